@@ -0,0 +1,5 @@
+"""
+Benchmarks del sistema experto de odontología
+Ejecutar desde la raíz del proyecto, por ejemplo:
+    python -m benchmarks.bench_reglas_crisp
+"""
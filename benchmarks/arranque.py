@@ -0,0 +1,134 @@
+"""
+Medición del arranque en frío
+- Informe estilo `python -X importtime`: coste de importar cada módulo del sistema
+  y los módulos más lentos que arrastra
+- Tiempo de reloj hasta el primer diagnóstico en un proceso nuevo
+Cada medición se hace en un intérprete limpio (subproceso)
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.comun import entorno, imprimir_resultados
+from benchmarks.generadores import generar_pacientes
+
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+MODULOS = [
+    'src.base_conocimiento',
+    'src.motor_inferencia',
+    'src.utilidades',
+    'src.interfaz.ventana_principal'
+]
+
+# Programa ejecutado en el proceso hijo: mide cada fase del primer diagnóstico
+PRIMER_DIAGNOSTICO = """
+import json, sys, time
+inicio = time.perf_counter()
+from src.motor_inferencia import MotorDiagnostico
+importado = time.perf_counter()
+motor = MotorDiagnostico()
+creado = time.perf_counter()
+motor.diagnose(json.loads(sys.argv[1]), use_fuzzy=sys.argv[2] == '1')
+diagnosticado = time.perf_counter()
+print(json.dumps({
+    'importacion': importado - inicio,
+    'creacion_motor': creado - importado,
+    'primer_diagnostico': diagnosticado - creado
+}))
+"""
+
+
+def importtime(modulo):
+    """
+    Ejecuta `python -X importtime -c "import <modulo>"`
+    Retorna la lista de (módulo, propio_us, acumulado_us) del informe
+    """
+    proceso = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+        cwd=RAIZ, capture_output=True, text=True
+    )
+    if proceso.returncode != 0:
+        raise RuntimeError(proceso.stderr.strip().splitlines()[-1])
+    
+    filas = []
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith('import time:') or 'self [us]' in linea:
+            continue
+        propio, acumulado, nombre = linea[len('import time:'):].split('|')
+        filas.append((nombre.strip(), int(propio), int(acumulado)))
+    return filas
+
+
+def informe_importacion(modulo, top):
+    """Coste total de importar un módulo y los módulos con más tiempo propio que arrastra"""
+    filas = importtime(modulo)
+    total = next((acumulado for nombre, _, acumulado in filas if nombre == modulo), 0)
+    lentos = sorted(filas, key=lambda fila: fila[1], reverse=True)
+    return {
+        'total_ms': round(total / 1000, 1),
+        'modulos_cargados': len(filas),
+        'skfuzzy_cargado': any(nombre == 'skfuzzy' for nombre, _, _ in filas),
+        'reportlab_cargado': any(nombre == 'reportlab' for nombre, _, _ in filas),
+        'mas_lentos': [
+            {'modulo': nombre, 'propio_ms': round(propio / 1000, 1), 'acumulado_ms': round(acumulado / 1000, 1)}
+            for nombre, propio, acumulado in lentos[:top]
+        ]
+    }
+
+
+def primer_diagnostico(facts, use_fuzzy):
+    """Lanza un intérprete nuevo y mide el tiempo hasta el primer diagnóstico"""
+    inicio = time.perf_counter()
+    proceso = subprocess.run(
+        [sys.executable, '-c', PRIMER_DIAGNOSTICO, json.dumps(facts), '1' if use_fuzzy else '0'],
+        cwd=RAIZ, capture_output=True, text=True, check=True
+    )
+    total = time.perf_counter() - inicio
+    fases = json.loads(proceso.stdout.strip().splitlines()[-1])
+    fases['total_proceso'] = total
+    return fases
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10, help='Módulos más lentos a listar')
+    parser.add_argument('--sin-fuzzy', action='store_true', help='Primer diagnóstico sin lógica difusa')
+    parser.add_argument('--json', default=None, help='Ruta donde guardar los resultados')
+    args = parser.parse_args()
+    
+    importaciones = {}
+    for modulo in MODULOS:
+        try:
+            importaciones[modulo] = informe_importacion(modulo, args.top)
+        except RuntimeError as e:
+            importaciones[modulo] = {'error': str(e)}
+    
+    facts = generar_pacientes(1)[0]
+    mediciones = [primer_diagnostico(facts, not args.sin_fuzzy) for _ in range(args.repeticiones)]
+    
+    imprimir_resultados({
+        'entorno': entorno(),
+        'benchmark': 'arranque',
+        'importacion': importaciones,
+        'primer_diagnostico': {
+            'repeticiones': args.repeticiones,
+            'usa_logica_fuzzy': not args.sin_fuzzy,
+            # Mediana de cada fase, en milisegundos
+            **{
+                f'{fase}_ms': round(statistics.median(m[fase] for m in mediciones) * 1000, 1)
+                for fase in mediciones[0]
+            }
+        }
+    }, args.json)
+
+
+if __name__ == '__main__':
+    main()
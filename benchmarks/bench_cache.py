@@ -0,0 +1,68 @@
+"""
+Benchmark de la caché de diagnósticos
+Simula tráfico sesgado (distribución de Zipf sobre un conjunto de perfiles)
+y compara diagnose() con y sin DiagnosisCache
+"""
+
+import argparse
+import random
+
+from src.motor_inferencia import MotorDiagnostico, DiagnosisCache
+from benchmarks.comun import entorno, imprimir_resultados, medir
+from benchmarks.generadores import generar_pacientes
+
+
+def trafico_zipf(perfiles, n, s=1.1, seed=42):
+    """Secuencia de n consultas donde el perfil k-ésimo aparece con peso 1/k^s"""
+    rng = random.Random(seed)
+    pesos = [1 / (k ** s) for k in range(1, len(perfiles) + 1)]
+    return rng.choices(perfiles, weights=pesos, k=n)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--consultas', type=int, default=20000)
+    parser.add_argument('--perfiles', type=int, default=2000, help='Perfiles distintos en el tráfico')
+    parser.add_argument('--entradas', type=int, default=512, help='Tamaño de la caché')
+    parser.add_argument('--zipf', type=float, default=1.1, help='Exponente de la distribución de Zipf')
+    parser.add_argument('--sin-fuzzy', action='store_true', help='Desactiva la capa difusa')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', default=None, help='Ruta donde guardar los resultados')
+    args = parser.parse_args()
+    
+    use_fuzzy = not args.sin_fuzzy
+    perfiles = generar_pacientes(args.perfiles, seed=args.seed)
+    consultas = trafico_zipf(perfiles, args.consultas, args.zipf, args.seed)
+    
+    motor = MotorDiagnostico()
+    cache = DiagnosisCache(args.entradas)
+    motor_cache = MotorDiagnostico(cache=cache)
+    
+    # Los resultados con y sin caché deben coincidir
+    muestra = consultas[:500]
+    assert [motor.diagnose(f, use_fuzzy) for f in muestra] == \
+        [motor_cache.diagnose(f, use_fuzzy) for f in muestra], "La caché altera los resultados"
+    
+    # Medir desde una caché vacía
+    cache = DiagnosisCache(args.entradas)
+    motor_cache.cache = cache
+    
+    sin_cache = medir(lambda f: motor.diagnose(f, use_fuzzy), consultas)
+    con_cache = medir(lambda f: motor_cache.diagnose(f, use_fuzzy), consultas)
+    
+    imprimir_resultados({
+        'entorno': entorno(),
+        'benchmark': 'cache_diagnosticos',
+        'consultas': args.consultas,
+        'perfiles': args.perfiles,
+        'zipf': args.zipf,
+        'usa_logica_fuzzy': use_fuzzy,
+        'sin_cache': sin_cache,
+        'con_cache': con_cache,
+        'cache': cache.stats(),
+        'aceleracion': round(sin_cache['segundos'] / con_cache['segundos'], 2)
+    }, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark de la caché persistente de diagnósticos
+1. Llena una caché SQLite con los resultados de un conjunto de perfiles
+2. Lanza varios procesos nuevos a la vez que sirven esos perfiles desde la
+   caché y los comparan con el motor (tiempo y coincidencia de resultados)
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from src.motor_inferencia import MotorDiagnostico, PersistentDiagnosisCache
+from benchmarks.comun import entorno, imprimir_resultados
+from benchmarks.generadores import generar_pacientes
+
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def lector(ruta, perfiles, seed):
+    """Proceso lector: sirve los perfiles desde la caché y desde el motor"""
+    pacientes = generar_pacientes(perfiles, seed=seed)
+    
+    inicio = time.perf_counter()
+    cache = PersistentDiagnosisCache(ruta)
+    motor_cache = MotorDiagnostico(cache=cache)
+    desde_cache = [motor_cache.diagnose(facts) for facts in pacientes]
+    t_cache = time.perf_counter() - inicio
+    
+    inicio = time.perf_counter()
+    motor = MotorDiagnostico()
+    desde_motor = [motor.diagnose(facts) for facts in pacientes]
+    t_motor = time.perf_counter() - inicio
+    
+    print(json.dumps({
+        'segundos_cache': t_cache,
+        'segundos_motor': t_motor,
+        'discrepancias': sum(a != b for a, b in zip(desde_cache, desde_motor)),
+        'cache': cache.stats()
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--perfiles', type=int, default=2000)
+    parser.add_argument('--lectores', type=int, default=4, help='Procesos lectores simultáneos')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--lector', default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--json', default=None, help='Ruta donde guardar los resultados')
+    args = parser.parse_args()
+    
+    if args.lector:
+        lector(args.lector, args.perfiles, args.seed)
+        return
+    
+    ruta = os.path.join(tempfile.mkdtemp(), 'cache_diagnosticos.db')
+    pacientes = generar_pacientes(args.perfiles, seed=args.seed)
+    
+    inicio = time.perf_counter()
+    cache = PersistentDiagnosisCache(ruta)
+    motor = MotorDiagnostico(cache=cache)
+    for facts in pacientes:
+        motor.diagnose(facts)
+    t_llenado = time.perf_counter() - inicio
+    cache.close()
+    
+    comando = [sys.executable, '-m', 'benchmarks.bench_cache_persistente',
+               '--lector', ruta, '--perfiles', str(args.perfiles), '--seed', str(args.seed)]
+    procesos = [
+        subprocess.Popen(comando, cwd=RAIZ, stdout=subprocess.PIPE, text=True)
+        for _ in range(args.lectores)
+    ]
+    lectores = [json.loads(p.communicate()[0].strip().splitlines()[-1]) for p in procesos]
+    
+    t_cache = max(l['segundos_cache'] for l in lectores)
+    t_motor = max(l['segundos_motor'] for l in lectores)
+    imprimir_resultados({
+        'entorno': entorno(),
+        'benchmark': 'cache_persistente',
+        'perfiles': args.perfiles,
+        'lectores': args.lectores,
+        'llenado_segundos': round(t_llenado, 3),
+        'bytes_en_disco': os.path.getsize(ruta),
+        'lector_cache_segundos': round(t_cache, 3),
+        'lector_motor_segundos': round(t_motor, 3),
+        'aciertos': sum(l['cache']['aciertos'] for l in lectores),
+        'fallos': sum(l['cache']['fallos'] for l in lectores),
+        'discrepancias': sum(l['discrepancias'] for l in lectores),
+        'aceleracion': round(t_motor / t_cache, 2) if t_cache else 0.0
+    }, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark del compilador de reglas crisp
+Compara evaluate_crisp_rules (índice invertido) con la función generada por
+compilador_reglas y comprueba que ambos disparan exactamente las mismas reglas:
+- de forma exhaustiva, regla por regla, sobre todas las combinaciones de los
+  campos que lee (muestreadas si hay demasiadas)
+- sobre pacientes simulados con distintas densidades de síntomas
+"""
+
+import argparse
+import itertools
+import random
+
+from src.base_conocimiento.hechos import SINTOMAS
+from src.base_conocimiento.reglas_crisp import get_compiled_rules, evaluate_crisp_rules
+from src.base_conocimiento.compilador_reglas import get_generated_evaluator
+from benchmarks.comun import entorno, imprimir_resultados, medir
+from benchmarks.generadores import generar_pacientes
+
+
+def dominio(campo):
+    """Valores posibles de un campo; None representa el campo ausente"""
+    valores = SINTOMAS.get(campo)
+    if isinstance(valores, tuple):
+        return [None] + list(range(valores[0], valores[1] + 1))
+    return [None] + list(valores or [])
+
+
+def tamano_espacio(regla):
+    """Número de combinaciones de los campos que lee una regla"""
+    total = 1
+    for campo in regla.fields or ():
+        total *= len(dominio(campo))
+    return total
+
+
+def espacio_regla(regla, maximo, rng):
+    """Combinaciones de los campos que lee una regla (todas o una muestra de maximo)"""
+    campos = sorted(regla.fields or ())
+    dominios = [dominio(campo) for campo in campos]
+    if tamano_espacio(regla) <= maximo:
+        combinaciones = itertools.product(*dominios)
+    else:
+        combinaciones = (tuple(rng.choice(v) for v in dominios) for _ in range(maximo))
+    for combinacion in combinaciones:
+        yield {c: v for c, v in zip(campos, combinacion) if v is not None}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pacientes', type=int, default=20000)
+    parser.add_argument('--prob-sintoma', type=float, nargs='+', default=[0.1, 0.4])
+    parser.add_argument('--max-combinaciones', type=int, default=50000,
+                        help='Combinaciones por regla antes de pasar a muestreo')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', default=None, help='Ruta donde guardar los resultados')
+    args = parser.parse_args()
+    
+    reglas = get_compiled_rules()
+    generado = get_generated_evaluator()
+    rng = random.Random(args.seed)
+    
+    # Exhaustivo por regla
+    combinaciones = 0
+    exhaustivas = 0
+    for regla in reglas:
+        for facts in espacio_regla(regla, args.max_combinaciones, rng):
+            combinaciones += 1
+            assert generado.evaluate(facts) == evaluate_crisp_rules(facts), \
+                f"Resultados distintos para {regla.name}: {facts}"
+        if tamano_espacio(regla) <= args.max_combinaciones:
+            exhaustivas += 1
+    
+    distribuciones = {}
+    for prob in args.prob_sintoma:
+        pacientes = generar_pacientes(args.pacientes, seed=args.seed, prob_sintoma=prob)
+        for facts in pacientes:
+            assert generado.evaluate(facts) == evaluate_crisp_rules(facts), \
+                f"Resultados distintos: {facts}"
+        indice = medir(evaluate_crisp_rules, pacientes, repeticiones=3)
+        funcion = medir(generado.evaluate, pacientes, repeticiones=3)
+        distribuciones[str(prob)] = {
+            'indice': indice,
+            'funcion_generada': funcion,
+            'solo_indices_disparados': medir(generado.fired, pacientes, repeticiones=3),
+            'aceleracion': round(indice['segundos'] / funcion['segundos'], 2)
+        }
+    
+    imprimir_resultados({
+        'entorno': entorno(),
+        'benchmark': 'compilador_reglas',
+        'reglas': len(reglas),
+        'lineas_generadas': generado.source.count('\n'),
+        'combinaciones_comprobadas': combinaciones,
+        'reglas_exhaustivas': exhaustivas,
+        'pacientes': args.pacientes,
+        'por_prob_sintoma': distribuciones
+    }, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark del recolector de estadísticas de reglas
+Mide el sobrecoste de RuleStatistics sobre evaluate_crisp_rules, diagnose()
+(con y sin lógica difusa), ForwardChainingEngine.run y ReteEngine.run, alternando rondas con
+el recolector activado y desactivado y quedándose con la mejor de cada una
+"""
+
+import argparse
+import time
+
+from src.base_conocimiento import evaluate_crisp_rules, get_compiled_rules
+from src.base_conocimiento.estadisticas_reglas import (
+    disable_rule_statistics,
+    enable_rule_statistics
+)
+from src.motor_inferencia import MotorDiagnostico
+from src.motor_inferencia.encadenamiento_adelante import ForwardChainingEngine
+from src.motor_inferencia.rete import ReteEngine
+from benchmarks.comun import entorno, imprimir_resultados
+from benchmarks.generadores import generar_pacientes
+
+
+def comparar(func, pacientes, rondas, estadisticas):
+    """Mejor tiempo de una ronda sin y con estadísticas, alternando las rondas"""
+    mejor = {'desactivado': None, 'activado': None}
+    for _ in range(rondas):
+        for modo in ('desactivado', 'activado'):
+            if modo == 'activado':
+                enable_rule_statistics(estadisticas)
+            inicio = time.perf_counter()
+            for facts in pacientes:
+                func(facts)
+            segundos = time.perf_counter() - inicio
+            disable_rule_statistics()
+            if mejor[modo] is None or segundos < mejor[modo]:
+                mejor[modo] = segundos
+    n = len(pacientes)
+    return {
+        'us_desactivado': round(mejor['desactivado'] / n * 1e6, 3),
+        'us_activado': round(mejor['activado'] / n * 1e6, 3),
+        'sobrecoste': round(mejor['activado'] / mejor['desactivado'] - 1, 4)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pacientes', type=int, default=200, help='Pacientes por ronda')
+    parser.add_argument('--rondas', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', default=None, help='Ruta donde guardar los resultados')
+    args = parser.parse_args()
+    
+    pacientes = generar_pacientes(args.pacientes, seed=args.seed)
+    motor = MotorDiagnostico()
+    lineal = ForwardChainingEngine(get_compiled_rules())
+    rete = ReteEngine(get_compiled_rules())
+    
+    # Las estadísticas no deben alterar los resultados
+    def resultados():
+        return ([motor.diagnose(f) for f in pacientes], [lineal.run(f) for f in pacientes],
+                [rete.run(f) for f in pacientes])
+    
+    esperados = resultados()
+    estadisticas = enable_rule_statistics()
+    obtenidos = resultados()
+    disable_rule_statistics()
+    assert obtenidos == esperados, "Las estadísticas alteran los resultados"
+    
+    rondas_difusas = max(1, args.rondas // 10)
+    imprimir_resultados({
+        'entorno': entorno(),
+        'benchmark': 'estadisticas_reglas',
+        'pacientes': args.pacientes,
+        'rondas': args.rondas,
+        'evaluate_crisp_rules': comparar(evaluate_crisp_rules, pacientes, args.rondas, estadisticas),
+        'diagnose_sin_fuzzy': comparar(
+            lambda f: motor.diagnose(f, use_fuzzy=False), pacientes, args.rondas, estadisticas
+        ),
+        'diagnose': comparar(motor.diagnose, pacientes, rondas_difusas, estadisticas),
+        'encadenamiento_lineal': comparar(lineal.run, pacientes, args.rondas, estadisticas),
+        'encadenamiento_rete': comparar(rete.run, pacientes, args.rondas, estadisticas),
+        'muestra': {
+            'reglas_con_disparos': sum(1 for r in estadisticas.stats()['reglas'].values() if r['disparos']),
+            'reglas_sin_disparos': len(estadisticas.never_fired())
+        }
+    }, args.json)
+
+
+if __name__ == '__main__':
+    main()
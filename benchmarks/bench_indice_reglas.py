@@ -0,0 +1,65 @@
+"""
+Benchmark del índice invertido de reglas
+Cuenta cuántas reglas se descartan por diagnóstico sin evaluarlas y compara
+evaluate_crisp_rules (con índice) con el recorrido completo de la tabla
+"""
+
+import argparse
+import statistics
+
+from src.base_conocimiento.reglas_crisp import get_compiled_rules, get_rule_index, evaluate_crisp_rules
+from benchmarks.comun import entorno, imprimir_resultados, medir
+from benchmarks.generadores import generar_pacientes
+
+
+def recorrido_completo(facts):
+    """Evaluación de referencia: todas las reglas en orden de la tabla"""
+    return [
+        {'diagnostico': r.conclusion, 'confianza': r.confidence, 'regla': r.name, 'tipo': 'crisp'}
+        for r in get_compiled_rules() if r.evaluate(facts)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pacientes', type=int, default=20000)
+    parser.add_argument('--prob-sintoma', type=float, nargs='+', default=[0.1, 0.25, 0.4],
+                        help='Probabilidades de que cada síntoma se aparte del valor por defecto')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', default=None, help='Ruta donde guardar los resultados')
+    args = parser.parse_args()
+    
+    reglas = get_compiled_rules()
+    indice = get_rule_index()
+    
+    distribuciones = {}
+    for prob in args.prob_sintoma:
+        pacientes = generar_pacientes(args.pacientes, seed=args.seed, prob_sintoma=prob)
+        for facts in pacientes:
+            assert evaluate_crisp_rules(facts) == recorrido_completo(facts), "El índice altera los resultados"
+        
+        descartadas = [len(reglas) - len(indice.candidates(facts)) for facts in pacientes]
+        completo = medir(recorrido_completo, pacientes, repeticiones=3)
+        con_indice = medir(evaluate_crisp_rules, pacientes, repeticiones=3)
+        distribuciones[str(prob)] = {
+            'reglas_descartadas_media': round(statistics.mean(descartadas), 2),
+            'reglas_descartadas_p10': sorted(descartadas)[len(descartadas) // 10],
+            'reglas_descartadas_p90': sorted(descartadas)[len(descartadas) * 9 // 10],
+            'fraccion_descartada': round(statistics.mean(descartadas) / len(reglas), 3),
+            'recorrido_completo': completo,
+            'con_indice': con_indice,
+            'aceleracion': round(completo['segundos'] / con_indice['segundos'], 2)
+        }
+    
+    imprimir_resultados({
+        'entorno': entorno(),
+        'benchmark': 'indice_reglas',
+        'reglas': len(reglas),
+        'reglas_sin_disparador': len(indice.unindexed),
+        'pacientes': args.pacientes,
+        'por_prob_sintoma': distribuciones
+    }, args.json)
+
+
+if __name__ == '__main__':
+    main()
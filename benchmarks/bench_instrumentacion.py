@@ -0,0 +1,61 @@
+"""
+Benchmark de la instrumentación por etapas
+Compara diagnose() con el perfilado desactivado y activado, comprueba que los
+resultados no cambian e imprime los percentiles de cada etapa
+"""
+
+import argparse
+import timeit
+
+from src.motor_inferencia import MotorDiagnostico
+from src.utilidades.instrumentacion import disable_profiling, enable_profiling, get_profiler
+from benchmarks.comun import entorno, imprimir_resultados, medir
+from benchmarks.generadores import generar_pacientes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pacientes', type=int, default=3000)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--sin-fuzzy', action='store_true', help='Desactiva la capa difusa')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--prometheus', action='store_true', help='Imprime también el formato de Prometheus')
+    parser.add_argument('--json', default=None, help='Ruta donde guardar los resultados')
+    args = parser.parse_args()
+    
+    use_fuzzy = not args.sin_fuzzy
+    pacientes = generar_pacientes(args.pacientes, seed=args.seed)
+    motor = MotorDiagnostico()
+    
+    disable_profiling()
+    esperados = [motor.diagnose(f, use_fuzzy) for f in pacientes]
+    desactivado = medir(lambda f: motor.diagnose(f, use_fuzzy), pacientes, args.repeticiones)
+    
+    perfilador = enable_profiling()
+    assert [motor.diagnose(f, use_fuzzy) for f in pacientes] == esperados, \
+        "El perfilado altera los resultados"
+    perfilador.reset()
+    activado = medir(lambda f: motor.diagnose(f, use_fuzzy), pacientes, args.repeticiones)
+    disable_profiling()
+    
+    # Coste de un punto de medida desactivado: una llamada y una comparación con None
+    n = 1_000_000
+    comprobacion = timeit.timeit('get_profiler() is None', globals={'get_profiler': get_profiler}, number=n)
+    
+    imprimir_resultados({
+        'entorno': entorno(),
+        'benchmark': 'instrumentacion_etapas',
+        'pacientes': args.pacientes,
+        'usa_logica_fuzzy': use_fuzzy,
+        'desactivado': desactivado,
+        'activado': activado,
+        'sobrecoste_activado': round(activado['segundos'] / desactivado['segundos'] - 1, 4),
+        'ns_por_comprobacion_desactivada': round(comprobacion / n * 1e9, 1),
+        'etapas': perfilador.stats()
+    }, args.json)
+    if args.prometheus:
+        print(perfilador.to_prometheus())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark del diagnóstico por lotes
+Compara diagnose() paciente a paciente con diagnose_batch() sobre un lote columnar
+"""
+
+import argparse
+import time
+
+from src.motor_inferencia import MotorDiagnostico
+from src.motor_inferencia.diagnostico_lotes import encode_batch
+from benchmarks.comun import entorno, imprimir_resultados
+from benchmarks.generadores import generar_pacientes
+
+
+def pacientes_por_segundo(n, segundos):
+    return round(n / segundos, 1) if segundos else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pacientes', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--sin-fuzzy', action='store_true', help='Desactiva la capa difusa')
+    parser.add_argument('--json', default=None, help='Ruta donde guardar los resultados')
+    args = parser.parse_args()
+    
+    use_fuzzy = not args.sin_fuzzy
+    pacientes = generar_pacientes(args.pacientes, seed=args.seed)
+    motor = MotorDiagnostico()
+    
+    inicio = time.perf_counter()
+    individuales = [motor.diagnose(facts, use_fuzzy=use_fuzzy) for facts in pacientes]
+    t_individual = time.perf_counter() - inicio
+    
+    inicio = time.perf_counter()
+    lote = encode_batch(pacientes)
+    t_codificacion = time.perf_counter() - inicio
+    
+    inicio = time.perf_counter()
+    por_lote = motor.diagnose_batch(lote, use_fuzzy=use_fuzzy)
+    t_lote = time.perf_counter() - inicio
+    
+    assert individuales == por_lote, "diagnose_batch no coincide con diagnose"
+    
+    n = len(pacientes)
+    imprimir_resultados({
+        'entorno': entorno(),
+        'benchmark': 'diagnostico_lotes',
+        'pacientes': n,
+        'usa_logica_fuzzy': use_fuzzy,
+        'individual_pacientes_por_segundo': pacientes_por_segundo(n, t_individual),
+        'lote_pacientes_por_segundo': pacientes_por_segundo(n, t_lote),
+        'lote_con_codificacion_pacientes_por_segundo': pacientes_por_segundo(n, t_lote + t_codificacion),
+        'aceleracion': round(t_individual / t_lote, 2)
+    }, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark del motor difuso NumPy frente a scikit-fuzzy
+Comprueba que MamdaniInferenceSystem da exactamente los mismos valores que las
+simulaciones de scikit-fuzzy (todas las entradas enteras y entradas decimales
+aleatorias, también fuera del universo) y mide ambos motores paciente a
+paciente y el motor NumPy con todo el lote a la vez (evaluate_inputs_batch)
+"""
+
+import argparse
+import itertools
+import random
+import time
+
+import numpy as np
+
+from src.base_conocimiento.reglas_difusas import (
+    FuzzyDiagnosisSystem,
+    FuzzySurface,
+    SIMULATION_INPUTS,
+    extract_fuzzy_inputs
+)
+from benchmarks.comun import entorno, imprimir_resultados, medir
+from benchmarks.generadores import generar_pacientes
+
+
+def verificar(skfuzzy, numpy_sys, decimales, seed):
+    """Cuenta las entradas en las que el motor NumPy difiere de scikit-fuzzy"""
+    rng = random.Random(seed)
+    entradas = list(itertools.product(*(range(size) for size in FuzzySurface.SHAPE)))
+    entradas += [(rng.uniform(-1, 11), rng.uniform(-1, 11), rng.uniform(-1, 8)) for _ in range(decimales)]
+    matriz = np.array(entradas, dtype=float)
+    
+    diferencias = 0
+    for output, (_, input_1, input_2, input_3) in SIMULATION_INPUTS.items():
+        lote = numpy_sys.mamdani.compute(
+            {input_1: matriz[:, 0], input_2: matriz[:, 1], input_3: matriz[:, 2]}, [output]
+        )[output].tolist()
+        for entrada, valor in zip(entradas, lote):
+            esperado = skfuzzy._simulate(output, *entrada)
+            obtenido = numpy_sys._simulate(output, *entrada)
+            valor = None if np.isnan(valor) else valor
+            if esperado is None or obtenido is None or valor is None:
+                diferencias += not (esperado is None and obtenido is None and valor is None)
+            elif not float(esperado) == obtenido == valor:
+                diferencias += 1
+    return diferencias, len(entradas) * len(SIMULATION_INPUTS)
+
+
+def medir_lote(matriz, repeticiones=3):
+    """
+    Mejor tiempo de evaluate_inputs_batch sobre toda la matriz
+    Cada repetición usa un sistema nuevo (sin centroides memorizados)
+    """
+    mejor = None
+    for _ in range(repeticiones):
+        sistema = FuzzyDiagnosisSystem()
+        sistema.mamdani._compile()
+        inicio = time.perf_counter()
+        sistema.evaluate_inputs_batch(matriz)
+        total = time.perf_counter() - inicio
+        if mejor is None or total < mejor:
+            mejor = total
+    n = len(matriz)
+    return {
+        'n': n,
+        'segundos': round(mejor, 6),
+        'us_por_item': round(mejor / n * 1e6, 3),
+        'items_por_segundo': round(n / mejor, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pacientes', type=int, default=5000)
+    parser.add_argument('--decimales', type=int, default=2000,
+                        help='Entradas decimales aleatorias de la verificación')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', default=None, help='Ruta donde guardar los resultados')
+    args = parser.parse_args()
+    
+    skfuzzy = FuzzyDiagnosisSystem(backend='skfuzzy')
+    numpy_sys = FuzzyDiagnosisSystem(backend='numpy')
+    
+    diferencias, comparaciones = verificar(skfuzzy, numpy_sys, args.decimales, args.seed)
+    assert diferencias == 0, f"El motor NumPy difiere de scikit-fuzzy en {diferencias} entradas"
+    
+    pacientes = generar_pacientes(args.pacientes, seed=args.seed)
+    entradas = [extract_fuzzy_inputs(facts) for facts in pacientes]
+    
+    t_skfuzzy = medir(lambda e: skfuzzy.evaluate_inputs(*e), entradas)
+    t_numpy = medir(lambda e: numpy_sys.evaluate_inputs(*e), entradas, repeticiones=3)
+    
+    # Lote completo en una llamada: entradas enteras de los pacientes y las
+    # mismas con escalas decimales (casi todas las combinaciones distintas)
+    matriz = np.array(entradas, dtype=float)
+    decimales = matriz.copy()
+    decimales[:, :3] = np.random.default_rng(args.seed).uniform(0, 10, (len(matriz), 3))
+    t_lote = medir_lote(matriz)
+    t_lote_decimal = medir_lote(decimales)
+    
+    imprimir_resultados({
+        'entorno': entorno(),
+        'benchmark': 'motor_difuso',
+        'comparaciones': comparaciones,
+        'diferencias': diferencias,
+        'skfuzzy': t_skfuzzy,
+        'numpy': t_numpy,
+        'numpy_lote': t_lote,
+        'numpy_lote_decimales': t_lote_decimal,
+        'aceleracion': round(t_skfuzzy['segundos'] / t_numpy['segundos'], 1),
+        'aceleracion_lote': round(t_skfuzzy['segundos'] / t_lote['segundos'], 1)
+    }, args.json)
+
+
+if __name__ == '__main__':
+    main()
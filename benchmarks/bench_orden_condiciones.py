@@ -0,0 +1,74 @@
+"""
+Benchmark del orden de condiciones aprendido
+Aprende el orden con un corpus de entrenamiento y, sobre otro corpus distinto,
+cuenta las pruebas de condiciones que se ahorran y compara los tiempos de la
+evaluación crisp con el orden escrito y con el orden aprendido
+"""
+
+import argparse
+
+from src.base_conocimiento.reglas_crisp import (
+    RuleIndex,
+    apply_condition_order,
+    compile_rules,
+    get_all_rules
+)
+from src.base_conocimiento.optimizador_reglas import (
+    SelectivityProfile,
+    learn_condition_order,
+    save_condition_order
+)
+from benchmarks.comun import entorno, imprimir_resultados, medir
+from benchmarks.generadores import generar_pacientes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--entrenamiento', type=int, default=20000)
+    parser.add_argument('--pacientes', type=int, default=20000)
+    parser.add_argument('--prob-sintoma', type=float, default=0.4)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--guardar', action='store_true',
+                        help='Guarda el orden aprendido en data/orden_condiciones.json')
+    parser.add_argument('--json', default=None, help='Ruta donde guardar los resultados')
+    args = parser.parse_args()
+    
+    escritas = compile_rules(get_all_rules())
+    entrenamiento = generar_pacientes(args.entrenamiento, seed=args.seed, prob_sintoma=args.prob_sintoma)
+    orden, perfil_entrenamiento = learn_condition_order(entrenamiento, escritas)
+    ordenadas = apply_condition_order(escritas, orden)
+    
+    # Corpus de prueba distinto del de entrenamiento
+    pacientes = generar_pacientes(args.pacientes, seed=args.seed + 1, prob_sintoma=args.prob_sintoma)
+    indice_escrito = RuleIndex(escritas)
+    indice_ordenado = RuleIndex(ordenadas)
+    for facts in pacientes:
+        assert indice_escrito.evaluate(facts) == indice_ordenado.evaluate(facts), \
+            "El orden aprendido altera los resultados"
+    
+    perfil = SelectivityProfile(escritas, pacientes).summary(orden)
+    reordenadas = sum(1 for a, b in zip(escritas, ordenadas) if a.conditions != b.conditions)
+    con_orden_escrito = medir(indice_escrito.evaluate, pacientes, repeticiones=3)
+    con_orden_aprendido = medir(indice_ordenado.evaluate, pacientes, repeticiones=3)
+    
+    if args.guardar:
+        save_condition_order(orden, escritas, summary=perfil_entrenamiento)
+    
+    imprimir_resultados({
+        'entorno': entorno(),
+        'benchmark': 'orden_condiciones',
+        'reglas': len(escritas),
+        'reglas_reordenadas': reordenadas,
+        'prob_sintoma': args.prob_sintoma,
+        'entrenamiento': perfil_entrenamiento,
+        'prueba': perfil,
+        'pruebas_por_paciente_antes': round(perfil['pruebas_antes'] / args.pacientes, 2),
+        'pruebas_por_paciente_despues': round(perfil['pruebas_despues'] / args.pacientes, 2),
+        'orden_escrito': con_orden_escrito,
+        'orden_aprendido': con_orden_aprendido,
+        'aceleracion': round(con_orden_escrito['segundos'] / con_orden_aprendido['segundos'], 2)
+    }, args.json)
+
+
+if __name__ == '__main__':
+    main()
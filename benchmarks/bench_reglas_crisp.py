@@ -0,0 +1,78 @@
+"""
+Benchmark de evaluación de reglas crisp
+Compara la construcción de objetos Rule por diagnóstico (comportamiento anterior)
+con la tabla de reglas compilada una sola vez
+"""
+
+import argparse
+import tracemalloc
+
+from src.base_conocimiento.reglas_crisp import (
+    get_all_rules,
+    evaluate_crisp_rules
+)
+from benchmarks.comun import medir, entorno, imprimir_resultados
+from benchmarks.generadores import generar_pacientes
+
+
+def evaluate_crisp_rules_sin_compilar(facts):
+    """Evaluación anterior: reconstruye cada Rule y sus lambdas por paciente"""
+    results = []
+    for rule_func in get_all_rules():
+        rule = rule_func(facts)
+        if rule.evaluate(facts):
+            results.append({
+                'diagnostico': rule.conclusion,
+                'confianza': rule.confidence,
+                'regla': rule.name,
+                'tipo': 'crisp'
+            })
+    return results
+
+
+def medir_memoria(func, pacientes):
+    """
+    Mide la memoria asignada por diagnóstico con tracemalloc
+    Retorna el pico medio de bytes asignados durante una llamada
+    """
+    tracemalloc.start()
+    total_pico = 0
+    for facts in pacientes:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        func(facts)
+        total_pico += tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return round(total_pico / len(pacientes), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pacientes', type=int, default=100000)
+    parser.add_argument('--muestra-memoria', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', default=None, help='Ruta donde guardar los resultados')
+    args = parser.parse_args()
+    
+    pacientes = generar_pacientes(args.pacientes, seed=args.seed)
+    muestra = pacientes[:args.muestra_memoria]
+    
+    # Verificar que ambas rutas producen el mismo resultado
+    for facts in muestra:
+        assert evaluate_crisp_rules(facts) == evaluate_crisp_rules_sin_compilar(facts)
+    
+    resultados = {'entorno': entorno(), 'benchmark': 'reglas_crisp'}
+    for nombre, func in [('sin_compilar', evaluate_crisp_rules_sin_compilar),
+                         ('tabla_compilada', evaluate_crisp_rules)]:
+        resultado = medir(func, pacientes)
+        resultado['bytes_pico_por_diagnostico'] = medir_memoria(func, muestra)
+        resultados[nombre] = resultado
+    
+    resultados['aceleracion'] = round(
+        resultados['sin_compilar']['segundos'] / resultados['tabla_compilada']['segundos'], 2
+    )
+    imprimir_resultados(resultados, args.json)
+
+
+if __name__ == '__main__':
+    main()
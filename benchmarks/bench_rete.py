@@ -0,0 +1,108 @@
+"""
+Benchmark del motor Rete frente al recorrido lineal de reglas
+Hace crecer la base de reglas desde las reglas reales hasta miles de reglas sintéticas
+"""
+
+import argparse
+import random
+
+from src.base_conocimiento.hechos import SINTOMAS
+from src.base_conocimiento.reglas_crisp import Rule, Condition, get_compiled_rules
+from src.motor_inferencia.encadenamiento_adelante import ForwardChainingEngine
+from src.motor_inferencia.rete import ReteEngine
+from benchmarks.comun import medir, entorno, imprimir_resultados
+from benchmarks.generadores import generar_pacientes
+
+
+def generar_condicion(rng):
+    """Genera una condición sintética sobre un campo de SINTOMAS"""
+    campo = rng.choice(list(SINTOMAS))
+    valores = SINTOMAS[campo]
+    if isinstance(valores, tuple):
+        operador = rng.choice(['>=', '>=', '<=', '<'])
+        return Condition(campo, operador, rng.randint(1, 9))
+    if rng.random() < 0.5:
+        return Condition(campo, '==', rng.choice(valores))
+    return Condition(campo, 'in', rng.sample(valores, min(2, len(valores))))
+
+
+def generar_reglas(n, seed=7):
+    """
+    Construye una base de n reglas: las reglas reales más reglas sintéticas
+    Las reglas sintéticas reutilizan condiciones de las reales para que haya pruebas compartidas
+    """
+    rng = random.Random(seed)
+    reales = list(get_compiled_rules())
+    condiciones = [c for rule in reales for c in rule.conditions]
+    reglas = reales[:n]
+    while len(reglas) < n:
+        tamano = rng.randint(2, 5)
+        conds = [
+            rng.choice(condiciones) if rng.random() < 0.7 else generar_condicion(rng)
+            for _ in range(tamano)
+        ]
+        reglas.append(Rule(
+            name=f"Regla sintética {len(reglas)}",
+            conditions=conds,
+            conclusion=rng.choice([r.conclusion for r in reales]),
+            confidence=round(rng.uniform(0.5, 0.99), 2)
+        ))
+    return reglas
+
+
+def secuencia_incremental(pacientes, seed=11):
+    """Secuencia de hechos donde cada paso cambia un único campo (como al editar el formulario)"""
+    rng = random.Random(seed)
+    actual = dict(pacientes[0])
+    secuencia = []
+    for _ in range(len(pacientes)):
+        actual = dict(actual)
+        campo = rng.choice(list(SINTOMAS))
+        valores = SINTOMAS[campo]
+        actual[campo] = rng.randint(*valores) if isinstance(valores, tuple) else rng.choice(valores)
+        secuencia.append(actual)
+    return secuencia
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pacientes', type=int, default=2000)
+    parser.add_argument('--tamanos', default='50,500,1000,5000')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', default=None, help='Ruta donde guardar los resultados')
+    args = parser.parse_args()
+    
+    pacientes = generar_pacientes(args.pacientes, seed=args.seed)
+    escenarios = {
+        'pacientes_independientes': pacientes,
+        'edicion_incremental': secuencia_incremental(pacientes)
+    }
+    
+    resultados = {'entorno': entorno(), 'benchmark': 'rete', 'tamanos': []}
+    for n in [int(t) for t in args.tamanos.split(',')]:
+        reglas = generar_reglas(n)
+        lineal = ForwardChainingEngine(reglas)
+        rete = ReteEngine(reglas)
+        fila = {
+            'reglas': n,
+            'condiciones': sum(len(r.conditions) for r in reglas),
+            'nodos_alfa': len(rete.network.alpha_nodes)
+        }
+        for nombre, secuencia in escenarios.items():
+            for facts in secuencia[:200]:
+                assert lineal.run(facts) == rete.run(facts)
+            t_lineal = medir(lineal.run, secuencia)
+            rete.network.reset()
+            t_rete = medir(rete.run, secuencia)
+            fila[nombre] = {
+                'lineal': t_lineal,
+                'rete': t_rete,
+                'aceleracion': round(t_lineal['segundos'] / t_rete['segundos'], 2)
+            }
+        resultados['tamanos'].append(fila)
+    
+    imprimir_resultados(resultados, args.json)
+
+
+if __name__ == '__main__':
+    main()
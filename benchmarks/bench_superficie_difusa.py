@@ -0,0 +1,77 @@
+"""
+Benchmark de la superficie difusa precalculada
+Compara la simulación de scikit-fuzzy con la consulta a la superficie tabulada
+y comprueba que ambas dan exactamente el mismo valor para todas las entradas enteras
+"""
+
+import argparse
+import itertools
+import os
+import tempfile
+import time
+
+from src.base_conocimiento.reglas_difusas import (
+    FuzzyDiagnosisSystem,
+    FuzzySurface,
+    SIMULATION_INPUTS,
+    extract_fuzzy_inputs
+)
+from benchmarks.comun import entorno, imprimir_resultados, medir
+from benchmarks.generadores import generar_pacientes
+
+
+def verificar(simulado, superficie):
+    """Cuenta las entradas enteras en las que la superficie difiere de la simulación"""
+    diferencias = 0
+    for index in itertools.product(*(range(size) for size in FuzzySurface.SHAPE)):
+        for output in SIMULATION_INPUTS:
+            esperado = simulado._simulate(output, *index)
+            obtenido = superficie._probability(output, *index)
+            if esperado is None or obtenido is None:
+                diferencias += esperado is not obtenido
+            elif float(esperado) != float(obtenido):
+                diferencias += 1
+    return diferencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pacientes', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', default=None, help='Ruta donde guardar los resultados')
+    args = parser.parse_args()
+    
+    simulado = FuzzyDiagnosisSystem()
+    ruta = os.path.join(tempfile.mkdtemp(), 'superficie_difusa.npz')
+    
+    inicio = time.perf_counter()
+    superficie = FuzzyDiagnosisSystem(use_surface=True, surface_path=ruta)
+    t_construccion = time.perf_counter() - inicio
+    
+    inicio = time.perf_counter()
+    FuzzyDiagnosisSystem(use_surface=True, surface_path=ruta)
+    t_carga = time.perf_counter() - inicio
+    
+    diferencias = verificar(simulado, superficie)
+    assert diferencias == 0, f"La superficie difiere de la simulación en {diferencias} entradas"
+    
+    entradas = [extract_fuzzy_inputs(facts) for facts in generar_pacientes(args.pacientes, seed=args.seed)]
+    t_simulado = medir(lambda e: simulado.evaluate_inputs(*e), entradas)
+    t_superficie = medir(lambda e: superficie.evaluate_inputs(*e), entradas, repeticiones=3)
+    
+    imprimir_resultados({
+        'entorno': entorno(),
+        'benchmark': 'superficie_difusa',
+        'celdas_por_salida': int(FuzzySurface.SHAPE[0] * FuzzySurface.SHAPE[1] * FuzzySurface.SHAPE[2]),
+        'bytes_en_disco': os.path.getsize(ruta),
+        'construccion_segundos': round(t_construccion, 3),
+        'carga_segundos': round(t_carga, 3),
+        'diferencias': diferencias,
+        'simulacion': t_simulado,
+        'superficie': t_superficie,
+        'aceleracion': round(t_simulado['segundos'] / t_superficie['segundos'], 1)
+    }, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark de la tabla de decisión precalculada
+Informa del tamaño de la tabla (umbrales, clases por campo, máscaras) y compara
+la latencia de consulta con evaluate_crisp_rules y con la función generada;
+comprueba que las reglas disparadas son idénticas de forma exhaustiva por regla
+y sobre pacientes simulados
+"""
+
+import argparse
+import random
+import time
+
+from src.base_conocimiento.reglas_crisp import get_compiled_rules, evaluate_crisp_rules
+from src.base_conocimiento.compilador_reglas import get_generated_evaluator
+from src.base_conocimiento.tabla_decision import DecisionTable, get_decision_table
+from benchmarks.bench_compilador_reglas import espacio_regla
+from benchmarks.comun import entorno, imprimir_resultados, medir
+from benchmarks.generadores import generar_pacientes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pacientes', type=int, default=20000)
+    parser.add_argument('--prob-sintoma', type=float, nargs='+', default=[0.1, 0.4])
+    parser.add_argument('--max-combinaciones', type=int, default=50000,
+                        help='Combinaciones por regla antes de pasar a muestreo')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', default=None, help='Ruta donde guardar los resultados')
+    args = parser.parse_args()
+    
+    reglas = get_compiled_rules()
+    inicio = time.perf_counter()
+    DecisionTable(reglas)
+    construccion = time.perf_counter() - inicio
+    tabla = get_decision_table()
+    generado = get_generated_evaluator()
+    rng = random.Random(args.seed)
+    
+    combinaciones = 0
+    for regla in reglas:
+        for facts in espacio_regla(regla, args.max_combinaciones, rng):
+            combinaciones += 1
+            assert tabla.evaluate(facts) == evaluate_crisp_rules(facts), \
+                f"Resultados distintos para {regla.name}: {facts}"
+    
+    distribuciones = {}
+    for prob in args.prob_sintoma:
+        pacientes = generar_pacientes(args.pacientes, seed=args.seed, prob_sintoma=prob)
+        for facts in pacientes:
+            assert tabla.evaluate(facts) == evaluate_crisp_rules(facts), f"Resultados distintos: {facts}"
+        indice = medir(evaluate_crisp_rules, pacientes, repeticiones=3)
+        consulta = medir(tabla.evaluate, pacientes, repeticiones=3)
+        distribuciones[str(prob)] = {
+            'indice': indice,
+            'funcion_generada': medir(generado.evaluate, pacientes, repeticiones=3),
+            'tabla_decision': consulta,
+            'solo_mascara': medir(tabla.mask, pacientes, repeticiones=3),
+            'aceleracion_sobre_indice': round(indice['segundos'] / consulta['segundos'], 2)
+        }
+    
+    descripcion = tabla.describe()
+    imprimir_resultados({
+        'entorno': entorno(),
+        'benchmark': 'tabla_decision',
+        'reglas': len(reglas),
+        'campos': len(descripcion['campos']),
+        'grupos': len(descripcion['grupos']),
+        'clases_por_campo': {c: info['clases'] for c, info in descripcion['campos'].items()},
+        'mascaras': descripcion['mascaras'],
+        'clases_equivalencia': descripcion['clases_equivalencia'],
+        'segundos_construccion': round(construccion, 4),
+        'combinaciones_comprobadas': combinaciones,
+        'pacientes': args.pacientes,
+        'por_prob_sintoma': distribuciones
+    }, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Prueba de carga de la API asyncio de diagnóstico
+Mientras se lanzan muchos diagnósticos concurrentes, una tarea "latido" duerme
+1 ms en bucle y mide cuánto se retrasa el bucle de eventos respecto a lo
+previsto. Compara:
+- sin carga (referencia)
+- bloqueante: cada petición llama a MotorDiagnostico.analyze() dentro del bucle
+- DiagnosticoAsincrono con pool de hilos y de procesos
+Además comprueba que los resultados coinciden con los de la API síncrona y
+ejercita los tiempos máximos y la cancelación.
+"""
+
+import argparse
+import asyncio
+import time
+
+from src.motor_inferencia import MotorDiagnostico
+from src.servicio import DiagnosticoAsincrono
+from benchmarks.carga_http import percentil
+from benchmarks.comun import entorno, imprimir_resultados
+from benchmarks.generadores import generar_pacientes
+
+
+INTERVALO_LATIDO = 0.001
+
+
+async def latido(retrasos, parar):
+    """Mide el retraso del bucle de eventos en cada despertar"""
+    while not parar.is_set():
+        inicio = time.perf_counter()
+        await asyncio.sleep(INTERVALO_LATIDO)
+        retrasos.append((time.perf_counter() - inicio - INTERVALO_LATIDO) * 1000)
+
+
+def resumen_retrasos(retrasos):
+    retrasos = sorted(retrasos)
+    return {
+        'latidos': len(retrasos),
+        'retraso_p50_ms': round(percentil(retrasos, 50), 3),
+        'retraso_p99_ms': round(percentil(retrasos, 99), 3),
+        'retraso_max_ms': round(retrasos[-1], 3) if retrasos else 0.0
+    }
+
+
+async def medir_carga(carga):
+    """Ejecuta la corrutina carga() con el latido en paralelo"""
+    retrasos = []
+    parar = asyncio.Event()
+    tarea = asyncio.ensure_future(latido(retrasos, parar))
+    inicio = time.perf_counter()
+    resultados = await carga()
+    segundos = time.perf_counter() - inicio
+    parar.set()
+    await tarea
+    datos = resumen_retrasos(retrasos)
+    datos['segundos'] = round(segundos, 3)
+    return datos, resultados
+
+
+async def ejecutar(args):
+    pacientes = generar_pacientes(args.pacientes, seed=args.seed)
+    motor = MotorDiagnostico()
+    esperados = [motor.analyze(facts).data for facts in pacientes]
+    modos = {}
+    
+    async def sin_carga():
+        await asyncio.sleep(0.5)
+    
+    modos['sin_carga'], _ = await medir_carga(sin_carga)
+    
+    async def peticion_bloqueante(facts):
+        return motor.analyze(facts).data
+    
+    async def bloqueante():
+        # Integración ingenua: cada petición llama al motor dentro del bucle
+        return await asyncio.gather(*(peticion_bloqueante(f) for f in pacientes))
+    
+    modos['bloqueante'], resultados = await medir_carga(bloqueante)
+    assert resultados == esperados
+    
+    for modo in ('hilos', 'procesos'):
+        async with DiagnosticoAsincrono(trabajadores=args.trabajadores, modo=modo,
+                                        max_concurrencia=args.concurrencia) as servicio:
+            # Calentar el pool (arranque de procesos, primer motor)
+            await servicio.diagnose_many(pacientes[:args.trabajadores])
+            datos, resultados = await medir_carga(lambda: servicio.diagnose_many(pacientes))
+            assert resultados == esperados, f"Resultados distintos en modo {modo}"
+            datos['diagnosticos_por_segundo'] = round(len(pacientes) / datos['segundos'], 1)
+            
+            # Tiempo máximo demasiado corto: debe expirar sin bloquear el bucle
+            expirados = 0
+            for facts in pacientes[:20]:
+                try:
+                    await servicio.diagnose(facts, timeout=1e-6)
+                except asyncio.TimeoutError:
+                    expirados += 1
+            
+            # Cancelación de diagnósticos en curso
+            tareas = [asyncio.ensure_future(servicio.diagnose(f)) for f in pacientes[:50]]
+            await asyncio.sleep(0.01)
+            for tarea in tareas:
+                tarea.cancel()
+            finalizadas = await asyncio.gather(*tareas, return_exceptions=True)
+            datos['expirados'] = expirados
+            datos['cancelados'] = sum(isinstance(r, asyncio.CancelledError) for r in finalizadas)
+            datos['contadores'] = dict(servicio.contadores)
+            modos[modo] = datos
+    
+    return modos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pacientes', type=int, default=1000)
+    parser.add_argument('--trabajadores', type=int, default=2)
+    parser.add_argument('--concurrencia', type=int, default=32)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', default=None, help='Ruta donde guardar los resultados')
+    args = parser.parse_args()
+    
+    modos = asyncio.run(ejecutar(args))
+    imprimir_resultados({
+        'entorno': entorno(),
+        'benchmark': 'carga_async',
+        'pacientes': args.pacientes,
+        'trabajadores': args.trabajadores,
+        'concurrencia': args.concurrencia,
+        'modos': modos
+    }, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Prueba de carga del servicio HTTP de diagnóstico
+Lanza clientes concurrentes con conexiones persistentes contra POST /diagnostico
+y reporta latencias (p50/p99) y peticiones por segundo.
+Sin --url arranca un servidor local en un puerto libre.
+"""
+
+import argparse
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlsplit
+
+from src.servicio import ServidorDiagnostico
+from benchmarks.comun import entorno, imprimir_resultados
+from benchmarks.generadores import generar_pacientes
+
+
+def percentil(valores, p):
+    """Percentil por el método del rango más cercano (valores ordenados)"""
+    if not valores:
+        return 0.0
+    indice = max(0, min(len(valores) - 1, int(round(p / 100 * len(valores) + 0.5)) - 1))
+    return valores[indice]
+
+
+def cliente(host, port, cuerpos, ruta, latencias, errores):
+    """Envía las peticiones de un cliente reutilizando una conexión"""
+    conexion = http.client.HTTPConnection(host, port, timeout=60)
+    cabeceras = {'Content-Type': 'application/json'}
+    for cuerpo in cuerpos:
+        inicio = time.perf_counter()
+        try:
+            conexion.request('POST', ruta, body=cuerpo, headers=cabeceras)
+            respuesta = conexion.getresponse()
+            respuesta.read()
+            if respuesta.status != 200:
+                errores.append(respuesta.status)
+                continue
+        except Exception as e:
+            errores.append(str(e))
+            conexion.close()
+            conexion = http.client.HTTPConnection(host, port, timeout=60)
+            continue
+        latencias.append(time.perf_counter() - inicio)
+    conexion.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--url', default=None, help='Servicio a probar (ej. http://127.0.0.1:8080)')
+    parser.add_argument('--clientes', type=int, default=16, help='Clientes concurrentes')
+    parser.add_argument('--peticiones', type=int, default=2000, help='Peticiones totales')
+    parser.add_argument('--trabajadores', type=int, default=4, help='Pool del servidor local')
+    parser.add_argument('--modo', choices=('hilos', 'procesos'), default='hilos')
+    parser.add_argument('--superficie', action='store_true', help='Servidor local con superficie difusa')
+    parser.add_argument('--sin-fuzzy', action='store_true', help='Pide diagnósticos sin lógica difusa')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', default=None, help='Ruta donde guardar los resultados')
+    args = parser.parse_args()
+    
+    servidor = None
+    if args.url:
+        partes = urlsplit(args.url)
+        host, port = partes.hostname, partes.port or 80
+    else:
+        servidor = ServidorDiagnostico(
+            port=0, trabajadores=args.trabajadores, modo=args.modo, use_surface=args.superficie
+        )
+        servidor.start()
+        host, port = servidor.address[:2]
+    
+    ruta = '/diagnostico?fuzzy=0' if args.sin_fuzzy else '/diagnostico'
+    cuerpos = [json.dumps(p).encode('utf-8') for p in generar_pacientes(args.peticiones, seed=args.seed)]
+    
+    # Calentamiento: una petición por trabajador antes de medir
+    calentamiento = []
+    cliente(host, port, cuerpos[:args.trabajadores], ruta, calentamiento, [])
+    
+    latencias = []
+    errores = []
+    hilos = [
+        threading.Thread(target=cliente, args=(host, port, cuerpos[i::args.clientes], ruta, latencias, errores))
+        for i in range(args.clientes)
+    ]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    segundos = time.perf_counter() - inicio
+    
+    if servidor is not None:
+        servidor.shutdown()
+    
+    latencias.sort()
+    imprimir_resultados({
+        'entorno': entorno(),
+        'benchmark': 'carga_http',
+        'servidor': args.url or f'local ({args.trabajadores} {args.modo})',
+        'clientes': args.clientes,
+        'peticiones': args.peticiones,
+        'exitosas': len(latencias),
+        'errores': len(errores),
+        'segundos': round(segundos, 3),
+        'peticiones_por_segundo': round(len(latencias) / segundos, 1) if segundos else 0.0,
+        'latencia_ms': {
+            'p50': round(percentil(latencias, 50) * 1000, 2),
+            'p90': round(percentil(latencias, 90) * 1000, 2),
+            'p99': round(percentil(latencias, 99) * 1000, 2),
+            'max': round(latencias[-1] * 1000, 2) if latencias else 0.0
+        }
+    }, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Utilidades comunes para los benchmarks
+"""
+
+import json
+import platform
+import sys
+import time
+
+
+def medir(func, items, repeticiones=1):
+    """
+    Mide el tiempo de aplicar func a cada elemento de items
+    Retorna el mejor resultado entre las repeticiones
+    """
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        for item in items:
+            func(item)
+        total = time.perf_counter() - inicio
+        if mejor is None or total < mejor:
+            mejor = total
+    
+    n = len(items)
+    return {
+        'n': n,
+        'segundos': round(mejor, 6),
+        'us_por_item': round(mejor / n * 1e6, 3) if n else 0.0,
+        'items_por_segundo': round(n / mejor, 1) if mejor else 0.0
+    }
+
+
+def entorno():
+    """Describe el entorno de ejecución del benchmark"""
+    return {
+        'python': sys.version.split()[0],
+        'plataforma': platform.platform(),
+        'fecha': time.strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+
+def imprimir_resultados(resultados, ruta_json=None):
+    """Imprime los resultados como JSON y opcionalmente los guarda en disco"""
+    texto = json.dumps(resultados, indent=2, ensure_ascii=False)
+    print(texto)
+    if ruta_json:
+        with open(ruta_json, 'w', encoding='utf-8') as f:
+            f.write(texto)
@@ -0,0 +1,77 @@
+"""
+Benchmark de escalado del InferencePool
+Mide el rendimiento (diagnósticos/s) con 1..N procesos trabajadores ya
+precargados y la eficiencia respecto a la ejecución lineal ideal. También mide
+el coste de arranque del pool (precarga incluida) y comprueba que los
+resultados coinciden con los del motor en serie.
+En una máquina con C núcleos el escalado solo puede ser lineal hasta C procesos.
+"""
+
+import argparse
+import os
+import time
+
+from src.motor_inferencia import InferencePool, MotorDiagnostico
+from benchmarks.comun import entorno, imprimir_resultados
+from benchmarks.generadores import generar_pacientes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pacientes', type=int, default=4000)
+    parser.add_argument('--max-procesos', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--tamano-bloque', type=int, default=64)
+    parser.add_argument('--superficie', action='store_true', help='Usa la superficie difusa precalculada')
+    parser.add_argument('--arranque', default=None, choices=('fork', 'spawn', 'forkserver'),
+                        help='Método de arranque de los procesos')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', default=None, help='Ruta donde guardar los resultados')
+    args = parser.parse_args()
+    
+    pacientes = generar_pacientes(args.pacientes, seed=args.seed)
+    # Pacientes de calentamiento distintos: no dejan resultados memorizados por skfuzzy
+    calentamiento = generar_pacientes(200, seed=args.seed + 1)
+    
+    motor = MotorDiagnostico()
+    esperados = [motor.analyze(facts).data for facts in pacientes[:500]]
+    
+    escalado = []
+    base = None
+    for procesos in range(1, args.max_procesos + 1):
+        inicio = time.perf_counter()
+        with InferencePool(processes=procesos, chunk_size=args.tamano_bloque, use_surface=args.superficie,
+                           start_method=args.arranque) as pool:
+            pool.warm()
+            pool.diagnose_batch(calentamiento)
+            arranque = time.perf_counter() - inicio
+            
+            inicio = time.perf_counter()
+            resultados = pool.diagnose_batch(pacientes)
+            segundos = time.perf_counter() - inicio
+        assert resultados[:500] == esperados, "El pool altera los resultados"
+        
+        rendimiento = len(pacientes) / segundos
+        if base is None:
+            base = rendimiento
+        escalado.append({
+            'procesos': procesos,
+            'segundos_arranque': round(arranque, 3),
+            'segundos': round(segundos, 3),
+            'diagnosticos_por_segundo': round(rendimiento, 1),
+            'aceleracion': round(rendimiento / base, 2),
+            'eficiencia': round(rendimiento / base / procesos, 2)
+        })
+    
+    imprimir_resultados({
+        'entorno': entorno(),
+        'benchmark': 'escalado_pool',
+        'cpus': os.cpu_count(),
+        'pacientes': args.pacientes,
+        'tamano_bloque': args.tamano_bloque,
+        'usa_superficie': args.superficie,
+        'escalado': escalado
+    }, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Prueba de estrés de la evaluación difusa concurrente
+Lanza muchos hilos que evalúan pacientes a la vez sobre el sistema fuzzy global
+y comprueba que cada resultado coincide con la respuesta en serie.
+Termina con código 1 si algún resultado difiere.
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+
+from src.base_conocimiento import reglas_difusas
+from benchmarks.comun import entorno, imprimir_resultados
+from benchmarks.generadores import generar_pacientes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--hilos', type=int, default=16)
+    parser.add_argument('--pacientes', type=int, default=300)
+    parser.add_argument('--rondas', type=int, default=5, help='Pasadas de cada hilo sobre los pacientes')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--superficie', action='store_true',
+                        help='Usa la superficie precalculada en lugar de la simulación')
+    parser.add_argument('--json', default=None, help='Ruta donde guardar los resultados')
+    args = parser.parse_args()
+    
+    pacientes = generar_pacientes(args.pacientes, seed=args.seed)
+    
+    # Respuesta de referencia en serie, con un sistema independiente
+    referencia = reglas_difusas.FuzzyDiagnosisSystem()
+    esperados = [referencia.evaluate(facts) for facts in pacientes]
+    
+    if args.superficie:
+        reglas_difusas.configure_fuzzy_system(use_surface=True)
+    else:
+        # Forzar que la instancia global se cree desde los hilos a la vez
+        reglas_difusas._fuzzy_system = None
+    
+    barrera = threading.Barrier(args.hilos)
+    errores = []
+    evaluaciones = [0] * args.hilos
+    
+    def trabajador(numero):
+        orden = list(range(len(pacientes)))
+        random.Random(args.seed + numero).shuffle(orden)
+        barrera.wait()
+        for _ in range(args.rondas):
+            for i in orden:
+                obtenido = reglas_difusas.evaluate_fuzzy_rules(pacientes[i])
+                evaluaciones[numero] += 1
+                if obtenido != esperados[i]:
+                    errores.append((numero, i, obtenido, esperados[i]))
+    
+    hilos = [threading.Thread(target=trabajador, args=(n,)) for n in range(args.hilos)]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    segundos = time.perf_counter() - inicio
+    
+    total = sum(evaluaciones)
+    imprimir_resultados({
+        'entorno': entorno(),
+        'benchmark': 'estres_difuso',
+        'hilos': args.hilos,
+        'usa_superficie': args.superficie,
+        'evaluaciones': total,
+        'segundos': round(segundos, 3),
+        'evaluaciones_por_segundo': round(total / segundos, 1) if segundos else 0.0,
+        'discrepancias': len(errores),
+        'primeras_discrepancias': [
+            {'hilo': n, 'paciente': i, 'obtenido': obtenido, 'esperado': esperado}
+            for n, i, obtenido, esperado in errores[:5]
+        ]
+    }, args.json)
+    
+    if errores:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
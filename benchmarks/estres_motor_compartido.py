@@ -0,0 +1,85 @@
+"""
+Prueba de estrés de un MotorDiagnostico compartido entre hilos
+Muchos hilos llaman a analyze() sobre el mismo motor a la vez y se comprueba
+que cada DiagnosisResult (diagnósticos, explicación, urgencia y resumen)
+coincide con la respuesta en serie. También mide cuánto cuesta crear un motor
+por petición, que es lo que evita compartirlo.
+Termina con código 1 si algún resultado difiere.
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+
+from src.motor_inferencia import MotorDiagnostico, DiagnosisCache
+from benchmarks.comun import entorno, imprimir_resultados, medir
+from benchmarks.generadores import generar_pacientes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--hilos', type=int, default=16)
+    parser.add_argument('--pacientes', type=int, default=300)
+    parser.add_argument('--rondas', type=int, default=3, help='Pasadas de cada hilo sobre los pacientes')
+    parser.add_argument('--cache', type=int, default=0, help='Entradas de la caché compartida (0 = sin caché)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', default=None, help='Ruta donde guardar los resultados')
+    args = parser.parse_args()
+    
+    pacientes = generar_pacientes(args.pacientes, seed=args.seed)
+    
+    # Respuesta de referencia en serie con el API con estado
+    referencia = MotorDiagnostico()
+    esperados = []
+    for facts in pacientes:
+        resultado = referencia.diagnose(facts)
+        esperados.append((resultado, referencia.get_explanation(),
+                          referencia.get_urgency_level(), referencia.generate_summary()))
+    
+    motor = MotorDiagnostico(cache=DiagnosisCache(args.cache) if args.cache else None)
+    barrera = threading.Barrier(args.hilos)
+    errores = []
+    evaluaciones = [0] * args.hilos
+    
+    def trabajador(numero):
+        orden = list(range(len(pacientes)))
+        random.Random(args.seed + numero).shuffle(orden)
+        barrera.wait()
+        for _ in range(args.rondas):
+            for i in orden:
+                analisis = motor.analyze(pacientes[i])
+                obtenido = (analisis.data, analisis.explanation(), analisis.urgency(), analisis.summary())
+                evaluaciones[numero] += 1
+                if obtenido != esperados[i]:
+                    errores.append((numero, i))
+    
+    hilos = [threading.Thread(target=trabajador, args=(n,)) for n in range(args.hilos)]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    segundos = time.perf_counter() - inicio
+    
+    total = sum(evaluaciones)
+    imprimir_resultados({
+        'entorno': entorno(),
+        'benchmark': 'estres_motor_compartido',
+        'hilos': args.hilos,
+        'cache': args.cache,
+        'evaluaciones': total,
+        'segundos': round(segundos, 3),
+        'evaluaciones_por_segundo': round(total / segundos, 1) if segundos else 0.0,
+        'crear_motor': medir(lambda _: MotorDiagnostico(), range(200)),
+        'discrepancias': len(errores),
+        'primeras_discrepancias': [{'hilo': n, 'paciente': i} for n, i in errores[:5]]
+    }, args.json)
+    
+    if errores:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
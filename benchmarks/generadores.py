@@ -0,0 +1,149 @@
+"""
+Generadores de pacientes sintéticos
+Producen diccionarios de síntomas con la misma forma que PanelSintomas.get_symptoms()
+"""
+
+import random
+
+from src.base_conocimiento.hechos import SINTOMAS
+
+
+def valor_por_defecto(campo):
+    """
+    Valor que envía el formulario cuando el síntoma no se marca:
+    0 en las escalas, 'no' en los botones de radio y la primera opción en las listas
+    (tiempo_tratamiento no está en el formulario: 'ninguno')
+    """
+    valores = SINTOMAS[campo]
+    if isinstance(valores, tuple):
+        return valores[0]
+    if campo == 'tiempo_tratamiento':
+        return 'ninguno'
+    return 'no' if 'no' in valores else valores[0]
+
+
+def generar_paciente(rng, prob_sintoma=0.4):
+    """
+    Genera un diccionario de síntomas aleatorio
+    
+    Args:
+        rng: instancia de random.Random
+        prob_sintoma: probabilidad de que cada campo tome un valor distinto del defecto
+    """
+    facts = {}
+    for campo, valores in SINTOMAS.items():
+        if isinstance(valores, tuple):
+            minimo, maximo = valores
+            if rng.random() < prob_sintoma:
+                facts[campo] = rng.randint(minimo + 1, maximo)
+            else:
+                facts[campo] = minimo
+        else:
+            if rng.random() < prob_sintoma:
+                facts[campo] = rng.choice(valores)
+            else:
+                facts[campo] = valor_por_defecto(campo)
+    return facts
+
+
+def generar_pacientes(n, seed=42, prob_sintoma=0.4):
+    """Genera una lista reproducible de n pacientes sintéticos"""
+    rng = random.Random(seed)
+    return [generar_paciente(rng, prob_sintoma) for _ in range(n)]
+
+
+# --- Escenarios clínicos -------------------------------------------------------
+# Cada escenario parte de un paciente aleatorio con pocos síntomas de fondo
+# (prob_sintoma) y fija los campos característicos del cuadro: un rango (mínimo,
+# máximo) para las escalas o una lista de valores para elegir (los repetidos
+# pesan más)
+
+ESCENARIOS = {
+    'emergencia': (0.2, {
+        'intensidad_dolor': (7, 10),
+        'tipo_dolor': ['pulsante', 'pulsante', 'constante', 'agudo'],
+        'duracion_dolor': ['1_3_dias', '3_7_dias', 'mas_7_dias'],
+        'hinchazon_cara': ['si', 'si', 'no'],
+        'pus_visible': ['si', 'no'],
+        'fiebre': ['si', 'no', 'no'],
+        'mal_aliento': ['moderado', 'severo'],
+        'dolor_masticar': (5, 10),
+        'dolor_presion': (5, 10)
+    }),
+    'caries': (0.2, {
+        'caries_visible': ['si', 'si', 'no_seguro'],
+        'mancha_oscura': ['si', 'si', 'no'],
+        'sensibilidad_dulce': (3, 9),
+        'sensibilidad_frio': (2, 8),
+        'intensidad_dolor': (1, 7),
+        'tipo_dolor': ['punzante', 'intermitente', 'agudo'],
+        'duracion_dolor': ['menos_24h', '1_3_dias', '3_7_dias', 'mas_7_dias']
+    }),
+    'periodontal': (0.2, {
+        'inflamacion_encias': (4, 10),
+        'sangrado_encias': ['leve', 'moderado', 'moderado', 'severo'],
+        'color_encias': ['rojo_claro', 'rojo_intenso', 'rojo_intenso', 'purpura'],
+        'retraimiento_encias': ['no', 'leve', 'moderado', 'severo'],
+        'movilidad_dental': ['no', 'leve', 'moderado', 'severo'],
+        'mal_aliento': ['leve', 'moderado', 'severo'],
+        'intensidad_dolor': (0, 6),
+        'duracion_dolor': ['3_7_dias', 'mas_7_dias', 'mas_7_dias']
+    }),
+    'sin_sintomas': (0.0, {
+        # Formulario casi vacío: como mucho molestias de 1 en alguna escala
+        'intensidad_dolor': [0, 0, 0, 1],
+        'sensibilidad_frio': [0, 0, 0, 1],
+        'inflamacion_encias': [0, 0, 0, 1]
+    }),
+    # Paciente aleatorio sin cuadro dominante (generar_paciente)
+    'aleatorio': (0.4, {})
+}
+
+# Mezcla por defecto: más peso a los cuadros frecuentes en consulta
+PESOS_ESCENARIOS = {
+    'emergencia': 0.15,
+    'caries': 0.30,
+    'periodontal': 0.25,
+    'sin_sintomas': 0.10,
+    'aleatorio': 0.20
+}
+
+
+def generar_escenario(rng, escenario):
+    """Genera un diccionario de síntomas del escenario indicado (ver ESCENARIOS)"""
+    prob_sintoma, campos = ESCENARIOS[escenario]
+    facts = generar_paciente(rng, prob_sintoma)
+    for campo, valores in campos.items():
+        if isinstance(valores, tuple):
+            facts[campo] = rng.randint(*valores)
+        else:
+            facts[campo] = rng.choice(valores)
+    return facts
+
+
+def generar_mezcla(n, seed=42, pesos=None):
+    """
+    Genera una lista reproducible de n pares (escenario, síntomas)
+    con los escenarios elegidos según pesos (por defecto PESOS_ESCENARIOS)
+    """
+    pesos = pesos or PESOS_ESCENARIOS
+    rng = random.Random(seed)
+    nombres = list(pesos)
+    elegidos = rng.choices(nombres, weights=[pesos[e] for e in nombres], k=n)
+    return [(escenario, generar_escenario(rng, escenario)) for escenario in elegidos]
+
+
+def valores_sin_cubrir(pacientes):
+    """
+    Pares (campo, valor) de SINTOMAS que no aparecen en ningún paciente
+    (en las escalas, cada entero del rango)
+    """
+    vistos = set()
+    for facts in pacientes:
+        vistos.update(facts.items())
+    faltan = []
+    for campo, valores in SINTOMAS.items():
+        if isinstance(valores, tuple):
+            valores = range(valores[0], valores[1] + 1)
+        faltan.extend((campo, valor) for valor in valores if (campo, valor) not in vistos)
+    return faltan
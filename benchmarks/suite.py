@@ -0,0 +1,163 @@
+"""
+Suite de benchmarks del pipeline de diagnóstico
+Mide cada etapa por separado (evaluate_crisp_rules, evaluate_fuzzy_rules,
+_generate_fallback_diagnosis, apply_conflict_resolution) y el diagnóstico
+completo de MotorDiagnostico.diagnose, en total y por escenario clínico,
+sobre una mezcla reproducible de pacientes sintéticos (ver generar_mezcla).
+
+Los resultados se emiten como JSON para compararlos entre commits:
+    python -m benchmarks.suite --json base.json
+    ... cambios ...
+    python -m benchmarks.suite --json nuevo.json --comparar base.json
+
+Con --comparar se informa la variación de cada benchmark y el proceso
+termina con código 1 si alguno es más lento que la base en más de --umbral.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+from src.base_conocimiento import configure_fuzzy_system, evaluate_crisp_rules, evaluate_fuzzy_rules
+from src.motor_inferencia import MotorDiagnostico
+from src.motor_inferencia.encadenamiento_adelante import apply_conflict_resolution
+from benchmarks.comun import entorno, imprimir_resultados, medir
+from benchmarks.generadores import PESOS_ESCENARIOS, generar_mezcla, valores_sin_cubrir
+
+
+ESTRATEGIAS = ('combine', 'highest', 'specific', 'recent')
+
+
+def commit_actual():
+    """Commit de git del árbol medido (None si no hay repositorio)"""
+    try:
+        salida = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=10
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return salida.stdout.strip() or None
+
+
+def ejecutar_suite(mezcla, repeticiones=3):
+    """
+    Ejecuta todos los benchmarks sobre la mezcla [(escenario, síntomas), ...]
+    Retorna {benchmark: resultado de medir()}
+    """
+    pacientes = [facts for _, facts in mezcla]
+    motor = MotorDiagnostico()
+    
+    # Entradas de las etapas intermedias: conclusiones de las reglas de cada paciente
+    # y los pacientes que llegan al diagnóstico de respaldo
+    conclusiones = []
+    sin_reglas = []
+    for facts in pacientes:
+        reglas = evaluate_crisp_rules(facts) + evaluate_fuzzy_rules(facts)
+        if not reglas:
+            sin_reglas.append(facts)
+            reglas = motor._generate_fallback_diagnosis(facts)
+        conclusiones.append(reglas)
+    
+    resultados = {}
+    resultados['evaluate_crisp_rules'] = medir(evaluate_crisp_rules, pacientes, repeticiones)
+    resultados['evaluate_fuzzy_rules'] = medir(evaluate_fuzzy_rules, pacientes, repeticiones)
+    resultados['generate_fallback_diagnosis'] = medir(
+        motor._generate_fallback_diagnosis, pacientes, repeticiones
+    )
+    if sin_reglas:
+        resultados['generate_fallback_diagnosis[sin_reglas]'] = medir(
+            motor._generate_fallback_diagnosis, sin_reglas, repeticiones
+        )
+    for estrategia in ESTRATEGIAS:
+        resultados[f'apply_conflict_resolution[{estrategia}]'] = medir(
+            lambda c: apply_conflict_resolution(c, estrategia), conclusiones, repeticiones
+        )
+    resultados['diagnose'] = medir(motor.diagnose, pacientes, repeticiones)
+    resultados['diagnose[sin_fuzzy]'] = medir(
+        lambda f: motor.diagnose(f, use_fuzzy=False), pacientes, repeticiones
+    )
+    for escenario in PESOS_ESCENARIOS:
+        grupo = [facts for nombre, facts in mezcla if nombre == escenario]
+        if grupo:
+            resultados[f'diagnose[{escenario}]'] = medir(motor.diagnose, grupo, repeticiones)
+    return resultados
+
+
+def comparar(actual, base, umbral):
+    """
+    Compara us_por_item de cada benchmark común a las dos ejecuciones
+    Retorna (variaciones {benchmark: cambio relativo}, benchmarks más lentos que el umbral)
+    """
+    variaciones = {}
+    regresiones = []
+    for nombre, resultado in actual.items():
+        anterior = base.get(nombre)
+        if not anterior or not anterior.get('us_por_item'):
+            continue
+        cambio = resultado['us_por_item'] / anterior['us_por_item'] - 1
+        variaciones[nombre] = round(cambio, 4)
+        if cambio > umbral:
+            regresiones.append(nombre)
+    return variaciones, regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Suite de benchmarks del pipeline de diagnóstico",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--pacientes', type=int, default=2000)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--superficie', action='store_true', help='Usa la superficie difusa precalculada')
+    parser.add_argument('--json', default=None, help='Ruta donde guardar los resultados')
+    parser.add_argument('--comparar', default=None, metavar='BASE',
+                        help='JSON de una ejecución anterior con el que comparar')
+    parser.add_argument('--umbral', type=float, default=0.10,
+                        help='Variación máxima tolerada antes de considerar una regresión')
+    args = parser.parse_args()
+    
+    if args.superficie:
+        configure_fuzzy_system(use_surface=True)
+    
+    mezcla = generar_mezcla(args.pacientes, seed=args.seed)
+    faltan = valores_sin_cubrir([facts for _, facts in mezcla])
+    
+    salida = {
+        'entorno': entorno(),
+        'benchmark': 'suite',
+        'commit': commit_actual(),
+        'parametros': {
+            'pacientes': args.pacientes,
+            'repeticiones': args.repeticiones,
+            'seed': args.seed,
+            'superficie': args.superficie,
+            'escenarios': PESOS_ESCENARIOS
+        },
+        'valores_sin_cubrir': [f'{campo}={valor}' for campo, valor in faltan],
+        'resultados': ejecutar_suite(mezcla, args.repeticiones)
+    }
+    
+    regresiones = []
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            base = json.load(f)
+        variaciones, regresiones = comparar(salida['resultados'], base['resultados'], args.umbral)
+        salida['comparacion'] = {
+            'base': args.comparar,
+            'commit_base': base.get('commit'),
+            'umbral': args.umbral,
+            'variaciones': variaciones,
+            'regresiones': regresiones
+        }
+    
+    imprimir_resultados(salida, args.json)
+    if regresiones:
+        print(f"Regresiones (> {args.umbral:.0%}): {', '.join(regresiones)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,11 @@
 """
 Módulo de inicialización de la base de conocimientos
+Los evaluadores alternativos (compilador_reglas, tabla_decision) y el
+recolector de estadísticas se importan en el primer acceso
 """
 
+import importlib
+
 from .hechos import (
     SINTOMAS,
     DIAGNOSTICOS,
@@ -13,13 +17,25 @@ from .hechos import (
 
 from .reglas_crisp import (
     Rule,
+    Condition,
+    AnyOf,
     get_all_rules,
+    compile_rules,
+    get_compiled_rules,
+    RuleIndex,
+    get_rule_index,
+    configure_crisp_evaluator,
     evaluate_crisp_rules
 )
 
 from .reglas_difusas import (
     FuzzyDiagnosisSystem,
+    FuzzySurface,
+    FUZZY_BACKENDS,
+    create_mamdani_system,
     get_fuzzy_system,
+    configure_fuzzy_system,
+    ensure_fuzzy_surface,
     evaluate_fuzzy_rules
 )
 
@@ -31,9 +47,48 @@ __all__ = [
     'get_diagnostico_info',
     'get_recomendaciones',
     'Rule',
+    'Condition',
+    'AnyOf',
     'get_all_rules',
+    'compile_rules',
+    'get_compiled_rules',
+    'RuleIndex',
+    'get_rule_index',
+    'configure_crisp_evaluator',
+    'GeneratedRuleEvaluator',
+    'get_generated_evaluator',
+    'DecisionTable',
+    'get_decision_table',
+    'RuleStatistics',
+    'enable_rule_statistics',
+    'disable_rule_statistics',
     'evaluate_crisp_rules',
     'FuzzyDiagnosisSystem',
+    'FuzzySurface',
+    'FUZZY_BACKENDS',
+    'create_mamdani_system',
     'get_fuzzy_system',
+    'configure_fuzzy_system',
+    'ensure_fuzzy_surface',
     'evaluate_fuzzy_rules'
 ]
+
+# Nombre -> módulo que lo define, para los que se importan en el primer acceso
+_LAZY_IMPORTS = {
+    'GeneratedRuleEvaluator': '.compilador_reglas',
+    'get_generated_evaluator': '.compilador_reglas',
+    'DecisionTable': '.tabla_decision',
+    'get_decision_table': '.tabla_decision',
+    'RuleStatistics': '.estadisticas_reglas',
+    'enable_rule_statistics': '.estadisticas_reglas',
+    'disable_rule_statistics': '.estadisticas_reglas'
+}
+
+
+def __getattr__(name):
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,124 @@
+"""
+Compilador de la tabla de reglas crisp a una función Python generada
+Toda la tabla se traduce a código fuente de una sola función que lee cada
+síntoma necesario una vez en una variable local y evalúa cada regla como una
+expresión booleana en línea, sin el bucle de Rule.evaluate ni una llamada por
+condición. La función se compila con compile()/exec y retorna los índices de
+las reglas que se cumplen, en orden de la tabla.
+
+Las condiciones se evalúan en el mismo orden y con el mismo cortocircuito que
+Rule.evaluate, así que el resultado es idéntico al de recorrer la tabla.
+"""
+
+from .reglas_crisp import (
+    AnyOf,
+    Condition,
+    get_compiled_rules
+)
+
+
+# Tipos cuyo repr() es un literal Python que reproduce el mismo valor
+_LITERAL_TYPES = (str, int, float, bool, type(None))
+
+FUNCTION_NAME = '_evaluar_reglas'
+
+
+class GeneratedRuleEvaluator:
+    """
+    Evaluador de una tabla de reglas mediante una función generada
+    source: código fuente generado (útil para depurar)
+    function: facts -> lista de índices de las reglas que se cumplen
+    """
+    
+    def __init__(self, rules):
+        self.rules = rules
+        self._locals = {}  # (campo, valor por defecto) -> nombre de la variable local
+        self._constants = {}  # nombre -> objeto (operandos y condiciones opacas)
+        self.source = self._generate()
+        namespace = dict(self._constants)
+        exec(compile(self.source, f'<reglas crisp generadas ({len(rules)})>', 'exec'), namespace)
+        self.function = namespace[FUNCTION_NAME]
+        
+        self.conclusions = [
+            {
+                'diagnostico': rule.conclusion,
+                'confianza': rule.confidence,
+                'regla': rule.name,
+                'tipo': 'crisp'
+            }
+            for rule in rules
+        ]
+    
+    def _constant(self, value):
+        """Nombre de una constante del espacio de nombres de la función"""
+        name = f'k{len(self._constants)}'
+        self._constants[name] = value
+        return name
+    
+    def _literal(self, value):
+        """Literal del operando si su repr() es exacto; si no, una constante"""
+        if type(value) in _LITERAL_TYPES and value == value:  # NaN no tiene literal
+            return repr(value)
+        if type(value) is tuple and all(type(v) in _LITERAL_TYPES and v == v for v in value):
+            return repr(value)
+        return self._constant(value)
+    
+    def _local(self, field, default):
+        """Variable local con el valor del campo (se lee una sola vez)"""
+        key = (field, default)
+        if key not in self._locals:
+            self._locals[key] = f'v{len(self._locals)}'
+        return self._locals[key]
+    
+    def _expression(self, condition):
+        """Expresión Python equivalente a una condición"""
+        if isinstance(condition, AnyOf):
+            if not condition.conditions:
+                return 'False'
+            return '(' + ' or '.join(self._expression(c) for c in condition.conditions) + ')'
+        if isinstance(condition, Condition):
+            value = self._local(condition.field, condition.default)
+            return f'({value} {condition.operator} {self._literal(condition.operand)})'
+        # Función opaca: se llama con los hechos como en Rule.evaluate
+        return f'{self._constant(condition)}(facts)'
+    
+    def _generate(self):
+        """Código fuente de la función de evaluación"""
+        body = []
+        for index, rule in enumerate(self.rules):
+            test = ' and '.join(self._expression(c) for c in rule.conditions) or 'True'
+            body.append(f'    # {index}: {rule.name}')
+            body.append(f'    if {test}:')
+            body.append(f'        fired({index})')
+        
+        header = [f'def {FUNCTION_NAME}(facts):', '    get = facts.get']
+        for (field, default), name in self._locals.items():
+            header.append(f'    {name} = get({field!r}, {default!r})')
+        header.append('    result = []')
+        header.append('    fired = result.append')
+        return '\n'.join(header + body + ['    return result', ''])
+    
+    def fired(self, facts):
+        """Índices, en orden de la tabla, de las reglas que se cumplen"""
+        return self.function(facts)
+    
+    def evaluate(self, facts):
+        """Mismo resultado que evaluate_crisp_rules"""
+        conclusions = self.conclusions
+        return [dict(conclusions[index]) for index in self.function(facts)]
+
+
+_GENERATED_EVALUATOR = None
+
+
+def get_generated_evaluator():
+    """Evaluador generado de la tabla compilada (se regenera si la tabla cambia)"""
+    global _GENERATED_EVALUATOR
+    if _GENERATED_EVALUATOR is None or _GENERATED_EVALUATOR.rules is not get_compiled_rules():
+        _GENERATED_EVALUATOR = GeneratedRuleEvaluator(get_compiled_rules())
+    return _GENERATED_EVALUATOR
+
+
+def evaluate_crisp_rules_generated(facts):
+    """Evalúa las reglas crisp con la función generada (mismo contrato que evaluate_crisp_rules)"""
+    return get_generated_evaluator().evaluate(facts)
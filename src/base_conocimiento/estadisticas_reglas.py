@@ -0,0 +1,412 @@
+"""
+Estadísticas de disparo de las reglas crisp
+Recolector opcional que cuenta, por regla y por condición, cuántas veces se
+evalúa, cuántas se cumple y cuánto tiempo cuesta. Está conectado a
+evaluate_crisp_rules (que cuenta en línea sobre el índice de reglas) y a
+ForwardChainingEngine/ReteEngine: cada ejecución toma una vez los contadores
+del hilo (chain_counters) y cuenta cada regla que saca de la agenda con las
+mismas funciones de conteo, en lugar de Rule.evaluate; además suma los totales
+de la ejecución (iteraciones, conclusiones y tiempo). ReteEngine no
+re-evalúa condiciones: la posición donde se detiene una regla sale de las
+memorias alfa y sus reglas no se cronometran. Desactivado, cada punto solo
+comprueba si hay un recolector activo.
+
+Cada hilo acumula en sus propios contadores, sin bloqueos; stats() los suma al
+leer. Una regla se detiene en la primera condición que falla, así que basta
+con contar en qué posición se detuvo cada evaluación para conocer cuántas veces
+se probó y se cumplió cada condición. Los tiempos se miden solo en una de cada
+sample_every evaluaciones y se extrapolan al total.
+
+Uso:
+    estadisticas = enable_rule_statistics()
+    ... diagnósticos ...
+    estadisticas.stats()         # por regla: evaluaciones, disparos, tiempo, condiciones
+    estadisticas.never_fired()   # candidatas a revisar o podar
+    disable_rule_statistics()
+    
+    python -m src.base_conocimiento.estadisticas_reglas corpus.jsonl --salida estadisticas.json
+"""
+
+import argparse
+import json
+import sys
+import threading
+import weakref
+from time import perf_counter
+
+from .reglas_crisp import (
+    Condition,
+    evaluate_crisp_rules,
+    get_compiled_rules,
+    get_rule_statistics,
+    set_rule_statistics
+)
+
+
+# Una de cada SAMPLE_EVERY evaluaciones de reglas se cronometra condición a condición
+SAMPLE_EVERY = 128
+
+# Funciones de counting_function por regla, compartidas por todos los recolectores
+_COUNTERS = weakref.WeakKeyDictionary()
+
+
+def counting_function(rule):
+    """
+    Genera una función (facts, stops) -> bool equivalente a rule.evaluate que
+    además incrementa stops[k] en la condición k donde se detiene (stops[n] si
+    se cumplen todas). Las pruebas se despliegan una tras otra: contar no
+    añade un bucle ni un contador de posición a la evaluación, y las Condition
+    se comprueban en línea (su operador sobre facts.get), sin llamar a __call__
+    """
+    size = len(rule.conditions)
+    lines = ['def count(facts, stops):']
+    namespace = {}
+    for position, condition in enumerate(rule.conditions):
+        if isinstance(condition, Condition):
+            # Misma prueba que Condition.__call__, sin la llamada al método
+            namespace.update({
+                f't{position}': condition._test, f'f{position}': condition.field,
+                f'd{position}': condition.default, f'o{position}': condition.operand
+            })
+            test = f't{position}(facts.get(f{position}, d{position}), o{position})'
+        else:
+            namespace[f'c{position}'] = condition
+            test = f'c{position}(facts)'
+        lines += [
+            f'    if not {test}:',
+            f'        stops[{position}] += 1',
+            '        return False'
+        ]
+    lines += [f'    stops[{size}] += 1', '    return True']
+    exec(compile('\n'.join(lines), f'<contador {rule.name}>', 'exec'), namespace)
+    return namespace['count']
+
+
+class _RuleTally:
+    """Contadores de una regla en un hilo"""
+    __slots__ = ('count', 'stops', 'sampled', 'rule_time', 'condition_samples', 'condition_time')
+    
+    def __init__(self, count, size):
+        self.count = count  # Función de counting_function (compartida)
+        # stops[k]: evaluaciones detenidas en la condición k (stops[size]: la regla se cumplió)
+        self.stops = [0] * (size + 1)
+        self.sampled = 0
+        self.rule_time = 0.0
+        self.condition_samples = [0] * size
+        self.condition_time = [0.0] * size
+
+
+class _ThreadTally:
+    """Contadores de un hilo"""
+    __slots__ = ('rules', 'indexes', 'engines', 'countdown', 'calls', 'chains')
+    
+    def __init__(self, sample_every):
+        self.rules = {}  # Rule -> _RuleTally
+        self.indexes = {}  # RuleIndex -> (funciones, stops, _RuleTally) por posición en la tabla
+        self.engines = {}  # motor de encadenamiento -> (funciones, stops, _RuleTally, totales)
+        self.countdown = sample_every
+        # Llamadas a evaluate_crisp_rules, diagnósticos, llamadas cronometradas y sus segundos
+        self.calls = [0, 0, 0, 0.0]
+        self.chains = {}  # clase de motor -> [ejecuciones, iteraciones, conclusiones, segundos]
+
+
+class RuleStatistics:
+    """
+    Recolector de estadísticas de reglas con contadores por hilo
+    sample_every: una de cada sample_every evaluaciones se cronometra
+    """
+    
+    def __init__(self, sample_every=SAMPLE_EVERY):
+        self.sample_every = sample_every
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        """Descarta lo acumulado (los hilos crean contadores nuevos en su próxima evaluación)"""
+        with self._lock:
+            self._local = threading.local()
+            self._tallies = []
+    
+    def _tally(self):
+        try:
+            return self._local.tally
+        except AttributeError:
+            tally = _ThreadTally(self.sample_every)
+            with self._lock:
+                self._tallies.append(tally)
+            self._local.tally = tally
+            return tally
+    
+    def _entry(self, tally, rule):
+        """Contadores de una regla en el hilo (se crean en su primera evaluación)"""
+        entry = tally.rules.get(rule)
+        if entry is None:
+            count = _COUNTERS.get(rule)
+            if count is None:
+                count = _COUNTERS[rule] = counting_function(rule)
+            entry = tally.rules[rule] = _RuleTally(count, len(rule.conditions))
+        return entry
+    
+    # --- Puntos de medida -------------------------------------------------
+    
+    def evaluate_timed(self, rule, facts, entry):
+        """Evaluación cronometrada condición a condición"""
+        inicio = anterior = perf_counter()
+        position = 0
+        result = True
+        for condition in rule.conditions:
+            passed = condition(facts)
+            ahora = perf_counter()
+            entry.condition_samples[position] += 1
+            entry.condition_time[position] += ahora - anterior
+            anterior = ahora
+            if not passed:
+                result = False
+                break
+            position += 1
+        entry.stops[position] += 1
+        entry.sampled += 1
+        entry.rule_time += anterior - inicio
+        return result
+    
+    def evaluate_index(self, index, facts):
+        """
+        RuleIndex.evaluate con contadores (lo usa evaluate_crisp_rules)
+        Cuenta sin pasar por Rule.evaluate; una de cada sample_every llamadas
+        se cronometra entera y regla a regla, condición a condición
+        """
+        try:
+            tally = self._local.tally
+        except AttributeError:
+            tally = self._tally()
+        table = tally.indexes.get(index)
+        if table is None:
+            table = tally.indexes[index] = self._index_table(tally, index)
+        counters, stops, entries = table
+        
+        results = []
+        calls = tally.calls
+        calls[0] += 1
+        tally.countdown -= 1
+        if tally.countdown:
+            for i in index.candidates(facts):
+                if counters[i](facts, stops[i]):
+                    results.append(dict(index.conclusions[i]))
+        else:
+            tally.countdown = self.sample_every
+            inicio = perf_counter()
+            rules = index.rules
+            for i in index.candidates(facts):
+                if self.evaluate_timed(rules[i], facts, entries[i]):
+                    results.append(dict(index.conclusions[i]))
+            calls[2] += 1
+            calls[3] += perf_counter() - inicio
+        calls[1] += len(results)
+        return results
+    
+    def _index_table(self, tally, index):
+        """Contadores del hilo para cada regla del índice (o motor), en listas paralelas"""
+        entries = [self._entry(tally, rule) for rule in index.rules]
+        return (
+            [entry.count for entry in entries],
+            [entry.stops for entry in entries],
+            entries
+        )
+    
+    def chain_counters(self, engine):
+        """
+        Contadores del hilo para las reglas de un motor de encadenamiento
+        (se llama una vez por ejecución, no por regla)
+        Retorna ((funciones de conteo, stops, _RuleTally) por posición en la
+        tabla del motor y los totales de su clase [ejecuciones, iteraciones,
+        conclusiones, segundos], que el motor suma al terminar; y si esta
+        ejecución se cronometra regla a regla)
+        """
+        try:
+            tally = self._local.tally
+        except AttributeError:
+            tally = self._tally()
+        table = tally.engines.get(engine)
+        if table is None:
+            totals = tally.chains.setdefault(type(engine).__name__, [0, 0, 0, 0.0])
+            table = tally.engines[engine] = self._index_table(tally, engine) + (totals,)
+        tally.countdown -= 1
+        if tally.countdown:
+            return table, False
+        tally.countdown = self.sample_every
+        return table, True
+    
+    # --- Lectura ----------------------------------------------------------
+    
+    def _merged_rules(self):
+        """
+        Suma los contadores de todos los hilos por nombre de regla y, dentro
+        de cada regla, por condición (el orden puede variar entre tablas)
+        """
+        with self._lock:
+            tallies = list(self._tallies)
+        merged = {}
+        for tally in tallies:
+            for rule, entry in list(tally.rules.items()):
+                data = merged.get(rule.name)
+                if data is None:
+                    data = merged[rule.name] = {
+                        'evaluaciones': 0, 'disparos': 0, 'muestras': 0, 'segundos': 0.0,
+                        'condiciones': {}
+                    }
+                stops = list(entry.stops)
+                total = sum(stops)
+                data['evaluaciones'] += total
+                data['disparos'] += stops[-1]
+                data['muestras'] += entry.sampled
+                data['segundos'] += entry.rule_time
+                
+                evaluated = total
+                for position, condition in enumerate(rule.conditions):
+                    passed = evaluated - stops[position]
+                    stats = data['condiciones'].setdefault(
+                        repr(condition), {'evaluaciones': 0, 'cumplidas': 0, 'muestras': 0, 'segundos': 0.0}
+                    )
+                    stats['evaluaciones'] += evaluated
+                    stats['cumplidas'] += passed
+                    stats['muestras'] += entry.condition_samples[position]
+                    stats['segundos'] += entry.condition_time[position]
+                    evaluated = passed
+        return merged, tallies
+    
+    def stats(self):
+        """
+        Resumen de todos los hilos
+        Los tiempos (ms) se extrapolan de las evaluaciones cronometradas;
+        son None si la regla o condición no llegó a cronometrarse
+        """
+        merged, tallies = self._merged_rules()
+        
+        reglas = {}
+        for name, data in sorted(merged.items(), key=lambda item: -item[1]['evaluaciones']):
+            evaluaciones = data['evaluaciones']
+            condiciones = []
+            for condition, stats in data['condiciones'].items():
+                condiciones.append({
+                    'condicion': condition,
+                    'evaluaciones': stats['evaluaciones'],
+                    'cumplidas': stats['cumplidas'],
+                    'tasa_paso': round(stats['cumplidas'] / stats['evaluaciones'], 4)
+                                 if stats['evaluaciones'] else None,
+                    'tiempo_ms': _extrapolate(stats['segundos'], stats['muestras'], stats['evaluaciones'])
+                })
+            tiempo_ms = _extrapolate(data['segundos'], data['muestras'], evaluaciones)
+            reglas[name] = {
+                'evaluaciones': evaluaciones,
+                'disparos': data['disparos'],
+                'tasa_disparo': round(data['disparos'] / evaluaciones, 4) if evaluaciones else None,
+                'tiempo_ms': tiempo_ms,
+                'us_por_evaluacion': round(data['segundos'] / data['muestras'] * 1e6, 3)
+                                     if data['muestras'] else None,
+                'condiciones': condiciones
+            }
+        
+        llamadas = [0, 0, 0, 0.0]
+        encadenamiento = {}
+        for tally in tallies:
+            for i, value in enumerate(tally.calls):
+                llamadas[i] += value
+            for engine, values in list(tally.chains.items()):
+                total = encadenamiento.setdefault(engine, [0, 0, 0, 0.0])
+                for i, value in enumerate(values):
+                    total[i] += value
+        
+        return {
+            'evaluate_crisp_rules': {
+                'llamadas': llamadas[0],
+                'diagnosticos': llamadas[1],
+                'tiempo_ms': _extrapolate(llamadas[3], llamadas[2], llamadas[0])
+            },
+            'encadenamiento': {
+                engine: {
+                    'ejecuciones': values[0],
+                    'iteraciones': values[1],
+                    'conclusiones': values[2],
+                    'tiempo_ms': round(values[3] * 1e3, 3)
+                }
+                for engine, values in encadenamiento.items()
+            },
+            'reglas': reglas
+        }
+    
+    def never_fired(self, rules=None):
+        """Nombres de las reglas de la tabla que no se han cumplido nunca (en orden de la tabla)"""
+        merged, _ = self._merged_rules()
+        rules = get_compiled_rules() if rules is None else rules
+        return [rule.name for rule in rules if not merged.get(rule.name, {}).get('disparos')]
+    
+    def to_json(self, indent=2):
+        return json.dumps(self.stats(), indent=indent, ensure_ascii=False)
+
+
+def _extrapolate(seconds, samples, evaluations):
+    """Tiempo total estimado en ms a partir de las evaluaciones cronometradas"""
+    if not samples:
+        return None
+    return round(seconds / samples * evaluations * 1e3, 4)
+
+
+def enable_rule_statistics(collector=None, sample_every=SAMPLE_EVERY):
+    """Activa la recolección de estadísticas en el proceso actual; retorna el recolector"""
+    if collector is None:
+        collector = RuleStatistics(sample_every)
+    set_rule_statistics(collector)
+    return collector
+
+
+def disable_rule_statistics():
+    """Desactiva la recolección; retorna el recolector que estaba activo (o None)"""
+    collector = get_rule_statistics()
+    set_rule_statistics(None)
+    return collector
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Estadísticas de disparo de las reglas crisp sobre un corpus",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('corpus', help="Archivo JSONL/CSV de síntomas ('-' para stdin)")
+    parser.add_argument('--formato', choices=('csv', 'jsonl'), default=None)
+    parser.add_argument('--campo-id', default='id', help='Campo de identificación que se ignora')
+    parser.add_argument('--salida', default=None, help='Archivo JSON de salida (por defecto stdout)')
+    args = parser.parse_args()
+    
+    from ..procesar_lotes import LECTORES, detectar_formato
+    
+    lector = LECTORES[detectar_formato(args.corpus, args.formato)]
+    entrada = sys.stdin if args.corpus == '-' else open(args.corpus, encoding='utf-8', newline='')
+    
+    estadisticas = enable_rule_statistics()
+    try:
+        for registro, error in lector(entrada):
+            if error is None:
+                registro.pop(args.campo_id, None)
+                evaluate_crisp_rules(registro)
+    finally:
+        disable_rule_statistics()
+        if entrada is not sys.stdin:
+            entrada.close()
+    
+    resultado = estadisticas.stats()
+    resultado['sin_disparos'] = estadisticas.never_fired()
+    texto = json.dumps(resultado, ensure_ascii=False, indent=2)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            f.write(texto)
+    else:
+        print(texto)
+    
+    llamadas = resultado['evaluate_crisp_rules']['llamadas']
+    print(f"{llamadas} pacientes, {len(resultado['sin_disparos'])} reglas sin disparos",
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+"""
+Optimizador del orden de las condiciones de las reglas crisp
+Rule.evaluate comprueba las condiciones en orden y se detiene en la primera
+que falla. Este módulo mide, sobre un corpus de pacientes reales o simulados,
+cuántas veces se cumple cada condición y cuánto cuesta evaluarla, y reordena
+las condiciones de cada regla para hacer el menor número esperado de pruebas.
+
+Las condiciones son funciones puras de los hechos: con hechos válidos el orden
+no cambia qué reglas se cumplen, solo cuántas pruebas se hacen para averiguarlo.
+
+Uso:
+    python -m src.base_conocimiento.optimizador_reglas corpus.jsonl
+    python -m src.base_conocimiento.optimizador_reglas corpus.csv --salida orden.json
+
+El orden aprendido se guarda en data/orden_condiciones.json y se aplica solo si
+se pide: configure_crisp_evaluator(condition_order=CONDITION_ORDER_PATH). Con
+hechos mal formados el orden puede cambiar qué reglas lanzan una excepción.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from .reglas_crisp import (
+    AnyOf,
+    CONDITION_ORDER_PATH,
+    RuleIndex,
+    compile_rules,
+    get_all_rules,
+    is_declarative,
+    reset_compiled_rules,
+    rule_table_signature
+)
+
+
+def evaluate_counting(condition, facts):
+    """
+    Evalúa una condición y cuenta las pruebas elementales que hace
+    Una AnyOf cuenta las alternativas que comprueba hasta la primera que se cumple
+    Retorna (se_cumple, pruebas); una condición que falla con excepción no se cumple
+    """
+    if isinstance(condition, AnyOf):
+        tests = 0
+        for sub in condition.conditions:
+            passed, cost = evaluate_counting(sub, facts)
+            tests += cost
+            if passed:
+                return True, tests
+        return False, tests
+    try:
+        return bool(condition(facts)), 1
+    except Exception:
+        return False, 1
+
+
+class SelectivityProfile:
+    """
+    Perfil de selectividad de una tabla de reglas sobre un corpus
+    Por regla guarda, para cada paciente en el que la regla se evalúa
+    (su disparador del RuleIndex está presente), si cada condición se cumple
+    y cuántas pruebas cuesta
+    """
+    
+    def __init__(self, rules, corpus):
+        self.rules = rules
+        self.outcomes = []  # por regla: matriz (pacientes, condiciones) de bool
+        self.costs = []  # por regla: matriz (pacientes, condiciones) de pruebas
+        
+        rows = [[] for _ in rules]
+        index = RuleIndex(rules)
+        self.patients = 0
+        for facts in corpus:
+            self.patients += 1
+            for rule_index in index.candidates(facts):
+                rows[rule_index].append([
+                    evaluate_counting(c, facts) for c in rules[rule_index].conditions
+                ])
+        
+        for rule, rule_rows in zip(rules, rows):
+            shape = (len(rule_rows), len(rule.conditions))
+            data = np.array(rule_rows, dtype=float).reshape(shape + (2,))
+            self.outcomes.append(data[:, :, 0].astype(bool))
+            self.costs.append(data[:, :, 1])
+    
+    def pass_rates(self, rule_index):
+        """Fracción de evaluaciones en que se cumple cada condición de la regla"""
+        outcomes = self.outcomes[rule_index]
+        if not len(outcomes):
+            return [None] * outcomes.shape[1]
+        return outcomes.mean(axis=0).tolist()
+    
+    def evaluations(self, rule_index, order=None):
+        """
+        Pruebas elementales que hace la regla sobre el corpus evaluando sus
+        condiciones en el orden dado (posiciones; None = orden actual)
+        """
+        outcomes = self.outcomes[rule_index]
+        costs = self.costs[rule_index]
+        if order is None:
+            order = range(outcomes.shape[1])
+        alive = np.ones(len(outcomes), dtype=bool)
+        total = 0.0
+        for position in order:
+            total += costs[alive, position].sum()
+            alive &= outcomes[:, position]
+        return int(total)
+    
+    def best_order(self, rule_index):
+        """
+        Orden voraz de las condiciones de la regla: en cada paso, la condición
+        con menor coste / (1 - tasa de paso) entre los pacientes que siguen vivos
+        Las tasas son condicionadas a que se cumplieron las anteriores, así que
+        se aprovechan las correlaciones entre síntomas. A igualdad se conserva
+        el orden escrito.
+        """
+        outcomes = self.outcomes[rule_index]
+        costs = self.costs[rule_index]
+        remaining = list(range(outcomes.shape[1]))
+        alive = np.ones(len(outcomes), dtype=bool)
+        order = []
+        while remaining:
+            if not alive.any():
+                # Sin pacientes restantes: se decide con las tasas globales
+                alive = np.ones(len(outcomes), dtype=bool)
+            best, best_score = None, None
+            for position in remaining:
+                rejected = (~outcomes[alive, position]).sum()
+                cost = costs[alive, position].sum()
+                score = cost / rejected if rejected else float('inf')
+                if best is None or score < best_score:
+                    best, best_score = position, score
+            order.append(best)
+            remaining.remove(best)
+            alive = alive & outcomes[:, best]
+        return order
+    
+    def learn_order(self):
+        """
+        Orden aprendido para toda la tabla: {nombre de regla: [repr de condiciones]}
+        Las reglas con condiciones opacas no se reordenan
+        """
+        order = {}
+        for rule_index, rule in enumerate(self.rules):
+            if not all(is_declarative(c) for c in rule.conditions):
+                continue
+            order[rule.name] = [repr(rule.conditions[p]) for p in self.best_order(rule_index)]
+        return order
+    
+    def summary(self, order):
+        """Pruebas elementales totales antes y después de aplicar un orden aprendido"""
+        before = after = 0
+        for rule_index, rule in enumerate(self.rules):
+            current = self.evaluations(rule_index)
+            before += current
+            wanted = order.get(rule.name)
+            if wanted is None:
+                after += current
+                continue
+            positions = {repr(c): p for p, c in enumerate(rule.conditions)}
+            after += self.evaluations(rule_index, [positions[r] for r in wanted])
+        return {
+            'pacientes': self.patients,
+            'pruebas_antes': before,
+            'pruebas_despues': after,
+            'ahorro': round(1 - after / before, 4) if before else 0.0
+        }
+
+
+def learn_condition_order(corpus, rules=None):
+    """
+    Perfila la tabla de reglas (por defecto, la escrita en reglas_crisp, sin
+    ningún orden aprendido) sobre un corpus de hechos
+    Retorna (orden, resumen)
+    """
+    if rules is None:
+        rules = compile_rules(get_all_rules())
+    profile = SelectivityProfile(rules, corpus)
+    order = profile.learn_order()
+    return order, profile.summary(order)
+
+
+def save_condition_order(order, rules=None, path=CONDITION_ORDER_PATH, summary=None):
+    """Guarda un orden aprendido junto con la huella de la tabla de reglas"""
+    if rules is None:
+        rules = compile_rules(get_all_rules())
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    data = {'huella': rule_table_signature(rules), 'reglas': order}
+    if summary is not None:
+        data['perfil'] = summary
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    # Si este orden está configurado, la próxima llamada a get_compiled_rules lo aplica
+    reset_compiled_rules()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Aprende el orden de evaluación de las condiciones de las reglas crisp",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('corpus', help="Archivo JSONL/CSV de síntomas ('-' para stdin)")
+    parser.add_argument('--formato', choices=('csv', 'jsonl'), default=None)
+    parser.add_argument('--campo-id', default='id', help='Campo de identificación que se ignora')
+    parser.add_argument('--salida', default=CONDITION_ORDER_PATH, help='Archivo JSON del orden aprendido')
+    args = parser.parse_args()
+    
+    from ..procesar_lotes import LECTORES, detectar_formato
+    
+    lector = LECTORES[detectar_formato(args.corpus, args.formato)]
+    entrada = sys.stdin if args.corpus == '-' else open(args.corpus, encoding='utf-8', newline='')
+    
+    def corpus():
+        for registro, error in lector(entrada):
+            if error is None:
+                registro.pop(args.campo_id, None)
+                yield registro
+    
+    try:
+        order, summary = learn_condition_order(corpus())
+    finally:
+        if entrada is not sys.stdin:
+            entrada.close()
+    
+    save_condition_order(order, path=args.salida, summary=summary)
+    print(f"{summary['pacientes']} pacientes: {summary['pruebas_antes']} -> "
+          f"{summary['pruebas_despues']} pruebas de condiciones "
+          f"({summary['ahorro']:.1%} menos). Orden guardado en {args.salida}")
+
+
+if __name__ == '__main__':
+    main()
@@ -10,16 +10,139 @@ NIVEL DE CONFIANZA para el usuario final:
 - <30% = Sistema NO ESTÁ SEGURO (todo parece normal)
 """
 
+import hashlib
+import json
+import operator
+import os
+import warnings
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+
+from .hechos import SINTOMAS
+
+
+# Operadores soportados por las condiciones declarativas
+OPERATORS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '>=': operator.ge,
+    '<=': operator.le,
+    '>': operator.gt,
+    '<': operator.lt,
+    'in': lambda value, operand: value in operand
+}
+
+# Operadores de comparación numérica (el campo ausente vale 0)
+NUMERIC_OPERATORS = ('>=', '<=', '>', '<')
+
+
+class Condition:
+    """
+    Condición declarativa de una regla: (campo, operador, operando)
+    Equivale a lambda f: f.get(campo) <operador> operando, pero puede
+    inspeccionarse, compartirse entre reglas e indexarse
+    """
+    def __init__(self, field, operator, operand):
+        if operator not in OPERATORS:
+            raise ValueError(f"Operador no soportado: {operator}")
+        self.field = field
+        self.operator = operator
+        self.operand = tuple(operand) if operator == 'in' else operand
+        # Mismo valor por defecto que usaban las lambdas: 0 para escalas, None para el resto
+        self.default = 0 if operator in NUMERIC_OPERATORS else None
+        self._test = OPERATORS[operator]
+    
+    @property
+    def fields(self):
+        """Campos de los hechos que lee la condición"""
+        return frozenset((self.field,))
+    
+    @property
+    def key(self):
+        """Clave hashable que identifica la prueba (para deduplicar condiciones)"""
+        return (self.field, self.operator, self.operand)
+    
+    def __call__(self, facts):
+        return self._test(facts.get(self.field, self.default), self.operand)
+    
+    def __eq__(self, other):
+        return isinstance(other, Condition) and self.key == other.key
+    
+    def __hash__(self):
+        return hash(self.key)
+    
+    def __repr__(self):
+        operand = list(self.operand) if self.operator == 'in' else self.operand
+        return f"Condition({self.field!r}, {self.operator!r}, {operand!r})"
+
+
+class AnyOf:
+    """Disyunción de condiciones: se cumple si al menos una se cumple"""
+    def __init__(self, *conditions):
+        self.conditions = tuple(conditions)
+    
+    @property
+    def fields(self):
+        """Campos de los hechos que leen las condiciones"""
+        return frozenset().union(*(c.fields for c in self.conditions))
+    
+    @property
+    def key(self):
+        return ('any',) + tuple(c.key for c in self.conditions)
+    
+    def __call__(self, facts):
+        for condition in self.conditions:
+            if condition(facts):
+                return True
+        return False
+    
+    def __eq__(self, other):
+        return isinstance(other, AnyOf) and self.key == other.key
+    
+    def __hash__(self):
+        return hash(self.key)
+    
+    def __repr__(self):
+        return f"AnyOf({', '.join(repr(c) for c in self.conditions)})"
+
+
+def is_declarative(condition):
+    """Indica si una condición es declarativa (Condition/AnyOf) y no una función opaca"""
+    return isinstance(condition, (Condition, AnyOf))
+
+
 class Rule:
     """Clase base para representar una regla"""
     def __init__(self, name, conditions, conclusion, confidence):
+        """
+        conditions: lista de condiciones; cada una puede ser una Condition/AnyOf
+        declarativa o cualquier función facts -> bool
+        """
         self.name = name
-        self.conditions = conditions
+        self.conditions = tuple(conditions)
         self.conclusion = conclusion
         self.confidence = confidence
     
+    @property
+    def fields(self):
+        """
+        Campos de los hechos que lee la regla
+        Retorna None si alguna condición es una función opaca
+        """
+        fields = set()
+        for condition in self.conditions:
+            if not is_declarative(condition):
+                return None
+            fields |= condition.fields
+        return frozenset(fields)
+    
     def evaluate(self, facts):
-        """Evalúa si todas las condiciones de la regla se cumplen"""
+        """
+        Evalúa si todas las condiciones de la regla se cumplen
+        No pasa por el recolector de estadísticas: con él activo, los motores de
+        encadenamiento evalúan con funciones de conteo equivalentes (ver
+        estadisticas_reglas)
+        """
         for condition in self.conditions:
             if not condition(facts):
                 return False
@@ -29,6 +152,21 @@ class Rule:
         return f"Rule({self.name}, conclusion={self.conclusion}, confidence={self.confidence})"
 
 
+# Recolector de estadísticas de reglas activo (None = desactivado; ver estadisticas_reglas)
+_RULE_STATISTICS = None
+
+
+def set_rule_statistics(collector):
+    """Activa (o desactiva con None) el recolector que usan evaluate_crisp_rules y los motores de encadenamiento"""
+    global _RULE_STATISTICS
+    _RULE_STATISTICS = collector
+
+
+def get_rule_statistics():
+    """Recolector de estadísticas activo o None"""
+    return _RULE_STATISTICS
+
+
 # ========================================
 # REGLAS PARA EMERGENCIAS E INFECCIONES
 # ========================================
@@ -36,10 +174,10 @@ class Rule:
 def rule_celulitis_facial(facts):
     """Celulitis facial - EMERGENCIA MÉDICA"""
     conditions = [
-        lambda f: f.get('hinchazon_cara') == 'si',
-        lambda f: f.get('fiebre') == 'si',
-        lambda f: f.get('intensidad_dolor', 0) >= 8,
-        lambda f: f.get('mal_aliento') in ['moderado', 'severo']
+        Condition('hinchazon_cara', '==', 'si'),
+        Condition('fiebre', '==', 'si'),
+        Condition('intensidad_dolor', '>=', 8),
+        Condition('mal_aliento', 'in', ['moderado', 'severo'])
     ]
     return Rule(
         name="Celulitis facial - EMERGENCIA",
@@ -51,9 +189,9 @@ def rule_celulitis_facial(facts):
 def rule_absceso_agudo_1(facts):
     """Absceso dental agudo - máxima prioridad"""
     conditions = [
-        lambda f: f.get('hinchazon_cara') == 'si',
-        lambda f: f.get('pus_visible') == 'si',
-        lambda f: f.get('intensidad_dolor', 0) >= 7
+        Condition('hinchazon_cara', '==', 'si'),
+        Condition('pus_visible', '==', 'si'),
+        Condition('intensidad_dolor', '>=', 7)
     ]
     return Rule(
         name="Absceso agudo con pus visible",
@@ -65,9 +203,9 @@ def rule_absceso_agudo_1(facts):
 def rule_absceso_agudo_2(facts):
     """Absceso agudo por hinchazón y fiebre"""
     conditions = [
-        lambda f: f.get('hinchazon_cara') == 'si',
-        lambda f: f.get('fiebre') == 'si',
-        lambda f: f.get('intensidad_dolor', 0) >= 6
+        Condition('hinchazon_cara', '==', 'si'),
+        Condition('fiebre', '==', 'si'),
+        Condition('intensidad_dolor', '>=', 6)
     ]
     return Rule(
         name="Absceso con fiebre y hinchazón",
@@ -79,8 +217,8 @@ def rule_absceso_agudo_2(facts):
 def rule_absceso_agudo_3(facts):
     """Absceso por hinchazón facial"""
     conditions = [
-        lambda f: f.get('hinchazon_cara') == 'si',
-        lambda f: f.get('intensidad_dolor', 0) >= 6
+        Condition('hinchazon_cara', '==', 'si'),
+        Condition('intensidad_dolor', '>=', 6)
     ]
     return Rule(
         name="Absceso por hinchazón",
@@ -92,8 +230,8 @@ def rule_absceso_agudo_3(facts):
 def rule_absceso_agudo_4(facts):
     """Absceso por pus visible"""
     conditions = [
-        lambda f: f.get('pus_visible') == 'si',
-        lambda f: f.get('intensidad_dolor', 0) >= 5
+        Condition('pus_visible', '==', 'si'),
+        Condition('intensidad_dolor', '>=', 5)
     ]
     return Rule(
         name="Absceso con pus",
@@ -105,10 +243,10 @@ def rule_absceso_agudo_4(facts):
 def rule_absceso_cronico(facts):
     """Absceso crónico"""
     conditions = [
-        lambda f: f.get('mal_aliento') in ['moderado', 'severo'],
-        lambda f: f.get('duracion_dolor') in ['3_7_dias', 'mas_7_dias'],
-        lambda f: f.get('pus_visible') == 'si' or f.get('hinchazon_cara') == 'si',
-        lambda f: f.get('intensidad_dolor', 0) >= 4
+        Condition('mal_aliento', 'in', ['moderado', 'severo']),
+        Condition('duracion_dolor', 'in', ['3_7_dias', 'mas_7_dias']),
+        AnyOf(Condition('pus_visible', '==', 'si'), Condition('hinchazon_cara', '==', 'si')),
+        Condition('intensidad_dolor', '>=', 4)
     ]
     return Rule(
         name="Absceso crónico",
@@ -125,11 +263,11 @@ def rule_absceso_cronico(facts):
 def rule_necrosis_pulpar(facts):
     """Necrosis pulpar - pulpa muerta"""
     conditions = [
-        lambda f: f.get('duracion_dolor') == 'mas_7_dias',
-        lambda f: f.get('tipo_dolor') in ['pulsante', 'constante'],
-        lambda f: f.get('intensidad_dolor', 0) >= 8,
-        lambda f: f.get('sensibilidad_calor', 0) <= 2,  # No responde a calor
-        lambda f: f.get('mal_aliento') in ['leve', 'moderado', 'severo']
+        Condition('duracion_dolor', '==', 'mas_7_dias'),
+        Condition('tipo_dolor', 'in', ['pulsante', 'constante']),
+        Condition('intensidad_dolor', '>=', 8),
+        Condition('sensibilidad_calor', '<=', 2),  # No responde a calor
+        Condition('mal_aliento', 'in', ['leve', 'moderado', 'severo'])
     ]
     return Rule(
         name="Necrosis pulpar",
@@ -141,10 +279,10 @@ def rule_necrosis_pulpar(facts):
 def rule_pulpitis_irreversible_1(facts):
     """Pulpitis irreversible severa"""
     conditions = [
-        lambda f: f.get('intensidad_dolor', 0) >= 8,
-        lambda f: f.get('tipo_dolor') in ['pulsante', 'punzante'],
-        lambda f: f.get('sensibilidad_calor', 0) >= 7,
-        lambda f: f.get('dolor_nocturno', 0) >= 7
+        Condition('intensidad_dolor', '>=', 8),
+        Condition('tipo_dolor', 'in', ['pulsante', 'punzante']),
+        Condition('sensibilidad_calor', '>=', 7),
+        Condition('dolor_nocturno', '>=', 7)
     ]
     return Rule(
         name="Pulpitis irreversible severa",
@@ -156,10 +294,10 @@ def rule_pulpitis_irreversible_1(facts):
 def rule_pulpitis_irreversible_2(facts):
     """Pulpitis irreversible por dolor prolongado"""
     conditions = [
-        lambda f: f.get('duracion_dolor') in ['3_7_dias', 'mas_7_dias'],
-        lambda f: f.get('intensidad_dolor', 0) >= 6,
-        lambda f: f.get('dolor_nocturno', 0) >= 6,
-        lambda f: f.get('sensibilidad_calor', 0) >= 6
+        Condition('duracion_dolor', 'in', ['3_7_dias', 'mas_7_dias']),
+        Condition('intensidad_dolor', '>=', 6),
+        Condition('dolor_nocturno', '>=', 6),
+        Condition('sensibilidad_calor', '>=', 6)
     ]
     return Rule(
         name="Pulpitis irreversible prolongada",
@@ -171,9 +309,9 @@ def rule_pulpitis_irreversible_2(facts):
 def rule_pulpitis_irreversible_3(facts):
     """Pulpitis por dolor nocturno intenso"""
     conditions = [
-        lambda f: f.get('dolor_nocturno', 0) >= 8,
-        lambda f: f.get('intensidad_dolor', 0) >= 7,
-        lambda f: f.get('tipo_dolor') == 'pulsante'
+        Condition('dolor_nocturno', '>=', 8),
+        Condition('intensidad_dolor', '>=', 7),
+        Condition('tipo_dolor', '==', 'pulsante')
     ]
     return Rule(
         name="Pulpitis con dolor nocturno severo",
@@ -185,9 +323,9 @@ def rule_pulpitis_irreversible_3(facts):
 def rule_pulpitis_irreversible_4(facts):
     """Pulpitis por sensibilidad extrema al calor"""
     conditions = [
-        lambda f: f.get('sensibilidad_calor', 0) >= 8,
-        lambda f: f.get('intensidad_dolor', 0) >= 6,
-        lambda f: f.get('tipo_dolor') in ['pulsante', 'punzante', 'agudo']
+        Condition('sensibilidad_calor', '>=', 8),
+        Condition('intensidad_dolor', '>=', 6),
+        Condition('tipo_dolor', 'in', ['pulsante', 'punzante', 'agudo'])
     ]
     return Rule(
         name="Pulpitis por sensibilidad calor extrema",
@@ -199,11 +337,11 @@ def rule_pulpitis_irreversible_4(facts):
 def rule_pulpitis_reversible_1(facts):
     """Pulpitis reversible moderada"""
     conditions = [
-        lambda f: f.get('sensibilidad_calor', 0) >= 6,
-        lambda f: f.get('sensibilidad_frio', 0) >= 5,
-        lambda f: f.get('intensidad_dolor', 0) >= 4,
-        lambda f: f.get('intensidad_dolor', 0) < 7,
-        lambda f: f.get('duracion_dolor') in ['menos_24h', '1_3_dias']
+        Condition('sensibilidad_calor', '>=', 6),
+        Condition('sensibilidad_frio', '>=', 5),
+        Condition('intensidad_dolor', '>=', 4),
+        Condition('intensidad_dolor', '<', 7),
+        Condition('duracion_dolor', 'in', ['menos_24h', '1_3_dias'])
     ]
     return Rule(
         name="Pulpitis reversible",
@@ -215,10 +353,10 @@ def rule_pulpitis_reversible_1(facts):
 def rule_pulpitis_reversible_2(facts):
     """Pulpitis reversible por sensibilidad"""
     conditions = [
-        lambda f: f.get('sensibilidad_calor', 0) >= 7,
-        lambda f: f.get('intensidad_dolor', 0) >= 5,
-        lambda f: f.get('intensidad_dolor', 0) < 8,
-        lambda f: f.get('caries_visible') == 'si'
+        Condition('sensibilidad_calor', '>=', 7),
+        Condition('intensidad_dolor', '>=', 5),
+        Condition('intensidad_dolor', '<', 8),
+        Condition('caries_visible', '==', 'si')
     ]
     return Rule(
         name="Pulpitis reversible con caries",
@@ -235,10 +373,10 @@ def rule_pulpitis_reversible_2(facts):
 def rule_caries_profunda_1(facts):
     """Caries profunda cerca de pulpa"""
     conditions = [
-        lambda f: f.get('caries_visible') == 'si',
-        lambda f: f.get('intensidad_dolor', 0) >= 6,
-        lambda f: f.get('sensibilidad_calor', 0) >= 5,
-        lambda f: f.get('dolor_masticar', 0) >= 5
+        Condition('caries_visible', '==', 'si'),
+        Condition('intensidad_dolor', '>=', 6),
+        Condition('sensibilidad_calor', '>=', 5),
+        Condition('dolor_masticar', '>=', 5)
     ]
     return Rule(
         name="Caries profunda",
@@ -250,10 +388,10 @@ def rule_caries_profunda_1(facts):
 def rule_caries_profunda_2(facts):
     """Caries profunda por síntomas severos"""
     conditions = [
-        lambda f: f.get('mancha_oscura') == 'si',
-        lambda f: f.get('intensidad_dolor', 0) >= 6,
-        lambda f: f.get('sensibilidad_dulce', 0) >= 7,
-        lambda f: f.get('dolor_masticar', 0) >= 6
+        Condition('mancha_oscura', '==', 'si'),
+        Condition('intensidad_dolor', '>=', 6),
+        Condition('sensibilidad_dulce', '>=', 7),
+        Condition('dolor_masticar', '>=', 6)
     ]
     return Rule(
         name="Caries profunda probable",
@@ -265,9 +403,9 @@ def rule_caries_profunda_2(facts):
 def rule_caries_moderada_1(facts):
     """Caries visible con síntomas claros"""
     conditions = [
-        lambda f: f.get('caries_visible') == 'si',
-        lambda f: f.get('sensibilidad_dulce', 0) >= 5,
-        lambda f: f.get('tipo_dolor') in ['agudo', 'punzante']
+        Condition('caries_visible', '==', 'si'),
+        Condition('sensibilidad_dulce', '>=', 5),
+        Condition('tipo_dolor', 'in', ['agudo', 'punzante'])
     ]
     return Rule(
         name="Caries con síntomas claros",
@@ -279,9 +417,9 @@ def rule_caries_moderada_1(facts):
 def rule_caries_moderada_2(facts):
     """Caries por dolor localizado"""
     conditions = [
-        lambda f: f.get('mancha_oscura') == 'si',
-        lambda f: f.get('sensibilidad_frio', 0) >= 5,
-        lambda f: f.get('dolor_masticar', 0) >= 4
+        Condition('mancha_oscura', '==', 'si'),
+        Condition('sensibilidad_frio', '>=', 5),
+        Condition('dolor_masticar', '>=', 4)
     ]
     return Rule(
         name="Caries por mancha y sensibilidad",
@@ -293,8 +431,8 @@ def rule_caries_moderada_2(facts):
 def rule_caries_moderada_3(facts):
     """Caries visible simple"""
     conditions = [
-        lambda f: f.get('caries_visible') == 'si',
-        lambda f: f.get('intensidad_dolor', 0) >= 3
+        Condition('caries_visible', '==', 'si'),
+        Condition('intensidad_dolor', '>=', 3)
     ]
     return Rule(
         name="Caries detectada visualmente",
@@ -306,9 +444,9 @@ def rule_caries_moderada_3(facts):
 def rule_caries_moderada_4(facts):
     """Caries por alta sensibilidad dulce"""
     conditions = [
-        lambda f: f.get('sensibilidad_dulce', 0) >= 7,
-        lambda f: f.get('intensidad_dolor', 0) >= 4,
-        lambda f: f.get('intensidad_dolor', 0) < 8
+        Condition('sensibilidad_dulce', '>=', 7),
+        Condition('intensidad_dolor', '>=', 4),
+        Condition('intensidad_dolor', '<', 8)
     ]
     return Rule(
         name="Caries por sensibilidad dulce alta",
@@ -320,9 +458,9 @@ def rule_caries_moderada_4(facts):
 def rule_caries_moderada_5(facts):
     """Caries por impactación alimentaria"""
     conditions = [
-        lambda f: f.get('dolor_masticar', 0) >= 5,
-        lambda f: f.get('mancha_oscura') == 'si',
-        lambda f: f.get('sensibilidad_frio', 0) >= 4
+        Condition('dolor_masticar', '>=', 5),
+        Condition('mancha_oscura', '==', 'si'),
+        Condition('sensibilidad_frio', '>=', 4)
     ]
     return Rule(
         name="Caries con impactación",
@@ -334,9 +472,9 @@ def rule_caries_moderada_5(facts):
 def rule_caries_inicial_1(facts):
     """Caries inicial por mancha"""
     conditions = [
-        lambda f: f.get('mancha_oscura') == 'si',
-        lambda f: f.get('sensibilidad_frio', 0) >= 3,
-        lambda f: f.get('intensidad_dolor', 0) < 5
+        Condition('mancha_oscura', '==', 'si'),
+        Condition('sensibilidad_frio', '>=', 3),
+        Condition('intensidad_dolor', '<', 5)
     ]
     return Rule(
         name="Caries inicial detectada",
@@ -348,10 +486,10 @@ def rule_caries_inicial_1(facts):
 def rule_caries_inicial_2(facts):
     """Caries inicial por sensibilidad dulce"""
     conditions = [
-        lambda f: f.get('sensibilidad_dulce', 0) >= 5,
-        lambda f: f.get('intensidad_dolor', 0) >= 2,
-        lambda f: f.get('intensidad_dolor', 0) < 5,
-        lambda f: f.get('caries_visible') == 'no'
+        Condition('sensibilidad_dulce', '>=', 5),
+        Condition('intensidad_dolor', '>=', 2),
+        Condition('intensidad_dolor', '<', 5),
+        Condition('caries_visible', '==', 'no')
     ]
     return Rule(
         name="Caries inicial por sensibilidad",
@@ -363,10 +501,10 @@ def rule_caries_inicial_2(facts):
 def rule_caries_radicular(facts):
     """Caries radicular"""
     conditions = [
-        lambda f: f.get('retraimiento_encias') in ['moderado', 'severo'],
-        lambda f: f.get('sensibilidad_frio', 0) >= 6,
-        lambda f: f.get('mancha_oscura') == 'si',
-        lambda f: f.get('intensidad_dolor', 0) >= 4
+        Condition('retraimiento_encias', 'in', ['moderado', 'severo']),
+        Condition('sensibilidad_frio', '>=', 6),
+        Condition('mancha_oscura', '==', 'si'),
+        Condition('intensidad_dolor', '>=', 4)
     ]
     return Rule(
         name="Caries radicular",
@@ -383,11 +521,11 @@ def rule_caries_radicular(facts):
 def rule_periodontitis_agresiva(facts):
     """Periodontitis agresiva"""
     conditions = [
-        lambda f: f.get('movilidad_dental') in ['moderado', 'severo'],
-        lambda f: f.get('sangrado_encias') in ['moderado', 'severo'],
-        lambda f: f.get('retraimiento_encias') in ['moderado', 'severo'],
-        lambda f: f.get('duracion_dolor') == 'mas_7_dias',
-        lambda f: f.get('inflamacion_encias', 0) >= 7
+        Condition('movilidad_dental', 'in', ['moderado', 'severo']),
+        Condition('sangrado_encias', 'in', ['moderado', 'severo']),
+        Condition('retraimiento_encias', 'in', ['moderado', 'severo']),
+        Condition('duracion_dolor', '==', 'mas_7_dias'),
+        Condition('inflamacion_encias', '>=', 7)
     ]
     return Rule(
         name="Periodontitis agresiva",
@@ -399,10 +537,10 @@ def rule_periodontitis_agresiva(facts):
 def rule_absceso_periodontal(facts):
     """Absceso periodontal"""
     conditions = [
-        lambda f: f.get('inflamacion_encias', 0) >= 7,
-        lambda f: f.get('pus_visible') == 'si',
-        lambda f: f.get('movilidad_dental') in ['leve', 'moderado', 'severo'],
-        lambda f: f.get('sangrado_encias') in ['moderado', 'severo']
+        Condition('inflamacion_encias', '>=', 7),
+        Condition('pus_visible', '==', 'si'),
+        Condition('movilidad_dental', 'in', ['leve', 'moderado', 'severo']),
+        Condition('sangrado_encias', 'in', ['moderado', 'severo'])
     ]
     return Rule(
         name="Absceso periodontal",
@@ -414,10 +552,10 @@ def rule_absceso_periodontal(facts):
 def rule_periodontitis_cronica_1(facts):
     """Periodontitis crónica severa"""
     conditions = [
-        lambda f: f.get('movilidad_dental') in ['moderado', 'severo'],
-        lambda f: f.get('retraimiento_encias') in ['moderado', 'severo'],
-        lambda f: f.get('sangrado_encias') in ['moderado', 'severo'],
-        lambda f: f.get('mal_aliento') in ['moderado', 'severo']
+        Condition('movilidad_dental', 'in', ['moderado', 'severo']),
+        Condition('retraimiento_encias', 'in', ['moderado', 'severo']),
+        Condition('sangrado_encias', 'in', ['moderado', 'severo']),
+        Condition('mal_aliento', 'in', ['moderado', 'severo'])
     ]
     return Rule(
         name="Periodontitis crónica severa",
@@ -429,10 +567,10 @@ def rule_periodontitis_cronica_1(facts):
 def rule_periodontitis_cronica_2(facts):
     """Periodontitis crónica moderada"""
     conditions = [
-        lambda f: f.get('retraimiento_encias') in ['moderado', 'severo'],
-        lambda f: f.get('sangrado_encias') == 'moderado',
-        lambda f: f.get('movilidad_dental') == 'leve',
-        lambda f: f.get('duracion_dolor') in ['3_7_dias', 'mas_7_dias']
+        Condition('retraimiento_encias', 'in', ['moderado', 'severo']),
+        Condition('sangrado_encias', '==', 'moderado'),
+        Condition('movilidad_dental', '==', 'leve'),
+        Condition('duracion_dolor', 'in', ['3_7_dias', 'mas_7_dias'])
     ]
     return Rule(
         name="Periodontitis crónica moderada",
@@ -444,9 +582,9 @@ def rule_periodontitis_cronica_2(facts):
 def rule_periodontitis_cronica_3(facts):
     """Periodontitis por movilidad dental"""
     conditions = [
-        lambda f: f.get('movilidad_dental') in ['moderado', 'severo'],
-        lambda f: f.get('inflamacion_encias', 0) >= 5,
-        lambda f: f.get('sangrado_encias') in ['leve', 'moderado', 'severo']
+        Condition('movilidad_dental', 'in', ['moderado', 'severo']),
+        Condition('inflamacion_encias', '>=', 5),
+        Condition('sangrado_encias', 'in', ['leve', 'moderado', 'severo'])
     ]
     return Rule(
         name="Periodontitis con movilidad",
@@ -458,10 +596,10 @@ def rule_periodontitis_cronica_3(facts):
 def rule_gingivitis_aguda(facts):
     """Gingivitis aguda"""
     conditions = [
-        lambda f: f.get('sangrado_encias') == 'severo',
-        lambda f: f.get('inflamacion_encias', 0) >= 7,
-        lambda f: f.get('color_encias') in ['rojo_intenso', 'purpura'],
-        lambda f: f.get('duracion_dolor') in ['menos_24h', '1_3_dias']
+        Condition('sangrado_encias', '==', 'severo'),
+        Condition('inflamacion_encias', '>=', 7),
+        Condition('color_encias', 'in', ['rojo_intenso', 'purpura']),
+        Condition('duracion_dolor', 'in', ['menos_24h', '1_3_dias'])
     ]
     return Rule(
         name="Gingivitis aguda",
@@ -473,10 +611,10 @@ def rule_gingivitis_aguda(facts):
 def rule_gingivitis_moderada_1(facts):
     """Gingivitis moderada con sangrado"""
     conditions = [
-        lambda f: f.get('sangrado_encias') in ['moderado', 'severo'],
-        lambda f: f.get('inflamacion_encias', 0) >= 5,
-        lambda f: f.get('color_encias') in ['rojo_claro', 'rojo_intenso'],
-        lambda f: f.get('movilidad_dental') == 'no'
+        Condition('sangrado_encias', 'in', ['moderado', 'severo']),
+        Condition('inflamacion_encias', '>=', 5),
+        Condition('color_encias', 'in', ['rojo_claro', 'rojo_intenso']),
+        Condition('movilidad_dental', '==', 'no')
     ]
     return Rule(
         name="Gingivitis con sangrado",
@@ -488,9 +626,9 @@ def rule_gingivitis_moderada_1(facts):
 def rule_gingivitis_moderada_2(facts):
     """Gingivitis por inflamación"""
     conditions = [
-        lambda f: f.get('inflamacion_encias', 0) >= 6,
-        lambda f: f.get('sangrado_encias') in ['leve', 'moderado'],
-        lambda f: f.get('mal_aliento') in ['leve', 'moderado']
+        Condition('inflamacion_encias', '>=', 6),
+        Condition('sangrado_encias', 'in', ['leve', 'moderado']),
+        Condition('mal_aliento', 'in', ['leve', 'moderado'])
     ]
     return Rule(
         name="Gingivitis moderada",
@@ -502,9 +640,9 @@ def rule_gingivitis_moderada_2(facts):
 def rule_gingivitis_leve(facts):
     """Gingivitis leve"""
     conditions = [
-        lambda f: f.get('inflamacion_encias', 0) >= 4,
-        lambda f: f.get('sangrado_encias') == 'leve',
-        lambda f: f.get('intensidad_dolor', 0) <= 3
+        Condition('inflamacion_encias', '>=', 4),
+        Condition('sangrado_encias', '==', 'leve'),
+        Condition('intensidad_dolor', '<=', 3)
     ]
     return Rule(
         name="Gingivitis leve",
@@ -521,11 +659,11 @@ def rule_gingivitis_leve(facts):
 def rule_erosion_dental(facts):
     """Erosión dental"""
     conditions = [
-        lambda f: f.get('sensibilidad_frio', 0) >= 6,
-        lambda f: f.get('sensibilidad_calor', 0) >= 5,
-        lambda f: f.get('sensibilidad_dulce', 0) >= 5,
-        lambda f: f.get('desgaste_dental') in ['moderado', 'severo'],
-        lambda f: f.get('caries_visible') == 'no'
+        Condition('sensibilidad_frio', '>=', 6),
+        Condition('sensibilidad_calor', '>=', 5),
+        Condition('sensibilidad_dulce', '>=', 5),
+        Condition('desgaste_dental', 'in', ['moderado', 'severo']),
+        Condition('caries_visible', '==', 'no')
     ]
     return Rule(
         name="Erosión dental",
@@ -537,10 +675,10 @@ def rule_erosion_dental(facts):
 def rule_abrasion_dental(facts):
     """Abrasión dental por cepillado"""
     conditions = [
-        lambda f: f.get('sensibilidad_frio', 0) >= 6,
-        lambda f: f.get('retraimiento_encias') in ['leve', 'moderado'],
-        lambda f: f.get('desgaste_dental') in ['moderado', 'severo'],
-        lambda f: f.get('intensidad_dolor', 0) <= 5
+        Condition('sensibilidad_frio', '>=', 6),
+        Condition('retraimiento_encias', 'in', ['leve', 'moderado']),
+        Condition('desgaste_dental', 'in', ['moderado', 'severo']),
+        Condition('intensidad_dolor', '<=', 5)
     ]
     return Rule(
         name="Abrasión dental",
@@ -552,11 +690,11 @@ def rule_abrasion_dental(facts):
 def rule_sensibilidad_severa(facts):
     """Hipersensibilidad severa"""
     conditions = [
-        lambda f: f.get('sensibilidad_frio', 0) >= 7,
-        lambda f: f.get('caries_visible') == 'no',
-        lambda f: f.get('intensidad_dolor', 0) >= 5,
-        lambda f: f.get('intensidad_dolor', 0) <= 7,
-        lambda f: f.get('duracion_dolor') == 'menos_24h'
+        Condition('sensibilidad_frio', '>=', 7),
+        Condition('caries_visible', '==', 'no'),
+        Condition('intensidad_dolor', '>=', 5),
+        Condition('intensidad_dolor', '<=', 7),
+        Condition('duracion_dolor', '==', 'menos_24h')
     ]
     return Rule(
         name="Hipersensibilidad severa",
@@ -568,10 +706,10 @@ def rule_sensibilidad_severa(facts):
 def rule_sensibilidad_moderada_1(facts):
     """Sensibilidad moderada al frío"""
     conditions = [
-        lambda f: f.get('sensibilidad_frio', 0) >= 6,
-        lambda f: f.get('caries_visible') != 'si',
-        lambda f: f.get('intensidad_dolor', 0) <= 6,
-        lambda f: f.get('sensibilidad_calor', 0) < 5
+        Condition('sensibilidad_frio', '>=', 6),
+        Condition('caries_visible', '!=', 'si'),
+        Condition('intensidad_dolor', '<=', 6),
+        Condition('sensibilidad_calor', '<', 5)
     ]
     return Rule(
         name="Sensibilidad al frío",
@@ -583,10 +721,10 @@ def rule_sensibilidad_moderada_1(facts):
 def rule_sensibilidad_moderada_2(facts):
     """Sensibilidad con retracción gingival"""
     conditions = [
-        lambda f: f.get('sensibilidad_frio', 0) >= 5,
-        lambda f: f.get('retraimiento_encias') in ['leve', 'moderado'],
-        lambda f: f.get('intensidad_dolor', 0) <= 5,
-        lambda f: f.get('caries_visible') == 'no'
+        Condition('sensibilidad_frio', '>=', 5),
+        Condition('retraimiento_encias', 'in', ['leve', 'moderado']),
+        Condition('intensidad_dolor', '<=', 5),
+        Condition('caries_visible', '==', 'no')
     ]
     return Rule(
         name="Sensibilidad por retracción",
@@ -598,10 +736,10 @@ def rule_sensibilidad_moderada_2(facts):
 def rule_sensibilidad_leve(facts):
     """Sensibilidad leve"""
     conditions = [
-        lambda f: f.get('sensibilidad_frio', 0) >= 4,
-        lambda f: f.get('intensidad_dolor', 0) <= 4,
-        lambda f: f.get('caries_visible') == 'no',
-        lambda f: f.get('mancha_oscura') == 'no'
+        Condition('sensibilidad_frio', '>=', 4),
+        Condition('intensidad_dolor', '<=', 4),
+        Condition('caries_visible', '==', 'no'),
+        Condition('mancha_oscura', '==', 'no')
     ]
     return Rule(
         name="Sensibilidad leve",
@@ -618,9 +756,9 @@ def rule_sensibilidad_leve(facts):
 def rule_fractura_dental_severa(facts):
     """Fractura dental con trauma reciente"""
     conditions = [
-        lambda f: f.get('fractura_diente') == 'si',
-        lambda f: f.get('trauma_reciente') == 'si',
-        lambda f: f.get('intensidad_dolor', 0) >= 6
+        Condition('fractura_diente', '==', 'si'),
+        Condition('trauma_reciente', '==', 'si'),
+        Condition('intensidad_dolor', '>=', 6)
     ]
     return Rule(
         name="Fractura dental traumática",
@@ -632,9 +770,9 @@ def rule_fractura_dental_severa(facts):
 def rule_fractura_dental_moderada(facts):
     """Fractura dental visible"""
     conditions = [
-        lambda f: f.get('fractura_diente') == 'si',
-        lambda f: f.get('dolor_masticar', 0) >= 5,
-        lambda f: f.get('sensibilidad_frio', 0) >= 4
+        Condition('fractura_diente', '==', 'si'),
+        Condition('dolor_masticar', '>=', 5),
+        Condition('sensibilidad_frio', '>=', 4)
     ]
     return Rule(
         name="Fractura dental confirmada",
@@ -646,10 +784,10 @@ def rule_fractura_dental_moderada(facts):
 def rule_fisura_dental(facts):
     """Fisura o grieta dental"""
     conditions = [
-        lambda f: f.get('dolor_masticar', 0) >= 6,
-        lambda f: f.get('tipo_dolor') == 'agudo',
-        lambda f: f.get('sensibilidad_frio', 0) >= 5,
-        lambda f: f.get('duracion_dolor') in ['menos_24h', '1_3_dias']
+        Condition('dolor_masticar', '>=', 6),
+        Condition('tipo_dolor', '==', 'agudo'),
+        Condition('sensibilidad_frio', '>=', 5),
+        Condition('duracion_dolor', 'in', ['menos_24h', '1_3_dias'])
     ]
     return Rule(
         name="Fisura dental",
@@ -666,10 +804,10 @@ def rule_fisura_dental(facts):
 def rule_bruxismo_severo(facts):
     """Bruxismo severo con desgaste"""
     conditions = [
-        lambda f: f.get('rechinar_dientes') == 'si',
-        lambda f: f.get('desgaste_dental') in ['moderado', 'severo'],
-        lambda f: f.get('dolor_mandibula', 0) >= 6,
-        lambda f: f.get('tipo_dolor') in ['sordo', 'constante']
+        Condition('rechinar_dientes', '==', 'si'),
+        Condition('desgaste_dental', 'in', ['moderado', 'severo']),
+        Condition('dolor_mandibula', '>=', 6),
+        Condition('tipo_dolor', 'in', ['sordo', 'constante'])
     ]
     return Rule(
         name="Bruxismo severo",
@@ -681,10 +819,10 @@ def rule_bruxismo_severo(facts):
 def rule_bruxismo_moderado(facts):
     """Bruxismo moderado"""
     conditions = [
-        lambda f: f.get('dolor_mandibula', 0) >= 5,
-        lambda f: f.get('desgaste_dental') in ['leve', 'moderado'],
-        lambda f: f.get('dolor_nocturno', 0) <= 3,
-        lambda f: f.get('sensibilidad_frio', 0) >= 4
+        Condition('dolor_mandibula', '>=', 5),
+        Condition('desgaste_dental', 'in', ['leve', 'moderado']),
+        Condition('dolor_nocturno', '<=', 3),
+        Condition('sensibilidad_frio', '>=', 4)
     ]
     return Rule(
         name="Bruxismo probable",
@@ -696,10 +834,10 @@ def rule_bruxismo_moderado(facts):
 def rule_atm_disfuncion_severa(facts):
     """Disfunción ATM severa"""
     conditions = [
-        lambda f: f.get('dolor_mandibula', 0) >= 7,
-        lambda f: f.get('problemas_mordida') == 'si',
-        lambda f: f.get('dolor_masticar', 0) >= 6,
-        lambda f: f.get('tipo_dolor') in ['sordo', 'constante']
+        Condition('dolor_mandibula', '>=', 7),
+        Condition('problemas_mordida', '==', 'si'),
+        Condition('dolor_masticar', '>=', 6),
+        Condition('tipo_dolor', 'in', ['sordo', 'constante'])
     ]
     return Rule(
         name="Disfunción ATM severa",
@@ -711,9 +849,9 @@ def rule_atm_disfuncion_severa(facts):
 def rule_atm_disfuncion_moderada(facts):
     """Disfunción ATM moderada"""
     conditions = [
-        lambda f: f.get('dolor_mandibula', 0) >= 5,
-        lambda f: f.get('dolor_masticar', 0) >= 4,
-        lambda f: f.get('rechinar_dientes') in ['si', 'no_seguro']
+        Condition('dolor_mandibula', '>=', 5),
+        Condition('dolor_masticar', '>=', 4),
+        Condition('rechinar_dientes', 'in', ['si', 'no_seguro'])
     ]
     return Rule(
         name="Disfunción ATM moderada",
@@ -730,10 +868,10 @@ def rule_atm_disfuncion_moderada(facts):
 def rule_fracaso_endodoncia(facts):
     """Fracaso de endodoncia"""
     conditions = [
-        lambda f: f.get('tratamiento_reciente') == 'si',
-        lambda f: f.get('tiempo_tratamiento') in ['1_4_semanas', 'mas_1_mes'],
-        lambda f: f.get('intensidad_dolor', 0) >= 6,
-        lambda f: f.get('hinchazon_cara') == 'si' or f.get('pus_visible') == 'si'
+        Condition('tratamiento_reciente', '==', 'si'),
+        Condition('tiempo_tratamiento', 'in', ['1_4_semanas', 'mas_1_mes']),
+        Condition('intensidad_dolor', '>=', 6),
+        AnyOf(Condition('hinchazon_cara', '==', 'si'), Condition('pus_visible', '==', 'si'))
     ]
     return Rule(
         name="Fracaso de endodoncia",
@@ -745,11 +883,11 @@ def rule_fracaso_endodoncia(facts):
 def rule_dolor_post_obturacion(facts):
     """Dolor post-obturación normal"""
     conditions = [
-        lambda f: f.get('tratamiento_reciente') == 'si',
-        lambda f: f.get('tiempo_tratamiento') == 'menos_1_semana',
-        lambda f: f.get('intensidad_dolor', 0) >= 3,
-        lambda f: f.get('intensidad_dolor', 0) <= 6,
-        lambda f: f.get('hinchazon_cara') == 'no'
+        Condition('tratamiento_reciente', '==', 'si'),
+        Condition('tiempo_tratamiento', '==', 'menos_1_semana'),
+        Condition('intensidad_dolor', '>=', 3),
+        Condition('intensidad_dolor', '<=', 6),
+        Condition('hinchazon_cara', '==', 'no')
     ]
     return Rule(
         name="Dolor post-obturación",
@@ -761,10 +899,10 @@ def rule_dolor_post_obturacion(facts):
 def rule_sensibilidad_post_tratamiento(facts):
     """Sensibilidad post-tratamiento"""
     conditions = [
-        lambda f: f.get('tratamiento_reciente') == 'si',
-        lambda f: f.get('sensibilidad_frio', 0) >= 5,
-        lambda f: f.get('intensidad_dolor', 0) <= 5,
-        lambda f: f.get('duracion_dolor') == 'menos_24h'
+        Condition('tratamiento_reciente', '==', 'si'),
+        Condition('sensibilidad_frio', '>=', 5),
+        Condition('intensidad_dolor', '<=', 5),
+        Condition('duracion_dolor', '==', 'menos_24h')
     ]
     return Rule(
         name="Sensibilidad post-tratamiento",
@@ -781,10 +919,10 @@ def rule_sensibilidad_post_tratamiento(facts):
 def rule_ortodoncia_necesaria(facts):
     """Problema ortodóntico"""
     conditions = [
-        lambda f: f.get('problemas_mordida') == 'si',
-        lambda f: f.get('dolor_mandibula', 0) >= 4,
-        lambda f: f.get('dolor_masticar', 0) >= 4,
-        lambda f: f.get('tipo_dolor') in ['sordo', 'constante']
+        Condition('problemas_mordida', '==', 'si'),
+        Condition('dolor_mandibula', '>=', 4),
+        Condition('dolor_masticar', '>=', 4),
+        Condition('tipo_dolor', 'in', ['sordo', 'constante'])
     ]
     return Rule(
         name="Problema de ortodoncia",
@@ -796,11 +934,11 @@ def rule_ortodoncia_necesaria(facts):
 def rule_impactacion_alimentaria(facts):
     """Impactación de alimentos"""
     conditions = [
-        lambda f: f.get('dolor_masticar', 0) >= 4,
-        lambda f: f.get('dolor_presion', 0) >= 4,
-        lambda f: f.get('inflamacion_encias', 0) >= 3,
-        lambda f: f.get('duracion_dolor') == 'menos_24h',
-        lambda f: f.get('caries_visible') == 'no'
+        Condition('dolor_masticar', '>=', 4),
+        Condition('dolor_presion', '>=', 4),
+        Condition('inflamacion_encias', '>=', 3),
+        Condition('duracion_dolor', '==', 'menos_24h'),
+        Condition('caries_visible', '==', 'no')
     ]
     return Rule(
         name="Impactación alimentaria",
@@ -887,22 +1025,328 @@ def get_all_rules():
     ]
 
 
-def evaluate_crisp_rules(facts):
+# ========================================
+# TABLA DE REGLAS COMPILADA
+# ========================================
+
+# Tabla inmutable de objetos Rule, construida una sola vez
+_COMPILED_RULES = None
+
+# Ruta por defecto del orden de condiciones aprendido por optimizador_reglas
+CONDITION_ORDER_PATH = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), '..', '..', 'data', 'orden_condiciones.json'
+))
+
+# Orden de condiciones que aplica get_compiled_rules (None = orden escrito);
+# solo se usa si se pide con configure_crisp_evaluator(condition_order=...)
+_CONDITION_ORDER_PATH = None
+
+
+def compile_rules(rules):
     """
-    Evalúa todas las reglas crisp y retorna los diagnósticos que aplican
-    Sistema con 60+ reglas específicas
+    Construye una tabla inmutable (tupla) de objetos Rule
+    rules: lista de funciones rule_* o de objetos Rule ya construidos
+    """
+    compiled = []
+    for rule in rules:
+        if not isinstance(rule, Rule):
+            # Las funciones rule_* no dependen de los hechos recibidos
+            rule = rule({})
+        compiled.append(rule)
+    return tuple(compiled)
+
+
+def get_compiled_rules():
+    """
+    Retorna la tabla de reglas compilada del sistema
+    Se construye en el primer uso y se reutiliza en cada diagnóstico
+    Las condiciones siguen el orden escrito, salvo que configure_crisp_evaluator
+    haya indicado un orden aprendido
+    """
+    global _COMPILED_RULES
+    if _COMPILED_RULES is None:
+        rules = compile_rules(get_all_rules())
+        order = load_condition_order(_CONDITION_ORDER_PATH, rules)
+        if order is not None:
+            rules = apply_condition_order(rules, order)
+        _COMPILED_RULES = rules
+    return _COMPILED_RULES
+
+
+def reset_compiled_rules():
+    """
+    Descarta la tabla compilada; el próximo get_compiled_rules la reconstruye
+    (y vuelve a leer el orden de condiciones configurado, si lo hay)
+    """
+    global _COMPILED_RULES
+    _COMPILED_RULES = None
+
+
+# ========================================
+# ORDEN DE EVALUACIÓN DE LAS CONDICIONES
+# ========================================
+
+def rule_table_signature(rules):
+    """
+    Huella de la tabla de reglas que no depende del orden de las condiciones
+    Identifica para qué reglas se aprendió un orden de condiciones
+    """
+    digest = hashlib.sha256()
+    for rule in rules:
+        conditions = sorted(repr(c) for c in rule.conditions if is_declarative(c))
+        digest.update(repr((rule.name, conditions)).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def apply_condition_order(rules, order):
+    """
+    Retorna una tabla nueva con las condiciones de cada regla reordenadas
+    order: {nombre de regla: [repr de cada condición en el orden deseado]}
+    Las reglas sin entrada, con condiciones opacas o cuyo orden no coincide
+    con sus condiciones se conservan tal cual
+    """
+    ordered = []
+    for rule in rules:
+        wanted = order.get(rule.name)
+        by_repr = {repr(c): c for c in rule.conditions}
+        if wanted is None or not all(is_declarative(c) for c in rule.conditions) or \
+                len(by_repr) != len(rule.conditions) or sorted(wanted) != sorted(by_repr):
+            ordered.append(rule)
+            continue
+        ordered.append(Rule(rule.name, [by_repr[r] for r in wanted], rule.conclusion, rule.confidence))
+    return tuple(ordered)
+
+
+def load_condition_order(path, rules):
+    """
+    Lee un orden de condiciones guardado por optimizador_reglas
+    Retorna None si no hay ruta, o (con un aviso) si el archivo no existe,
+    no puede leerse o se aprendió para otra versión de la tabla de reglas
+    """
+    if not path:
+        return None
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        warnings.warn(f"Error al leer el orden de condiciones {path}: {e}", stacklevel=2)
+        return None
+    if not isinstance(data, dict) or data.get('huella') != rule_table_signature(rules):
+        warnings.warn(f"Orden de condiciones obsoleto, se ignora: {path}", stacklevel=2)
+        return None
+    return data.get('reglas', {})
+
+
+# ========================================
+# ÍNDICE INVERTIDO DE DISPARADORES
+# ========================================
+
+def trigger_pass_rate(condition):
+    """
+    Estima la fracción de pacientes que cumplen una condición disparadora
+    (valores uniformes en el dominio de SINTOMAS)
+    Retorna None si la condición no sirve como disparador: se cumple con el
+    campo ausente o no puede indexarse
+    """
+    if isinstance(condition, AnyOf):
+        rates = [trigger_pass_rate(c) for c in condition.conditions]
+        if not rates or None in rates:
+            return None
+        return min(1.0, sum(rates))
+    if not isinstance(condition, Condition):
+        return None
+    
+    domain = SINTOMAS.get(condition.field)
+    if condition.operator in ('==', 'in'):
+        values = condition.operand if condition.operator == 'in' else (condition.operand,)
+        if None in values:
+            return None
+        if not isinstance(domain, list):
+            return 0.5
+        # El valor por defecto del formulario es el más frecuente: un disparador
+        # que lo acepta apenas descarta reglas
+        default = 'no' if 'no' in domain else domain[0]
+        if default in values:
+            return 1.0
+        return len([v for v in domain if v in values]) / len(domain)
+    
+    if condition.operator in ('>=', '>'):
+        # El campo ausente vale 0: la condición debe fallar con 0
+        threshold = condition.operand
+        if not isinstance(threshold, (int, float)) or threshold < 0 or \
+                (threshold == 0 and condition.operator == '>='):
+            return None
+        low, high = domain if isinstance(domain, tuple) else (0, 10)
+        passing = [v for v in range(low, high + 1) if condition._test(v, threshold)]
+        return len(passing) / (high - low + 1)
+    
+    return None
+
+
+class RuleIndex:
+    """
+    Índice invertido de la tabla de reglas por condición disparadora
+    De cada regla se elige la condición más selectiva que solo se cumple con
+    un valor presente en los hechos: (campo, valor) para condiciones categóricas
+    y umbrales para escalas numéricas. Una regla solo se evalúa si su disparador
+    está presente; las reglas sin disparador se evalúan siempre.
+    El resultado es idéntico al de recorrer toda la tabla.
     """
-    results = []
-    rules = get_all_rules()
     
-    for rule_func in rules:
-        rule = rule_func(facts)
-        if rule.evaluate(facts):
-            results.append({
+    def __init__(self, rules):
+        self.rules = rules
+        self.triggers = []
+        self.by_value = defaultdict(list)  # (campo, valor) -> reglas
+        numeric = defaultdict(lambda: {'>=': [], '>': []})  # campo -> umbrales por operador
+        self.unindexed = []  # Reglas sin disparador
+        
+        for index, rule in enumerate(rules):
+            trigger = self._choose_trigger(rule)
+            self.triggers.append(trigger)
+            if trigger is None:
+                self.unindexed.append(index)
+                continue
+            alternatives = trigger.conditions if isinstance(trigger, AnyOf) else (trigger,)
+            for condition in alternatives:
+                if condition.operator in ('==', 'in'):
+                    values = condition.operand if condition.operator == 'in' else (condition.operand,)
+                    for value in values:
+                        self.by_value[(condition.field, value)].append(index)
+                else:
+                    numeric[condition.field][condition.operator].append((condition.operand, index))
+        
+        # Por campo numérico: umbrales ordenados y reglas en el mismo orden
+        self.numeric = {}
+        for field, by_operator in numeric.items():
+            ge = sorted(by_operator['>='])
+            gt = sorted(by_operator['>'])
+            self.numeric[field] = (
+                [t for t, _ in ge], [i for _, i in ge],
+                [t for t, _ in gt], [i for _, i in gt]
+            )
+        # Por campo categórico: valor -> reglas
+        by_field = defaultdict(dict)
+        for (field, value), indices in self.by_value.items():
+            by_field[field][value] = tuple(indices)
+        self.value_tables = tuple(by_field.items())
+        self.numeric_tables = tuple(self.numeric.items())
+        
+        self.conclusions = [
+            {
                 'diagnostico': rule.conclusion,
                 'confianza': rule.confidence,
                 'regla': rule.name,
                 'tipo': 'crisp'
-            })
+            }
+            for rule in rules
+        ]
+    
+    def _choose_trigger(self, rule):
+        """Condición de la regla con menor tasa de paso estimada (o None)"""
+        best = None
+        best_rate = None
+        for condition in rule.conditions:
+            rate = trigger_pass_rate(condition)
+            if rate is not None and (best_rate is None or rate < best_rate):
+                best, best_rate = condition, rate
+        return best
+    
+    def candidates(self, facts):
+        """Índices, en orden de la tabla, de las reglas cuyo disparador está presente"""
+        found = set(self.unindexed)
+        get = facts.get
+        for field, table in self.value_tables:
+            value = get(field)
+            if value is None:
+                continue
+            try:
+                indices = table.get(value)
+            except TypeError:
+                continue  # Valor no hashable: no puede ser igual a un operando
+            if indices:
+                found.update(indices)
+        for field, (ge_t, ge_rules, gt_t, gt_rules) in self.numeric_tables:
+            value = get(field, 0)
+            if value == 0:
+                continue  # Ausente o 0: ningún umbral disparador se cumple
+            if isinstance(value, (int, float)):
+                found.update(ge_rules[:bisect_right(ge_t, value)])
+                found.update(gt_rules[:bisect_left(gt_t, value)])
+            else:
+                # Valor no numérico: se evalúan las reglas para conservar su comportamiento
+                found.update(ge_rules)
+                found.update(gt_rules)
+        return sorted(found)
+    
+    def evaluate(self, facts):
+        """Evalúa solo las reglas candidatas; mismo resultado que recorrer la tabla"""
+        results = []
+        rules = self.rules
+        for index in self.candidates(facts):
+            if rules[index].evaluate(facts):
+                results.append(dict(self.conclusions[index]))
+        return results
+
+
+_RULE_INDEX = None
+
+
+def get_rule_index():
+    """Índice invertido de la tabla de reglas compilada (se reconstruye si la tabla cambia)"""
+    global _RULE_INDEX
+    if _RULE_INDEX is None or _RULE_INDEX.rules is not get_compiled_rules():
+        _RULE_INDEX = RuleIndex(get_compiled_rules())
+    return _RULE_INDEX
+
+
+# Evaluador crisp alternativo (None = índice invertido)
+_CRISP_EVALUATOR = None
+
+CRISP_EVALUATORS = ('indice', 'generado', 'tabla')
+
+
+def configure_crisp_evaluator(mode='indice', condition_order=None):
+    """
+    Elige cómo evalúa evaluate_crisp_rules la tabla de reglas
+    'indice': RuleIndex, solo las reglas cuyo disparador está presente
+    'generado': una función Python generada con toda la tabla (compilador_reglas)
+    'tabla': máscaras precalculadas por clase de equivalencia (tabla_decision)
+    Todos retornan exactamente los mismos diagnósticos
     
-    return results
+    condition_order: ruta de un orden de condiciones aprendido por
+    optimizador_reglas (p. ej. CONDITION_ORDER_PATH); None usa el orden escrito.
+    Con hechos válidos el orden no cambia los diagnósticos, pero con hechos
+    mal formados sí puede cambiar el error: una regla que antes se descartaba
+    en una condición que falla puede llegar a comparar, p. ej., un texto con
+    '>=' y lanzar TypeError (o al revés)
+    """
+    global _CRISP_EVALUATOR, _CONDITION_ORDER_PATH
+    if mode not in CRISP_EVALUATORS:
+        raise ValueError(f"Evaluador crisp desconocido: {mode}")
+    if condition_order != _CONDITION_ORDER_PATH:
+        _CONDITION_ORDER_PATH = condition_order
+        reset_compiled_rules()
+    if mode == 'generado':
+        from .compilador_reglas import evaluate_crisp_rules_generated
+        _CRISP_EVALUATOR = evaluate_crisp_rules_generated
+    elif mode == 'tabla':
+        from .tabla_decision import evaluate_crisp_rules_table
+        _CRISP_EVALUATOR = evaluate_crisp_rules_table
+    else:
+        _CRISP_EVALUATOR = None
+
+
+def evaluate_crisp_rules(facts):
+    """
+    Evalúa las reglas crisp y retorna los diagnósticos que aplican
+    Sistema con 60+ reglas específicas
+    Solo se evalúan las reglas cuyo disparador está presente en los hechos
+    (ver RuleIndex), salvo que configure_crisp_evaluator elija otro evaluador
+    """
+    if _RULE_STATISTICS is not None:
+        # Con estadísticas activas se usa siempre el índice, que recorre las
+        # condiciones de cada regla y permite contarlas
+        return _RULE_STATISTICS.evaluate_index(get_rule_index(), facts)
+    if _CRISP_EVALUATOR is not None:
+        return _CRISP_EVALUATOR(facts)
+    return get_rule_index().evaluate(facts)
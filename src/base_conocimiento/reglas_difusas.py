@@ -3,24 +3,177 @@ Base de conocimientos - Reglas Difusas (Fuzzy Logic)
 Implementa lógica difusa para casos con síntomas ambiguos
 """
 
+import hashlib
+import math
+import os
+import threading
+from time import perf_counter
+
 import numpy as np
-try:
-    import skfuzzy as fuzz
-    from skfuzzy import control as ctrl
-    FUZZY_AVAILABLE = True
-except ImportError:
-    FUZZY_AVAILABLE = False
-    print("Advertencia: scikit-fuzzy no está instalado. Lógica difusa limitada.")
+
+from ..utilidades.instrumentacion import get_profiler
+
+# scikit-fuzzy se importa en el primer uso (ver load_skfuzzy): importarlo
+# cuesta más que el resto de la base de conocimientos junta
+fuzz = None
+ctrl = None
+_skfuzzy_available = None
+_skfuzzy_lock = threading.Lock()
+
+
+def load_skfuzzy():
+    """
+    Importa scikit-fuzzy la primera vez que se necesita
+    Retorna True si está disponible
+    """
+    global fuzz, ctrl, _skfuzzy_available
+    if _skfuzzy_available is None:
+        with _skfuzzy_lock:
+            if _skfuzzy_available is None:
+                try:
+                    import skfuzzy
+                    from skfuzzy import control
+                    fuzz, ctrl = skfuzzy, control
+                    _skfuzzy_available = True
+                except ImportError:
+                    _skfuzzy_available = False
+    return _skfuzzy_available
+
+
+def __getattr__(name):
+    # FUZZY_AVAILABLE se calcula al consultarlo (importa scikit-fuzzy si hace falta)
+    if name == 'FUZZY_AVAILABLE':
+        return load_skfuzzy()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Motores de inferencia: 'numpy' (MamdaniInferenceSystem de logica_difusa,
+# vectorizado) o 'skfuzzy' (scikit-fuzzy, opcional); dan los mismos resultados
+FUZZY_BACKENDS = ('numpy', 'skfuzzy')
+DEFAULT_FUZZY_BACKEND = 'numpy'
+
+# Ruta por defecto de la superficie precalculada
+DEFAULT_SURFACE_PATH = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), '..', '..', 'data', 'superficie_difusa.npz'
+))
+
+# Por cada salida: simulación y nombres de sus entradas (intensidad, segunda entrada, duración)
+SIMULATION_INPUTS = {
+    'prob_caries': ('caries_sim', 'intensidad_dolor', 'sensibilidad', 'duracion_dias'),
+    'prob_pulpitis': ('pulpitis_sim', 'intensidad_dolor', 'sensibilidad', 'duracion_dias'),
+    'prob_infeccion': ('infeccion_sim', 'intensidad_dolor', 'inflamacion', 'duracion_dias'),
+    'prob_encias': ('encias_sim', 'intensidad_dolor', 'inflamacion', 'duracion_dias')
+}
+
+
+class FuzzySurface:
+    """
+    Superficie precalculada del sistema difuso
+    Para cada salida guarda una tabla densa indexada por
+    [intensidad (0-10), sensibilidad o inflamación (0-10), duración en días (0-7)]
+    con el valor exacto que produce la simulación (NaN si ninguna regla se activa)
+    """
+    
+    SHAPE = (11, 11, 8)
+    
+    def __init__(self, tables, fingerprint):
+        self.tables = tables
+        self.fingerprint = fingerprint
+    
+    @classmethod
+    def build(cls, system):
+        """Tabula todas las entradas enteras ejecutando las simulaciones una vez"""
+        if system.mamdani is not None:
+            # Motor NumPy: toda la rejilla de una vez
+            grid = np.indices(cls.SHAPE)
+            tables = {}
+            for output, (_, input_1, input_2, input_3) in SIMULATION_INPUTS.items():
+                tables[output] = system.mamdani.compute(
+                    {input_1: grid[0], input_2: grid[1], input_3: grid[2]}, [output]
+                )[output]
+            return cls(tables, system.fingerprint())
+        
+        tables = {}
+        for output in SIMULATION_INPUTS:
+            table = np.full(cls.SHAPE, np.nan)
+            for index in np.ndindex(*cls.SHAPE):
+                value = system._simulate(output, *index)
+                if value is not None:
+                    table[index] = value
+            tables[output] = table
+        return cls(tables, system.fingerprint())
+    
+    @classmethod
+    def load(cls, path):
+        """Carga una superficie guardada con save()"""
+        with np.load(path) as data:
+            tables = {output: data[output] for output in SIMULATION_INPUTS}
+            fingerprint = str(data['fingerprint'])
+        return cls(tables, fingerprint)
+    
+    def save(self, path):
+        """Guarda la superficie en disco (formato .npz de NumPy)"""
+        np.savez(path, fingerprint=np.array(self.fingerprint), **self.tables)
+    
+    def index(self, intensidad, segunda, duracion):
+        """
+        Convierte las entradas en un índice de la tabla
+        Retorna None si alguna entrada no es un entero dentro del rango tabulado
+        (los valores no finitos, como inf o nan, tampoco se tabulan)
+        """
+        index = []
+        for value, size in zip((intensidad, segunda, duracion), self.SHAPE):
+            if not math.isfinite(value) or value != int(value) or not 0 <= value < size:
+                return None
+            index.append(int(value))
+        return tuple(index)
+    
+    def lookup(self, output, index):
+        """Valor tabulado de una salida (float, como la simulación), o None si ninguna regla se activa"""
+        value = self.tables[output][index]
+        return None if np.isnan(value) else float(value)
 
 
 class FuzzyDiagnosisSystem:
-    """Sistema de diagnóstico basado en lógica difusa"""
+    """
+    Sistema de diagnóstico basado en lógica difusa
+    Puede usarse desde varios hilos a la vez: el motor NumPy solo comparte entre
+    llamadas su memoria de centroides, que los hilos pueden rellenar a la vez
+    (ver MamdaniInferenceSystem); scikit-fuzzy comparte estado entre todas las
+    simulaciones de un mismo sistema de control, así que con ese motor cada
+    hilo distinto del creador trabaja sobre su propia réplica de las variables,
+    reglas y simulaciones
+    """
     
-    def __init__(self):
-        if not FUZZY_AVAILABLE:
-            self.system = None
-            return
-            
+    def __init__(self, use_surface=False, surface_path=None, backend=DEFAULT_FUZZY_BACKEND):
+        """
+        use_surface: responder con la superficie precalculada en lugar de simular
+        surface_path: archivo .npz desde el que cargar la superficie; si no existe
+        o corresponde a otras definiciones, se recalcula y se guarda ahí
+        backend: 'numpy' o 'skfuzzy' (si scikit-fuzzy no está instalado se usa 'numpy')
+        """
+        if backend not in FUZZY_BACKENDS:
+            raise ValueError(f"Motor difuso desconocido: {backend}")
+        if backend == 'skfuzzy' and not load_skfuzzy():
+            print("Advertencia: scikit-fuzzy no está instalado. Se usa el motor NumPy.")
+            backend = 'numpy'
+        self.backend = backend
+        self.surface = None
+        self.mamdani = None
+        self._owner = threading.get_ident()
+        self._local = threading.local()
+        
+        if backend == 'numpy':
+            self.mamdani = create_mamdani_system()
+            self.system = True
+        else:
+            self._build_skfuzzy()
+        
+        if use_surface:
+            self.enable_surface(surface_path)
+    
+    def _build_skfuzzy(self):
+        """Variables, funciones de pertenencia, reglas y simulaciones de scikit-fuzzy"""
         # Definir variables de entrada (antecedentes)
         self.intensidad_dolor = ctrl.Antecedent(np.arange(0, 11, 1), 'intensidad_dolor')
         self.sensibilidad = ctrl.Antecedent(np.arange(0, 11, 1), 'sensibilidad')
@@ -35,7 +188,7 @@ class FuzzyDiagnosisSystem:
         
         self._define_membership_functions()
         self._define_rules()
-        
+    
     def _define_membership_functions(self):
         """Define funciones de pertenencia para variables difusas"""
         
@@ -149,191 +302,365 @@ class FuzzyDiagnosisSystem:
             print(f"Error al crear simulaciones fuzzy: {e}")
             self.system = None
     
-    def evaluate(self, facts):
+    def fingerprint(self):
+        """Huella de las funciones de pertenencia y reglas (identifica una superficie)"""
+        if self.mamdani is not None:
+            return self.mamdani.fingerprint()
+        digest = hashlib.sha256()
+        variables = [
+            self.intensidad_dolor, self.sensibilidad, self.inflamacion, self.duracion,
+            self.prob_caries, self.prob_pulpitis, self.prob_infeccion, self.prob_encias
+        ]
+        for variable in variables:
+            digest.update(variable.label.encode())
+            digest.update(np.asarray(variable.universe, dtype=float).tobytes())
+            for label, term in variable.terms.items():
+                digest.update(label.encode())
+                digest.update(np.asarray(term.mf, dtype=float).tobytes())
+        for control in [self.caries_ctrl, self.pulpitis_ctrl, self.infeccion_ctrl, self.encias_ctrl]:
+            for rule in control.rules:
+                digest.update(str(rule).encode())
+        return digest.hexdigest()
+    
+    def enable_surface(self, surface_path=None):
         """
-        Evalúa síntomas usando lógica difusa
-        facts: diccionario con síntomas del paciente
+        Activa el modo de superficie precalculada
+        Carga la superficie desde disco si coincide con las definiciones actuales;
+        si no, la calcula (y la guarda si se indicó una ruta)
         """
-        if not FUZZY_AVAILABLE or self.system is None:
-            return self._evaluate_simple(facts)
+        if self.system is None:
+            return
         
-        try:
-            # Extraer valores
-            intensidad = facts.get('intensidad_dolor', 0)
-            sensibilidad = max(
-                facts.get('sensibilidad_frio', 0),
-                facts.get('sensibilidad_calor', 0),
-                facts.get('sensibilidad_dulce', 0)
-            )
-            inflamacion = facts.get('inflamacion_encias', 0)
-            
-            # Convertir duración a días numéricos
-            duracion_map = {
-                'menos_24h': 0,
-                '1_3_dias': 2,
-                '3_7_dias': 5,
-                'mas_7_dias': 7
-            }
-            duracion = duracion_map.get(facts.get('duracion_dolor', 'menos_24h'), 0)
-            
-            results = []
-            
-            # Evaluar Caries
-            try:
-                self.caries_sim.input['intensidad_dolor'] = intensidad
-                self.caries_sim.input['sensibilidad'] = sensibilidad
-                self.caries_sim.input['duracion_dias'] = duracion
-                self.caries_sim.compute()
-                prob_caries = self.caries_sim.output['prob_caries']
-                if prob_caries > 30:
-                    results.append({
-                        'diagnostico': 'caries',
-                        'confianza': prob_caries / 100,
-                        'regla': 'Fuzzy Logic - Caries',
-                        'tipo': 'fuzzy'
-                    })
-            except Exception as e:
-                pass
-            
-            # Evaluar Pulpitis
+        fingerprint = self.fingerprint()
+        if surface_path and os.path.exists(surface_path):
             try:
-                self.pulpitis_sim.input['intensidad_dolor'] = intensidad
-                self.pulpitis_sim.input['sensibilidad'] = sensibilidad
-                self.pulpitis_sim.input['duracion_dias'] = duracion
-                self.pulpitis_sim.compute()
-                prob_pulpitis = self.pulpitis_sim.output['prob_pulpitis']
-                if prob_pulpitis > 30:
-                    results.append({
-                        'diagnostico': 'pulpitis',
-                        'confianza': prob_pulpitis / 100,
-                        'regla': 'Fuzzy Logic - Pulpitis',
-                        'tipo': 'fuzzy'
-                    })
+                surface = FuzzySurface.load(surface_path)
+                if surface.fingerprint == fingerprint:
+                    self.surface = surface
+                    return
             except Exception as e:
-                pass
-            
-            # Evaluar Infección
-            try:
-                self.infeccion_sim.input['intensidad_dolor'] = intensidad
-                self.infeccion_sim.input['inflamacion'] = inflamacion
-                self.infeccion_sim.input['duracion_dias'] = duracion
-                self.infeccion_sim.compute()
-                prob_infeccion = self.infeccion_sim.output['prob_infeccion']
-                if prob_infeccion > 30:
-                    results.append({
-                        'diagnostico': 'absceso',
-                        'confianza': prob_infeccion / 100,
-                        'regla': 'Fuzzy Logic - Infección',
-                        'tipo': 'fuzzy'
-                    })
-            except Exception as e:
-                pass
-            
-            # Evaluar Encías
+                print(f"Error al cargar la superficie difusa: {e}")
+        
+        self.surface = FuzzySurface.build(self)
+        if surface_path:
             try:
-                self.encias_sim.input['inflamacion'] = inflamacion
-                self.encias_sim.input['intensidad_dolor'] = intensidad
-                self.encias_sim.input['duracion_dias'] = duracion
-                self.encias_sim.compute()
-                prob_encias = self.encias_sim.output['prob_encias']
-                if prob_encias > 30:
-                    # Determinar si es gingivitis o periodontitis
-                    movilidad = facts.get('movilidad_dental', 'no')
-                    if movilidad in ['moderado', 'severo']:
-                        diag = 'periodontitis'
-                    else:
-                        diag = 'gingivitis'
-                    results.append({
-                        'diagnostico': diag,
-                        'confianza': prob_encias / 100,
-                        'regla': 'Fuzzy Logic - Encías',
-                        'tipo': 'fuzzy'
-                    })
+                self.surface.save(surface_path)
             except Exception as e:
-                pass
-            
-            return results
-            
+                print(f"Error al guardar la superficie difusa: {e}")
+    
+    def evaluate(self, facts):
+        """
+        Evalúa síntomas usando lógica difusa
+        facts: diccionario con síntomas del paciente
+        """
+        if self.system is None:
+            return []
+        
+        try:
+            return self.evaluate_inputs(*extract_fuzzy_inputs(facts))
         except Exception as e:
             print(f"Error en evaluación fuzzy: {e}")
-            return self._evaluate_simple(facts)
+            return []
     
-    def _evaluate_simple(self, facts):
+    def evaluate_inputs(self, intensidad, sensibilidad, inflamacion, duracion, movilidad_avanzada):
         """
-        Evaluación difusa simplificada sin scikit-fuzzy
-        Usa funciones de pertenencia básicas
+        Evalúa el sistema difuso sobre las entradas ya extraídas de los hechos
+        (ver extract_fuzzy_inputs)
         """
-        results = []
+        if self.system is None:
+            return []
         
-        intensidad = facts.get('intensidad_dolor', 0)
-        sensibilidad = max(
-            facts.get('sensibilidad_frio', 0),
-            facts.get('sensibilidad_calor', 0),
-            facts.get('sensibilidad_dulce', 0)
+        return self._results(
+            self._probability('prob_caries', intensidad, sensibilidad, duracion),
+            self._probability('prob_pulpitis', intensidad, sensibilidad, duracion),
+            self._probability('prob_infeccion', intensidad, inflamacion, duracion),
+            self._probability('prob_encias', intensidad, inflamacion, duracion),
+            movilidad_avanzada
         )
-        inflamacion = facts.get('inflamacion_encias', 0)
+    
+    def evaluate_inputs_batch(self, inputs):
+        """
+        Evalúa el sistema difuso sobre una matriz de entradas, una fila por paciente
+        (columnas: intensidad, sensibilidad, inflamacion, duracion, movilidad_avanzada)
+        Con el motor NumPy todas las filas se calculan a la vez
+        Retorna una lista de resultados por fila (iguales a los de evaluate_inputs)
+        """
+        rows = np.asarray(inputs, dtype=float).reshape(-1, 5)
+        if self.mamdani is None:
+            return [
+                self.evaluate_inputs(intensidad, sensibilidad, inflamacion, duracion, bool(movilidad))
+                for intensidad, sensibilidad, inflamacion, duracion, movilidad in rows.tolist()
+            ]
+        
+        columns = {
+            'intensidad_dolor': rows[:, 0],
+            'sensibilidad': rows[:, 1],
+            'inflamacion': rows[:, 2],
+            'duracion_dias': rows[:, 3]
+        }
+        outputs = self.mamdani.compute(columns)
+        # NaN (ninguna regla activa) -> None, como en _simulate
+        probabilities = zip(*(
+            [None if value != value else value for value in outputs[output].tolist()]
+            for output in SIMULATION_INPUTS
+        ))
+        return [
+            self._results(*row_probabilities, bool(movilidad))
+            for row_probabilities, movilidad in zip(probabilities, rows[:, 4].tolist())
+        ]
+    
+    def _results(self, prob_caries, prob_pulpitis, prob_infeccion, prob_encias, movilidad_avanzada):
+        """Diagnósticos a partir de las cuatro probabilidades (None si ninguna regla se activa)"""
+        results = []
         
-        # Caries: sensibilidad alta + dolor medio
-        if sensibilidad >= 5 and intensidad >= 3 and intensidad <= 7:
-            confianza = min(sensibilidad, intensidad) / 10
+        # Evaluar Caries
+        if prob_caries is not None and prob_caries > 30:
             results.append({
                 'diagnostico': 'caries',
-                'confianza': confianza,
-                'regla': 'Fuzzy Simple - Caries',
-                'tipo': 'fuzzy_simple'
+                'confianza': prob_caries / 100,
+                'regla': 'Fuzzy Logic - Caries',
+                'tipo': 'fuzzy'
             })
         
-        # Pulpitis: dolor alto + duración
-        if intensidad >= 7:
-            duracion = facts.get('duracion_dolor', 'menos_24h')
-            if duracion in ['3_7_dias', 'mas_7_dias']:
-                confianza = intensidad / 10
-                results.append({
-                    'diagnostico': 'pulpitis',
-                    'confianza': confianza,
-                    'regla': 'Fuzzy Simple - Pulpitis',
-                    'tipo': 'fuzzy_simple'
-                })
+        # Evaluar Pulpitis
+        if prob_pulpitis is not None and prob_pulpitis > 30:
+            results.append({
+                'diagnostico': 'pulpitis',
+                'confianza': prob_pulpitis / 100,
+                'regla': 'Fuzzy Logic - Pulpitis',
+                'tipo': 'fuzzy'
+            })
         
-        # Absceso: inflamación alta + dolor alto
-        if inflamacion >= 7 and intensidad >= 7:
-            confianza = min(inflamacion, intensidad) / 10
+        # Evaluar Infección
+        if prob_infeccion is not None and prob_infeccion > 30:
             results.append({
                 'diagnostico': 'absceso',
-                'confianza': confianza,
-                'regla': 'Fuzzy Simple - Infección',
-                'tipo': 'fuzzy_simple'
+                'confianza': prob_infeccion / 100,
+                'regla': 'Fuzzy Logic - Infección',
+                'tipo': 'fuzzy'
             })
         
-        # Problemas de encías: inflamación alta + dolor bajo
-        if inflamacion >= 5 and intensidad <= 5:
-            movilidad = facts.get('movilidad_dental', 'no')
-            if movilidad in ['moderado', 'severo']:
-                diag = 'periodontitis'
-            else:
-                diag = 'gingivitis'
-            confianza = inflamacion / 10
+        # Evaluar Encías
+        if prob_encias is not None and prob_encias > 30:
+            # Determinar si es gingivitis o periodontitis
+            diag = 'periodontitis' if movilidad_avanzada else 'gingivitis'
             results.append({
                 'diagnostico': diag,
-                'confianza': confianza,
-                'regla': 'Fuzzy Simple - Encías',
-                'tipo': 'fuzzy_simple'
+                'confianza': prob_encias / 100,
+                'regla': 'Fuzzy Logic - Encías',
+                'tipo': 'fuzzy'
             })
         
         return results
+    
+    def _probability(self, output, intensidad, segunda, duracion):
+        """
+        Calcula una salida del sistema difuso
+        Usa la superficie precalculada si está activa y las entradas son enteras;
+        si no, ejecuta la simulación. Retorna None si ninguna regla se activa
+        """
+        profiler = get_profiler()
+        if profiler is None:
+            return self._compute_probability(output, intensidad, segunda, duracion)
+        inicio = perf_counter()
+        value = self._compute_probability(output, intensidad, segunda, duracion)
+        profiler.record('fuzzy.' + output, perf_counter() - inicio)
+        return value
+    
+    def _compute_probability(self, output, intensidad, segunda, duracion):
+        """Superficie precalculada o simulación (ver _probability)"""
+        if self.surface is not None:
+            try:
+                index = self.surface.index(intensidad, segunda, duracion)
+            except (TypeError, ValueError):
+                index = None
+            if index is not None:
+                return self.surface.lookup(output, index)
+        return self._simulate(output, intensidad, segunda, duracion)
+    
+    def _simulations(self):
+        """
+        Retorna el sistema cuyas simulaciones puede usar el hilo actual
+        (este mismo en el hilo creador; una réplica propia en cualquier otro)
+        """
+        if threading.get_ident() == self._owner:
+            return self
+        replica = getattr(self._local, 'replica', None)
+        if replica is None:
+            replica = self.__class__(backend=self.backend)
+            self._local.replica = replica
+        return replica
+    
+    def _simulate(self, output, intensidad, segunda, duracion):
+        """Ejecuta la simulación de una salida; retorna None si falla o ninguna regla se activa"""
+        sim_name, input_1, input_2, input_3 = SIMULATION_INPUTS[output]
+        if self.mamdani is not None:
+            try:
+                value = float(self.mamdani.compute(
+                    {input_1: intensidad, input_2: segunda, input_3: duracion}, [output]
+                )[output])
+            except Exception as e:
+                return None
+            return None if np.isnan(value) else value
+        
+        sim = getattr(self._simulations(), sim_name)
+        try:
+            # scikit-fuzzy >= 0.5 no limpia la salida al reutilizar un cálculo en caché
+            # sin resultado; sin esto se devolvería la salida del paciente anterior
+            sim.output = {}
+            sim.input[input_1] = intensidad
+            sim.input[input_2] = segunda
+            sim.input[input_3] = duracion
+            sim.compute()
+            return sim.output[output]
+        except Exception as e:
+            return None
+
+
+# Conversión de la duración del dolor a días numéricos
+DURACION_DIAS = {
+    'menos_24h': 0,
+    '1_3_dias': 2,
+    '3_7_dias': 5,
+    'mas_7_dias': 7
+}
+
+
+def extract_fuzzy_inputs(facts):
+    """
+    Extrae de los hechos las entradas del sistema difuso
+    Retorna: (intensidad, sensibilidad, inflamacion, duracion_dias, movilidad_avanzada)
+    """
+    intensidad = facts.get('intensidad_dolor', 0)
+    sensibilidad = max(
+        facts.get('sensibilidad_frio', 0),
+        facts.get('sensibilidad_calor', 0),
+        facts.get('sensibilidad_dulce', 0)
+    )
+    inflamacion = facts.get('inflamacion_encias', 0)
+    duracion = DURACION_DIAS.get(facts.get('duracion_dolor', 'menos_24h'), 0)
+    movilidad_avanzada = facts.get('movilidad_dental', 'no') in ['moderado', 'severo']
+    return intensidad, sensibilidad, inflamacion, duracion, movilidad_avanzada
+
+
+def create_mamdani_system():
+    """
+    Mismas variables, funciones de pertenencia y reglas que el sistema de
+    scikit-fuzzy, sobre el motor Mamdani vectorizado de logica_difusa
+    """
+    # Importación diferida: el paquete motor_inferencia importa este módulo
+    from ..motor_inferencia.logica_difusa import (
+        FuzzyRule, FuzzyVariable, MamdaniInferenceSystem, TriangularMF
+    )
+    
+    system = MamdaniInferenceSystem()
+    
+    # Variables de entrada (antecedentes)
+    intensidad_dolor = FuzzyVariable('intensidad_dolor', (0, 10))
+    intensidad_dolor.add_fuzzy_set('bajo', TriangularMF(0, 0, 4))
+    intensidad_dolor.add_fuzzy_set('medio', TriangularMF(2, 5, 8))
+    intensidad_dolor.add_fuzzy_set('alto', TriangularMF(6, 10, 10))
+    
+    sensibilidad = FuzzyVariable('sensibilidad', (0, 10))
+    sensibilidad.add_fuzzy_set('baja', TriangularMF(0, 0, 4))
+    sensibilidad.add_fuzzy_set('media', TriangularMF(2, 5, 8))
+    sensibilidad.add_fuzzy_set('alta', TriangularMF(6, 10, 10))
+    
+    inflamacion = FuzzyVariable('inflamacion', (0, 10))
+    inflamacion.add_fuzzy_set('baja', TriangularMF(0, 0, 4))
+    inflamacion.add_fuzzy_set('media', TriangularMF(2, 5, 8))
+    inflamacion.add_fuzzy_set('alta', TriangularMF(6, 10, 10))
+    
+    duracion = FuzzyVariable('duracion_dias', (0, 7))
+    duracion.add_fuzzy_set('corta', TriangularMF(0, 0, 2))
+    duracion.add_fuzzy_set('media', TriangularMF(1, 3, 5))
+    duracion.add_fuzzy_set('larga', TriangularMF(4, 7, 7))
+    
+    for variable in [intensidad_dolor, sensibilidad, inflamacion, duracion]:
+        system.add_variable(variable)
+    
+    # Variables de salida: probabilidades (0-100%)
+    for name in SIMULATION_INPUTS:
+        prob = FuzzyVariable(name, (0, 100))
+        prob.add_fuzzy_set('baja', TriangularMF(0, 0, 40))
+        prob.add_fuzzy_set('media', TriangularMF(20, 50, 80))
+        prob.add_fuzzy_set('alta', TriangularMF(60, 100, 100))
+        system.add_output(prob)
+    
+    rules = [
+        # CARIES
+        ([('sensibilidad', 'alta'), ('intensidad_dolor', 'medio')], ('prob_caries', 'media')),
+        ([('sensibilidad', 'alta'), ('intensidad_dolor', 'alto'), ('duracion_dias', 'corta')],
+         ('prob_caries', 'alta')),
+        ([('sensibilidad', 'media'), ('intensidad_dolor', 'bajo')], ('prob_caries', 'baja')),
+        
+        # PULPITIS
+        ([('intensidad_dolor', 'alto'), ('duracion_dias', 'media')], ('prob_pulpitis', 'alta')),
+        ([('intensidad_dolor', 'alto'), ('duracion_dias', 'larga')], ('prob_pulpitis', 'alta')),
+        ([('intensidad_dolor', 'medio'), ('sensibilidad', 'alta'), ('duracion_dias', 'media')],
+         ('prob_pulpitis', 'media')),
+        
+        # INFECCIÓN (Absceso)
+        ([('intensidad_dolor', 'alto'), ('inflamacion', 'alta')], ('prob_infeccion', 'alta')),
+        ([('inflamacion', 'alta'), ('duracion_dias', 'larga')], ('prob_infeccion', 'alta')),
+        ([('intensidad_dolor', 'medio'), ('inflamacion', 'media')], ('prob_infeccion', 'media')),
+        
+        # PROBLEMAS DE ENCÍAS
+        ([('inflamacion', 'alta'), ('intensidad_dolor', 'bajo')], ('prob_encias', 'alta')),
+        ([('inflamacion', 'media'), ('duracion_dias', 'larga')], ('prob_encias', 'media')),
+        ([('inflamacion', 'alta'), ('duracion_dias', 'larga')], ('prob_encias', 'alta'))
+    ]
+    for antecedents, consequent in rules:
+        system.add_rule(FuzzyRule(
+            [(variable, fuzzy_set, 0) for variable, fuzzy_set in antecedents],
+            consequent,
+            'AND'
+        ))
+    
+    return system
 
 
 # Instancia global del sistema fuzzy
 _fuzzy_system = None
+_fuzzy_system_lock = threading.Lock()
 
 def get_fuzzy_system():
-    """Obtiene la instancia del sistema fuzzy (singleton)"""
+    """Obtiene la instancia del sistema fuzzy (singleton, seguro entre hilos)"""
     global _fuzzy_system
     if _fuzzy_system is None:
-        _fuzzy_system = FuzzyDiagnosisSystem()
+        with _fuzzy_system_lock:
+            if _fuzzy_system is None:
+                _fuzzy_system = FuzzyDiagnosisSystem()
+    return _fuzzy_system
+
+
+def configure_fuzzy_system(use_surface=False, surface_path=DEFAULT_SURFACE_PATH,
+                           backend=DEFAULT_FUZZY_BACKEND):
+    """
+    Reemplaza la instancia global del sistema fuzzy
+    use_surface=True activa la superficie precalculada (cargada desde surface_path
+    o calculada y guardada ahí la primera vez)
+    backend: motor de inferencia, 'numpy' o 'skfuzzy'
+    """
+    global _fuzzy_system
+    with _fuzzy_system_lock:
+        _fuzzy_system = FuzzyDiagnosisSystem(
+            use_surface=use_surface, surface_path=surface_path, backend=backend
+        )
     return _fuzzy_system
 
 
+def ensure_fuzzy_surface(surface_path=DEFAULT_SURFACE_PATH):
+    """
+    Activa la superficie precalculada en el sistema fuzzy global si aún no la usa
+    Si ya la usa no se reemplaza, así no se invalidan las cachés de diagnósticos
+    """
+    system = get_fuzzy_system()
+    if system.surface is None:
+        system = configure_fuzzy_system(use_surface=True, surface_path=surface_path)
+    return system
+
+
 def evaluate_fuzzy_rules(facts):
     """
     Evalúa reglas difusas y retorna diagnósticos
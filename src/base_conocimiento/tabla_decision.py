@@ -0,0 +1,399 @@
+"""
+Tabla de decisión precalculada de las reglas crisp
+Las reglas solo comparan cada campo con un conjunto finito de umbrales y
+valores, así que los valores de un campo se agrupan en clases de equivalencia:
+dos valores son equivalentes si todas las condiciones que leen el campo dan el
+mismo resultado con ambos. Para cada campo (o grupo de campos que comparten
+una disyunción AnyOf) se precalcula, por clase, la máscara de bits de las
+reglas que siguen siendo posibles; las reglas que se cumplen para unos hechos
+son el AND de una máscara por grupo: O(número de campos) por diagnóstico.
+
+Los valores que no pueden clasificarse (tipos inesperados) se evalúan con
+evaluate_crisp_rules, así que el resultado es siempre idéntico.
+
+Uso:
+    python -m src.base_conocimiento.tabla_decision
+    python -m src.base_conocimiento.tabla_decision --salida tabla.json
+"""
+
+import argparse
+import json
+from bisect import bisect_left
+from itertools import product
+
+from .hechos import SINTOMAS
+from .reglas_crisp import (
+    AnyOf,
+    NUMERIC_OPERATORS,
+    get_compiled_rules,
+    get_rule_index,
+    is_declarative
+)
+
+
+class _Absent:
+    """Marcador del campo ausente en las tablas (distinto de cualquier valor)"""
+    
+    def __repr__(self):
+        return '<ausente>'
+
+
+class _Other:
+    """Valor que no coincide con ningún operando (representa al resto de valores)"""
+    
+    def __repr__(self):
+        return '<otro>'
+
+
+ABSENT = _Absent()
+
+# Número máximo de conjuntos de reglas disparadas que se memorizan
+FIRED_CACHE_SIZE = 4096
+
+
+def leaf_conditions(condition):
+    """Condiciones elementales de una condición (las alternativas de una AnyOf)"""
+    if isinstance(condition, AnyOf):
+        leaves = []
+        for sub in condition.conditions:
+            leaves.extend(leaf_conditions(sub))
+        return leaves
+    return [condition]
+
+
+class FieldPartition:
+    """
+    Clases de equivalencia de los valores de un campo
+    Cada clase es la firma (resultado de cada condición que lee el campo);
+    representatives guarda un valor de cada clase (ABSENT para el campo ausente)
+    """
+    
+    def __init__(self, field, conditions):
+        self.field = field
+        self.conditions = conditions
+        self.numeric = all(c.operator in NUMERIC_OPERATORS for c in conditions)
+        self.breakpoints = sorted({
+            c.operand for c in conditions
+            if c.operator in NUMERIC_OPERATORS and isinstance(c.operand, (int, float))
+        })
+        
+        self.classes = {}  # firma -> clase
+        self.representatives = []
+        self.values = {}  # valor conocido -> clase (camino rápido)
+        for value in self._candidate_values():
+            signature = self.signature(value)
+            if signature is None:
+                continue
+            if signature not in self.classes:
+                self.classes[signature] = len(self.representatives)
+                self.representatives.append(value)
+            try:
+                self.values[value] = self.classes[signature]
+            except TypeError:
+                pass
+        
+        # Campo solo numérico: clase por región entre umbrales (bisect)
+        self.regions = None
+        if self.numeric:
+            self.regions = [self.classes[self.signature(v)] for v in self._region_values()]
+    
+    def _region_values(self):
+        """Un valor de cada región: antes del primer umbral, cada umbral y entre umbrales"""
+        points = self.breakpoints
+        if not points:
+            return [0]
+        values = [points[0] - 1]
+        for i, point in enumerate(points):
+            values.append(point)
+            following = points[i + 1] if i + 1 < len(points) else point + 2
+            values.append((point + following) / 2)
+        return values
+    
+    def _candidate_values(self):
+        """Valores que cubren todas las clases del campo"""
+        values = [ABSENT]
+        if self.numeric:
+            values.extend(self._region_values())
+        for condition in self.conditions:
+            if condition.operator == 'in':
+                values.extend(condition.operand)
+            elif condition.operator not in NUMERIC_OPERATORS:
+                values.append(condition.operand)
+        domain = SINTOMAS.get(self.field)
+        if isinstance(domain, tuple):
+            values.extend(range(domain[0], domain[1] + 1))
+        elif domain:
+            values.extend(domain)
+        if not self.numeric:
+            values.append(_Other())  # Cualquier valor que no coincide con ningún operando
+        return values
+    
+    def signature(self, value):
+        """Resultados de las condiciones del campo para un valor (None si alguna falla)"""
+        try:
+            if value is ABSENT:
+                return tuple(bool(c({})) for c in self.conditions)
+            facts = {self.field: value}
+            return tuple(bool(c(facts)) for c in self.conditions)
+        except Exception:
+            return None
+    
+    def classify(self, value):
+        """Clase de un valor sin entrada en la tabla rápida (None si no puede clasificarse)"""
+        if self.regions is not None and type(value) in (int, float) and value == value:
+            position = bisect_left(self.breakpoints, value)
+            exact = position < len(self.breakpoints) and self.breakpoints[position] == value
+            return self.regions[2 * position + (1 if exact else 0)]
+        return self.classes.get(self.signature(value))
+
+
+class DecisionTable:
+    """
+    Tabla de decisión de una tabla de reglas
+    groups: por grupo de campos, (campos, máscaras por combinación de clases)
+    Las reglas con condiciones opacas se evalúan aparte con Rule.evaluate
+    """
+    
+    def __init__(self, rules):
+        self.rules = rules
+        self.opaque = [i for i, rule in enumerate(rules)
+                       if not all(is_declarative(c) for c in rule.conditions)]
+        self.all_rules = (1 << len(rules)) - 1
+        for index in self.opaque:
+            self.all_rules &= ~(1 << index)
+        
+        # Condiciones de nivel superior (átomos) de las reglas declarativas
+        atoms = [
+            (index, condition)
+            for index, rule in enumerate(rules) if index not in self.opaque
+            for condition in rule.conditions
+        ]
+        
+        # Los campos que aparecen en una misma AnyOf forman un grupo
+        parent = {}
+        
+        def find(field):
+            while parent.setdefault(field, field) != field:
+                field = parent[field]
+            return field
+        
+        for _, condition in atoms:
+            fields = sorted(condition.fields)
+            for field in fields[1:]:
+                parent[find(field)] = find(fields[0])
+            find(fields[0])
+        
+        group_fields = {}
+        for field in sorted(parent):
+            group_fields.setdefault(find(field), []).append(field)
+        
+        leaves_by_field = {}
+        for _, condition in atoms:
+            for leaf in leaf_conditions(condition):
+                conditions = leaves_by_field.setdefault(leaf.field, [])
+                if leaf not in conditions:
+                    conditions.append(leaf)
+        self.partitions = {
+            field: FieldPartition(field, conditions)
+            for field, conditions in leaves_by_field.items()
+        }
+        
+        self.groups = []
+        for fields in group_fields.values():
+            group_atoms = [(i, c) for i, c in atoms if c.fields <= set(fields)]
+            self.groups.append(self._build_group(fields, group_atoms))
+        self.groups = tuple(self.groups)
+        
+        # Grupos de un solo campo: valor -> máscara directamente (camino rápido)
+        self.single = tuple(
+            (lookups[0][0], lookups[0][1],
+             {value: masks[cls] for value, cls in lookups[0][1].values.items()}, masks)
+            for lookups, masks in self.groups if len(lookups) == 1
+        )
+        self.multi = tuple(group for group in self.groups if len(group[0]) > 1)
+        
+        self.conclusions = [
+            {
+                'diagnostico': rule.conclusion,
+                'confianza': rule.confidence,
+                'regla': rule.name,
+                'tipo': 'crisp'
+            }
+            for rule in rules
+        ]
+        self._fired = {}
+    
+    def _build_group(self, fields, atoms):
+        """
+        Máscaras de un grupo de campos, una por combinación de clases
+        Cada campo de la tabla rápida guarda su clase ya multiplicada por el
+        paso del grupo: la posición de la máscara es la suma de las entradas
+        """
+        partitions = [self.partitions[field] for field in fields]
+        strides = []
+        stride = 1
+        for partition in reversed(partitions):
+            strides.append(stride)
+            stride *= len(partition.representatives)
+        strides.reverse()
+        
+        masks = []
+        for classes in product(*(range(len(p.representatives)) for p in partitions)):
+            facts = {}
+            for partition, cls in zip(partitions, classes):
+                value = partition.representatives[cls]
+                if value is not ABSENT:
+                    facts[partition.field] = value
+            mask = self.all_rules
+            for index, condition in atoms:
+                if not condition(facts):
+                    mask &= ~(1 << index)
+            masks.append(mask)
+        
+        lookups = tuple(
+            (partition.field, partition, step,
+             {value: cls * step for value, cls in partition.values.items()})
+            for partition, step in zip(partitions, strides)
+        )
+        return lookups, tuple(masks)
+    
+    @property
+    def size(self):
+        """Número total de máscaras precalculadas"""
+        return sum(len(masks) for _, masks in self.groups)
+    
+    def equivalence_classes(self):
+        """Número de clases de equivalencia de todo el espacio de entradas"""
+        total = 1
+        for partition in self.partitions.values():
+            total *= len(partition.representatives)
+        return total
+    
+    def mask(self, facts):
+        """
+        Máscara de bits de las reglas declarativas que se cumplen
+        Retorna None si algún valor no puede clasificarse
+        """
+        mask = self.all_rules
+        get = facts.get
+        try:
+            for field, partition, table, masks in self.single:
+                value = get(field, ABSENT)
+                group_mask = table.get(value)
+                if group_mask is None:
+                    cls = partition.classify(value)
+                    if cls is None:
+                        return None
+                    group_mask = masks[cls]
+                mask &= group_mask
+            for lookups, masks in self.multi:
+                position = 0
+                for field, partition, step, table in lookups:
+                    value = get(field, ABSENT)
+                    offset = table.get(value)
+                    if offset is None:
+                        cls = partition.classify(value)
+                        if cls is None:
+                            return None
+                        offset = cls * step
+                    position += offset
+                mask &= masks[position]
+        except TypeError:
+            return None  # Valor no hashable
+        return mask
+    
+    def fired(self, facts):
+        """Índices, en orden de la tabla, de las reglas que se cumplen"""
+        mask = self.mask(facts)
+        if mask is None:
+            return [i for i in get_rule_index().candidates(facts) if self.rules[i].evaluate(facts)]
+        
+        indices = self._fired.get(mask)
+        if indices is None:
+            indices = []
+            remaining = mask
+            while remaining:
+                low = remaining & -remaining
+                indices.append(low.bit_length() - 1)
+                remaining ^= low
+            indices = tuple(indices)
+            if len(self._fired) < FIRED_CACHE_SIZE:
+                self._fired[mask] = indices
+        
+        if self.opaque:
+            extra = [i for i in self.opaque if self.rules[i].evaluate(facts)]
+            return sorted(indices + tuple(extra))
+        return list(indices)
+    
+    def evaluate(self, facts):
+        """Mismo resultado que evaluate_crisp_rules"""
+        conclusions = self.conclusions
+        return [dict(conclusions[index]) for index in self.fired(facts)]
+    
+    def describe(self):
+        """Resumen de la tabla: umbrales, clases por campo y tamaño"""
+        return {
+            'reglas': len(self.rules),
+            'reglas_opacas': len(self.opaque),
+            'campos': {
+                field: {
+                    'umbrales': partition.breakpoints,
+                    'clases': len(partition.representatives),
+                    'representantes': [repr(v) for v in partition.representatives]
+                }
+                for field, partition in sorted(self.partitions.items())
+            },
+            'grupos': [[field for field, _, _, _ in lookups] for lookups, _ in self.groups],
+            'mascaras': self.size,
+            'clases_equivalencia': self.equivalence_classes()
+        }
+
+
+_DECISION_TABLE = None
+
+
+def get_decision_table():
+    """Tabla de decisión de la tabla compilada (se reconstruye si la tabla cambia)"""
+    global _DECISION_TABLE
+    if _DECISION_TABLE is None or _DECISION_TABLE.rules is not get_compiled_rules():
+        _DECISION_TABLE = DecisionTable(get_compiled_rules())
+    return _DECISION_TABLE
+
+
+def evaluate_crisp_rules_table(facts):
+    """Evalúa las reglas crisp con la tabla de decisión (mismo contrato que evaluate_crisp_rules)"""
+    return get_decision_table().evaluate(facts)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Tabla de decisión precalculada de las reglas crisp",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--salida', default=None, help='Archivo JSON con la tabla completa')
+    args = parser.parse_args()
+    
+    table = get_decision_table()
+    summary = table.describe()
+    for field, info in summary['campos'].items():
+        print(f"{field:24} {info['clases']:3} clases  umbrales={info['umbrales']}")
+    print(f"{len(summary['campos'])} campos, {len(summary['grupos'])} grupos, "
+          f"{summary['mascaras']} máscaras precalculadas, "
+          f"{summary['clases_equivalencia']:.3e} clases de equivalencia")
+    
+    if args.salida:
+        summary['tablas'] = [
+            {
+                'campos': [field for field, _, _, _ in lookups],
+                'mascaras': [format(mask, f'0{len(table.rules)}b') for mask in masks]
+            }
+            for lookups, masks in table.groups
+        ]
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"Tabla guardada en {args.salida}")
+
+
+if __name__ == '__main__':
+    main()
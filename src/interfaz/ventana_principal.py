@@ -15,7 +15,6 @@ from src.interfaz.panel_sintomas import PanelSintomas
 from src.interfaz.panel_resultados import PanelResultados
 from src.motor_inferencia import MotorDiagnostico
 from src.utilidades.registro import Registro
-from src.utilidades.generador_reportes import GeneradorReportes
 
 
 class VentanaPrincipal:
@@ -32,7 +31,7 @@ class VentanaPrincipal:
         # Inicializar componentes
         self.motor_diagnostico = MotorDiagnostico()
         self.registro = Registro()
-        self.generador_reportes = GeneradorReportes()
+        self.generador_reportes = None  # Se crea al exportar el primer PDF (carga reportlab)
         
         # Variables
         self.current_diagnosis = None
@@ -379,6 +378,13 @@ class VentanaPrincipal:
         self.clear_form()
         self.patient_name.set("Paciente")
     
+    def get_generador_reportes(self):
+        """Crea el generador de reportes en el primer uso"""
+        if self.generador_reportes is None:
+            from src.utilidades.generador_reportes import GeneradorReportes
+            self.generador_reportes = GeneradorReportes()
+        return self.generador_reportes
+    
     def save_pdf_report(self):
         """Guarda un reporte PDF del diagnóstico"""
         if not self.current_diagnosis or self.current_diagnosis['num_diagnosticos'] == 0:
@@ -409,7 +415,7 @@ class VentanaPrincipal:
                 }
                 
                 # Generar reporte
-                self.generador_reportes.generate_report(
+                self.get_generador_reportes().generate_report(
                     patient_name=self.patient_name.get(),
                     symptoms=symptoms,
                     diagnosis=self.current_diagnosis,
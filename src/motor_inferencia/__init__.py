@@ -1,35 +1,82 @@
 """
 Módulo de inicialización del motor de inferencia
+PersistentDiagnosisCache (sqlite3) e InferencePool (multiprocessing) se
+importan en el primer acceso
 """
 
+import importlib
+
 from .encadenamiento_adelante import (
     ForwardChainingEngine,
     ConflictResolution,
     apply_conflict_resolution
 )
 
+from .rete import ReteEngine, ReteNetwork
+
 from .logica_difusa import (
     FuzzySet,
     TriangularMF,
     TrapezoidalMF,
+    GaussianMF,
+    SigmoidMF,
     FuzzyVariable,
     FuzzyRule,
     FuzzyInferenceSystem,
+    MamdaniInferenceSystem,
     create_fuzzy_diagnosis_system
 )
 
+from .diagnostico_lotes import (
+    SymptomBatch,
+    BatchRuleEvaluator,
+    encode_batch
+)
+
+from .cache import DiagnosisCache, canonical_key, rule_base_fingerprint
+
+from .resultado import DiagnosisResult
 from .diagnostico import MotorDiagnostico
 
 __all__ = [
     'ForwardChainingEngine',
     'ConflictResolution',
     'apply_conflict_resolution',
+    'ReteEngine',
+    'ReteNetwork',
     'FuzzySet',
     'TriangularMF',
     'TrapezoidalMF',
+    'GaussianMF',
+    'SigmoidMF',
     'FuzzyVariable',
     'FuzzyRule',
     'FuzzyInferenceSystem',
+    'MamdaniInferenceSystem',
     'create_fuzzy_diagnosis_system',
-    'MotorDiagnostico'
+    'SymptomBatch',
+    'BatchRuleEvaluator',
+    'encode_batch',
+    'DiagnosisCache',
+    'canonical_key',
+    'rule_base_fingerprint',
+    'PersistentDiagnosisCache',
+    'DiagnosisResult',
+    'MotorDiagnostico',
+    'InferencePool'
 ]
+
+# Nombre -> módulo que lo define, para los que se importan en el primer acceso
+_LAZY_IMPORTS = {
+    'PersistentDiagnosisCache': '.cache_persistente',
+    'InferencePool': '.pool_inferencia'
+}
+
+
+def __getattr__(name):
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
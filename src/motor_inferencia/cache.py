@@ -0,0 +1,168 @@
+"""
+Caché de diagnósticos en memoria
+Memoriza el resultado de MotorDiagnostico.diagnose() por perfil de síntomas:
+el espacio de síntomas es pequeño y el tráfico real se concentra en pocos perfiles
+"""
+
+import hashlib
+import importlib
+import threading
+from collections import OrderedDict
+
+from ..base_conocimiento.reglas_crisp import Condition, AnyOf, get_compiled_rules
+from ..base_conocimiento.reglas_difusas import get_fuzzy_system
+
+
+def canonical_value(value):
+    """
+    Normaliza un valor de síntoma para la clave de caché
+    5 y 5.0 dan la misma clave (se evalúan igual); True no se confunde con 1
+    """
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return ('bool', value)
+    if isinstance(value, (int, float)):
+        return float(value)
+    return ('repr', repr(value))
+
+
+def canonical_key(facts, use_fuzzy=True, strategy='combine'):
+    """Clave hashable e independiente del orden de los síntomas"""
+    items = tuple(sorted((field, canonical_value(value)) for field, value in facts.items()))
+    return (items, bool(use_fuzzy), strategy)
+
+
+def copy_result(value):
+    """Copia profunda de un resultado (diccionarios, listas y valores inmutables)"""
+    if isinstance(value, dict):
+        return {k: copy_result(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [copy_result(v) for v in value]
+    return value
+
+
+class DiagnosisCache:
+    """
+    Caché LRU de resultados de diagnóstico, segura entre hilos
+    - Tamaño acotado: al superar max_entries se descarta la entrada menos usada
+    - Se vacía sola si cambia la tabla de reglas o se reemplaza el sistema fuzzy
+    - Guarda y retorna copias: quien recibe un resultado puede modificarlo
+    """
+    
+    def __init__(self, max_entries=4096):
+        if max_entries <= 0:
+            raise ValueError("max_entries debe ser positivo")
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._rules = None
+        self._fuzzy = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    def _check_version(self):
+        """Vacía la caché si la base de reglas cambió desde la última consulta"""
+        rules = get_compiled_rules()
+        fuzzy = get_fuzzy_system()
+        if self._rules is not None and (rules is not self._rules or fuzzy is not self._fuzzy):
+            self._entries.clear()
+            self.invalidations += 1
+        self._rules = rules
+        self._fuzzy = fuzzy
+    
+    def get(self, key):
+        """Retorna una copia del resultado memorizado, o None"""
+        with self._lock:
+            self._check_version()
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy_result(result)
+    
+    def put(self, key, result):
+        """Memoriza una copia del resultado"""
+        result = copy_result(result)
+        with self._lock:
+            self._check_version()
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def stats(self):
+        """Contadores de uso de la caché"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entradas': len(self._entries),
+                'max_entradas': self.max_entries,
+                'aciertos': self.hits,
+                'fallos': self.misses,
+                'desalojos': self.evictions,
+                'invalidaciones': self.invalidations,
+                'tasa_aciertos': round(self.hits / total, 4) if total else 0.0
+            }
+
+
+# Módulos cuyo código determina el resultado de diagnose()
+# (relativos a este paquete: no dependen del nombre con que se importe el proyecto)
+_FINGERPRINT_MODULES = (
+    '..base_conocimiento.hechos',
+    '..base_conocimiento.reglas_crisp',
+    '..base_conocimiento.reglas_difusas',
+    '.logica_difusa',
+    '.encadenamiento_adelante',
+    '.diagnostico'
+)
+
+
+def _condition_signature(condition):
+    """Descripción estable de una condición (declarativa o función opaca)"""
+    if isinstance(condition, (Condition, AnyOf)):
+        return repr(condition)
+    code = getattr(condition, '__code__', None)
+    if code is None:
+        return repr(condition)
+    return f"{getattr(condition, '__qualname__', '')}:{code.co_code.hex()}:{code.co_consts!r}"
+
+
+def rule_base_fingerprint(rules=None):
+    """
+    Huella de la versión de la base de conocimientos
+    Combina el contenido de la tabla de reglas, el código de los módulos que
+    producen el resultado y la versión de scikit-fuzzy: si cualquiera cambia,
+    los resultados guardados con otra huella dejan de usarse
+    """
+    digest = hashlib.sha256()
+    for rule in rules if rules is not None else get_compiled_rules():
+        digest.update(repr((rule.name, rule.conclusion, rule.confidence)).encode())
+        for condition in rule.conditions:
+            digest.update(_condition_signature(condition).encode())
+    
+    for name in _FINGERPRINT_MODULES:
+        path = getattr(importlib.import_module(name, __package__), '__file__', None)
+        if path:
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    
+    # importlib.metadata es caro de importar y solo se necesita aquí
+    from importlib import metadata
+    try:
+        digest.update(metadata.version('scikit-fuzzy').encode())
+    except metadata.PackageNotFoundError:
+        digest.update(b'sin-skfuzzy')
+    return digest.hexdigest()
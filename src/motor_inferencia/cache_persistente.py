@@ -0,0 +1,200 @@
+"""
+Caché persistente de diagnósticos (SQLite)
+Guarda los resultados de diagnose() en disco para que procesos recién
+arrancados sirvan los perfiles frecuentes sin volver a evaluar las reglas.
+Varios procesos pueden leer y escribir a la vez (modo WAL de SQLite).
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from ..base_conocimiento.reglas_crisp import get_compiled_rules
+from .cache import rule_base_fingerprint
+
+
+DEFAULT_CACHE_PATH = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), '..', '..', 'data', 'cache_diagnosticos.db'
+))
+
+# Un acierto solo actualiza la fecha de último uso si es más antigua que esto
+# (evita una escritura por cada lectura)
+TOUCH_INTERVAL = 60.0
+
+# Cada cuántas inserciones (como máximo) se comprueba el límite de tamaño
+EVICTION_INTERVAL = 256
+
+
+class PersistentDiagnosisCache:
+    """
+    Caché de diagnósticos en una base SQLite compartida entre procesos
+    Misma interfaz que DiagnosisCache (get/put/stats), así que puede pasarse
+    como MotorDiagnostico(cache=...)
+    
+    - Clave: hash SHA-256 de la codificación canónica de los hechos y de la
+      huella de la base de conocimientos (rule_base_fingerprint)
+    - Tamaño acotado: al superar max_entries se eliminan las entradas usadas
+      hace más tiempo (se comprueba periódicamente; el exceso no pasa del 10%)
+    - Cada hilo usa su propia conexión, abierta en su primer acceso; un
+      proceso hijo creado con fork abre las suyas en lugar de reutilizar
+      las del padre (SQLite no admite compartirlas entre procesos)
+    """
+    
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=100000, timeout=30.0):
+        if max_entries <= 0:
+            raise ValueError("max_entries debe ser positivo")
+        self.path = path
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._rules = None
+        self._fingerprint = None
+        self._puts = 0
+        self._eviction_interval = max(1, min(EVICTION_INTERVAL, max_entries // 10))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.errors = 0
+        
+        directory = os.path.dirname(os.path.abspath(path))
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+    
+    def _connection(self):
+        """Conexión del hilo y proceso actuales (se crea y configura en el primer uso)"""
+        pid = os.getpid()
+        if getattr(self._local, 'pid', None) != pid:
+            # Hilo nuevo o proceso hijo: la conexión heredada (si la hay) no se toca
+            self._local.connection = None
+            self._local.pid = pid
+        connection = self._local.connection
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute('''
+                CREATE TABLE IF NOT EXISTS diagnosticos (
+                    clave TEXT PRIMARY KEY,
+                    huella TEXT NOT NULL,
+                    resultado TEXT NOT NULL,
+                    ultimo_uso REAL NOT NULL
+                )
+            ''')
+            connection.execute(
+                'CREATE INDEX IF NOT EXISTS idx_diagnosticos_uso ON diagnosticos (ultimo_uso)'
+            )
+            self._local.connection = connection
+        return connection
+    
+    def fingerprint(self):
+        """Huella actual; se recalcula si se reemplaza la tabla de reglas compilada"""
+        rules = get_compiled_rules()
+        if rules is not self._rules:
+            self._fingerprint = rule_base_fingerprint(rules)
+            self._rules = rules
+        return self._fingerprint
+    
+    def _hash(self, key):
+        return hashlib.sha256(f"{self.fingerprint()}|{key!r}".encode('utf-8')).hexdigest()
+    
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+    
+    def get(self, key):
+        """Retorna el resultado guardado (objeto nuevo en cada llamada), o None"""
+        clave = self._hash(key)
+        try:
+            connection = self._connection()
+            row = connection.execute(
+                'SELECT resultado, ultimo_uso FROM diagnosticos WHERE clave = ?', (clave,)
+            ).fetchone()
+            if row is None:
+                self._count('misses')
+                return None
+            now = time.time()
+            if now - row[1] > TOUCH_INTERVAL:
+                connection.execute(
+                    'UPDATE diagnosticos SET ultimo_uso = ? WHERE clave = ?', (now, clave)
+                )
+        except sqlite3.Error as e:
+            print(f"Error al leer la caché persistente: {e}")
+            self._count('errors')
+            return None
+        self._count('hits')
+        return json.loads(row[0])
+    
+    def put(self, key, result):
+        """Guarda un resultado (serializado como JSON)"""
+        try:
+            self._connection().execute(
+                'INSERT OR REPLACE INTO diagnosticos (clave, huella, resultado, ultimo_uso) '
+                'VALUES (?, ?, ?, ?)',
+                (self._hash(key), self.fingerprint(), json.dumps(result, ensure_ascii=False), time.time())
+            )
+        except sqlite3.Error as e:
+            print(f"Error al escribir en la caché persistente: {e}")
+            self._count('errors')
+            return
+        
+        with self._lock:
+            self._puts += 1
+            check = self._puts % self._eviction_interval == 0
+        if check:
+            self.evict()
+    
+    def evict(self):
+        """Elimina las entradas usadas hace más tiempo hasta respetar max_entries"""
+        try:
+            connection = self._connection()
+            total = connection.execute('SELECT COUNT(*) FROM diagnosticos').fetchone()[0]
+            excess = total - self.max_entries
+            if excess > 0:
+                connection.execute(
+                    'DELETE FROM diagnosticos WHERE clave IN '
+                    '(SELECT clave FROM diagnosticos ORDER BY ultimo_uso LIMIT ?)', (excess,)
+                )
+                with self._lock:
+                    self.evictions += excess
+        except sqlite3.Error as e:
+            print(f"Error al acotar la caché persistente: {e}")
+            self._count('errors')
+    
+    def purge_stale(self):
+        """Elimina las entradas guardadas con otra versión de la base de conocimientos"""
+        cursor = self._connection().execute(
+            'DELETE FROM diagnosticos WHERE huella != ?', (self.fingerprint(),)
+        )
+        return cursor.rowcount
+    
+    def clear(self):
+        self._connection().execute('DELETE FROM diagnosticos')
+    
+    def __len__(self):
+        return self._connection().execute('SELECT COUNT(*) FROM diagnosticos').fetchone()[0]
+    
+    def close(self):
+        """Cierra la conexión del hilo actual (si la abrió este proceso)"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None and self._local.pid == os.getpid():
+            connection.close()
+            self._local.connection = None
+    
+    def stats(self):
+        """Contadores de uso de este proceso y tamaño actual de la caché"""
+        with self._lock:
+            hits, misses = self.hits, self.misses
+            stats = {
+                'entradas': len(self),
+                'max_entradas': self.max_entries,
+                'aciertos': hits,
+                'fallos': misses,
+                'desalojos': self.evictions,
+                'errores': self.errors,
+                'tasa_aciertos': round(hits / (hits + misses), 4) if hits + misses else 0.0
+            }
+        return stats
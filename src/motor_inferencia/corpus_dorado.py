@@ -0,0 +1,525 @@
+"""
+Corpus dorado de regresión y verificación diferencial de motores
+Genera un conjunto grande y reproducible de combinaciones de síntomas, guarda
+la salida actual de MotorDiagnostico.diagnose para cada una en un archivo
+compacto (JSONL comprimido) y compara contra él cualquier implementación del
+motor registrada con register_engine, informando de las primeras diferencias.
+
+Casos del corpus:
+- rejilla: todas las combinaciones de las entradas difusas (intensidad,
+  sensibilidad, inflamación y duración) con el resto de síntomas al azar
+- reglas: combinaciones de los campos que lee cada regla crisp (todas si
+  caben en el límite, una muestra si no), con o sin síntomas de fondo
+- aleatorios: pacientes con distinta densidad de síntomas
+- extremos: valores fuera de la escala entera (decimales) y categorías
+  desconocidas, además del paciente vacío
+Cada caso lleva su propio use_fuzzy y estrategia de resolución de conflictos.
+
+De cada resultado se guardan (diagnóstico, confianza, regla, tipo) y un hash
+del resultado completo sin las confianzas; las confianzas se comparan con
+tolerancia numérica.
+
+Uso:
+    python -m src.motor_inferencia.corpus_dorado generar
+    python -m src.motor_inferencia.corpus_dorado verificar
+    python -m src.motor_inferencia.corpus_dorado verificar tabla superficie --max-divergencias 5
+    python -m src.motor_inferencia.corpus_dorado listar
+"""
+
+import argparse
+import gzip
+import hashlib
+import itertools
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+from ..base_conocimiento.hechos import SINTOMAS
+from ..base_conocimiento.reglas_crisp import configure_crisp_evaluator, get_compiled_rules
+from ..base_conocimiento.reglas_difusas import configure_fuzzy_system
+from .cache import DiagnosisCache, rule_base_fingerprint
+
+
+DEFAULT_CORPUS_PATH = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), '..', '..', 'data', 'corpus_dorado.jsonl.gz'
+))
+
+CORPUS_VERSION = 1
+
+STRATEGIES = ('combine', 'highest', 'specific', 'recent')
+
+# Probabilidad de cada estrategia y de desactivar la lógica difusa en un caso
+STRATEGY_WEIGHTS = (0.7, 0.1, 0.1, 0.1)
+NO_FUZZY_PROBABILITY = 0.15
+
+# Diferencia máxima admitida entre confianzas
+TOLERANCE = 1e-9
+
+# Claves que se excluyen del hash (se comparan aparte, con tolerancia)
+_NUMERIC_KEYS = ('confianza', 'confianza_porcentaje')
+
+# Diagnósticos por bloque al ejecutar un motor
+CHUNK_SIZE = 512
+
+
+# --- Generación de casos ------------------------------------------------------
+
+def domain(field):
+    """Valores posibles de un campo; None representa el campo ausente"""
+    values = SINTOMAS.get(field)
+    if isinstance(values, tuple):
+        return [None] + list(range(values[0], values[1] + 1))
+    return [None] + list(values or [])
+
+
+def random_patient(rng, probability):
+    """Paciente con cada síntoma presente con la probabilidad dada"""
+    facts = {}
+    for field in SINTOMAS:
+        if rng.random() < probability:
+            facts[field] = rng.choice(domain(field)[1:])
+    return facts
+
+
+def grid_cases(rng):
+    """Rejilla completa de las entradas del sistema difuso"""
+    scale = range(11)
+    durations = domain('duracion_dolor')
+    sensitivities = ('sensibilidad_frio', 'sensibilidad_calor', 'sensibilidad_dulce')
+    for intensity, sensitivity, inflammation, duration in itertools.product(scale, scale, scale, durations):
+        facts = random_patient(rng, 0.2)
+        facts['intensidad_dolor'] = intensity
+        facts['inflamacion_encias'] = inflammation
+        # La entrada difusa es la máxima de las tres sensibilidades
+        for field in sensitivities:
+            facts.pop(field, None)
+        facts[rng.choice(sensitivities)] = sensitivity
+        if duration is None:
+            facts.pop('duracion_dolor', None)
+        else:
+            facts['duracion_dolor'] = duration
+        yield facts
+
+
+def rule_cases(rng, per_rule):
+    """Combinaciones de los campos de cada regla (todas o una muestra de per_rule)"""
+    for rule in get_compiled_rules():
+        fields = sorted(rule.fields or ())
+        domains = [domain(field) for field in fields]
+        size = 1
+        for values in domains:
+            size *= len(values)
+        if size <= per_rule:
+            combinations = itertools.product(*domains)
+        else:
+            combinations = (tuple(rng.choice(values) for values in domains) for _ in range(per_rule))
+        for combination in combinations:
+            # La mitad de los casos con síntomas de fondo para probar interacciones
+            facts = random_patient(rng, 0.3) if rng.random() < 0.5 else {}
+            for field, value in zip(fields, combination):
+                if value is None:
+                    facts.pop(field, None)
+                else:
+                    facts[field] = value
+            yield facts
+
+
+def random_cases(rng, count):
+    """Pacientes aleatorios con densidades de síntomas variadas"""
+    for _ in range(count):
+        yield random_patient(rng, rng.choice((0.05, 0.15, 0.3, 0.6, 1.0)))
+
+
+def edge_cases(rng, count):
+    """Valores decimales, categorías desconocidas y el paciente vacío"""
+    yield {}
+    for _ in range(count):
+        facts = random_patient(rng, 0.4)
+        for field in list(facts):
+            if rng.random() < 0.3:
+                if isinstance(SINTOMAS[field], tuple):
+                    facts[field] = round(rng.uniform(0, 10), 1)
+                else:
+                    facts[field] = 'desconocido'
+        yield facts
+
+
+def generate_cases(per_rule=100, random_count=5000, edge_count=500, seed=42):
+    """
+    Lista de casos (síntomas, use_fuzzy, estrategia) del corpus
+    Misma semilla y misma base de reglas: mismos casos
+    """
+    rng = random.Random(seed)
+    groups = (
+        grid_cases(rng),
+        rule_cases(rng, per_rule),
+        random_cases(rng, random_count),
+        edge_cases(rng, edge_count)
+    )
+    cases = []
+    for facts in itertools.chain(*groups):
+        use_fuzzy = rng.random() >= NO_FUZZY_PROBABILITY
+        strategy = rng.choices(STRATEGIES, STRATEGY_WEIGHTS)[0]
+        cases.append((facts, use_fuzzy, strategy))
+    return cases
+
+
+# --- Huella de un resultado ------------------------------------------------------
+
+def _strip_numeric(value):
+    """Copia del resultado sin las claves de confianza"""
+    if isinstance(value, dict):
+        return {k: _strip_numeric(v) for k, v in value.items() if k not in _NUMERIC_KEYS}
+    if isinstance(value, list):
+        return [_strip_numeric(v) for v in value]
+    return value
+
+
+def summarize(result):
+    """
+    Forma compacta de un resultado de diagnose()
+    Retorna (lista de [diagnóstico, confianza, regla, tipo], hash del resto)
+    """
+    rows = [
+        [d['diagnostico'], d['confianza'], d['regla'], d['tipo_regla']]
+        for d in result['diagnosticos']
+    ]
+    text = json.dumps(_strip_numeric(result), sort_keys=True, ensure_ascii=False)
+    return rows, hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+
+def compare(expected_rows, expected_hash, result, tolerance=TOLERANCE):
+    """
+    Compara un resultado con su entrada del corpus
+    Retorna None si coinciden o una descripción de la primera diferencia
+    """
+    rows, digest = summarize(result)
+    if len(rows) != len(expected_rows):
+        return f"{len(rows)} diagnósticos en lugar de {len(expected_rows)}"
+    for position, (row, expected) in enumerate(zip(rows, expected_rows)):
+        if row[0] != expected[0] or row[2:] != expected[2:]:
+            return f"diagnóstico {position}: {row[0]}/{row[2]} en lugar de {expected[0]}/{expected[2]}"
+        if abs(row[1] - expected[1]) > tolerance:
+            return f"confianza de {row[0]}: {row[1]!r} en lugar de {expected[1]!r}"
+    if digest != expected_hash:
+        return "el resultado completo difiere (textos, urgencias o recomendaciones)"
+    return None
+
+
+# --- Archivo del corpus -----------------------------------------------------------
+
+def build_corpus(cases, path=DEFAULT_CORPUS_PATH, engine=None):
+    """
+    Diagnostica los casos con el motor de referencia y guarda el corpus
+    Retorna la cabecera escrita
+    """
+    if engine is None:
+        from .diagnostico import MotorDiagnostico
+        engine = MotorDiagnostico()
+    header = {
+        'version': CORPUS_VERSION,
+        'huella': rule_base_fingerprint(),
+        'fecha': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'casos': len(cases)
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # mtime=0: el mismo corpus produce el mismo archivo comprimido
+    with open(path, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as compressed:
+        compressed.write((json.dumps(header, ensure_ascii=False) + '\n').encode('utf-8'))
+        for facts, use_fuzzy, strategy in cases:
+            rows, digest = summarize(engine.diagnose(facts, use_fuzzy, strategy))
+            line = {'s': facts, 'f': use_fuzzy, 'e': strategy, 'r': rows, 'h': digest}
+            compressed.write((json.dumps(line, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8'))
+    return header
+
+
+def load_corpus(path=DEFAULT_CORPUS_PATH):
+    """Retorna (cabecera, lista de entradas) de un corpus guardado"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        header = json.loads(f.readline())
+        if header.get('version') != CORPUS_VERSION:
+            raise ValueError(f"Versión de corpus no soportada: {header.get('version')}")
+        entries = [json.loads(line) for line in f if line.strip()]
+    return header, entries
+
+
+# --- Registro de motores ----------------------------------------------------------
+
+# nombre -> (descripción, fábrica); la fábrica retorna un gestor de contexto que
+# entrega una función diagnose_many(lista de síntomas, use_fuzzy, estrategia)
+ENGINES = {}
+
+
+def register_engine(name, factory, description=''):
+    """
+    Registra una implementación del motor para la verificación diferencial
+    factory() debe retornar un gestor de contexto que entregue una función
+    diagnose_many(facts_list, use_fuzzy, strategy) -> lista de resultados
+    iguales a los de MotorDiagnostico.diagnose; al salir del contexto debe
+    dejar la configuración global como estaba
+    """
+    ENGINES[name] = (description, factory)
+
+
+def _one_by_one(engine):
+    return lambda facts_list, use_fuzzy, strategy: [
+        engine.diagnose(facts, use_fuzzy, strategy) for facts in facts_list
+    ]
+
+
+@contextmanager
+def _reference_engine():
+    from .diagnostico import MotorDiagnostico
+    yield _one_by_one(MotorDiagnostico())
+
+
+def _crisp_evaluator_engine(mode):
+    @contextmanager
+    def factory():
+        from .diagnostico import MotorDiagnostico
+        configure_crisp_evaluator(mode)
+        try:
+            yield _one_by_one(MotorDiagnostico())
+        finally:
+            configure_crisp_evaluator('indice')
+    return factory
+
+
+def _chaining_engine(mode):
+    @contextmanager
+    def factory():
+        from .diagnostico import MotorDiagnostico
+        yield _one_by_one(MotorDiagnostico(engine_mode=mode))
+    return factory
+
+
+@contextmanager
+def _surface_engine():
+    from .diagnostico import MotorDiagnostico
+    configure_fuzzy_system(use_surface=True)
+    try:
+        yield _one_by_one(MotorDiagnostico())
+    finally:
+        configure_fuzzy_system()
+
+
+@contextmanager
+def _skfuzzy_engine():
+    from .diagnostico import MotorDiagnostico
+    configure_fuzzy_system(backend='skfuzzy')
+    try:
+        yield _one_by_one(MotorDiagnostico())
+    finally:
+        configure_fuzzy_system()
+
+
+@contextmanager
+def _batch_engine():
+    from .diagnostico import MotorDiagnostico
+    engine = MotorDiagnostico()
+    yield lambda facts_list, use_fuzzy, strategy: engine.diagnose_batch(facts_list, use_fuzzy, strategy)
+
+
+def _twice(engine):
+    """Diagnostica dos veces cada paciente: la segunda respuesta sale de la caché"""
+    def diagnose_many(facts_list, use_fuzzy, strategy):
+        for facts in facts_list:
+            engine.diagnose(facts, use_fuzzy, strategy)
+        return [engine.diagnose(facts, use_fuzzy, strategy) for facts in facts_list]
+    return diagnose_many
+
+
+@contextmanager
+def _cache_engine():
+    from .diagnostico import MotorDiagnostico
+    yield _twice(MotorDiagnostico(cache=DiagnosisCache(1 << 20)))
+
+
+@contextmanager
+def _persistent_cache_engine():
+    from .cache_persistente import PersistentDiagnosisCache
+    from .diagnostico import MotorDiagnostico
+    directory = tempfile.mkdtemp(prefix='corpus_dorado_')
+    cache = PersistentDiagnosisCache(os.path.join(directory, 'cache.db'), max_entries=1 << 20)
+    try:
+        yield _twice(MotorDiagnostico(cache=cache))
+    finally:
+        cache.close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+@contextmanager
+def _pool_engine():
+    from .pool_inferencia import InferencePool
+    with InferencePool(processes=2) as pool:
+        yield pool.diagnose_batch
+
+
+@contextmanager
+def _statistics_engine():
+    from ..base_conocimiento.estadisticas_reglas import disable_rule_statistics, enable_rule_statistics
+    from .diagnostico import MotorDiagnostico
+    enable_rule_statistics()
+    try:
+        yield _one_by_one(MotorDiagnostico())
+    finally:
+        disable_rule_statistics()
+
+
+@contextmanager
+def _profiling_engine():
+    from ..utilidades.instrumentacion import disable_profiling, enable_profiling
+    from .diagnostico import MotorDiagnostico
+    enable_profiling()
+    try:
+        yield _one_by_one(MotorDiagnostico())
+    finally:
+        disable_profiling()
+
+
+register_engine('referencia', _reference_engine, 'MotorDiagnostico.diagnose con la configuración por defecto')
+register_engine('generado', _crisp_evaluator_engine('generado'), "Evaluador crisp 'generado' (compilador_reglas)")
+register_engine('tabla', _crisp_evaluator_engine('tabla'), "Evaluador crisp 'tabla' (tabla_decision)")
+register_engine('lineal', _chaining_engine('lineal'), "Reglas crisp con ForwardChainingEngine (engine_mode='lineal')")
+register_engine('rete', _chaining_engine('rete'), "Reglas crisp con ReteEngine (engine_mode='rete')")
+register_engine('skfuzzy', _skfuzzy_engine, 'Sistema difuso de scikit-fuzzy')
+register_engine('superficie', _surface_engine, 'Superficie difusa precalculada')
+register_engine('lotes', _batch_engine, 'MotorDiagnostico.diagnose_batch (reglas vectorizadas)')
+register_engine('cache', _cache_engine, 'Resultados servidos desde DiagnosisCache')
+register_engine('cache_disco', _persistent_cache_engine, 'Resultados servidos desde PersistentDiagnosisCache')
+register_engine('pool', _pool_engine, 'InferencePool con 2 procesos')
+register_engine('estadisticas', _statistics_engine, 'Con el recolector de estadísticas de reglas activo')
+register_engine('perfilado', _profiling_engine, 'Con el perfilado por etapas activo')
+
+
+# --- Verificación diferencial -----------------------------------------------------
+
+def verify_engine(name, entries, max_divergences=10, tolerance=TOLERANCE):
+    """
+    Ejecuta un motor registrado sobre las entradas del corpus
+    Los casos se agrupan por (use_fuzzy, estrategia) en bloques de CHUNK_SIZE
+    Retorna {'motor', 'casos', 'divergencias', 'primeras', 'segundos'}; 'primeras'
+    son las max_divergences divergencias de menor índice
+    """
+    description, factory = ENGINES[name]
+    groups = {}
+    for index, entry in enumerate(entries):
+        groups.setdefault((entry['f'], entry['e']), []).append(index)
+    
+    divergent = []
+    inicio = time.perf_counter()
+    with factory() as diagnose_many:
+        for (use_fuzzy, strategy), indices in groups.items():
+            for start in range(0, len(indices), CHUNK_SIZE):
+                chunk = indices[start:start + CHUNK_SIZE]
+                try:
+                    results = diagnose_many([entries[i]['s'] for i in chunk], use_fuzzy, strategy)
+                except Exception as e:
+                    divergent.extend((i, f"Error: {e}") for i in chunk)
+                    continue
+                for i, result in zip(chunk, results):
+                    difference = compare(entries[i]['r'], entries[i]['h'], result, tolerance)
+                    if difference is not None:
+                        divergent.append((i, difference))
+    
+    divergent.sort(key=lambda item: item[0])
+    return {
+        'motor': name,
+        'casos': len(entries),
+        'divergencias': len(divergent),
+        'primeras': [
+            {
+                'caso': i,
+                'sintomas': entries[i]['s'],
+                'use_fuzzy': entries[i]['f'],
+                'estrategia': entries[i]['e'],
+                'esperado': entries[i]['r'],
+                'diferencia': difference
+            }
+            for i, difference in divergent[:max_divergences]
+        ],
+        'segundos': round(time.perf_counter() - inicio, 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Corpus dorado de regresión y verificación diferencial de motores",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    subparsers = parser.add_subparsers(dest='orden', required=True)
+    
+    generar = subparsers.add_parser('generar', help='Genera el corpus con el motor de referencia')
+    generar.add_argument('--salida', default=DEFAULT_CORPUS_PATH)
+    generar.add_argument('--por-regla', type=int, default=100,
+                         help='Combinaciones por regla antes de pasar a muestreo')
+    generar.add_argument('--aleatorios', type=int, default=5000)
+    generar.add_argument('--extremos', type=int, default=500)
+    generar.add_argument('--seed', type=int, default=42)
+    
+    verificar = subparsers.add_parser('verificar', help='Compara motores registrados con el corpus')
+    verificar.add_argument('motores', nargs='*', help='Motores a verificar (por defecto todos)')
+    verificar.add_argument('--corpus', default=DEFAULT_CORPUS_PATH)
+    verificar.add_argument('--max-divergencias', type=int, default=10,
+                           help='Divergencias que se muestran por motor')
+    verificar.add_argument('--limite', type=int, default=None, help='Usa solo los primeros N casos')
+    verificar.add_argument('--tolerancia', type=float, default=TOLERANCE)
+    verificar.add_argument('--json', default=None, help='Ruta donde guardar el informe')
+    
+    subparsers.add_parser('listar', help='Lista los motores registrados')
+    args = parser.parse_args()
+    
+    if args.orden == 'listar':
+        for name, (description, _) in ENGINES.items():
+            print(f"{name:14} {description}")
+        return
+    
+    if args.orden == 'generar':
+        inicio = time.perf_counter()
+        cases = generate_cases(args.por_regla, args.aleatorios, args.extremos, args.seed)
+        header = build_corpus(cases, args.salida)
+        print(f"Corpus con {header['casos']} casos guardado en {args.salida} "
+              f"({os.path.getsize(args.salida) / 1024:.0f} KiB, {time.perf_counter() - inicio:.1f} s)")
+        return
+    
+    unknown = [name for name in args.motores if name not in ENGINES]
+    if unknown:
+        parser.error(f"Motores desconocidos: {', '.join(unknown)} (ver 'listar')")
+    
+    header, entries = load_corpus(args.corpus)
+    if args.limite is not None:
+        entries = entries[:args.limite]
+    if header.get('huella') != rule_base_fingerprint():
+        print("Aviso: la base de conocimientos ha cambiado desde que se generó el corpus "
+              f"({header.get('fecha')}); las divergencias pueden ser cambios intencionados",
+              file=sys.stderr)
+    
+    report = []
+    for name in args.motores or list(ENGINES):
+        result = verify_engine(name, entries, args.max_divergencias, args.tolerancia)
+        report.append(result)
+        estado = 'OK' if not result['divergencias'] else f"{result['divergencias']} divergencias"
+        print(f"{name:14} {result['casos']} casos  {result['segundos']:7.2f} s  {estado}")
+        for divergence in result['primeras']:
+            print(f"    caso {divergence['caso']} (use_fuzzy={divergence['use_fuzzy']}, "
+                  f"{divergence['estrategia']}): {divergence['diferencia']}")
+            print(f"      síntomas: {json.dumps(divergence['sintomas'], ensure_ascii=False)}")
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'corpus': args.corpus, 'cabecera': header, 'motores': report}, f,
+                      indent=2, ensure_ascii=False)
+    if any(result['divergencias'] for result in report):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
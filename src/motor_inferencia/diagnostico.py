@@ -3,6 +3,9 @@ Motor de Diagnóstico
 Coordina el uso de reglas crisp y fuzzy para generar diagnósticos
 """
 
+import threading
+from time import perf_counter
+
 from ..base_conocimiento import (
     evaluate_crisp_rules,
     evaluate_fuzzy_rules,
@@ -10,7 +13,31 @@ from ..base_conocimiento import (
     get_recomendaciones
 )
 from .encadenamiento_adelante import ForwardChainingEngine, apply_conflict_resolution
-from ..base_conocimiento.reglas_crisp import get_all_rules
+from .rete import ReteEngine
+from .cache import canonical_key
+from .resultado import DiagnosisResult
+from .diagnostico_lotes import (
+    SymptomBatch,
+    encode_batch,
+    get_batch_evaluator,
+    evaluate_fuzzy_batch
+)
+from ..base_conocimiento.reglas_crisp import get_compiled_rules
+from ..utilidades.instrumentacion import get_profiler
+
+
+def _record(profiler, stage, inicio):
+    """Registra la etapa que empezó en inicio; retorna el inicio de la siguiente"""
+    fin = perf_counter()
+    profiler.record(stage, fin - inicio)
+    return fin
+
+
+# Motores de encadenamiento hacia adelante para la etapa crisp (engine_mode)
+ENGINE_MODES = {
+    'lineal': ForwardChainingEngine,
+    'rete': ReteEngine
+}
 
 
 class MotorDiagnostico:
@@ -18,15 +45,56 @@ class MotorDiagnostico:
     Motor de diagnóstico que combina reglas crisp y fuzzy
     """
     
-    def __init__(self):
-        self.crisp_engine = ForwardChainingEngine(get_all_rules())
+    def __init__(self, engine_mode=None, cache=None):
+        """
+        engine_mode: cómo se evalúan las reglas crisp
+            None: evaluate_crisp_rules (el evaluador de configure_crisp_evaluator)
+            'lineal': ForwardChainingEngine (recorre todas las reglas)
+            'rete': ReteEngine (red de discriminación)
+            Todos dan los mismos diagnósticos
+        cache: DiagnosisCache opcional que memoriza los resultados de diagnose()
+        (puede compartirse entre varios motores)
+        """
+        if engine_mode is not None and engine_mode not in ENGINE_MODES:
+            raise ValueError(f"Modo de motor desconocido: {engine_mode}")
+        self.engine_mode = engine_mode
+        self._engines = threading.local()
+        self.cache = cache
+        self.last_analysis = None
         self.last_facts = None
         self.last_results = None
     
+    def analyze(self, facts, use_fuzzy=True, strategy='combine'):
+        """
+        Realiza el diagnóstico sin modificar el estado del motor
+        Un mismo motor puede atender a varios hilos a la vez
+        
+        Args:
+            facts: diccionario con síntomas del paciente
+            use_fuzzy: si se debe usar lógica difusa
+            strategy: estrategia de resolución de conflictos
+        
+        Returns:
+            DiagnosisResult con los síntomas, diagnósticos, explicación,
+            urgencia y resumen
+        """
+        if self.cache is None:
+            result = self._diagnose(facts, use_fuzzy, strategy)
+        else:
+            key = canonical_key(facts, use_fuzzy, strategy)
+            result = self.cache.get(key)
+            if result is None:
+                result = self._diagnose(facts, use_fuzzy, strategy)
+                self.cache.put(key, result)
+        
+        return DiagnosisResult(facts, result)
+    
     def diagnose(self, facts, use_fuzzy=True, strategy='combine'):
         """
         Realiza el diagnóstico basado en los síntomas
         SIEMPRE retorna un resultado, incluso con datos mínimos
+        Guarda el último diagnóstico para get_explanation(), get_urgency_level()
+        y generate_summary(); para compartir el motor entre hilos usar analyze()
         
         Args:
             facts: diccionario con síntomas del paciente
@@ -36,10 +104,61 @@ class MotorDiagnostico:
         Returns:
             diccionario con diagnósticos y recomendaciones
         """
-        self.last_facts = facts.copy()
+        analysis = self.analyze(facts, use_fuzzy, strategy)
+        self.last_analysis = analysis
+        self.last_facts = analysis.facts
+        self.last_results = analysis.diagnosticos
+        return analysis.data
+    
+    @property
+    def crisp_engine(self):
+        """
+        Motor de encadenamiento crisp (ForwardChainingEngine o el de engine_mode)
+        Es el motor del hilo actual: motor.crisp_engine.run(facts) y
+        motor.crisp_engine.explain_reasoning() siguen funcionando
+        """
+        return self._crisp_engine_for_mode()
+    
+    def _crisp_engine_for_mode(self):
+        """
+        Motor de encadenamiento del hilo actual según engine_mode
+        Los motores guardan la memoria de trabajo de la ejecución en curso, así
+        que cada hilo usa el suyo; se reconstruye si cambia la tabla de reglas
+        """
+        rules = get_compiled_rules()
+        local = self._engines
+        if getattr(local, 'rules', None) is not rules:
+            local.engine = ENGINE_MODES[self.engine_mode or 'lineal'](rules)
+            local.rules = rules
+        return local.engine
+    
+    def _evaluate_crisp(self, facts):
+        """
+        Conclusiones de las reglas crisp según engine_mode
+        Con el evaluador configurado se hace una sola pasada; si alguna regla
+        lee los hechos derivados de las conclusiones (diagnostico_<x>), el motor
+        de encadenamiento continúa hasta el punto fijo
+        """
+        if self.engine_mode is not None:
+            return self._crisp_engine_for_mode().run(facts)
+        results = evaluate_crisp_rules(facts)
+        if results:
+            engine = self._crisp_engine_for_mode()
+            if engine.needs_chaining(results):
+                return engine.run(facts)
+        return results
+    
+    def _diagnose(self, facts, use_fuzzy, strategy):
+        """Evalúa las reglas y construye el resultado (sin caché)"""
+        # Con el perfilado desactivado cada etapa solo comprueba profiler is None
+        profiler = get_profiler()
+        if profiler is not None:
+            start = inicio = perf_counter()
         
         # Evaluar reglas crisp
-        crisp_results = evaluate_crisp_rules(facts)
+        crisp_results = self._evaluate_crisp(facts)
+        if profiler is not None:
+            inicio = _record(profiler, 'crisp', inicio)
         
         # Evaluar reglas fuzzy si está habilitado
         fuzzy_results = []
@@ -48,6 +167,8 @@ class MotorDiagnostico:
                 fuzzy_results = evaluate_fuzzy_rules(facts)
             except Exception as e:
                 print(f"Error en evaluación fuzzy: {e}")
+            if profiler is not None:
+                inicio = _record(profiler, 'fuzzy', inicio)
         
         # Combinar resultados
         all_results = crisp_results + fuzzy_results
@@ -55,12 +176,30 @@ class MotorDiagnostico:
         # Si no hay resultados, generar diagnóstico por defecto basado en síntomas
         if not all_results:
             all_results = self._generate_fallback_diagnosis(facts)
+            if profiler is not None:
+                _record(profiler, 'fallback', inicio)
+        
+        result = self._build_result(all_results, len(facts), use_fuzzy, strategy)
+        if profiler is not None:
+            _record(profiler, 'total', start)
+        return result
+    
+    def _build_result(self, all_results, num_facts, use_fuzzy, strategy):
+        """
+        Resuelve conflictos, ordena y enriquece los resultados de las reglas
+        Retorna el diccionario de resultado de diagnose()
+        """
+        profiler = get_profiler()
+        if profiler is not None:
+            inicio = perf_counter()
         
         # Aplicar resolución de conflictos
         resolved_results = apply_conflict_resolution(all_results, strategy)
         
         # Ordenar por confianza
         resolved_results.sort(key=lambda x: x['confianza'], reverse=True)
+        if profiler is not None:
+            inicio = _record(profiler, 'conflictos', inicio)
         
         # Enriquecer con información adicional
         enriched_results = []
@@ -79,20 +218,63 @@ class MotorDiagnostico:
                 'confianza_porcentaje': round(result['confianza'] * 100, 1),
                 'regla': result['regla'],
                 'tipo_regla': result['tipo'],
-                'recomendaciones': recomendaciones
+                'recomendaciones': list(recomendaciones)  # Copia: no exponer RECOMENDACIONES
             }
             enriched_results.append(enriched)
-        
-        self.last_results = enriched_results
+        if profiler is not None:
+            _record(profiler, 'enriquecimiento', inicio)
         
         return {
             'diagnosticos': enriched_results,
             'num_diagnosticos': len(enriched_results),
             'principal': enriched_results[0] if enriched_results else None,
-            'sintomas_evaluados': len(facts),
+            'sintomas_evaluados': num_facts,
             'usa_logica_fuzzy': use_fuzzy
         }
     
+    def diagnose_batch(self, batch, use_fuzzy=True, strategy='combine'):
+        """
+        Diagnostica un lote de pacientes de una sola vez
+        Las reglas crisp se evalúan como máscaras booleanas sobre columnas y la
+        capa difusa se calcula una vez por combinación distinta de entradas
+        
+        Args:
+            batch: SymptomBatch (columnas numéricas + códigos categóricos)
+                   o lista de diccionarios de síntomas
+            use_fuzzy: si se debe usar lógica difusa
+            strategy: estrategia de resolución de conflictos
+        
+        Returns:
+            lista de diccionarios, uno por paciente, iguales a los de diagnose()
+        """
+        if not isinstance(batch, SymptomBatch):
+            batch = encode_batch(batch)
+        
+        crisp_results = get_batch_evaluator().evaluate(batch)
+        
+        fuzzy_results = None
+        if use_fuzzy:
+            try:
+                fuzzy_results = evaluate_fuzzy_batch(batch)
+            except Exception as e:
+                print(f"Error en evaluación fuzzy: {e}")
+        
+        engine = self._crisp_engine_for_mode()
+        results = []
+        for row in range(len(batch)):
+            all_results = crisp_results[row]
+            if all_results and engine.needs_chaining(all_results):
+                all_results = engine.run(batch.decode_row(row))
+            if fuzzy_results is not None:
+                all_results = all_results + fuzzy_results[row]
+            if not all_results:
+                all_results = self._generate_fallback_diagnosis(batch.decode_row(row))
+            results.append(self._build_result(
+                all_results, int(batch.num_facts[row]), use_fuzzy, strategy
+            ))
+        
+        return results
+    
     def _generate_fallback_diagnosis(self, facts):
         """
         Genera diagnóstico de respaldo cuando no hay coincidencias de reglas
@@ -245,77 +427,9 @@ class MotorDiagnostico:
         """
         Proporciona una explicación del proceso de diagnóstico
         """
-        if not self.last_facts or not self.last_results:
+        if self.last_analysis is None:
             return "No hay diagnóstico previo para explicar."
-        
-        explanation = {
-            'sintomas_clave': self._identify_key_symptoms(),
-            'reglas_aplicadas': [r['regla'] for r in self.last_results],
-            'razonamiento': self._generate_reasoning()
-        }
-        
-        return explanation
-    
-    def _identify_key_symptoms(self):
-        """Identifica los síntomas más relevantes para el diagnóstico"""
-        key_symptoms = []
-        
-        if not self.last_facts:
-            return key_symptoms
-        
-        # Síntomas numéricos significativos
-        numeric_symptoms = [
-            'intensidad_dolor',
-            'sensibilidad_frio',
-            'sensibilidad_calor',
-            'dolor_masticar',
-            'inflamacion_encias'
-        ]
-        
-        for symptom in numeric_symptoms:
-            value = self.last_facts.get(symptom, 0)
-            if value >= 5:
-                key_symptoms.append({
-                    'sintoma': symptom,
-                    'valor': value,
-                    'relevancia': 'alta' if value >= 7 else 'media'
-                })
-        
-        # Síntomas categóricos importantes
-        if self.last_facts.get('caries_visible') == 'si':
-            key_symptoms.append({
-                'sintoma': 'caries_visible',
-                'valor': 'si',
-                'relevancia': 'alta'
-            })
-        
-        if self.last_facts.get('hinchazon_cara') == 'si':
-            key_symptoms.append({
-                'sintoma': 'hinchazon_cara',
-                'valor': 'si',
-                'relevancia': 'muy_alta'
-            })
-        
-        return key_symptoms
-    
-    def _generate_reasoning(self):
-        """Genera una explicación del razonamiento"""
-        if not self.last_results:
-            return "No se pudo generar un diagnóstico con los síntomas proporcionados."
-        
-        principal = self.last_results[0]
-        
-        reasoning = f"Basándose en los síntomas reportados, el diagnóstico más probable es "
-        reasoning += f"{principal['nombre']} con una confianza del {principal['confianza_porcentaje']}%. "
-        reasoning += f"\n\nEsto se determinó mediante {principal['regla']}. "
-        reasoning += f"\n\nDescripción: {principal['descripcion']}"
-        
-        if len(self.last_results) > 1:
-            reasoning += f"\n\nOtros diagnósticos posibles incluyen: "
-            otros = [r['nombre'] for r in self.last_results[1:3]]
-            reasoning += ", ".join(otros)
-        
-        return reasoning
+        return self.last_analysis.explanation()
     
     def validate_symptoms(self, facts):
         """
@@ -355,50 +469,17 @@ class MotorDiagnostico:
         """
         Determina el nivel de urgencia basado en los diagnósticos
         """
-        if not self.last_results:
+        if self.last_analysis is None:
             return 'desconocida'
-        
-        urgencias = [r['urgencia'] for r in self.last_results]
-        
-        if 'urgente' in urgencias:
-            return 'urgente'
-        elif 'alta' in urgencias:
-            return 'alta'
-        elif 'moderada' in urgencias:
-            return 'moderada'
-        else:
-            return 'baja'
+        return self.last_analysis.urgency()
     
     def generate_summary(self):
         """
         Genera un resumen del diagnóstico
         """
-        if not self.last_results:
+        if self.last_analysis is None:
             return {
                 'tiene_diagnostico': False,
                 'mensaje': 'No se pudo determinar un diagnóstico con los síntomas proporcionados.'
             }
-        
-        principal = self.last_results[0]
-        urgencia = self.get_urgency_level()
-        
-        # Mensaje de urgencia
-        urgencia_msg = {
-            'urgente': '🚨 ATENCIÓN URGENTE REQUERIDA',
-            'alta': '⚠️ Consulte a un odontólogo pronto',
-            'moderada': '📅 Agende una cita odontológica',
-            'baja': 'ℹ️ Considere una evaluación odontológica'
-        }
-        
-        summary = {
-            'tiene_diagnostico': True,
-            'diagnostico_principal': principal['nombre'],
-            'confianza': principal['confianza_porcentaje'],
-            'descripcion': principal['descripcion'],
-            'urgencia': urgencia,
-            'mensaje_urgencia': urgencia_msg.get(urgencia, ''),
-            'num_diagnosticos_alternativos': len(self.last_results) - 1,
-            'recomendaciones_principales': principal['recomendaciones'][:3]
-        }
-        
-        return summary
+        return self.last_analysis.summary()
@@ -0,0 +1,247 @@
+"""
+Motor de Diagnóstico por Lotes
+Evalúa muchos pacientes a la vez sobre una representación columnar de los síntomas:
+- Síntomas numéricos (escalas 0-10) como matriz float
+- Síntomas categóricos de SINTOMAS como códigos enteros pequeños
+
+Las reglas crisp se compilan a operaciones sobre máscaras booleanas y la capa
+difusa se calcula una sola vez por combinación distinta de entradas.
+Para valores dentro del dominio de SINTOMAS los resultados son idénticos a los
+de la evaluación paciente a paciente.
+"""
+
+import numbers
+
+import numpy as np
+
+from ..base_conocimiento.hechos import SINTOMAS
+from ..base_conocimiento.reglas_crisp import (
+    Condition,
+    AnyOf,
+    OPERATORS,
+    NUMERIC_OPERATORS,
+    get_compiled_rules
+)
+from ..base_conocimiento.reglas_difusas import DURACION_DIAS, get_fuzzy_system
+
+
+# Orden de las columnas del lote
+NUMERIC_FIELDS = tuple(k for k, v in SINTOMAS.items() if isinstance(v, tuple))
+CATEGORICAL_FIELDS = tuple(k for k, v in SINTOMAS.items() if not isinstance(v, tuple))
+
+NUMERIC_INDEX = {field: i for i, field in enumerate(NUMERIC_FIELDS)}
+CATEGORICAL_INDEX = {field: i for i, field in enumerate(CATEGORICAL_FIELDS)}
+
+# Código para un campo categórico ausente o con un valor fuera de SINTOMAS
+MISSING = -1
+
+# Tabla valor -> código por campo categórico
+CATEGORY_CODES = {
+    field: {value: code for code, value in enumerate(SINTOMAS[field])}
+    for field in CATEGORICAL_FIELDS
+}
+
+
+class SymptomBatch:
+    """
+    Lote columnar de pacientes
+    numeric: matriz (n, len(NUMERIC_FIELDS)) de float; ausente = 0
+    categorical: matriz (n, len(CATEGORICAL_FIELDS)) de códigos; ausente = MISSING
+    num_facts: número de síntomas de cada paciente (por defecto, todas las columnas)
+    """
+    
+    def __init__(self, numeric, categorical, num_facts=None):
+        self.numeric = np.asarray(numeric, dtype=float)
+        self.categorical = np.asarray(categorical, dtype=np.int8)
+        if self.numeric.shape != (len(self.categorical), len(NUMERIC_FIELDS)):
+            raise ValueError(f"Forma inválida de la matriz numérica: {self.numeric.shape}")
+        if self.categorical.shape[1:] != (len(CATEGORICAL_FIELDS),):
+            raise ValueError(f"Forma inválida de la matriz categórica: {self.categorical.shape}")
+        if num_facts is None:
+            num_facts = np.full(len(self), len(NUMERIC_FIELDS) + len(CATEGORICAL_FIELDS))
+        self.num_facts = np.asarray(num_facts, dtype=np.int32)
+    
+    def __len__(self):
+        return len(self.numeric)
+    
+    def column(self, field):
+        """Retorna la columna de un campo (valores numéricos o códigos)"""
+        if field in NUMERIC_INDEX:
+            return self.numeric[:, NUMERIC_INDEX[field]]
+        return self.categorical[:, CATEGORICAL_INDEX[field]]
+    
+    def decode_row(self, row):
+        """Reconstruye el diccionario de síntomas de un paciente"""
+        facts = {}
+        for i, field in enumerate(NUMERIC_FIELDS):
+            facts[field] = float(self.numeric[row, i])
+        for i, field in enumerate(CATEGORICAL_FIELDS):
+            code = self.categorical[row, i]
+            if code != MISSING:
+                facts[field] = SINTOMAS[field][code]
+        return facts
+
+
+def encode_batch(facts_list):
+    """
+    Convierte una lista de diccionarios de síntomas en un SymptomBatch
+    Los valores categóricos fuera de SINTOMAS se codifican como MISSING
+    Los valores numéricos pueden ser cualquier número real (int, float o
+    escalares de NumPy como np.int64 o np.float32)
+    """
+    n = len(facts_list)
+    numeric = np.zeros((n, len(NUMERIC_FIELDS)), dtype=float)
+    categorical = np.full((n, len(CATEGORICAL_FIELDS)), MISSING, dtype=np.int8)
+    num_facts = np.zeros(n, dtype=np.int32)
+    
+    for row, facts in enumerate(facts_list):
+        num_facts[row] = len(facts)
+        for i, field in enumerate(NUMERIC_FIELDS):
+            value = facts.get(field, 0)
+            if not isinstance(value, numbers.Real):
+                raise ValueError(f"Valor no numérico para {field}: {value!r}")
+            numeric[row, i] = value
+        for i, field in enumerate(CATEGORICAL_FIELDS):
+            categorical[row, i] = CATEGORY_CODES[field].get(facts.get(field), MISSING)
+    
+    return SymptomBatch(numeric, categorical, num_facts)
+
+
+class BatchRuleEvaluator:
+    """
+    Evalúa una tabla de reglas sobre un lote como operaciones de máscaras
+    Cada condición distinta se calcula una sola vez por lote y se comparte entre reglas
+    Las condiciones que no pueden vectorizarse se evalúan fila a fila
+    """
+    
+    def __init__(self, rules):
+        self.rules = rules
+        self.conclusions = [
+            {
+                'diagnostico': rule.conclusion,
+                'confianza': rule.confidence,
+                'regla': rule.name,
+                'tipo': 'crisp'
+            }
+            for rule in rules
+        ]
+    
+    def _vectorizable(self, condition):
+        """Indica si una condición puede calcularse con operaciones de columnas"""
+        if isinstance(condition, AnyOf):
+            return all(self._vectorizable(c) for c in condition.conditions)
+        if not isinstance(condition, Condition):
+            return False
+        if condition.field in NUMERIC_INDEX:
+            return condition.operator in NUMERIC_OPERATORS
+        if condition.field in CATEGORICAL_INDEX:
+            codes = CATEGORY_CODES[condition.field]
+            operands = condition.operand if condition.operator == 'in' else (condition.operand,)
+            return condition.operator in ('==', '!=', 'in') and all(o in codes for o in operands)
+        return False
+    
+    def _condition_mask(self, condition, batch, cache):
+        """Máscara booleana de una condición sobre el lote (memorizada por clave)"""
+        key = condition.key if isinstance(condition, (Condition, AnyOf)) else id(condition)
+        if key in cache:
+            return cache[key]
+        
+        if not self._vectorizable(condition):
+            mask = np.fromiter(
+                (bool(condition(batch.decode_row(row))) for row in range(len(batch))),
+                dtype=bool, count=len(batch)
+            )
+        elif isinstance(condition, AnyOf):
+            mask = np.zeros(len(batch), dtype=bool)
+            for sub in condition.conditions:
+                mask |= self._condition_mask(sub, batch, cache)
+        elif condition.field in NUMERIC_INDEX:
+            column = batch.column(condition.field)
+            mask = OPERATORS[condition.operator](column, condition.operand)
+        else:
+            column = batch.column(condition.field)
+            codes = CATEGORY_CODES[condition.field]
+            if condition.operator == 'in':
+                mask = np.isin(column, [codes[o] for o in condition.operand])
+            elif condition.operator == '==':
+                mask = column == codes[condition.operand]
+            else:
+                mask = column != codes[condition.operand]
+        
+        cache[key] = mask
+        return mask
+    
+    def evaluate_masks(self, batch):
+        """Retorna una matriz booleana (n_pacientes, n_reglas) de reglas que se cumplen"""
+        cache = {}
+        masks = np.ones((len(batch), len(self.rules)), dtype=bool)
+        for index, rule in enumerate(self.rules):
+            for condition in rule.conditions:
+                masks[:, index] &= self._condition_mask(condition, batch, cache)
+        return masks
+    
+    def evaluate(self, batch):
+        """
+        Retorna, por paciente, la lista de resultados crisp en el mismo formato
+        y orden que evaluate_crisp_rules
+        """
+        results = [[] for _ in range(len(batch))]
+        rows, rule_indices = np.nonzero(self.evaluate_masks(batch))
+        for row, index in zip(rows.tolist(), rule_indices.tolist()):
+            results[row].append(dict(self.conclusions[index]))
+        return results
+
+
+_batch_evaluator = None
+
+
+def get_batch_evaluator():
+    """Obtiene el evaluador por lotes de la tabla de reglas compilada"""
+    global _batch_evaluator
+    if _batch_evaluator is None or _batch_evaluator.rules is not get_compiled_rules():
+        _batch_evaluator = BatchRuleEvaluator(get_compiled_rules())
+    return _batch_evaluator
+
+
+def fuzzy_input_matrix(batch):
+    """
+    Calcula las entradas del sistema difuso para todo el lote
+    Columnas: intensidad, sensibilidad, inflamacion, duracion_dias, movilidad_avanzada
+    (mismas reglas de extracción que extract_fuzzy_inputs)
+    """
+    intensidad = batch.column('intensidad_dolor')
+    sensibilidad = np.maximum.reduce([
+        batch.column('sensibilidad_frio'),
+        batch.column('sensibilidad_calor'),
+        batch.column('sensibilidad_dulce')
+    ])
+    inflamacion = batch.column('inflamacion_encias')
+    
+    # Código de duración -> días (ausente o desconocido = 0)
+    dias = np.zeros(len(SINTOMAS['duracion_dolor']) + 1)
+    for code, value in enumerate(SINTOMAS['duracion_dolor']):
+        dias[code] = DURACION_DIAS.get(value, 0)
+    duracion = dias[batch.column('duracion_dolor')]  # MISSING (-1) indexa la última posición
+    
+    codes = CATEGORY_CODES['movilidad_dental']
+    movilidad = np.isin(batch.column('movilidad_dental'), [codes['moderado'], codes['severo']])
+    
+    return np.column_stack([intensidad, sensibilidad, inflamacion, duracion, movilidad])
+
+
+def evaluate_fuzzy_batch(batch):
+    """
+    Evalúa la capa difusa para todo el lote
+    Retorna, por paciente, la lista de resultados fuzzy (mismo formato que evaluate_fuzzy_rules)
+    """
+    fuzzy_sys = get_fuzzy_system()
+    inputs = fuzzy_input_matrix(batch)
+    unique_inputs, inverse = np.unique(inputs, axis=0, return_inverse=True)
+    
+    # Con el motor NumPy todas las combinaciones se calculan a la vez
+    unique_results = fuzzy_sys.evaluate_inputs_batch(unique_inputs)
+    
+    return [
+        [dict(result) for result in unique_results[index]]
+        for index in inverse.reshape(-1).tolist()
+    ]
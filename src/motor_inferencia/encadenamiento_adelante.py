@@ -3,30 +3,65 @@ Motor de Inferencia - Encadenamiento Hacia Adelante (Forward Chaining)
 Procesa los hechos (síntomas) y aplica reglas para llegar a conclusiones
 """
 
-from collections import defaultdict
+import heapq
+from collections import defaultdict, deque
+from time import perf_counter
+
+from ..base_conocimiento.reglas_crisp import compile_rules, get_rule_statistics
+
+
+def derived_fact(conclusion):
+    """Hecho que añade a la memoria de trabajo una conclusión alcanzada"""
+    return f"diagnostico_{conclusion}"
 
 
 class ForwardChainingEngine:
     """
     Motor de inferencia que utiliza encadenamiento hacia adelante
     Parte de los hechos conocidos y aplica reglas para derivar nuevas conclusiones
+    Cada conclusión se añade a la memoria de trabajo como hecho
+    (diagnostico_<conclusion> = True), de modo que otras reglas pueden activarse
+    sobre hechos derivados hasta alcanzar un punto fijo
     """
     
-    def __init__(self, rules):
+    def __init__(self, rules, max_iterations=None):
         """
         Inicializa el motor con un conjunto de reglas
-        rules: lista de funciones que retornan objetos Rule
+        rules: tabla de objetos Rule o lista de funciones que los retornan
+        (las funciones se compilan una sola vez al crear el motor)
+        max_iterations: límite de reglas extraídas de la agenda por ejecución
+        (None = 10 veces el número de reglas más 100; 0 no evalúa ninguna regla)
         """
-        self.rules = rules
+        self.rules = compile_rules(rules)
+        if max_iterations is None:
+            max_iterations = 10 * len(self.rules) + 100
+        self.max_iterations = max_iterations
         self.working_memory = {}  # Memoria de trabajo (hechos conocidos)
         self.fired_rules = []  # Reglas que se han activado
         self.inferred_facts = []  # Hechos inferidos
+        self.asserted_facts = []  # Hechos derivados añadidos a la memoria de trabajo
+        self.input_facts = set()  # Hechos recibidos en add_facts
+        self.iterations = 0
         
+        # Índice campo -> reglas que lo leen, para re-encolar solo las afectadas
+        self.rules_by_field = defaultdict(list)
+        self.opaque_rules = []  # Reglas con funciones opacas: dependen de cualquier hecho
+        for index, rule in enumerate(self.rules):
+            fields = rule.fields
+            if fields is None:
+                self.opaque_rules.append(index)
+            else:
+                for field in fields:
+                    self.rules_by_field[field].append(index)
+    
     def reset(self):
         """Reinicia el estado del motor"""
         self.working_memory = {}
         self.fired_rules = []
         self.inferred_facts = []
+        self.asserted_facts = []
+        self.input_facts = set()
+        self.iterations = 0
     
     def add_facts(self, facts):
         """
@@ -34,6 +69,75 @@ class ForwardChainingEngine:
         facts: diccionario con síntomas del paciente
         """
         self.working_memory.update(facts)
+        self.input_facts.update(facts)
+    
+    def needs_chaining(self, conclusions):
+        """
+        Indica si alguna regla lee los hechos derivados de estas conclusiones
+        Si no, las conclusiones de una sola pasada ya son el punto fijo
+        """
+        if self.opaque_rules:
+            return bool(conclusions)
+        return any(
+            derived_fact(conclusion['diagnostico']) in self.rules_by_field
+            for conclusion in conclusions
+        )
+    
+    def assert_fact(self, fact, value):
+        """
+        Añade un hecho derivado a la memoria de trabajo
+        Retorna False si el hecho ya era conocido con el mismo valor (no hay cambio)
+        """
+        if fact in self.working_memory and self.working_memory[fact] == value:
+            return False
+        self.working_memory[fact] = value
+        self.asserted_facts.append(fact)
+        return True
+    
+    def dependent_rules(self, fact):
+        """Índices de las reglas que leen un hecho"""
+        if not self.opaque_rules:
+            return self.rules_by_field.get(fact, ())
+        return sorted(set(self.rules_by_field.get(fact, ())) | set(self.opaque_rules))
+    
+    def matches(self, index):
+        """Comprueba si la regla con el índice dado se cumple con la memoria de trabajo"""
+        try:
+            return self.rules[index].evaluate(self.working_memory)
+        except Exception as e:
+            print(f"Error al evaluar regla: {e}")
+            return False
+    
+    def counting_matcher(self, statistics):
+        """
+        Equivalente a matches() que además cuenta cada evaluación en el
+        recolector de estadísticas (condición donde se detiene y, en las
+        ejecuciones cronometradas, tiempos por condición)
+        Retorna (función index -> bool, totales de la ejecución para el recolector)
+        """
+        (counters, stops, entries, totals), timed = statistics.chain_counters(self)
+        memory = self.working_memory
+        rules = self.rules
+        
+        if timed:
+            def match(index):
+                try:
+                    return statistics.evaluate_timed(rules[index], memory, entries[index])
+                except Exception as e:
+                    print(f"Error al evaluar regla: {e}")
+                    return False
+        else:
+            def match(index):
+                try:
+                    return counters[index](memory, stops[index])
+                except Exception as e:
+                    print(f"Error al evaluar regla: {e}")
+                    return False
+        return match, totals
+    
+    def initial_agenda(self):
+        """Reglas a comprobar en la primera pasada (todas, en orden de la tabla)"""
+        return list(range(len(self.rules)))
     
     def run(self, facts):
         """
@@ -42,38 +146,88 @@ class ForwardChainingEngine:
         """
         self.reset()
         self.add_facts(facts)
+        return self.chain()
+    
+    def chain(self):
+        """
+        Encadena sobre la memoria de trabajo hasta un punto fijo
+        La primera pasada recorre las reglas en orden de la tabla y cada hecho
+        derivado re-encola solo las reglas que lo leen
+        Retorna: lista de conclusiones alcanzadas
+        """
+        statistics = get_rule_statistics()
+        if statistics is not None:
+            inicio = perf_counter()
+            matches, totals = self.counting_matcher(statistics)
+        else:
+            matches = self.matches
         
         conclusions = []
+        fired = set()
+        
+        # Agenda: primera pasada ordenada por índice + cola de reglas re-encoladas
+        first_pass = self.initial_agenda()
+        heapq.heapify(first_pass)
+        in_first_pass = set(first_pass)
+        pending = deque()
+        in_pending = set()
         
-        # Evaluar cada regla
-        for rule_func in self.rules:
-            try:
-                rule = rule_func(self.working_memory)
-                
-                # Si la regla se activa
-                if rule.evaluate(self.working_memory):
-                    self.fired_rules.append(rule)
-                    
-                    # Añadir conclusión
-                    conclusion = {
-                        'diagnostico': rule.conclusion,
-                        'confianza': rule.confidence,
-                        'regla': rule.name,
-                        'tipo': 'crisp'
-                    }
-                    conclusions.append(conclusion)
-                    
-                    # Registrar el hecho inferido
-                    self.inferred_facts.append({
-                        'hecho': f"diagnostico_{rule.conclusion}",
-                        'valor': True,
-                        'confianza': rule.confidence
-                    })
+        while first_pass or pending:
+            if self.iterations >= self.max_iterations:
+                print(f"Advertencia: encadenamiento detenido tras {self.iterations} iteraciones")
+                break
+            self.iterations += 1
             
-            except Exception as e:
-                print(f"Error al evaluar regla: {e}")
+            from_first_pass = bool(first_pass)
+            if from_first_pass:
+                index = heapq.heappop(first_pass)
+                in_first_pass.discard(index)
+            else:
+                index = pending.popleft()
+                in_pending.discard(index)
+            
+            # Cada regla se dispara como máximo una vez (evita ciclos)
+            if index in fired or not matches(index):
                 continue
+            
+            rule = self.rules[index]
+            fired.add(index)
+            self.fired_rules.append(rule)
+            
+            # Añadir conclusión
+            conclusions.append({
+                'diagnostico': rule.conclusion,
+                'confianza': rule.confidence,
+                'regla': rule.name,
+                'tipo': 'crisp'
+            })
+            
+            # Registrar el hecho inferido y añadirlo a la memoria de trabajo
+            fact = derived_fact(rule.conclusion)
+            self.inferred_facts.append({
+                'hecho': fact,
+                'valor': True,
+                'confianza': rule.confidence
+            })
+            if not self.assert_fact(fact, True):
+                continue
+            
+            # Re-encolar solo las reglas que leen el hecho nuevo
+            for dependent in self.dependent_rules(fact):
+                if dependent in fired or dependent in in_first_pass or dependent in in_pending:
+                    continue
+                if from_first_pass and dependent > index:
+                    heapq.heappush(first_pass, dependent)
+                    in_first_pass.add(dependent)
+                else:
+                    pending.append(dependent)
+                    in_pending.add(dependent)
         
+        if statistics is not None:
+            totals[0] += 1
+            totals[1] += self.iterations
+            totals[2] += len(conclusions)
+            totals[3] += perf_counter() - inicio
         return conclusions
     
     def explain_reasoning(self):
@@ -81,7 +235,7 @@ class ForwardChainingEngine:
         Proporciona una explicación del razonamiento seguido
         """
         explanation = {
-            'facts_used': len(self.working_memory),
+            'facts_used': len(self.input_facts),
             'rules_fired': len(self.fired_rules),
             'conclusions': len(self.inferred_facts),
             'fired_rules_names': [rule.name for rule in self.fired_rules],
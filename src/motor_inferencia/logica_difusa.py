@@ -3,6 +3,8 @@ Motor de Lógica Difusa
 Maneja razonamiento difuso para síntomas ambiguos
 """
 
+import hashlib
+
 import numpy as np
 
 
@@ -24,8 +26,26 @@ class FuzzySet:
         return self.membership_function(value)
 
 
+def _is_scalar(x):
+    """True si x es un número suelto (no un array ni una lista)"""
+    return np.ndim(x) == 0 and not isinstance(x, np.ndarray)
+
+
+def _as_array(x):
+    """
+    Entrada como array de floats de al menos una dimensión
+    Un número se evalúa como un array de un elemento: np.exp usa otra rutina
+    con escalares y podría diferir en la última cifra del resultado del lote
+    """
+    return np.atleast_1d(np.asarray(x, dtype=float))
+
+
 class TriangularMF:
-    """Función de pertenencia triangular"""
+    """
+    Función de pertenencia triangular
+    Acepta un número o un array (lista, columna de pacientes...) y retorna
+    un float o un array de la misma forma con los mismos valores punto a punto
+    """
     
     def __init__(self, a, b, c):
         """
@@ -39,18 +59,36 @@ class TriangularMF:
     
     def __call__(self, x):
         """Calcula el grado de pertenencia"""
-        if x <= self.a or x >= self.c:
-            return 0.0
-        elif x == self.b:
+        if not _is_scalar(x):
+            return self._evaluate_array(np.asarray(x, dtype=float))
+        
+        # La cima se comprueba primero: con a == b o b == c (hombros) vale 1
+        if x == self.b:
             return 1.0
+        elif x <= self.a or x >= self.c:
+            return 0.0
         elif x < self.b:
             return (x - self.a) / (self.b - self.a)
         else:
             return (self.c - x) / (self.c - self.b)
+    
+    def _evaluate_array(self, x):
+        """Mismos tramos y en el mismo orden que el cálculo escalar"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rising = (x - self.a) / (self.b - self.a)
+            falling = (self.c - x) / (self.c - self.b)
+        return np.select(
+            [x == self.b, (x <= self.a) | (x >= self.c), x < self.b],
+            [1.0, 0.0, rising],
+            falling
+        )
 
 
 class TrapezoidalMF:
-    """Función de pertenencia trapezoidal"""
+    """
+    Función de pertenencia trapezoidal
+    Acepta un número o un array, como TriangularMF
+    """
     
     def __init__(self, a, b, c, d):
         """
@@ -66,28 +104,95 @@ class TrapezoidalMF:
     
     def __call__(self, x):
         """Calcula el grado de pertenencia"""
-        if x <= self.a or x >= self.d:
-            return 0.0
-        elif self.b <= x <= self.c:
+        if not _is_scalar(x):
+            return self._evaluate_array(np.asarray(x, dtype=float))
+        
+        # La meseta se comprueba primero: con a == b o c == d (hombros) vale 1
+        if self.b <= x <= self.c:
             return 1.0
+        elif x <= self.a or x >= self.d:
+            return 0.0
         elif x < self.b:
             return (x - self.a) / (self.b - self.a)
         else:
             return (self.d - x) / (self.d - self.c)
+    
+    def _evaluate_array(self, x):
+        """Mismos tramos y en el mismo orden que el cálculo escalar"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rising = (x - self.a) / (self.b - self.a)
+            falling = (self.d - x) / (self.d - self.c)
+        return np.select(
+            [(self.b <= x) & (x <= self.c), (x <= self.a) | (x >= self.d), x < self.b],
+            [1.0, 0.0, rising],
+            falling
+        )
+
+
+class GaussianMF:
+    """
+    Función de pertenencia gaussiana: exp(-(x - mean)² / (2·sigma²))
+    Acepta un número o un array, como TriangularMF
+    """
+    
+    def __init__(self, mean, sigma):
+        """
+        mean: centro (máxima pertenencia)
+        sigma: desviación (anchura de la campana), mayor que 0
+        """
+        if sigma <= 0:
+            raise ValueError(f"sigma debe ser positivo: {sigma}")
+        self.mean = mean
+        self.sigma = sigma
+    
+    def __call__(self, x):
+        """Calcula el grado de pertenencia"""
+        result = np.exp(-((_as_array(x) - self.mean) ** 2) / (2 * self.sigma ** 2))
+        return float(result[0]) if _is_scalar(x) else result.reshape(np.shape(x))
+
+
+class SigmoidMF:
+    """
+    Función de pertenencia sigmoide: 1 / (1 + exp(-slope·(x - center)))
+    Con slope > 0 es un hombro creciente ('alto') y con slope < 0 decreciente ('bajo')
+    Acepta un número o un array, como TriangularMF
+    """
+    
+    def __init__(self, center, slope):
+        """
+        center: punto de pertenencia 0.5
+        slope: pendiente (signo y rapidez de la transición)
+        """
+        self.center = center
+        self.slope = slope
+    
+    def __call__(self, x):
+        """Calcula el grado de pertenencia"""
+        # Lejos del centro exp desborda a inf y la pertenencia tiende a 0
+        with np.errstate(over='ignore'):
+            result = 1.0 / (1.0 + np.exp(-self.slope * (_as_array(x) - self.center)))
+        return float(result[0]) if _is_scalar(x) else result.reshape(np.shape(x))
 
 
 class FuzzyVariable:
     """Variable lingüística difusa"""
     
-    def __init__(self, name, universe):
+    def __init__(self, name, universe, step=1):
         """
         name: nombre de la variable
         universe: rango de valores posibles
+        step: separación de los puntos del universo discretizado (ver points)
         """
         self.name = name
         self.universe = universe
+        self.step = step
         self.fuzzy_sets = {}
     
+    def points(self):
+        """Universo discretizado: array de min a max (incluido) cada step"""
+        low, high = self.universe
+        return np.arange(low, high + self.step / 2, self.step, dtype=float)
+    
     def add_fuzzy_set(self, set_name, membership_function):
         """Añade un conjunto difuso a la variable"""
         fuzzy_set = FuzzySet(set_name, self.universe, membership_function)
@@ -95,9 +200,13 @@ class FuzzyVariable:
     
     def fuzzify(self, value):
         """
-        Fuzzifica un valor crisp
-        Retorna un diccionario con grados de pertenencia a cada conjunto
+        Fuzzifica un valor crisp o un array de valores (p. ej. la intensidad de
+        dolor de todos los pacientes de un lote)
+        Retorna un diccionario con grados de pertenencia a cada conjunto: floats
+        para un valor y arrays de la forma de la entrada para un array
         """
+        if not _is_scalar(value):
+            value = np.asarray(value, dtype=float)
         result = {}
         for set_name, fuzzy_set in self.fuzzy_sets.items():
             result[set_name] = fuzzy_set.membership_degree(value)
@@ -217,6 +326,273 @@ class FuzzyInferenceSystem:
         return results
 
 
+# Funciones de pertenencia que aceptan arrays
+MEMBERSHIP_FUNCTIONS = (TriangularMF, TrapezoidalMF, GaussianMF, SigmoidMF)
+
+# Filas por bloque al calcular centroides (los temporales caben en caché)
+CENTROID_CHUNK = 512
+
+# Centroides memorizados por sistema, compartidos por sus hilos (se vacía al llenarse)
+CENTROID_CACHE_SIZE = 16384
+
+
+def _sample(membership_function, points):
+    """
+    Función de pertenencia evaluada en cada punto del universo discretizado
+    Las funciones de este módulo aceptan el array completo; cualquier otra
+    función (solo escalares) se evalúa punto a punto
+    """
+    if isinstance(membership_function, MEMBERSHIP_FUNCTIONS):
+        return np.asarray(membership_function(points), dtype=float)
+    return np.array([membership_function(x) for x in points.tolist()], dtype=float)
+
+
+def mamdani_centroid(points, mfs, cuts):
+    """
+    Centroide de max_t(min(cut_t, mf_t)) para cada fila, en forma vectorizada
+    Como skfuzzy.control: el universo se amplía con los puntos donde cada
+    función corta su nivel de activación y el área se integra exactamente
+    (trapecios entre puntos consecutivos), sumando en el mismo orden
+    
+    points: universo discretizado (S,)
+    mfs: funciones de pertenencia muestreadas en points [(S,), ...]
+    cuts: nivel de activación de cada función [(B,), ...]
+    Retorna (B,) con NaN en las filas cuya función resultante es nula
+    """
+    rows = len(cuts[0])
+    width = points[1:] - points[:-1]
+    
+    # Puntos donde cada función corta su nivel: solo los tramos que cruzan el
+    # nivel (los primeros de cada fila; NaN en las filas con menos cortes)
+    universe = [np.broadcast_to(points, (rows, len(points)))]
+    for mf, cut in zip(mfs, cuts):
+        level = cut[:, None]
+        above = np.where(level == 0.0, mf > level, mf >= level)
+        crosses = above[:, :-1] != above[:, 1:]
+        count = int(crosses.sum(axis=1).max())
+        if not count:
+            continue
+        segments = np.argsort(~crosses, axis=1, kind='stable')[:, :count]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            crossing = (points[segments] + (level - mf[segments]) * width[segments]
+                        / (mf[segments + 1] - mf[segments]))
+        universe.append(np.where(np.take_along_axis(crosses, segments, axis=1), crossing, np.nan))
+    # Los puntos repetidos forman tramos de ancho 0, que no suman área
+    x = np.sort(np.concatenate(universe, axis=1), axis=1)
+    
+    # Implicación por mínimo y agregación por máximo
+    y = np.zeros(x.shape)
+    for mf, cut in zip(mfs, cuts):
+        np.maximum(y, np.minimum(cut[:, None], np.interp(x, points, mf)), out=y)
+    
+    x1, x2 = x[:, :-1], x[:, 1:]
+    y1, y2 = y[:, :-1], y[:, 1:]
+    dx = x2 - x1
+    skip = ((y1 == 0.0) & (y2 == 0.0)) | (dx == 0.0) | np.isnan(x2)
+    rectangle = y1 == y2
+    rising = (y1 == 0.0) & (y2 != 0.0)
+    falling = (y2 == 0.0) & (y1 != 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        moment = np.where(rectangle, 0.5 * (x1 + x2),
+                 np.where(rising, 2.0 / 3.0 * dx + x1,
+                 np.where(falling, 1.0 / 3.0 * dx + x1,
+                          2.0 / 3.0 * dx * (y2 + 0.5 * y1) / (y1 + y2) + x1)))
+        area = np.where(rectangle, dx * y1,
+               np.where(rising, 0.5 * dx * y2,
+               np.where(falling, 0.5 * dx * y1, 0.5 * dx * (y1 + y2))))
+        moment_area = np.where(skip, 0.0, moment * area)
+    area = np.where(skip, 0.0, area)
+    
+    # cumsum suma en orden (np.sum usa suma por pares y redondearía distinto)
+    total_moment = np.cumsum(moment_area, axis=1)[:, -1]
+    total_area = np.cumsum(area, axis=1)[:, -1]
+    result = total_moment / np.fmax(total_area, np.finfo(float).eps)
+    result[~(y > 0).any(axis=1)] = np.nan
+    return result
+
+
+class MamdaniInferenceSystem(FuzzyInferenceSystem):
+    """
+    Sistema de inferencia Mamdani vectorizado con NumPy
+    - Universos discretizados (FuzzyVariable.points) con las funciones de
+      pertenencia muestreadas; las entradas se recortan al universo y su
+      pertenencia se interpola linealmente
+    - Activación de cada regla: mínimo (AND) o máximo (OR) de sus antecedentes
+    - Implicación por mínimo, agregación por máximo y defuzzificación por centroide
+    Reproduce los resultados de skfuzzy.control con las mismas definiciones.
+    Las entradas pueden ser escalares o arrays: todas las filas se calculan a la vez
+    
+    El sistema memoriza los centroides ya calculados (_centroids) y todos los
+    hilos que usan la instancia comparten esa memoria. Rellenarla a la vez es
+    seguro: cada operación sobre el diccionario es atómica bajo el GIL y el valor
+    de una clave solo depende de la clave, así que dos hilos que calculan el mismo
+    centroide escriben el mismo valor, y vaciarla solo obliga a recalcular.
+    Las variables y reglas no deben modificarse mientras otros hilos calculan
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self.outputs = {}
+        self._compiled = None
+        self._centroids = {}
+    
+    def add_variable(self, variable):
+        super().add_variable(variable)
+        self._compiled = None
+    
+    def add_output(self, variable):
+        """Añade una variable de salida (consecuente de las reglas)"""
+        self.outputs[variable.name] = variable
+        self._compiled = None
+    
+    def add_rule(self, rule):
+        super().add_rule(rule)
+        self._compiled = None
+    
+    def _compile(self):
+        """
+        Muestrea las funciones de pertenencia y agrupa las reglas por salida
+        entradas: {variable: (puntos, {conjunto: pertenencias})}
+        salidas: {variable: (puntos, [(conjunto, pertenencias, [(antecedentes, operador)])])}
+        Solo los conjuntos de salida que aparecen en alguna regla
+        """
+        if self._compiled is not None:
+            return self._compiled
+        
+        inputs = {}
+        for name, variable in self.variables.items():
+            points = variable.points()
+            inputs[name] = (points, {
+                set_name: _sample(fuzzy_set.membership_function, points)
+                for set_name, fuzzy_set in variable.fuzzy_sets.items()
+            })
+        
+        outputs = {}
+        for name, variable in self.outputs.items():
+            points = variable.points()
+            terms = []
+            for set_name, fuzzy_set in variable.fuzzy_sets.items():
+                rules = [
+                    ([(var_name, set_) for var_name, set_, _ in rule.antecedents], rule.operator)
+                    for rule in self.rules
+                    if rule.consequent == (name, set_name) and rule.antecedents
+                ]
+                if rules:
+                    terms.append((set_name, _sample(fuzzy_set.membership_function, points), rules))
+            outputs[name] = (points, terms)
+        
+        self._compiled = (inputs, outputs)
+        self._centroids = {}
+        return self._compiled
+    
+    def fingerprint(self):
+        """Huella de los universos, funciones muestreadas y reglas"""
+        inputs, outputs = self._compile()
+        digest = hashlib.sha256()
+        for name, (points, mfs) in inputs.items():
+            digest.update(name.encode())
+            digest.update(points.tobytes())
+            for set_name, mf in mfs.items():
+                digest.update(set_name.encode())
+                digest.update(mf.tobytes())
+        for name, (points, terms) in outputs.items():
+            digest.update(name.encode())
+            digest.update(points.tobytes())
+            for set_name, mf, rules in terms:
+                digest.update(set_name.encode())
+                digest.update(mf.tobytes())
+                digest.update(repr(rules).encode())
+        return digest.hexdigest()
+    
+    def compute(self, inputs, outputs=None):
+        """
+        Calcula las salidas para entradas escalares o arrays
+        inputs: {variable: valor o array} (los arrays se difunden entre sí)
+        outputs: nombres de las salidas a calcular (por defecto todas)
+        Retorna {salida: array con la forma de las entradas}; NaN donde ninguna
+        regla activa la salida
+        """
+        compiled_inputs, compiled_outputs = self._compile()
+        names = list(self.outputs) if outputs is None else list(outputs)
+        
+        # Conjuntos de entrada que usan las reglas de estas salidas
+        needed = {
+            antecedent
+            for name in names
+            for _, _, rules in compiled_outputs[name][1]
+            for antecedents, _ in rules
+            for antecedent in antecedents
+        }
+        var_names = sorted({var_name for var_name, _ in needed})
+        values = []
+        for var_name in var_names:
+            value = np.asarray(inputs[var_name])
+            if value.dtype.kind not in 'biuf':
+                raise TypeError(f"Entrada no numérica para {var_name}: {inputs[var_name]!r}")
+            values.append(value)
+        values = np.broadcast_arrays(*values)
+        shape = values[0].shape if values else ()
+        flat = {var_name: value.reshape(-1) for var_name, value in zip(var_names, values)}
+        
+        # Fuzzificación: fuera del universo np.interp da el valor del extremo,
+        # igual que recortar la entrada al universo
+        memberships = {}
+        for var_name, set_name in needed:
+            points, mfs = compiled_inputs[var_name]
+            memberships[(var_name, set_name)] = np.interp(flat[var_name], points, mfs[set_name])
+        
+        results = {}
+        for name in names:
+            points, terms = compiled_outputs[name]
+            mfs, cuts = [], []
+            for _, mf, rules in terms:
+                cut = None
+                for antecedents, operator in rules:
+                    combine = np.fmax if operator == 'OR' else np.fmin
+                    activation = memberships[antecedents[0]]
+                    for antecedent in antecedents[1:]:
+                        activation = combine(activation, memberships[antecedent])
+                    cut = activation if cut is None else np.fmax(activation, cut)
+                mfs.append(mf)
+                cuts.append(cut)
+            if mfs:
+                results[name] = self._defuzzify(name, points, mfs, cuts).reshape(shape)
+            else:
+                results[name] = np.full(shape, np.nan)
+        return results
+    
+    def _defuzzify(self, name, points, mfs, cuts):
+        """
+        Centroide de cada fila a partir de los niveles de activación
+        Cada combinación distinta de niveles se calcula una sola vez, en bloques
+        de CENTROID_CHUNK filas, y se memoriza para las llamadas siguientes
+        (memoria compartida entre hilos, ver la clase)
+        """
+        levels = np.column_stack(cuts)
+        result = np.empty(len(levels))
+        cache = self._centroids
+        pending = {}
+        for row, key in enumerate(map(tuple, levels.tolist())):
+            value = cache.get((name, key))
+            if value is None:
+                pending.setdefault(key, []).append(row)
+            else:
+                result[row] = value
+        
+        if pending:
+            unique = np.array(list(pending))
+            values = np.concatenate([
+                mamdani_centroid(points, mfs, list(unique[start:start + CENTROID_CHUNK].T))
+                for start in range(0, len(unique), CENTROID_CHUNK)
+            ])
+            if len(cache) + len(pending) > CENTROID_CACHE_SIZE:
+                cache.clear()
+            for (key, rows), value in zip(pending.items(), values.tolist()):
+                cache[(name, key)] = value
+                result[rows] = value
+        return result
+
+
 def create_fuzzy_diagnosis_system():
     """
     Crea un sistema de inferencia difusa para diagnóstico odontológico
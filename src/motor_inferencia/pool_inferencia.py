@@ -0,0 +1,197 @@
+"""
+Pool de procesos de inferencia con motores precargados
+Cada proceso trabajador importa la base de reglas, construye su sistema fuzzy
+y crea su MotorDiagnostico una sola vez al arrancar (init_worker); las tareas
+solo envían bloques de diccionarios de síntomas y reciben los resultados, nunca
+el estado del motor. Con el método de arranque 'fork' el proceso principal
+construye antes la tabla de reglas y su índice, que los hijos heredan.
+
+Crear un pool no cambia el sistema fuzzy global del proceso principal (ni
+invalida sus cachés): con use_surface el archivo de la superficie se calcula o
+valida con un sistema propio, y cada hijo carga la superficie al arrancar.
+
+Los resultados se entregan en orden a medida que terminan los bloques, con un
+número limitado de bloques en vuelo: la memoria no depende del tamaño de la
+entrada.
+
+Ejemplo:
+    with InferencePool(processes=4, use_surface=True) as pool:
+        for resultado in pool.imap(pacientes):
+            ...
+"""
+
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from ..base_conocimiento.reglas_crisp import get_rule_index
+from ..base_conocimiento.reglas_difusas import (
+    FuzzyDiagnosisSystem,
+    configure_fuzzy_system,
+    ensure_fuzzy_surface,
+    get_fuzzy_system
+)
+from .cache import DiagnosisCache
+from .cache_persistente import PersistentDiagnosisCache
+from .diagnostico import MotorDiagnostico
+
+
+# Motor del proceso actual (trabajador del pool o proceso principal sin pool)
+_engine = None
+
+
+def preload(use_surface=False):
+    """
+    Construye la tabla de reglas, su índice y el sistema fuzzy del proceso actual
+    use_surface: activa la superficie si el sistema fuzzy global aún no la usa
+    """
+    get_rule_index()
+    if use_surface:
+        ensure_fuzzy_surface()
+    else:
+        get_fuzzy_system()
+
+
+def init_worker(use_surface=False, cache_entries=0, cache_path=None):
+    """
+    Inicializador de cada proceso: precarga el sistema y crea su MotorDiagnostico
+    (también se usa para ejecutar sin pool en el proceso actual)
+    """
+    global _engine
+    preload(use_surface)
+    if cache_path:
+        cache = PersistentDiagnosisCache(cache_path)
+    elif cache_entries:
+        cache = DiagnosisCache(cache_entries)
+    else:
+        cache = None
+    _engine = MotorDiagnostico(cache=cache)
+
+
+def _init_pool_worker(use_surface, cache_entries, cache_path):
+    """
+    Inicializador de los procesos del pool
+    Con 'fork' el hijo hereda el sistema fuzzy del padre; si no coincide con
+    use_surface se reemplaza (solo en el hijo)
+    """
+    if (get_fuzzy_system().surface is not None) != use_surface:
+        configure_fuzzy_system(use_surface=use_surface)
+    init_worker(use_surface, cache_entries, cache_path)
+
+
+def worker_engine():
+    """MotorDiagnostico del proceso actual (se crea sin caché si no hay ninguno)"""
+    if _engine is None:
+        init_worker()
+    return _engine
+
+
+def _diagnose_chunk(chunk, use_fuzzy, strategy):
+    """Tarea del pool: diagnostica un bloque de diccionarios de síntomas"""
+    engine = worker_engine()
+    return [engine.analyze(facts, use_fuzzy, strategy).data for facts in chunk]
+
+
+def _ping():
+    """Tarea vacía: obliga a arrancar (y precargar) un trabajador"""
+    return os.getpid()
+
+
+def chunked(items, size):
+    """Agrupa un iterable en listas de tamaño fijo"""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class InferencePool:
+    """
+    Pool de procesos con un MotorDiagnostico precargado por proceso
+    
+    Args:
+        processes: procesos trabajadores (None = número de CPUs; 0 = sin pool,
+                   en el proceso actual y con su sistema fuzzy global, al que
+                   use_surface solo activa la superficie si aún no la usa)
+        chunk_size: diagnósticos por tarea
+        use_surface: usar la superficie difusa precalculada
+        cache: entradas de la caché de diagnósticos de cada proceso (0 = sin caché)
+        cache_path: ruta de una caché persistente SQLite compartida entre procesos
+        start_method: 'fork', 'spawn' o 'forkserver' (None = el de la plataforma)
+    """
+    
+    def __init__(self, processes=None, chunk_size=256, use_surface=False, cache=0,
+                 cache_path=None, start_method=None):
+        self.processes = (os.cpu_count() or 1) if processes is None else processes
+        self.chunk_size = chunk_size
+        self.initargs = (use_surface, cache, cache_path)
+        self.executor = None
+        
+        if self.processes == 0:
+            init_worker(*self.initargs)
+            return
+        
+        context = multiprocessing.get_context(start_method)
+        if context.get_start_method() == 'fork':
+            # Los hijos heredan la tabla de reglas y su índice ya construidos
+            get_rule_index()
+        if use_surface:
+            # Calcular (o validar) el archivo de la superficie una vez antes de arrancar
+            # los procesos, con un sistema propio: el sistema fuzzy global no cambia
+            FuzzyDiagnosisSystem(use_surface=True)
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.processes, mp_context=context,
+            initializer=_init_pool_worker, initargs=self.initargs
+        )
+    
+    def warm(self):
+        """Arranca todos los trabajadores y espera a que terminen de precargar"""
+        if self.executor is not None:
+            futures = [self.executor.submit(_ping) for _ in range(2 * self.processes)]
+            for future in futures:
+                future.result()
+        return self
+    
+    def imap_chunks(self, func, chunks, *args):
+        """
+        Aplica func(bloque, *args) a cada bloque y entrega los resultados en orden
+        func debe ser una función de módulo (se envía por nombre a los procesos)
+        y puede usar worker_engine(); hay como máximo 2 bloques en vuelo por proceso
+        """
+        if self.executor is None:
+            for chunk in chunks:
+                yield func(chunk, *args)
+            return
+        
+        pending = deque()
+        for chunk in chunks:
+            pending.append(self.executor.submit(func, chunk, *args))
+            while pending and (len(pending) >= 2 * self.processes or pending[0].done()):
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    
+    def imap(self, facts_iterable, use_fuzzy=True, strategy='combine'):
+        """Diagnostica un flujo de diccionarios de síntomas; entrega los resultados en orden"""
+        chunks = chunked(facts_iterable, self.chunk_size)
+        for results in self.imap_chunks(_diagnose_chunk, chunks, use_fuzzy, strategy):
+            yield from results
+    
+    def diagnose_batch(self, facts_list, use_fuzzy=True, strategy='combine'):
+        """Lista de resultados (iguales a los de diagnose()) para una lista de pacientes"""
+        return list(self.imap(facts_list, use_fuzzy, strategy))
+    
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,155 @@
+"""
+Resultado de un diagnóstico
+Objeto autocontenido que guarda los síntomas evaluados y los diagnósticos, y
+deriva de ellos la explicación, la urgencia y el resumen sin depender del
+estado del motor que lo produjo
+"""
+
+
+# Síntomas numéricos que se destacan en la explicación (valor >= 5)
+KEY_NUMERIC_SYMPTOMS = [
+    'intensidad_dolor',
+    'sensibilidad_frio',
+    'sensibilidad_calor',
+    'dolor_masticar',
+    'inflamacion_encias'
+]
+
+URGENCY_MESSAGES = {
+    'urgente': '🚨 ATENCIÓN URGENTE REQUERIDA',
+    'alta': '⚠️ Consulte a un odontólogo pronto',
+    'moderada': '📅 Agende una cita odontológica',
+    'baja': 'ℹ️ Considere una evaluación odontológica'
+}
+
+
+class DiagnosisResult:
+    """
+    Resultado de MotorDiagnostico.analyze()
+    facts: copia de los síntomas evaluados
+    data: diccionario de resultado (el mismo que retorna diagnose())
+    """
+    
+    def __init__(self, facts, data):
+        self.facts = dict(facts)
+        self.data = data
+    
+    @property
+    def diagnosticos(self):
+        return self.data['diagnosticos']
+    
+    @property
+    def principal(self):
+        return self.data['principal']
+    
+    def key_symptoms(self):
+        """Identifica los síntomas más relevantes para el diagnóstico"""
+        key_symptoms = []
+        
+        if not self.facts:
+            return key_symptoms
+        
+        for symptom in KEY_NUMERIC_SYMPTOMS:
+            value = self.facts.get(symptom, 0)
+            if value >= 5:
+                key_symptoms.append({
+                    'sintoma': symptom,
+                    'valor': value,
+                    'relevancia': 'alta' if value >= 7 else 'media'
+                })
+        
+        # Síntomas categóricos importantes
+        if self.facts.get('caries_visible') == 'si':
+            key_symptoms.append({
+                'sintoma': 'caries_visible',
+                'valor': 'si',
+                'relevancia': 'alta'
+            })
+        
+        if self.facts.get('hinchazon_cara') == 'si':
+            key_symptoms.append({
+                'sintoma': 'hinchazon_cara',
+                'valor': 'si',
+                'relevancia': 'muy_alta'
+            })
+        
+        return key_symptoms
+    
+    def reasoning(self):
+        """Genera una explicación del razonamiento"""
+        results = self.diagnosticos
+        if not results:
+            return "No se pudo generar un diagnóstico con los síntomas proporcionados."
+        
+        principal = results[0]
+        
+        reasoning = f"Basándose en los síntomas reportados, el diagnóstico más probable es "
+        reasoning += f"{principal['nombre']} con una confianza del {principal['confianza_porcentaje']}%. "
+        reasoning += f"\n\nEsto se determinó mediante {principal['regla']}. "
+        reasoning += f"\n\nDescripción: {principal['descripcion']}"
+        
+        if len(results) > 1:
+            reasoning += f"\n\nOtros diagnósticos posibles incluyen: "
+            otros = [r['nombre'] for r in results[1:3]]
+            reasoning += ", ".join(otros)
+        
+        return reasoning
+    
+    def explanation(self):
+        """Explicación del proceso de diagnóstico"""
+        if not self.facts or not self.diagnosticos:
+            return "No hay diagnóstico previo para explicar."
+        
+        return {
+            'sintomas_clave': self.key_symptoms(),
+            'reglas_aplicadas': [r['regla'] for r in self.diagnosticos],
+            'razonamiento': self.reasoning()
+        }
+    
+    def urgency(self):
+        """Nivel de urgencia más alto entre los diagnósticos"""
+        if not self.diagnosticos:
+            return 'desconocida'
+        
+        urgencias = [r['urgencia'] for r in self.diagnosticos]
+        
+        if 'urgente' in urgencias:
+            return 'urgente'
+        elif 'alta' in urgencias:
+            return 'alta'
+        elif 'moderada' in urgencias:
+            return 'moderada'
+        else:
+            return 'baja'
+    
+    def summary(self):
+        """Resumen del diagnóstico"""
+        results = self.diagnosticos
+        if not results:
+            return {
+                'tiene_diagnostico': False,
+                'mensaje': 'No se pudo determinar un diagnóstico con los síntomas proporcionados.'
+            }
+        
+        principal = results[0]
+        urgencia = self.urgency()
+        
+        return {
+            'tiene_diagnostico': True,
+            'diagnostico_principal': principal['nombre'],
+            'confianza': principal['confianza_porcentaje'],
+            'descripcion': principal['descripcion'],
+            'urgencia': urgencia,
+            'mensaje_urgencia': URGENCY_MESSAGES.get(urgencia, ''),
+            'num_diagnosticos_alternativos': len(results) - 1,
+            'recomendaciones_principales': principal['recomendaciones'][:3]
+        }
+    
+    def to_dict(self):
+        """Resultado completo: diagnósticos, explicación, urgencia y resumen"""
+        data = dict(self.data)
+        data['sintomas'] = dict(self.facts)
+        data['explicacion'] = self.explanation()
+        data['urgencia'] = self.urgency()
+        data['resumen'] = self.summary()
+        return data
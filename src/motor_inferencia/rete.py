@@ -0,0 +1,197 @@
+"""
+Motor de Inferencia - Red de discriminación estilo Rete
+Comparte las pruebas repetidas entre reglas y solo re-evalúa lo que cambia
+"""
+
+from collections import defaultdict
+
+from ..base_conocimiento.reglas_crisp import is_declarative
+from .encadenamiento_adelante import ForwardChainingEngine
+
+
+class AlphaNode:
+    """
+    Nodo alfa: una prueba sobre los hechos compartida por varias reglas
+    Guarda en su memoria si la prueba se cumple para los hechos actuales
+    """
+    
+    def __init__(self, condition):
+        self.condition = condition
+        self.rules = []  # Índices de las reglas que usan esta prueba
+        self.satisfied = False
+    
+    def test(self, facts):
+        """Evalúa la prueba; una condición que falla con excepción no se cumple"""
+        try:
+            return bool(self.condition(facts))
+        except Exception as e:
+            print(f"Error al evaluar condición {self.condition!r}: {e}")
+            return False
+
+
+class ReteNetwork:
+    """
+    Red alfa/beta construida a partir de una tabla de reglas
+    - Red alfa: una prueba única por condición distinta, indexada por campo
+    - Red beta: por regla, el número de pruebas alfa que se cumplen
+    """
+    
+    def __init__(self, rules):
+        self.rules = rules
+        self.alpha_nodes = []
+        self.alpha_by_field = defaultdict(list)  # campo -> nodos alfa que lo leen
+        self.opaque_alphas = []  # funciones opacas: dependen de cualquier campo
+        self.rule_alphas = []  # por regla, índices de sus nodos alfa
+        self.condition_alphas = []  # por regla, nodo alfa de cada condición (en su orden)
+        
+        alpha_index = {}
+        for rule_index, rule in enumerate(rules):
+            alphas = []
+            condition_alphas = []
+            for condition in rule.conditions:
+                key = condition.key if is_declarative(condition) else ('opaque', id(condition))
+                if key not in alpha_index:
+                    node_index = len(self.alpha_nodes)
+                    alpha_index[key] = node_index
+                    self.alpha_nodes.append(AlphaNode(condition))
+                    if is_declarative(condition):
+                        for field in condition.fields:
+                            self.alpha_by_field[field].append(node_index)
+                    else:
+                        self.opaque_alphas.append(node_index)
+                node_index = alpha_index[key]
+                condition_alphas.append(node_index)
+                # Una condición repetida dentro de la misma regla cuenta una sola vez
+                if node_index not in alphas:
+                    alphas.append(node_index)
+                    self.alpha_nodes[node_index].rules.append(rule_index)
+            self.rule_alphas.append(tuple(alphas))
+            self.condition_alphas.append(tuple(condition_alphas))
+        
+        self.rule_sizes = [len(alphas) for alphas in self.rule_alphas]
+        self.reset()
+    
+    def reset(self):
+        """Vacía las memorias alfa y beta"""
+        for node in self.alpha_nodes:
+            node.satisfied = False
+        self.beta_counts = [0] * len(self.rules)
+        # Reglas sin condiciones siempre se cumplen
+        self.matched = {i for i, size in enumerate(self.rule_sizes) if size == 0}
+        self.primed = False
+    
+    def _update_alpha(self, node_index, facts, changed_rules):
+        """Re-evalúa un nodo alfa y propaga el cambio a la red beta"""
+        node = self.alpha_nodes[node_index]
+        satisfied = node.test(facts)
+        if satisfied == node.satisfied:
+            return
+        node.satisfied = satisfied
+        delta = 1 if satisfied else -1
+        for rule_index in node.rules:
+            self.beta_counts[rule_index] += delta
+            changed_rules.add(rule_index)
+    
+    def update(self, facts, changed_fields=None):
+        """
+        Propaga los hechos por la red
+        changed_fields: campos modificados desde la última propagación
+        (None re-evalúa todos los nodos alfa)
+        Retorna el conjunto de reglas cuyas memorias beta cambiaron
+        """
+        changed_rules = set()
+        
+        if changed_fields is None or not self.primed:
+            node_indices = range(len(self.alpha_nodes))
+        else:
+            if not changed_fields:
+                return changed_rules
+            node_indices = set(self.opaque_alphas)
+            for field in changed_fields:
+                node_indices.update(self.alpha_by_field.get(field, ()))
+        
+        for node_index in node_indices:
+            self._update_alpha(node_index, facts, changed_rules)
+        self.primed = True
+        
+        # Solo las reglas afectadas se vuelven a comprobar
+        for rule_index in changed_rules:
+            if self.beta_counts[rule_index] == self.rule_sizes[rule_index]:
+                self.matched.add(rule_index)
+            else:
+                self.matched.discard(rule_index)
+        
+        return changed_rules
+    
+    def matched_rules(self):
+        """Índices de las reglas cuyas condiciones se cumplen, en orden de la tabla"""
+        return sorted(self.matched)
+
+
+class ReteEngine(ForwardChainingEngine):
+    """
+    Motor de encadenamiento hacia adelante basado en una red Rete
+    Mantiene el contrato run(facts) / explain_reasoning() del motor lineal
+    Entre llamadas consecutivas, y al derivar hechos nuevos, solo re-evalúa
+    las pruebas de los campos que cambiaron
+    """
+    
+    def __init__(self, rules, max_iterations=None):
+        super().__init__(rules, max_iterations)
+        self.network = ReteNetwork(self.rules)
+    
+    def _changed_fields(self, previous, facts):
+        """Campos cuyo valor difiere entre dos conjuntos de hechos"""
+        changed = set()
+        for field in previous.keys() | facts.keys():
+            if field not in previous or field not in facts or previous[field] != facts[field]:
+                changed.add(field)
+        return changed
+    
+    def run(self, facts):
+        """
+        Ejecuta el motor de inferencia con los hechos proporcionados
+        Retorna: lista de conclusiones alcanzadas
+        """
+        previous = self.working_memory
+        self.reset()
+        self.add_facts(facts)
+        self.network.update(self.working_memory, self._changed_fields(previous, self.working_memory))
+        return self.chain()
+    
+    def initial_agenda(self):
+        """Solo las reglas cuyas memorias beta están completas entran en la agenda"""
+        return self.network.matched_rules()
+    
+    def matches(self, index):
+        """Consulta la memoria beta en lugar de re-evaluar las condiciones"""
+        return index in self.network.matched
+    
+    def counting_matcher(self, statistics):
+        """
+        Equivalente a matches() que además cuenta la regla en el recolector de
+        estadísticas sin re-evaluarla: si no se cumple, se detiene en la primera
+        condición cuyo nodo alfa no se cumple (no hay tiempos por regla)
+        """
+        (_, stops, _, totals), _ = statistics.chain_counters(self)
+        network = self.network
+        nodes = network.alpha_nodes
+        
+        def match(index):
+            alphas = network.condition_alphas[index]
+            if index in network.matched:
+                stops[index][len(alphas)] += 1
+                return True
+            for position, node_index in enumerate(alphas):
+                if not nodes[node_index].satisfied:
+                    break
+            stops[index][position] += 1
+            return False
+        return match, totals
+    
+    def assert_fact(self, fact, value):
+        """Añade un hecho derivado y lo propaga por la red"""
+        if not super().assert_fact(fact, value):
+            return False
+        self.network.update(self.working_memory, (fact,))
+        return True
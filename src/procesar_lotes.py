@@ -0,0 +1,292 @@
+"""
+Procesamiento por lotes de archivos de síntomas
+Lee registros de un archivo JSONL o CSV como flujo, los diagnostica con
+MotorDiagnostico y escribe los resultados a medida que se obtienen.
+La memoria usada no depende del tamaño del archivo.
+
+Uso:
+    python -m src.procesar_lotes entrada.jsonl salida.jsonl
+    python -m src.procesar_lotes entrada.csv salida.csv --procesos 4
+    cat entrada.jsonl | python -m src.procesar_lotes - - > salida.jsonl
+
+Cada registro JSONL es un objeto con los síntomas (misma forma que
+PanelSintomas.get_symptoms()); en CSV cada columna es un síntoma y las
+celdas vacías se omiten. La columna/clave de identificación (--campo-id)
+se copia a la salida y no se pasa al motor.
+"""
+
+import argparse
+import csv
+import io
+import json
+import sys
+import time
+from itertools import islice
+
+from .base_conocimiento.hechos import SINTOMAS
+from .motor_inferencia.pool_inferencia import InferencePool, worker_engine
+
+
+COLUMNAS_CSV = [
+    'registro', 'id', 'diagnostico', 'nombre', 'confianza', 'urgencia',
+    'num_diagnosticos', 'error'
+]
+
+
+# --- Lectura ---------------------------------------------------------------
+
+def convertir_valor(campo, valor):
+    """Convierte una celda CSV al tipo del síntoma (escalas numéricas)"""
+    if isinstance(SINTOMAS.get(campo), tuple):
+        numero = float(valor)
+        return int(numero) if numero.is_integer() else numero
+    return valor
+
+
+def leer_jsonl(archivo):
+    """Genera (registro, error) por cada línea no vacía de un archivo JSONL"""
+    for linea in archivo:
+        linea = linea.strip()
+        if not linea:
+            continue
+        try:
+            registro = json.loads(linea)
+        except ValueError as e:
+            yield None, f"JSON inválido: {e}"
+            continue
+        if not isinstance(registro, dict):
+            yield None, "El registro no es un objeto JSON"
+        else:
+            yield registro, None
+
+
+def leer_csv(archivo):
+    """
+    Genera (registro, error) por cada fila de un archivo CSV con cabecera
+    Si una celda numérica no es válida se genera la fila sin convertir junto
+    al error, para que la salida conserve su identificación
+    """
+    for fila in csv.DictReader(archivo):
+        celdas = {
+            campo: valor.strip()
+            for campo, valor in fila.items()
+            if campo and valor is not None and valor.strip() != ''
+        }
+        try:
+            registro = {campo: convertir_valor(campo, valor) for campo, valor in celdas.items()}
+        except ValueError as e:
+            yield celdas, f"Valor numérico inválido: {e}"
+            continue
+        yield registro, None
+
+
+LECTORES = {'jsonl': leer_jsonl, 'csv': leer_csv}
+
+
+# --- Diagnóstico -------------------------------------------------------------
+
+def formatear(numero, id_registro, resultado, error, formato):
+    """Convierte el resultado de un registro en una línea de salida"""
+    if formato == 'jsonl':
+        salida = {'registro': numero}
+        if id_registro is not None:
+            salida['id'] = id_registro
+        if error:
+            salida['error'] = error
+        else:
+            salida['resultado'] = resultado
+        return json.dumps(salida, ensure_ascii=False) + '\n'
+    
+    principal = resultado['principal'] if resultado else None
+    texto = io.StringIO()
+    csv.writer(texto, lineterminator='\n').writerow([
+        numero,
+        '' if id_registro is None else id_registro,
+        principal['diagnostico'] if principal else '',
+        principal['nombre'] if principal else '',
+        principal['confianza'] if principal else '',
+        principal['urgencia'] if principal else '',
+        resultado['num_diagnosticos'] if resultado else '',
+        error or ''
+    ])
+    return texto.getvalue()
+
+
+def procesar_bloque(bloque, campo_id, use_fuzzy, strategy, formato):
+    """
+    Diagnostica un bloque de registros [(número, registro, error), ...]
+    Los registros con error no se diagnostican pero conservan su identificación
+    Retorna (líneas de salida, número de errores)
+    """
+    lineas = []
+    errores = 0
+    for numero, registro, error in bloque:
+        id_registro = None
+        resultado = None
+        if registro is not None:
+            sintomas = dict(registro)
+            id_registro = sintomas.pop(campo_id, None)
+        if error is None:
+            try:
+                resultado = worker_engine().analyze(sintomas, use_fuzzy=use_fuzzy, strategy=strategy).data
+            except Exception as e:
+                error = f"Error en diagnóstico: {e}"
+        if error:
+            errores += 1
+        lineas.append(formatear(numero, id_registro, resultado, error, formato))
+    return lineas, errores
+
+
+# --- Flujo principal ---------------------------------------------------------
+
+def bloques(registros, tamano):
+    """Agrupa el flujo de registros numerados en bloques de tamaño fijo"""
+    numerados = ((numero, registro, error) for numero, (registro, error) in enumerate(registros, 1))
+    while True:
+        bloque = list(islice(numerados, tamano))
+        if not bloque:
+            return
+        yield bloque
+
+
+class Progreso:
+    """Informa del avance por stderr como máximo una vez por intervalo"""
+    
+    def __init__(self, intervalo, salida=sys.stderr):
+        self.intervalo = intervalo
+        self.salida = salida
+        self.inicio = time.perf_counter()
+        self.ultimo = self.inicio
+        self.registros = 0
+        self.errores = 0
+    
+    def update(self, registros, errores):
+        self.registros += registros
+        self.errores += errores
+        ahora = time.perf_counter()
+        if self.intervalo and ahora - self.ultimo >= self.intervalo:
+            self.ultimo = ahora
+            print(f"  {self.registros} registros ({self.tasa():.0f}/s), {self.errores} errores",
+                  file=self.salida, flush=True)
+    
+    def segundos(self):
+        return time.perf_counter() - self.inicio
+    
+    def tasa(self):
+        segundos = self.segundos()
+        return self.registros / segundos if segundos else 0.0
+
+
+def procesar(entrada, salida, formato_entrada, formato_salida, campo_id='id', use_fuzzy=True,
+             strategy='combine', procesos=1, tamano_bloque=256, use_surface=False, cache=0,
+             cache_disco=None, progreso=None):
+    """
+    Diagnostica todos los registros de entrada y escribe los resultados en orden
+    Con procesos > 1 reparte bloques entre un InferencePool (motores precargados)
+    manteniendo como máximo 2 bloques en vuelo por proceso
+    cache: entradas de la caché de diagnósticos de cada proceso (0 = sin caché)
+    cache_disco: ruta de una caché persistente SQLite compartida por todos los procesos
+    Retorna el objeto Progreso con los totales
+    """
+    if tamano_bloque < 1:
+        raise ValueError("El tamaño de bloque debe ser al menos 1")
+    if procesos < 0:
+        raise ValueError("El número de procesos no puede ser negativo")
+    progreso = progreso or Progreso(0)
+    registros = LECTORES[formato_entrada](entrada)
+    argumentos = (campo_id, use_fuzzy, strategy, formato_salida)
+    
+    if formato_salida == 'csv':
+        csv.writer(salida, lineterminator='\n').writerow(COLUMNAS_CSV)
+    
+    def escribir(lineas, errores, tamano):
+        salida.writelines(lineas)
+        progreso.update(tamano, errores)
+    
+    # Sin pool (procesos <= 1) se diagnostica en el proceso actual
+    with InferencePool(processes=procesos if procesos > 1 else 0, use_surface=use_surface,
+                       cache=cache, cache_path=cache_disco) as pool:
+        for lineas, errores in pool.imap_chunks(procesar_bloque, bloques(registros, tamano_bloque), *argumentos):
+            escribir(lineas, errores, len(lineas))  # Una línea por registro
+    return progreso
+
+
+def entero_minimo(minimo):
+    """Tipo de argparse: entero mayor o igual que minimo"""
+    def convertir(texto):
+        try:
+            valor = int(texto)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"'{texto}' no es un entero")
+        if valor < minimo:
+            raise argparse.ArgumentTypeError(f"debe ser un entero >= {minimo}")
+        return valor
+    return convertir
+
+
+def detectar_formato(ruta, formato):
+    """Formato explícito o deducido de la extensión del archivo"""
+    if formato:
+        return formato
+    if ruta.lower().endswith('.csv'):
+        return 'csv'
+    return 'jsonl'
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Diagnóstico por lotes de archivos JSONL/CSV",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('entrada', help="Archivo de entrada ('-' para stdin)")
+    parser.add_argument('salida', help="Archivo de salida ('-' para stdout)")
+    parser.add_argument('--formato-entrada', choices=sorted(LECTORES), default=None)
+    parser.add_argument('--formato-salida', choices=('csv', 'jsonl'), default=None)
+    parser.add_argument('--campo-id', default='id', help='Campo de identificación del registro')
+    parser.add_argument('--sin-fuzzy', action='store_true', help='Desactiva la lógica difusa')
+    parser.add_argument('--estrategia', choices=('combine', 'highest', 'specific', 'recent'),
+                        default='combine')
+    parser.add_argument('--procesos', type=entero_minimo(0), default=1,
+                        help='Procesos trabajadores (0 o 1 = sin pool)')
+    parser.add_argument('--tamano-bloque', type=entero_minimo(1), default=256, help='Registros por bloque')
+    parser.add_argument('--superficie', action='store_true', help='Usa la superficie difusa precalculada')
+    parser.add_argument('--cache', type=int, default=0,
+                        help='Entradas de la caché de diagnósticos por proceso (0 = sin caché)')
+    parser.add_argument('--cache-disco', default=None, metavar='RUTA',
+                        help='Caché persistente SQLite compartida entre procesos y ejecuciones')
+    parser.add_argument('--progreso', type=float, default=5.0,
+                        help='Segundos entre informes de progreso (0 = sin informes)')
+    args = parser.parse_args()
+    
+    formato_entrada = detectar_formato(args.entrada, args.formato_entrada)
+    formato_salida = detectar_formato(args.salida, args.formato_salida)
+    
+    entrada = sys.stdin if args.entrada == '-' else open(args.entrada, encoding='utf-8', newline='')
+    salida = sys.stdout if args.salida == '-' else open(args.salida, 'w', encoding='utf-8', newline='')
+    
+    try:
+        progreso = procesar(
+            entrada, salida, formato_entrada, formato_salida,
+            campo_id=args.campo_id,
+            use_fuzzy=not args.sin_fuzzy,
+            strategy=args.estrategia,
+            procesos=args.procesos,
+            tamano_bloque=args.tamano_bloque,
+            use_surface=args.superficie,
+            cache=args.cache,
+            cache_disco=args.cache_disco,
+            progreso=Progreso(args.progreso)
+        )
+    finally:
+        if entrada is not sys.stdin:
+            entrada.close()
+        if salida is not sys.stdout:
+            salida.close()
+    
+    print(f"Procesados {progreso.registros} registros en {progreso.segundos():.2f} s "
+          f"({progreso.tasa():.1f} registros/s), {progreso.errores} errores", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+"""
+Módulo de servicio - Diagnóstico por HTTP sin interfaz gráfica
+"""
+
+from .servidor import (
+    ServidorDiagnostico,
+    MetricasServicio,
+    validar_sintomas,
+    main
+)
+from .asincrono import DiagnosticoAsincrono
+
+__all__ = [
+    'ServidorDiagnostico',
+    'MetricasServicio',
+    'validar_sintomas',
+    'DiagnosticoAsincrono',
+    'main'
+]
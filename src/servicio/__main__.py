@@ -0,0 +1,8 @@
+"""
+Punto de entrada del servicio: python -m src.servicio
+"""
+
+from .servidor import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+API asyncio de diagnóstico y reportes
+Versiones async de MotorDiagnostico.analyze/diagnose y de
+GeneradorReportes.generate_report para aplicaciones asyncio. El trabajo de CPU
+(inferencia y dibujo del PDF con reportlab) se ejecuta en un pool gestionado
+de hilos o de procesos, así el bucle de eventos sigue atendiendo otras tareas.
+
+Cada operación respeta un límite de concurrencia (semáforo), un tiempo máximo
+opcional (que incluye la espera de una plaza) y la cancelación de la tarea que
+la espera. Si la tarea se cancela o expira antes de que el trabajo empiece, éste
+se retira del pool y la plaza se libera de inmediato; un trabajo ya en ejecución
+termina en segundo plano (un hilo o proceso no puede interrumpirse a mitad de la
+inferencia) y conserva su plaza hasta entonces, así el pool nunca tiene más
+trabajos en curso que el límite.
+
+Ejemplo:
+    async with DiagnosticoAsincrono(trabajadores=4, max_concurrencia=16) as servicio:
+        analisis = await servicio.analyze(sintomas, timeout=5)
+        await servicio.generate_report('Paciente', sintomas, analisis.data, 'reporte.pdf')
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from ..base_conocimiento.reglas_difusas import FuzzyDiagnosisSystem, ensure_fuzzy_surface
+from ..motor_inferencia import DiagnosisResult
+from .trabajadores import EstadoDiagnostico, diagnosticar_en_proceso, iniciar_proceso
+
+
+# --- Trabajadores ---------------------------------------------------------
+# GeneradorReportes se crea una vez por hilo o proceso (carga reportlab en el
+# primer reporte)
+
+_reportes = threading.local()
+
+
+def _generar_reporte(patient_name, symptoms, diagnosis, output_path, patient_info):
+    """Tarea ejecutada en el pool"""
+    generador = getattr(_reportes, 'generador', None)
+    if generador is None:
+        from ..utilidades.generador_reportes import GeneradorReportes
+        generador = GeneradorReportes()
+        _reportes.generador = generador
+    generador.generate_report(patient_name, symptoms, diagnosis, output_path, patient_info)
+    return output_path
+
+
+def _liberar(loop, semaforo):
+    """Libera la plaza de un trabajo abandonado al terminar (desde el hilo del pool)"""
+    try:
+        loop.call_soon_threadsafe(semaforo.release)
+    except RuntimeError:
+        pass  # el bucle ya se cerró
+
+
+class DiagnosticoAsincrono:
+    """
+    Fachada asyncio sobre un pool de diagnóstico
+    
+    Args:
+        trabajadores: tamaño del pool
+        modo: 'hilos' (un motor sin estado propio de esta fachada, compartido por sus
+              hilos) o 'procesos' (un motor por proceso; la inferencia no compite con
+              el bucle de eventos por el GIL)
+        max_concurrencia: diagnósticos admitidos a la vez; el resto espera su turno
+                          (None = 2 por trabajador)
+        max_reportes: reportes PDF admitidos a la vez (None = uno por trabajador)
+        timeout: segundos máximos por operación por defecto (None = sin límite)
+        use_surface: usar la superficie difusa precalculada
+        cache: entradas de la caché de diagnósticos (0 = sin caché; una por proceso)
+        cache_disco: ruta de una caché persistente SQLite compartida
+    """
+    
+    def __init__(self, trabajadores=4, modo='hilos', max_concurrencia=None, max_reportes=None,
+                 timeout=None, use_surface=False, cache=0, cache_disco=None):
+        if modo not in ('hilos', 'procesos'):
+            raise ValueError(f"Modo de pool desconocido: {modo}")
+        self.modo = modo
+        self.trabajadores = trabajadores
+        self.timeout = timeout
+        self.max_concurrencia = max_concurrencia or 2 * trabajadores
+        self.max_reportes = max_reportes or trabajadores
+        self._diagnosticos = asyncio.Semaphore(self.max_concurrencia)
+        self._reportes = asyncio.Semaphore(self.max_reportes)
+        self.contadores = {'completados': 0, 'cancelados': 0, 'expirados': 0, 'errores': 0}
+        
+        if modo == 'procesos':
+            if use_surface:
+                # Calcular (o validar) la superficie una vez antes de arrancar los procesos,
+                # con un sistema propio: el sistema fuzzy global no cambia
+                FuzzyDiagnosisSystem(use_surface=True)
+            self.cache = None
+            self._tarea = diagnosticar_en_proceso
+            self.pool = ProcessPoolExecutor(
+                max_workers=trabajadores, initializer=iniciar_proceso,
+                initargs=(use_surface, cache, cache_disco)
+            )
+        else:
+            if use_surface:
+                ensure_fuzzy_surface()
+            # Motor y caché propios: no comparten configuración con otros servicios
+            estado = EstadoDiagnostico(cache, cache_disco)
+            self.cache = estado.cache
+            self._tarea = estado.diagnosticar
+            self.pool = ThreadPoolExecutor(max_workers=trabajadores, thread_name_prefix='diagnostico-async')
+    
+    async def _ejecutar(self, semaforo, timeout, func, *args):
+        """
+        Ejecuta func en el pool respetando el semáforo, el tiempo máximo y la cancelación
+        El tiempo máximo cubre la espera de la plaza y la ejecución. La plaza se
+        retiene hasta que el trabajo termina de verdad en el pool
+        """
+        if timeout is None:
+            timeout = self.timeout
+        loop = asyncio.get_running_loop()
+        try:
+            async with asyncio.timeout(timeout):
+                await semaforo.acquire()
+                trabajo = None
+                try:
+                    trabajo = self.pool.submit(func, *args)
+                    # Cancelar la espera cancela también el trabajo si aún no empezó
+                    resultado = await asyncio.wrap_future(trabajo)
+                finally:
+                    # cancel() solo retira un trabajo que aún no ha empezado
+                    if trabajo is None or trabajo.cancel() or trabajo.done():
+                        semaforo.release()
+                    else:
+                        # Ya está en ejecución: la plaza se libera cuando termine
+                        trabajo.add_done_callback(lambda _: _liberar(loop, semaforo))
+        except asyncio.TimeoutError:
+            self.contadores['expirados'] += 1
+            raise
+        except asyncio.CancelledError:
+            self.contadores['cancelados'] += 1
+            raise
+        except Exception:
+            self.contadores['errores'] += 1
+            raise
+        self.contadores['completados'] += 1
+        return resultado
+    
+    async def analyze(self, facts, use_fuzzy=True, strategy='combine', timeout=None):
+        """Versión async de MotorDiagnostico.analyze(): retorna un DiagnosisResult"""
+        data = await self._ejecutar(self._diagnosticos, timeout, self._tarea, facts, use_fuzzy, strategy)
+        return DiagnosisResult(facts, data)
+    
+    async def diagnose(self, facts, use_fuzzy=True, strategy='combine', timeout=None):
+        """Versión async de MotorDiagnostico.diagnose(): retorna el diccionario de resultado"""
+        return await self._ejecutar(self._diagnosticos, timeout, self._tarea, facts, use_fuzzy, strategy)
+    
+    async def diagnose_many(self, facts_list, use_fuzzy=True, strategy='combine', timeout=None):
+        """
+        Diagnostica varios pacientes a la vez (limitados por max_concurrencia)
+        Retorna los resultados en el mismo orden; una excepción cancela el resto
+        """
+        tareas = [
+            asyncio.ensure_future(self.diagnose(facts, use_fuzzy, strategy, timeout))
+            for facts in facts_list
+        ]
+        try:
+            return await asyncio.gather(*tareas)
+        except BaseException:
+            for tarea in tareas:
+                tarea.cancel()
+            raise
+    
+    async def generate_report(self, patient_name, symptoms, diagnosis, output_path,
+                              patient_info=None, timeout=None):
+        """Versión async de GeneradorReportes.generate_report(): retorna output_path"""
+        return await self._ejecutar(
+            self._reportes, timeout, _generar_reporte,
+            patient_name, symptoms, diagnosis, output_path, patient_info
+        )
+    
+    async def aclose(self):
+        """Espera a que terminen los trabajos en curso y cierra el pool sin bloquear el bucle"""
+        await asyncio.get_running_loop().run_in_executor(None, self.pool.shutdown, True)
+    
+    def close(self):
+        self.pool.shutdown(wait=True)
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
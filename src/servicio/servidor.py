@@ -0,0 +1,371 @@
+"""
+Servidor HTTP de diagnóstico
+Expone MotorDiagnostico sin la interfaz Tkinter, usando solo la biblioteca estándar
+
+Endpoints:
+- POST /diagnostico   cuerpo JSON con los síntomas (misma forma que PanelSintomas.get_symptoms())
+                      parámetros opcionales: ?fuzzy=0 y ?estrategia=combine|highest|specific|recent
+                      retorna el diccionario de diagnose()
+- GET  /health        estado del servicio
+- GET  /metrics       contadores y latencias en formato de texto de Prometheus
+                      (con --perfilado, también un histograma por etapa del diagnóstico)
+
+Los diagnósticos se ejecutan en un pool configurable de hilos o de procesos;
+los hilos HTTP solo reciben la petición y esperan el resultado.
+"""
+
+import argparse
+import json
+import math
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, TimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from ..base_conocimiento.hechos import SINTOMAS
+from ..base_conocimiento.reglas_difusas import FuzzyDiagnosisSystem, ensure_fuzzy_surface
+from ..utilidades.instrumentacion import enable_profiling
+from .trabajadores import EstadoDiagnostico, diagnosticar_en_proceso, iniciar_proceso
+
+
+ESTRATEGIAS = ('combine', 'highest', 'specific', 'recent')
+
+RUTAS = ('/diagnostico', '/health', '/metrics')
+
+# Tamaño máximo del cuerpo de una petición
+MAX_CUERPO = 64 * 1024
+
+
+def validar_sintomas(sintomas):
+    """
+    Comprueba que el cuerpo de la petición tenga la forma de get_symptoms()
+    Retorna un mensaje de error o None si es válido
+    """
+    if not isinstance(sintomas, dict):
+        return "El cuerpo debe ser un objeto JSON con los síntomas"
+    for campo, valor in sintomas.items():
+        # json.loads acepta NaN e Infinity
+        if isinstance(valor, float) and not math.isfinite(valor):
+            return f"El síntoma '{campo}' debe ser un número finito"
+        dominio = SINTOMAS.get(campo)
+        if isinstance(dominio, tuple):
+            if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+                return f"El síntoma '{campo}' debe ser numérico"
+            minimo, maximo = dominio
+            if not minimo <= valor <= maximo:
+                return f"El síntoma '{campo}' debe estar entre {minimo} y {maximo}"
+        elif not isinstance(valor, (str, int, float)) or isinstance(valor, bool):
+            return f"Valor inválido para el síntoma '{campo}'"
+    return None
+
+
+class MetricasServicio:
+    """Contadores del servicio, seguros entre hilos"""
+    
+    def __init__(self, cache=None, perfilador=None):
+        self._lock = threading.Lock()
+        self.cache = cache
+        self.perfilador = perfilador
+        self.inicio = time.time()
+        self.peticiones = {}  # (ruta, código) -> número de peticiones
+        self.diagnosticos = 0
+        self.segundos_diagnostico = 0.0
+        self.en_curso = 0
+    
+    def registrar(self, ruta, codigo):
+        with self._lock:
+            clave = (ruta, codigo)
+            self.peticiones[clave] = self.peticiones.get(clave, 0) + 1
+    
+    def comenzar_diagnostico(self):
+        with self._lock:
+            self.en_curso += 1
+    
+    def terminar_diagnostico(self, segundos):
+        with self._lock:
+            self.en_curso -= 1
+            self.diagnosticos += 1
+            self.segundos_diagnostico += segundos
+    
+    def to_prometheus(self):
+        """Exporta las métricas en formato de texto de Prometheus"""
+        with self._lock:
+            peticiones = sorted(self.peticiones.items())
+            diagnosticos = self.diagnosticos
+            segundos = self.segundos_diagnostico
+            en_curso = self.en_curso
+        
+        lineas = [
+            '# HELP odontologia_uptime_seconds Tiempo desde el arranque del servicio',
+            '# TYPE odontologia_uptime_seconds gauge',
+            f'odontologia_uptime_seconds {time.time() - self.inicio:.3f}',
+            '# HELP odontologia_http_requests_total Peticiones HTTP por ruta y código',
+            '# TYPE odontologia_http_requests_total counter'
+        ]
+        for (ruta, codigo), total in peticiones:
+            lineas.append(f'odontologia_http_requests_total{{path="{ruta}",code="{codigo}"}} {total}')
+        lineas += [
+            '# HELP odontologia_diagnosis_seconds Tiempo de diagnóstico (cola del pool incluida)',
+            '# TYPE odontologia_diagnosis_seconds summary',
+            f'odontologia_diagnosis_seconds_count {diagnosticos}',
+            f'odontologia_diagnosis_seconds_sum {segundos:.6f}',
+            '# HELP odontologia_diagnosis_in_flight Diagnósticos en curso',
+            '# TYPE odontologia_diagnosis_in_flight gauge',
+            f'odontologia_diagnosis_in_flight {en_curso}'
+        ]
+        if self.cache is not None:
+            stats = self.cache.stats()
+            lineas += [
+                '# HELP odontologia_cache_events_total Consultas a la caché de diagnósticos',
+                '# TYPE odontologia_cache_events_total counter',
+                f'odontologia_cache_events_total{{event="hit"}} {stats["aciertos"]}',
+                f'odontologia_cache_events_total{{event="miss"}} {stats["fallos"]}',
+                f'odontologia_cache_events_total{{event="eviction"}} {stats["desalojos"]}',
+                f'odontologia_cache_events_total{{event="invalidation"}} {stats.get("invalidaciones", 0)}',
+                '# HELP odontologia_cache_entries Entradas en la caché de diagnósticos',
+                '# TYPE odontologia_cache_entries gauge',
+                f'odontologia_cache_entries {stats["entradas"]}'
+            ]
+        texto = '\n'.join(lineas) + '\n'
+        if self.perfilador is not None:
+            texto += self.perfilador.to_prometheus()
+        return texto
+
+
+class ServidorDiagnostico:
+    """
+    Servicio HTTP de diagnóstico
+    
+    Args:
+        host, port: dirección de escucha (port=0 elige un puerto libre)
+        trabajadores: tamaño del pool de diagnóstico
+        modo: 'hilos' o 'procesos'
+        use_surface: usar la superficie difusa precalculada
+        timeout: segundos máximos de espera por diagnóstico
+        cache: entradas de la caché de diagnósticos (0 = sin caché; una por proceso)
+        cache_disco: ruta de una caché persistente SQLite compartida (tiene prioridad sobre cache)
+        verbose: registrar cada petición en la consola
+        perfilado: exporta en /metrics la latencia de cada etapa del diagnóstico
+                   (solo en modo 'hilos': los procesos del pool no comparten el perfilador)
+    """
+    
+    def __init__(self, host='127.0.0.1', port=8080, trabajadores=4, modo='hilos',
+                 use_surface=False, timeout=30.0, cache=0, cache_disco=None, verbose=False,
+                 perfilado=False):
+        if modo not in ('hilos', 'procesos'):
+            raise ValueError(f"Modo de pool desconocido: {modo}")
+        self.modo = modo
+        self.trabajadores = trabajadores
+        self.timeout = timeout
+        self.verbose = verbose
+        
+        if modo == 'procesos':
+            if use_surface:
+                # Calcular (o validar) la superficie una vez antes de arrancar los procesos,
+                # con un sistema propio: el sistema fuzzy global no cambia
+                FuzzyDiagnosisSystem(use_surface=True)
+            if perfilado:
+                print("El perfilado por etapas solo está disponible en modo 'hilos'")
+            self.metricas = MetricasServicio()
+            self._tarea = diagnosticar_en_proceso
+            self.pool = ProcessPoolExecutor(
+                max_workers=trabajadores, initializer=iniciar_proceso, initargs=(use_surface, cache, cache_disco)
+            )
+        else:
+            if use_surface:
+                ensure_fuzzy_surface()
+            # Motor y caché propios de este servidor
+            estado = EstadoDiagnostico(cache, cache_disco)
+            perfilador = enable_profiling() if perfilado else None
+            self.metricas = MetricasServicio(estado.cache, perfilador)
+            self._tarea = estado.diagnosticar
+            self.pool = ThreadPoolExecutor(max_workers=trabajadores, thread_name_prefix='diagnostico')
+        
+        self.httpd = ThreadingHTTPServer((host, port), self._crear_manejador())
+        self.httpd.daemon_threads = True
+    
+    @property
+    def address(self):
+        return self.httpd.server_address
+    
+    def diagnose(self, sintomas, use_fuzzy=True, strategy='combine'):
+        """Envía un diagnóstico al pool y espera el resultado"""
+        self.metricas.comenzar_diagnostico()
+        inicio = time.perf_counter()
+        try:
+            futuro = self.pool.submit(self._tarea, sintomas, use_fuzzy, strategy)
+            try:
+                return futuro.result(timeout=self.timeout)
+            except TimeoutError:
+                # Si aún espera en la cola no llega a ocupar un trabajador
+                # (un diagnóstico ya en marcha no puede interrumpirse)
+                futuro.cancel()
+                raise
+        finally:
+            self.metricas.terminar_diagnostico(time.perf_counter() - inicio)
+    
+    def health(self):
+        return {
+            'estado': 'ok',
+            'modo': self.modo,
+            'trabajadores': self.trabajadores,
+            'uptime_segundos': round(time.time() - self.metricas.inicio, 3)
+        }
+    
+    def serve_forever(self):
+        self.httpd.serve_forever()
+    
+    def start(self):
+        """Atiende peticiones en un hilo en segundo plano"""
+        hilo = threading.Thread(target=self.serve_forever, daemon=True)
+        hilo.start()
+        return hilo
+    
+    def shutdown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.pool.shutdown(wait=True)
+    
+    def _crear_manejador(self):
+        servidor = self
+        
+        class Manejador(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Cabeceras y cuerpo se escriben por separado: sin esto, Nagle y el ACK
+            # retardado añaden ~40 ms a cada respuesta en conexiones persistentes
+            disable_nagle_algorithm = True
+            
+            def log_message(self, format, *args):
+                if servidor.verbose:
+                    super().log_message(format, *args)
+            
+            def _responder(self, codigo, cuerpo, tipo='application/json; charset=utf-8'):
+                if not isinstance(cuerpo, bytes):
+                    cuerpo = json.dumps(cuerpo, ensure_ascii=False).encode('utf-8')
+                self.send_response(codigo)
+                self.send_header('Content-Type', tipo)
+                self.send_header('Content-Length', str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+                ruta = urlsplit(self.path).path
+                servidor.metricas.registrar(ruta if ruta in RUTAS else 'otra', codigo)
+            
+            def _error(self, codigo, mensaje):
+                self._responder(codigo, {'error': mensaje})
+            
+            def _longitud_cuerpo(self):
+                """
+                Longitud del cuerpo según Content-Length
+                Si falta o no es válida responde el error y retorna None; la
+                conexión se cierra porque no se sabe dónde acaba el cuerpo
+                """
+                cabecera = self.headers.get('Content-Length')
+                if cabecera is None:
+                    self.close_connection = True
+                    self._error(411, "Falta la cabecera Content-Length")
+                    return None
+                # Solo dígitos: int() aceptaría también signos y '1_000'
+                valor = cabecera.strip()
+                if not (valor.isascii() and valor.isdigit()):
+                    self.close_connection = True
+                    self._error(400, f"Content-Length inválido: {cabecera!r}")
+                    return None
+                longitud = int(valor)
+                if longitud > MAX_CUERPO:
+                    self.close_connection = True
+                    self._error(413, "Cuerpo demasiado grande")
+                    return None
+                return longitud
+            
+            def do_GET(self):
+                ruta = urlsplit(self.path).path
+                if ruta == '/health':
+                    self._responder(200, servidor.health())
+                elif ruta == '/metrics':
+                    self._responder(
+                        200, servidor.metricas.to_prometheus().encode('utf-8'),
+                        'text/plain; version=0.0.4; charset=utf-8'
+                    )
+                else:
+                    self._error(404, f"Ruta no encontrada: {ruta}")
+            
+            def do_POST(self):
+                partes = urlsplit(self.path)
+                longitud = self._longitud_cuerpo()
+                if longitud is None:
+                    return
+                cuerpo = self.rfile.read(longitud)
+                
+                if partes.path != '/diagnostico':
+                    self._error(404, f"Ruta no encontrada: {partes.path}")
+                    return
+                
+                try:
+                    sintomas = json.loads(cuerpo or b'null')
+                except ValueError as e:
+                    self._error(400, f"JSON inválido: {e}")
+                    return
+                error = validar_sintomas(sintomas)
+                if error:
+                    self._error(400, error)
+                    return
+                
+                parametros = parse_qs(partes.query)
+                use_fuzzy = parametros.get('fuzzy', ['1'])[0] not in ('0', 'false', 'no')
+                strategy = parametros.get('estrategia', ['combine'])[0]
+                if strategy not in ESTRATEGIAS:
+                    self._error(400, f"Estrategia desconocida: {strategy}")
+                    return
+                
+                try:
+                    resultado = servidor.diagnose(sintomas, use_fuzzy, strategy)
+                except TimeoutError:
+                    self._error(503, "Tiempo de diagnóstico agotado")
+                    return
+                except Exception:
+                    # El detalle queda en el registro del servidor, no en la respuesta
+                    print("Error en diagnóstico:", file=sys.stderr)
+                    traceback.print_exc()
+                    self._error(500, "Error interno en el diagnóstico")
+                    return
+                self._responder(200, resultado)
+        
+        return Manejador
+
+
+def main():
+    """Arranca el servicio desde la línea de comandos"""
+    parser = argparse.ArgumentParser(description="Servicio HTTP del sistema experto de odontología")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--trabajadores', type=int, default=4, help='Tamaño del pool de diagnóstico')
+    parser.add_argument('--modo', choices=('hilos', 'procesos'), default='hilos')
+    parser.add_argument('--superficie', action='store_true',
+                        help='Usa la superficie difusa precalculada')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Segundos máximos por diagnóstico')
+    parser.add_argument('--cache', type=int, default=0,
+                        help='Entradas de la caché de diagnósticos (0 = sin caché)')
+    parser.add_argument('--cache-disco', default=None, metavar='RUTA',
+                        help='Caché persistente SQLite compartida entre procesos')
+    parser.add_argument('--verbose', action='store_true', help='Registra cada petición')
+    parser.add_argument('--perfilado', action='store_true',
+                        help='Exporta en /metrics la latencia de cada etapa (modo hilos)')
+    args = parser.parse_args()
+    
+    servidor = ServidorDiagnostico(
+        args.host, args.port, args.trabajadores, args.modo,
+        use_surface=args.superficie, timeout=args.timeout, cache=args.cache,
+        cache_disco=args.cache_disco, verbose=args.verbose, perfilado=args.perfilado
+    )
+    host, port = servidor.address[:2]
+    print(f"Servicio de diagnóstico escuchando en http://{host}:{port} "
+          f"({args.trabajadores} {args.modo})")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\nDeteniendo servicio...")
+    finally:
+        servidor.shutdown()
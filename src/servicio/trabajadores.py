@@ -0,0 +1,61 @@
+"""
+Trabajadores de diagnóstico de los servicios
+Compartidos por el servidor HTTP (servidor.py) y la API asyncio (asincrono.py).
+
+Cada servicio en modo hilos crea su propio EstadoDiagnostico (motor y caché),
+así que varios servicios en el mismo proceso no se pisan la configuración.
+En modo procesos cada proceso del pool pertenece a un único servicio: su
+inicializador (iniciar_proceso) crea el estado de ese proceso.
+"""
+
+from ..base_conocimiento.reglas_difusas import ensure_fuzzy_surface
+from ..motor_inferencia import MotorDiagnostico, DiagnosisCache, PersistentDiagnosisCache
+
+
+def crear_cache(entradas, ruta=None):
+    """
+    Caché de diagnósticos de un servicio
+    ruta: caché persistente SQLite (tiene prioridad sobre entradas)
+    entradas: tamaño de la caché en memoria (0 = sin caché)
+    """
+    if ruta:
+        return PersistentDiagnosisCache(ruta)
+    if entradas:
+        return DiagnosisCache(entradas)
+    return None
+
+
+class EstadoDiagnostico:
+    """
+    Motor y caché de diagnósticos de un servicio
+    Todos los hilos del servicio comparten el motor: analyze() no guarda estado
+    entre consultas. La caché, si está activa, se comparte entre esos hilos
+    (la caché en disco se comparte además entre procesos)
+    """
+    
+    def __init__(self, entradas_cache=0, ruta_cache=None):
+        self.cache = crear_cache(entradas_cache, ruta_cache)
+        self.motor = MotorDiagnostico(cache=self.cache)
+    
+    def diagnosticar(self, sintomas, use_fuzzy, strategy):
+        """Tarea ejecutada en el pool"""
+        return self.motor.analyze(sintomas, use_fuzzy=use_fuzzy, strategy=strategy).data
+
+
+# --- Modo procesos ------------------------------------------------------------
+
+# Estado del proceso trabajador actual (lo crea iniciar_proceso)
+_estado_proceso = None
+
+
+def iniciar_proceso(use_surface, entradas_cache, ruta_cache):
+    """Inicializador de cada proceso del pool"""
+    global _estado_proceso
+    if use_surface:
+        ensure_fuzzy_surface()
+    _estado_proceso = EstadoDiagnostico(entradas_cache, ruta_cache)
+
+
+def diagnosticar_en_proceso(sintomas, use_fuzzy, strategy):
+    """Tarea ejecutada en un proceso del pool (iniciado con iniciar_proceso)"""
+    return _estado_proceso.diagnosticar(sintomas, use_fuzzy, strategy)
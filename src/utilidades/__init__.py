@@ -1,8 +1,19 @@
 """
 Módulo de utilidades
+GeneradorReportes se importa en el primer acceso (carga reportlab)
 """
 
 from .registro import Registro
-from .generador_reportes import GeneradorReportes
+from .instrumentacion import PerfiladorEtapas, enable_profiling, disable_profiling, get_profiler
 
-__all__ = ['Registro', 'GeneradorReportes']
+__all__ = [
+    'Registro', 'GeneradorReportes',
+    'PerfiladorEtapas', 'enable_profiling', 'disable_profiling', 'get_profiler'
+]
+
+
+def __getattr__(name):
+    if name == 'GeneradorReportes':
+        from .generador_reportes import GeneradorReportes
+        return GeneradorReportes
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,206 @@
+"""
+Instrumentación de latencias por etapa
+Histogramas de latencia (recuento, suma, máximo y percentiles p50/p95/p99) por
+etapa del diagnóstico: reglas crisp, cada simulación difusa, diagnóstico de
+respaldo, resolución de conflictos y enriquecimiento.
+
+El perfilado es opcional y está desactivado por defecto: los puntos de medida
+del motor solo comprueban si hay un perfilador activo, así que desactivado no
+añade más que esa comprobación. Se activa para todo el proceso:
+
+    perfilador = enable_profiling()
+    motor.diagnose(sintomas)
+    print(perfilador.to_json())
+    print(perfilador.to_prometheus())
+    disable_profiling()
+
+Los percentiles se estiman a partir de los cubos del histograma (límites en
+progresión geométrica), con un error relativo acotado por el ancho del cubo.
+"""
+
+import json
+import threading
+from bisect import bisect_left
+
+
+# Límites superiores de los cubos en segundos: de 1 µs a ~16 s, cuatro cubos por
+# cada duplicación (error relativo de los percentiles < 19%)
+DEFAULT_BOUNDS = tuple(1e-6 * 2 ** (i / 4) for i in range(97))
+
+# En Prometheus se exporta uno de cada EXPORT_STEP límites (potencias de 2 µs):
+# el mismo conjunto de cubos en cada lectura y ~25 líneas por etapa
+EXPORT_STEP = 4
+
+# Etapas que mide MotorDiagnostico, en el orden en que se ejecutan
+STAGES = (
+    'crisp',
+    'fuzzy',
+    'fuzzy.prob_caries',
+    'fuzzy.prob_pulpitis',
+    'fuzzy.prob_infeccion',
+    'fuzzy.prob_encias',
+    'fallback',
+    'conflictos',
+    'enriquecimiento',
+    'total'
+)
+
+
+class HistogramaLatencia:
+    """Histograma de latencias con cubos fijos, seguro entre hilos"""
+    
+    def __init__(self, bounds=DEFAULT_BOUNDS):
+        self.bounds = tuple(bounds)
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        with self._lock:
+            self.buckets = [0] * (len(self.bounds) + 1)  # El último es +Inf
+            self.count = 0
+            self.total = 0.0
+            self.max = 0.0
+    
+    def observe(self, seconds):
+        index = bisect_left(self.bounds, seconds)
+        with self._lock:
+            self.buckets[index] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+    
+    def _percentile(self, buckets, count, maximum, q):
+        """Interpola el percentil q (0-100) dentro de su cubo"""
+        if not count:
+            return 0.0
+        target = q / 100 * count
+        seen = 0
+        for index, n in enumerate(buckets):
+            if n and seen + n >= target:
+                lower = self.bounds[index - 1] if index else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else maximum
+                value = lower + (upper - lower) * (target - seen) / n
+                return min(value, maximum)
+            seen += n
+        return maximum
+    
+    def percentile(self, q):
+        with self._lock:
+            buckets, count, maximum = list(self.buckets), self.count, self.max
+        return self._percentile(buckets, count, maximum, q)
+    
+    def snapshot(self):
+        """Copia coherente del estado: recuento, suma, máximo, percentiles y cubos"""
+        with self._lock:
+            buckets, count, total, maximum = list(self.buckets), self.count, self.total, self.max
+        return {
+            'count': count,
+            'sum': total,
+            'max': maximum,
+            'p50': self._percentile(buckets, count, maximum, 50),
+            'p95': self._percentile(buckets, count, maximum, 95),
+            'p99': self._percentile(buckets, count, maximum, 99),
+            'buckets': buckets
+        }
+
+
+class PerfiladorEtapas:
+    """
+    Histogramas de latencia por etapa
+    Cada etapa crea su histograma la primera vez que se registra
+    """
+    
+    def __init__(self, bounds=DEFAULT_BOUNDS):
+        self.bounds = tuple(bounds)
+        self._lock = threading.Lock()
+        self.histograms = {}
+    
+    def histogram(self, stage):
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.get(stage)
+                if histogram is None:
+                    histogram = HistogramaLatencia(self.bounds)
+                    self.histograms[stage] = histogram
+        return histogram
+    
+    def record(self, stage, seconds):
+        """Registra la duración (en segundos) de una ejecución de la etapa"""
+        self.histogram(stage).observe(seconds)
+    
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+    
+    def _ordered(self):
+        """(etapa, histograma) en el orden del pipeline; las etapas ajenas al final"""
+        histograms = dict(self.histograms)
+        order = [s for s in STAGES if s in histograms]
+        order += sorted(s for s in histograms if s not in STAGES)
+        return [(stage, histograms[stage]) for stage in order]
+    
+    def stats(self):
+        """Resumen por etapa en milisegundos: recuento, total, media, p50/p95/p99 y máximo"""
+        stats = {}
+        for stage, histogram in self._ordered():
+            snapshot = histogram.snapshot()
+            count = snapshot['count']
+            stats[stage] = {
+                'count': count,
+                'total_ms': round(snapshot['sum'] * 1e3, 3),
+                'mean_ms': round(snapshot['sum'] / count * 1e3, 4) if count else 0.0,
+                'p50_ms': round(snapshot['p50'] * 1e3, 4),
+                'p95_ms': round(snapshot['p95'] * 1e3, 4),
+                'p99_ms': round(snapshot['p99'] * 1e3, 4),
+                'max_ms': round(snapshot['max'] * 1e3, 4)
+            }
+        return stats
+    
+    def to_json(self, indent=2):
+        return json.dumps(self.stats(), indent=indent, ensure_ascii=False)
+    
+    def to_prometheus(self, name='odontologia_stage_seconds'):
+        """Exporta un histograma de Prometheus con la etiqueta stage"""
+        lineas = [
+            f'# HELP {name} Latencia de cada etapa del diagnóstico',
+            f'# TYPE {name} histogram'
+        ]
+        for stage, histogram in self._ordered():
+            snapshot = histogram.snapshot()
+            acumulado = 0
+            for index, n in enumerate(snapshot['buckets']):
+                acumulado += n
+                if index == len(self.bounds):
+                    lineas.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {acumulado}')
+                elif index % EXPORT_STEP == 0:
+                    le = f'{self.bounds[index]:.9g}'
+                    lineas.append(f'{name}_bucket{{stage="{stage}",le="{le}"}} {acumulado}')
+            lineas.append(f'{name}_sum{{stage="{stage}"}} {snapshot["sum"]:.9f}')
+            lineas.append(f'{name}_count{{stage="{stage}"}} {snapshot["count"]}')
+        return '\n'.join(lineas) + '\n'
+
+
+# --- Perfilador activo del proceso ------------------------------------------
+
+_profiler = None
+
+
+def enable_profiling(profiler=None):
+    """Activa el perfilado en el proceso actual y retorna el perfilador activo"""
+    global _profiler
+    _profiler = profiler if profiler is not None else PerfiladorEtapas()
+    return _profiler
+
+
+def disable_profiling():
+    """Desactiva el perfilado; retorna el perfilador que estaba activo (o None)"""
+    global _profiler
+    profiler, _profiler = _profiler, None
+    return profiler
+
+
+def get_profiler():
+    """Perfilador activo o None si el perfilado está desactivado"""
+    return _profiler
@@ -0,0 +1,27 @@
+"""
+Fixtures compartidas de las pruebas
+"""
+
+import pytest
+
+from src.base_conocimiento import reglas_crisp, reglas_difusas
+from src.motor_inferencia.corpus_dorado import load_corpus
+
+
+# Uno de cada CORPUS_STEP casos del corpus dorado (el corpus completo se
+# verifica con python -m src.motor_inferencia.corpus_dorado verificar)
+CORPUS_STEP = 4
+
+
+@pytest.fixture(scope='session')
+def corpus():
+    """Muestra fija de entradas del corpus dorado"""
+    _, entries = load_corpus()
+    return entries[::CORPUS_STEP]
+
+
+@pytest.fixture
+def estado_global(monkeypatch):
+    """Restaura la tabla de reglas compilada y el sistema fuzzy global"""
+    monkeypatch.setattr(reglas_crisp, '_COMPILED_RULES', reglas_crisp.get_compiled_rules())
+    monkeypatch.setattr(reglas_difusas, '_fuzzy_system', reglas_difusas.get_fuzzy_system())
@@ -0,0 +1,57 @@
+"""
+Importar los paquetes no debe cargar dependencias que solo usan algunas funciones
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Módulos que no deben cargarse al importar los paquetes
+DIFERIDOS = [
+    'skfuzzy',
+    'reportlab',
+    'sqlite3',
+    'multiprocessing',
+    'importlib.metadata',
+    'src.base_conocimiento.compilador_reglas',
+    'src.base_conocimiento.tabla_decision',
+    'src.base_conocimiento.estadisticas_reglas',
+    'src.motor_inferencia.cache_persistente',
+    'src.motor_inferencia.pool_inferencia'
+]
+
+
+def modulos_cargados(codigo):
+    """Ejecuta código en un intérprete limpio y retorna los DIFERIDOS que cargó"""
+    programa = f"import sys\n{codigo}\nprint(','.join(m for m in {DIFERIDOS!r} if m in sys.modules))"
+    salida = subprocess.run(
+        [sys.executable, '-c', programa], cwd=RAIZ, capture_output=True, text=True, check=True
+    )
+    return [m for m in salida.stdout.strip().split(',') if m]
+
+
+@pytest.mark.parametrize('paquete', ['src.base_conocimiento', 'src.motor_inferencia', 'src.utilidades'])
+def test_importacion_diferida(paquete):
+    assert modulos_cargados(f'import {paquete}') == []
+
+
+def test_primer_diagnostico_sin_dependencias_opcionales():
+    codigo = (
+        "from src.motor_inferencia import MotorDiagnostico\n"
+        "MotorDiagnostico().diagnose({'intensidad_dolor': 8, 'caries_visible': 'si'})"
+    )
+    assert modulos_cargados(codigo) == []
+
+
+def test_nombres_diferidos_accesibles():
+    from src import base_conocimiento, motor_inferencia
+    for paquete in (base_conocimiento, motor_inferencia):
+        for nombre in paquete.__all__:
+            assert getattr(paquete, nombre) is not None
+    with pytest.raises(AttributeError):
+        motor_inferencia.NoExiste
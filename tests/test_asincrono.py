@@ -0,0 +1,148 @@
+"""
+Pruebas de la API asyncio: límite de concurrencia, tiempo máximo y cancelación
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from src.servicio.asincrono import DiagnosticoAsincrono
+
+
+class TareaLenta:
+    """Sustituye al diagnóstico: espera una señal y registra su concurrencia"""
+    
+    def __init__(self):
+        self.continuar = threading.Event()
+        self.empezadas = []
+        self.activas = 0
+        self.max_activas = 0
+        self._lock = threading.Lock()
+    
+    def __call__(self, facts, use_fuzzy, strategy):
+        with self._lock:
+            self.empezadas.append(facts)
+            self.activas += 1
+            self.max_activas = max(self.max_activas, self.activas)
+        self.continuar.wait(5)
+        with self._lock:
+            self.activas -= 1
+        return {'facts': facts}
+
+
+@pytest.fixture
+def servicio():
+    servicio = DiagnosticoAsincrono(trabajadores=4, max_concurrencia=1)
+    servicio._tarea = TareaLenta()
+    yield servicio
+    servicio._tarea.continuar.set()
+    servicio.close()
+
+
+async def esperar_inicio(tarea, n=1):
+    while len(tarea.empezadas) < n:
+        await asyncio.sleep(0.005)
+
+
+def test_limite_de_concurrencia():
+    servicio = DiagnosticoAsincrono(trabajadores=4, max_concurrencia=2)
+    tarea = servicio._tarea = TareaLenta()
+    
+    async def escenario():
+        lote = asyncio.ensure_future(servicio.diagnose_many([{'id': i} for i in range(6)]))
+        await esperar_inicio(tarea, 2)
+        await asyncio.sleep(0.05)
+        assert len(tarea.empezadas) == 2
+        tarea.continuar.set()
+        return await lote
+    
+    try:
+        resultados = asyncio.run(escenario())
+    finally:
+        servicio.close()
+    assert resultados == [{'facts': {'id': i}} for i in range(6)]
+    assert tarea.max_activas == 2
+    assert servicio.contadores['completados'] == 6
+
+
+def test_tiempo_maximo_incluye_la_espera_de_plaza(servicio):
+    tarea = servicio._tarea
+    
+    async def escenario():
+        primera = asyncio.ensure_future(servicio.diagnose({'id': 1}))
+        await esperar_inicio(tarea)
+        with pytest.raises(asyncio.TimeoutError):
+            await servicio.diagnose({'id': 2}, timeout=0.05)
+        tarea.continuar.set()
+        return await primera
+    
+    assert asyncio.run(escenario()) == {'facts': {'id': 1}}
+    # La segunda expiró esperando la plaza: nunca llegó al pool
+    assert tarea.empezadas == [{'id': 1}]
+    assert servicio.contadores['expirados'] == 1
+    assert servicio.contadores['completados'] == 1
+
+
+def test_tiempo_agotado_retiene_la_plaza_hasta_terminar(servicio):
+    tarea = servicio._tarea
+    
+    async def escenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await servicio.diagnose({'id': 1}, timeout=0.05)
+        # El trabajo sigue en ejecución en el pool y conserva su plaza
+        assert servicio._diagnosticos.locked()
+        siguiente = asyncio.ensure_future(servicio.diagnose({'id': 2}))
+        await asyncio.sleep(0.05)
+        assert tarea.empezadas == [{'id': 1}]
+        tarea.continuar.set()
+        return await siguiente
+    
+    assert asyncio.run(escenario()) == {'facts': {'id': 2}}
+    assert tarea.max_activas == 1
+    assert servicio.contadores['expirados'] == 1
+    assert servicio.contadores['completados'] == 1
+
+
+def test_cancelacion(servicio):
+    tarea = servicio._tarea
+    
+    async def escenario():
+        primera = asyncio.ensure_future(servicio.diagnose({'id': 1}))
+        await esperar_inicio(tarea)
+        en_espera = asyncio.ensure_future(servicio.diagnose({'id': 2}))
+        await asyncio.sleep(0.01)
+        for pendiente in (en_espera, primera):
+            pendiente.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await pendiente
+        # La primera ya estaba en ejecución: su plaza se libera cuando termina
+        assert servicio._diagnosticos.locked()
+        tarea.continuar.set()
+        return await servicio.diagnose({'id': 3}, timeout=5)
+    
+    assert asyncio.run(escenario()) == {'facts': {'id': 3}}
+    assert tarea.empezadas == [{'id': 1}, {'id': 3}]
+    assert servicio.contadores['cancelados'] == 2
+    assert servicio.contadores['completados'] == 1
+
+
+def test_trabajo_sin_empezar_se_retira_del_pool():
+    servicio = DiagnosticoAsincrono(trabajadores=1, max_concurrencia=2)
+    tarea = servicio._tarea = TareaLenta()
+    
+    async def escenario():
+        primera = asyncio.ensure_future(servicio.diagnose({'id': 1}))
+        await esperar_inicio(tarea)
+        # Tiene plaza pero el único trabajador está ocupado
+        with pytest.raises(asyncio.TimeoutError):
+            await servicio.diagnose({'id': 2}, timeout=0.05)
+        assert not servicio._diagnosticos.locked()
+        tarea.continuar.set()
+        return await primera
+    
+    try:
+        asyncio.run(escenario())
+    finally:
+        servicio.close()
+    assert tarea.empezadas == [{'id': 1}]
@@ -0,0 +1,102 @@
+"""
+Pruebas de DiagnosisCache (caché en memoria)
+"""
+
+import threading
+
+import pytest
+
+from src.base_conocimiento import reglas_crisp, reglas_difusas
+from src.motor_inferencia import DiagnosisCache, MotorDiagnostico, canonical_key
+
+
+FACTS = {'intensidad_dolor': 8, 'caries_visible': 'si', 'sensibilidad_dulce': 6}
+
+
+def test_acierto_igual_al_diagnostico():
+    cache = DiagnosisCache()
+    motor = MotorDiagnostico(cache=cache)
+    primero = motor.diagnose(FACTS)
+    segundo = motor.diagnose(FACTS)
+    assert segundo == primero == MotorDiagnostico().diagnose(FACTS)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_clave_canonica():
+    assert canonical_key({'a': 5, 'b': 'si'}) == canonical_key({'b': 'si', 'a': 5.0})
+    assert canonical_key({'a': True}) != canonical_key({'a': 1})
+    assert canonical_key(FACTS, use_fuzzy=False) != canonical_key(FACTS)
+
+
+def test_retorna_copias():
+    motor = MotorDiagnostico(cache=DiagnosisCache())
+    motor.diagnose(FACTS)['diagnosticos'].clear()
+    assert motor.diagnose(FACTS)['diagnosticos']
+
+
+def test_desaloja_la_menos_usada():
+    cache = DiagnosisCache(max_entries=2)
+    cache.put('a', {'v': 1})
+    cache.put('b', {'v': 2})
+    cache.get('a')
+    cache.put('c', {'v': 3})
+    assert cache.get('b') is None
+    assert cache.get('a') == {'v': 1}
+    assert cache.evictions == 1
+
+
+def test_invalida_al_cambiar_la_tabla_de_reglas(estado_global):
+    cache = DiagnosisCache()
+    cache.put('a', {'v': 1})
+    assert cache.get('a') == {'v': 1}
+    
+    reglas_crisp.reset_compiled_rules()
+    assert cache.get('a') is None
+    assert cache.invalidations == 1
+
+
+def test_invalida_al_reemplazar_el_sistema_fuzzy(estado_global):
+    cache = DiagnosisCache()
+    cache.put('a', {'v': 1})
+    
+    reglas_difusas.configure_fuzzy_system()
+    assert cache.get('a') is None
+    assert cache.invalidations == 1
+
+
+def test_no_invalida_al_crear_el_sistema_fuzzy(estado_global, monkeypatch):
+    # Sin sistema fuzzy global la caché lo crea con get_fuzzy_system() en su
+    # primera consulta, antes de guardar nada
+    monkeypatch.setattr(reglas_difusas, '_fuzzy_system', None)
+    cache = DiagnosisCache()
+    cache.put('a', {'v': 1})
+    sistema = reglas_difusas.get_fuzzy_system()
+    assert cache.get('a') == {'v': 1}
+    assert reglas_difusas.get_fuzzy_system() is sistema
+    assert cache.invalidations == 0
+
+
+def test_concurrente():
+    cache = DiagnosisCache(max_entries=16)
+    barrera = threading.Barrier(4)
+    
+    def trabajar(hilo):
+        barrera.wait()
+        for i in range(500):
+            clave = hilo * 4 + i % 8
+            if cache.get(clave) is None:
+                cache.put(clave, {'v': clave})
+            else:
+                assert cache.get(clave) == {'v': clave}
+    
+    hilos = [threading.Thread(target=trabajar, args=(n,)) for n in range(4)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    
+    stats = cache.stats()
+    assert stats['entradas'] == 16
+    assert stats['aciertos'] + stats['fallos'] >= 4 * 500
+    assert stats['aciertos'] and stats['desalojos']
+    assert all(cache.get(clave) in (None, {'v': clave}) for clave in range(20))
@@ -0,0 +1,74 @@
+"""
+Pruebas de PersistentDiagnosisCache (caché SQLite compartida entre procesos)
+"""
+
+import os
+
+import pytest
+
+from src.base_conocimiento import reglas_crisp
+from src.motor_inferencia import cache as modulo_cache
+from src.motor_inferencia import MotorDiagnostico, PersistentDiagnosisCache, canonical_key
+
+
+FACTS = {'intensidad_dolor': 8, 'caries_visible': 'si', 'sensibilidad_dulce': 6}
+
+
+def test_persistente_entre_instancias(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    motor = MotorDiagnostico(cache=PersistentDiagnosisCache(path))
+    esperado = motor.diagnose(FACTS)
+    
+    otra = PersistentDiagnosisCache(path)
+    assert otra.get(canonical_key(FACTS)) == esperado
+    assert MotorDiagnostico(cache=otra).diagnose(FACTS) == esperado
+
+
+def test_persistente_ignora_otra_huella(tmp_path, estado_global, monkeypatch):
+    path = str(tmp_path / 'cache.db')
+    cache = PersistentDiagnosisCache(path)
+    cache.put('a', {'v': 1})
+    assert cache.get('a') == {'v': 1}
+    
+    # Una tabla de reglas distinta cambia la huella: las entradas viejas no se usan
+    reglas = reglas_crisp.get_compiled_rules()
+    monkeypatch.setattr(reglas_crisp, '_COMPILED_RULES', reglas[1:])
+    assert cache.get('a') is None
+    assert cache.purge_stale() == 1
+    assert len(cache) == 0
+
+
+def test_persistente_conexion_perezosa(tmp_path):
+    path = tmp_path / 'cache.db'
+    cache = PersistentDiagnosisCache(str(path))
+    assert not path.exists()
+    cache.put('a', {'v': 1})
+    assert path.exists()
+    assert cache.get('a') == {'v': 1}
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='requiere fork')
+def test_persistente_tras_fork(tmp_path):
+    cache = PersistentDiagnosisCache(str(tmp_path / 'cache.db'))
+    cache.put('padre', {'v': 1})
+    heredada = cache._connection()
+    
+    pid = os.fork()
+    if pid == 0:
+        # Hijo: debe abrir su propia conexión y ver lo que escribió el padre
+        estado = 1
+        try:
+            if cache._connection() is not heredada and cache.get('padre') == {'v': 1}:
+                cache.put('hijo', {'v': 2})
+                estado = 0
+        finally:
+            os._exit(estado)
+    _, estado = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(estado) == 0
+    assert cache._connection() is heredada
+    assert cache.get('hijo') == {'v': 2}
+
+
+def test_huella_con_modulos_relativos():
+    assert all(name.startswith('.') for name in modulo_cache._FINGERPRINT_MODULES)
+    assert modulo_cache.rule_base_fingerprint() == modulo_cache.rule_base_fingerprint()
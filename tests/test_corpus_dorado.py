@@ -0,0 +1,100 @@
+"""
+Equivalencia de cada motor registrado con el corpus dorado
+(muestra del corpus; el corpus completo se verifica con
+python -m src.motor_inferencia.corpus_dorado verificar)
+"""
+
+from contextlib import contextmanager
+
+import pytest
+
+from src.motor_inferencia import MotorDiagnostico
+from src.motor_inferencia import corpus_dorado
+from src.motor_inferencia.corpus_dorado import (
+    ENGINES,
+    build_corpus,
+    load_corpus,
+    register_engine,
+    verify_engine
+)
+
+
+# Evaluadores crisp y motores de encadenamiento
+MOTORES_CRISP = ['referencia', 'generado', 'tabla', 'lineal', 'rete', 'lotes']
+
+# Sistemas difusos
+MOTORES_DIFUSOS = ['skfuzzy', 'superficie']
+
+# Cachés, procesos e instrumentación alrededor del motor
+MOTORES_ENVOLTORIO = ['cache', 'cache_disco', 'pool', 'estadisticas', 'perfilado']
+
+
+def test_todos_los_motores_cubiertos():
+    assert set(ENGINES) == set(MOTORES_CRISP + MOTORES_DIFUSOS + MOTORES_ENVOLTORIO)
+
+
+@pytest.mark.parametrize('name', MOTORES_CRISP + MOTORES_DIFUSOS + MOTORES_ENVOLTORIO)
+def test_motor_igual_al_corpus(corpus, name):
+    if name == 'skfuzzy':
+        pytest.importorskip('skfuzzy')
+    report = verify_engine(name, corpus)
+    assert report['divergencias'] == 0, report['primeras']
+
+
+# --- Arnés diferencial ----------------------------------------------------------
+
+def registrar(monkeypatch, name, diagnose_many):
+    """Registra un motor de prueba solo durante la prueba"""
+    @contextmanager
+    def factory():
+        yield diagnose_many
+    
+    monkeypatch.setitem(ENGINES, name, ('', factory))
+
+
+def test_detecta_confianza_distinta(corpus, monkeypatch):
+    entries = [entry for entry in corpus if entry['r']][:50]
+    motor = MotorDiagnostico()
+    
+    def diagnose_many(facts_list, use_fuzzy, strategy):
+        results = [motor.diagnose(facts, use_fuzzy, strategy) for facts in facts_list]
+        for result in results[::2]:
+            result['diagnosticos'][0]['confianza'] += 1e-6
+        return results
+    
+    registrar(monkeypatch, 'alterado', diagnose_many)
+    report = verify_engine('alterado', entries, max_divergences=3)
+    assert 0 < report['divergencias'] < len(entries)
+    assert len(report['primeras']) == 3
+    casos = [d['caso'] for d in report['primeras']]
+    assert casos == sorted(casos)
+    assert all(d['diferencia'].startswith('confianza de ') for d in report['primeras'])
+    # Dentro de la tolerancia no hay divergencias
+    assert verify_engine('alterado', entries, tolerance=1e-5)['divergencias'] == 0
+
+
+def test_error_del_motor_cuenta_como_divergencia(corpus, monkeypatch):
+    def diagnose_many(facts_list, use_fuzzy, strategy):
+        raise RuntimeError('motor roto')
+    
+    registrar(monkeypatch, 'roto', diagnose_many)
+    report = verify_engine('roto', corpus[:20])
+    assert report['divergencias'] == 20
+    assert report['primeras'][0]['diferencia'] == 'Error: motor roto'
+
+
+def test_construir_y_cargar_corpus(tmp_path, monkeypatch):
+    cases = corpus_dorado.generate_cases(per_rule=1, random_count=10, edge_count=5, seed=1)
+    assert corpus_dorado.generate_cases(per_rule=1, random_count=10, edge_count=5, seed=1) == cases
+    path = str(tmp_path / 'corpus.jsonl.gz')
+    header = build_corpus(cases, path)
+    
+    cargada, entries = load_corpus(path)
+    assert cargada == header
+    assert header['casos'] == len(entries) == len(cases)
+    assert [(e['s'], e['f'], e['e']) for e in entries] == cases
+    
+    # Un motor registrado con register_engine se verifica contra el corpus nuevo
+    monkeypatch.setattr(corpus_dorado, 'ENGINES', dict(ENGINES))
+    register_engine('referencia_prueba', corpus_dorado._reference_engine)
+    assert verify_engine('referencia_prueba', entries)['divergencias'] == 0
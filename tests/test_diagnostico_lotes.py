@@ -0,0 +1,30 @@
+"""
+Pruebas del diagnóstico por lotes (diagnose_batch / encode_batch)
+"""
+
+import numpy as np
+import pytest
+
+from src.motor_inferencia import MotorDiagnostico, encode_batch
+
+
+def test_lote_igual_a_uno_por_uno(corpus):
+    motor = MotorDiagnostico()
+    facts_list = [entry['s'] for entry in corpus if entry['f'] and entry['e'] == 'combine'][:500]
+    assert motor.diagnose_batch(facts_list) == [motor.diagnose(facts) for facts in facts_list]
+
+
+@pytest.mark.parametrize('convert', [np.int64, np.int32, np.float32, np.float64])
+def test_escalares_numpy(convert):
+    facts = {'intensidad_dolor': 8, 'sensibilidad_calor': 7, 'dolor_nocturno': 6, 'caries_visible': 'si'}
+    numpy_facts = {k: convert(v) if isinstance(v, int) else v for k, v in facts.items()}
+    
+    motor = MotorDiagnostico()
+    expected = motor.diagnose(facts)
+    assert motor.diagnose(numpy_facts) == expected
+    assert motor.diagnose_batch([numpy_facts]) == [expected]
+
+
+def test_valor_no_numerico():
+    with pytest.raises(ValueError):
+        encode_batch([{'intensidad_dolor': 'alto'}])
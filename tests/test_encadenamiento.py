@@ -0,0 +1,132 @@
+"""
+Pruebas del encadenamiento hacia adelante con reglas por capas
+(reglas que leen los hechos derivados diagnostico_<conclusión>)
+"""
+
+import pytest
+
+from src.base_conocimiento import reglas_crisp
+from src.base_conocimiento.reglas_crisp import Condition, Rule, get_compiled_rules
+from src.motor_inferencia import MotorDiagnostico
+from src.motor_inferencia.encadenamiento_adelante import ForwardChainingEngine
+from src.motor_inferencia.rete import ReteEngine
+
+
+ENGINES = [ForwardChainingEngine, ReteEngine]
+
+# Regla de segunda capa: se apoya en una conclusión de la tabla real
+DERIVACION = Rule(
+    'Derivación urgente: absceso con fiebre',
+    [Condition('diagnostico_absceso', '==', True), Condition('fiebre', '==', 'si')],
+    'derivacion_urgente',
+    0.97
+)
+
+ABSCESO_CON_FIEBRE = {'pus_visible': 'si', 'intensidad_dolor': 7, 'dolor_presion': 8, 'fiebre': 'si'}
+
+
+def regla(nombre, campo, valor, conclusion):
+    return Rule(nombre, [Condition(campo, '==', valor)], conclusion, 0.9)
+
+
+def conclusiones(engine_class, rules, facts, **kwargs):
+    engine = engine_class(rules, **kwargs)
+    return engine, [c['diagnostico'] for c in engine.run(facts)]
+
+
+@pytest.mark.parametrize('engine_class', ENGINES)
+def test_regla_posterior_en_la_misma_pasada(engine_class):
+    rules = [
+        regla('base', 'fiebre', 'si', 'infeccion'),
+        regla('capa', 'diagnostico_infeccion', True, 'derivacion')
+    ]
+    _, found = conclusiones(engine_class, rules, {'fiebre': 'si'})
+    assert found == ['infeccion', 'derivacion']
+
+
+@pytest.mark.parametrize('engine_class', ENGINES)
+def test_regla_anterior_se_reencola(engine_class):
+    # La regla de capa va primero: falla en la primera pasada y el hecho
+    # derivado la vuelve a poner en la agenda
+    rules = [
+        regla('capa 2', 'diagnostico_derivacion', True, 'ingreso'),
+        regla('capa 1', 'diagnostico_infeccion', True, 'derivacion'),
+        regla('base', 'fiebre', 'si', 'infeccion')
+    ]
+    engine, found = conclusiones(engine_class, rules, {'fiebre': 'si'})
+    assert found == ['infeccion', 'derivacion', 'ingreso']
+    assert engine.asserted_facts == ['diagnostico_infeccion', 'diagnostico_derivacion', 'diagnostico_ingreso']
+
+
+@pytest.mark.parametrize('engine_class', ENGINES)
+def test_ciclo_termina(engine_class):
+    # a -> b -> a: cada regla se dispara una vez y el hecho repetido no re-encola
+    rules = [
+        regla('b desde a', 'diagnostico_a', True, 'b'),
+        regla('a desde b', 'diagnostico_b', True, 'a'),
+        regla('a', 'inicio', 'si', 'a')
+    ]
+    engine, found = conclusiones(engine_class, rules, {'inicio': 'si'})
+    assert found == ['a', 'b', 'a']
+    assert engine.asserted_facts == ['diagnostico_a', 'diagnostico_b']
+    assert engine.iterations < engine.max_iterations
+
+
+@pytest.mark.parametrize('engine_class', ENGINES)
+def test_max_iterations_detiene_la_cadena(engine_class, capsys):
+    # Cadena de 10 capas en orden inverso: cada paso necesita re-encolar
+    rules = [regla(f'c{i}', f'diagnostico_c{i - 1}', True, f'c{i}') for i in range(10, 0, -1)]
+    rules.append(regla('c0', 'inicio', 'si', 'c0'))
+    
+    _, found = conclusiones(engine_class, rules, {'inicio': 'si'})
+    assert found == [f'c{i}' for i in range(11)]
+    
+    engine, found = conclusiones(engine_class, rules, {'inicio': 'si'}, max_iterations=5)
+    assert engine.iterations == 5
+    assert found == [f'c{i}' for i in range(len(found))]
+    assert len(found) < 11
+    assert 'encadenamiento detenido' in capsys.readouterr().out
+    
+    engine, found = conclusiones(engine_class, rules, {'inicio': 'si'}, max_iterations=0)
+    assert engine.max_iterations == 0
+    assert engine.iterations == 0
+    assert found == []
+    assert engine_class(rules).max_iterations == 10 * len(rules) + 100
+
+
+def test_hechos_usados_con_hechos_derivados_en_la_entrada():
+    engine = ForwardChainingEngine([regla('base', 'fiebre', 'si', 'infeccion')])
+    engine.run({'fiebre': 'si', 'diagnostico_infeccion': True, 'diagnostico_otro': True})
+    explanation = engine.explain_reasoning()
+    assert explanation['facts_used'] == 3
+    assert explanation['rules_fired'] == 1
+
+
+@pytest.fixture
+def tabla_con_capa(monkeypatch):
+    """Tabla de reglas del sistema más la regla DERIVACION al principio"""
+    monkeypatch.setattr(reglas_crisp, '_COMPILED_RULES', (DERIVACION,) + get_compiled_rules())
+
+
+def test_sin_capa_no_hay_derivacion():
+    result = MotorDiagnostico().diagnose(ABSCESO_CON_FIEBRE)
+    assert 'derivacion_urgente' not in [d['diagnostico'] for d in result['diagnosticos']]
+
+
+@pytest.mark.parametrize('mode', [None, 'lineal', 'rete'])
+def test_diagnose_encadena_reglas_por_capas(tabla_con_capa, mode):
+    result = MotorDiagnostico(engine_mode=mode).diagnose(ABSCESO_CON_FIEBRE)
+    found = [d['diagnostico'] for d in result['diagnosticos']]
+    assert found[0] == 'derivacion_urgente'
+    assert 'absceso' in found
+    
+    # Sin fiebre la regla de capa no se cumple
+    facts = dict(ABSCESO_CON_FIEBRE, fiebre='no')
+    found = [d['diagnostico'] for d in MotorDiagnostico(engine_mode=mode).diagnose(facts)['diagnosticos']]
+    assert 'derivacion_urgente' not in found
+
+
+def test_diagnose_batch_encadena_reglas_por_capas(tabla_con_capa):
+    motor = MotorDiagnostico()
+    facts_list = [ABSCESO_CON_FIEBRE, dict(ABSCESO_CON_FIEBRE, fiebre='no'), {'intensidad_dolor': 3}]
+    assert motor.diagnose_batch(facts_list) == [motor.diagnose(facts) for facts in facts_list]
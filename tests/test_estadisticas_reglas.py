@@ -0,0 +1,94 @@
+"""
+Pruebas del recolector de estadísticas de reglas
+"""
+
+import pytest
+
+from src.base_conocimiento import evaluate_crisp_rules, get_compiled_rules
+from src.base_conocimiento.estadisticas_reglas import disable_rule_statistics, enable_rule_statistics
+from src.motor_inferencia.encadenamiento_adelante import ForwardChainingEngine
+from src.motor_inferencia.rete import ReteEngine
+
+
+@pytest.fixture
+def estadisticas():
+    recolector = enable_rule_statistics()
+    yield recolector
+    disable_rule_statistics()
+
+
+def test_cuenta_evaluate_crisp_rules(corpus, estadisticas):
+    pacientes = [entry['s'] for entry in corpus[:200]]
+    disable_rule_statistics()
+    esperados = [evaluate_crisp_rules(facts) for facts in pacientes]
+    enable_rule_statistics(estadisticas)
+    
+    assert [evaluate_crisp_rules(facts) for facts in pacientes] == esperados
+    stats = estadisticas.stats()
+    assert stats['evaluate_crisp_rules']['llamadas'] == len(pacientes)
+    assert stats['evaluate_crisp_rules']['diagnosticos'] == sum(len(r) for r in esperados)
+    disparos = sum(regla['disparos'] for regla in stats['reglas'].values())
+    assert disparos == stats['evaluate_crisp_rules']['diagnosticos']
+
+
+def disparos_por_regla(stats):
+    return {nombre: regla['disparos'] for nombre, regla in stats['reglas'].items() if regla['disparos']}
+
+
+@pytest.mark.parametrize('motor', [ForwardChainingEngine, ReteEngine])
+def test_encadenamiento_cuenta_por_regla(corpus, estadisticas, motor):
+    pacientes = [entry['s'] for entry in corpus[:200]]
+    engine = motor(get_compiled_rules())
+    conclusiones = [engine.run(facts) for facts in pacientes]
+    
+    stats = estadisticas.stats()
+    ejecuciones = stats['encadenamiento'][motor.__name__]
+    assert ejecuciones['ejecuciones'] == len(pacientes)
+    assert ejecuciones['conclusiones'] == sum(len(c) for c in conclusiones)
+    
+    # Disparos por regla iguales a las conclusiones obtenidas
+    esperados = {}
+    for lista in conclusiones:
+        for conclusion in lista:
+            esperados[conclusion['regla']] = esperados.get(conclusion['regla'], 0) + 1
+    assert disparos_por_regla(stats) == esperados
+    
+    for regla in stats['reglas'].values():
+        # Cada evaluación se detiene en una condición o dispara la regla
+        condiciones = regla['condiciones']
+        assert condiciones[0]['evaluaciones'] == regla['evaluaciones']
+        assert condiciones[-1]['cumplidas'] == regla['disparos']
+        for anterior, siguiente in zip(condiciones, condiciones[1:]):
+            assert siguiente['evaluaciones'] == anterior['cumplidas']
+
+
+def test_encadenamiento_lineal_evalua_toda_la_tabla(corpus):
+    pacientes = [entry['s'] for entry in corpus[:100]]
+    estadisticas = enable_rule_statistics(sample_every=4)
+    try:
+        engine = ForwardChainingEngine(get_compiled_rules())
+        for facts in pacientes:
+            engine.run(facts)
+    finally:
+        disable_rule_statistics()
+    
+    reglas = estadisticas.stats()['reglas']
+    assert len(reglas) == len(get_compiled_rules())
+    # Sin hechos derivados que las re-encolen, cada regla se evalúa una vez por ejecución
+    assert all(regla['evaluaciones'] == len(pacientes) for regla in reglas.values())
+    # Una de cada sample_every ejecuciones se cronometra regla a regla
+    assert all(regla['tiempo_ms'] is not None for regla in reglas.values())
+
+
+def test_encadenamiento_igual_al_indice(corpus, estadisticas):
+    """Los disparos por regla coinciden con los de evaluate_crisp_rules"""
+    pacientes = [entry['s'] for entry in corpus[:200]]
+    for facts in pacientes:
+        evaluate_crisp_rules(facts)
+    por_indice = disparos_por_regla(estadisticas.stats())
+    
+    estadisticas.reset()
+    engine = ReteEngine(get_compiled_rules())
+    for facts in pacientes:
+        engine.run(facts)
+    assert disparos_por_regla(estadisticas.stats()) == por_indice
@@ -0,0 +1,87 @@
+"""
+Evaluación difusa concurrente: muchos hilos sobre el sistema fuzzy global
+deben obtener lo mismo que la evaluación en serie
+(versión reducida de python -m benchmarks.estres_difuso)
+"""
+
+import random
+import threading
+
+import pytest
+
+from src.base_conocimiento import reglas_difusas
+
+
+HILOS = 8
+RONDAS = 2
+
+
+@pytest.fixture
+def sistema_global(monkeypatch):
+    """Restaura el sistema fuzzy global al terminar la prueba"""
+    monkeypatch.setattr(reglas_difusas, '_fuzzy_system', reglas_difusas._fuzzy_system)
+
+
+def evaluar_en_hilos(pacientes):
+    """Evalúa los pacientes desde HILOS hilos a la vez; retorna las discrepancias"""
+    barrera = threading.Barrier(HILOS)
+    resultados = [[] for _ in range(HILOS)]
+    
+    def trabajador(numero):
+        orden = list(range(len(pacientes)))
+        random.Random(numero).shuffle(orden)
+        barrera.wait()
+        for _ in range(RONDAS):
+            for i in orden:
+                resultados[numero].append((i, reglas_difusas.evaluate_fuzzy_rules(pacientes[i])))
+    
+    hilos = [threading.Thread(target=trabajador, args=(n,)) for n in range(HILOS)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return resultados
+
+
+@pytest.mark.parametrize('backend, use_surface', [
+    ('numpy', False),
+    ('numpy', True),
+    ('skfuzzy', False)
+])
+def test_evaluacion_concurrente(corpus, sistema_global, tmp_path, backend, use_surface):
+    if backend == 'skfuzzy':
+        pytest.importorskip('skfuzzy')
+    pacientes = [entry['s'] for entry in corpus[:150]]
+    referencia = reglas_difusas.FuzzyDiagnosisSystem(backend=backend)
+    esperados = [referencia.evaluate(facts) for facts in pacientes]
+    
+    if use_surface or backend != 'numpy':
+        reglas_difusas.configure_fuzzy_system(
+            use_surface=use_surface, surface_path=str(tmp_path / 'superficie.npz'), backend=backend
+        )
+    else:
+        # La instancia global se crea desde los hilos a la vez
+        reglas_difusas._fuzzy_system = None
+    
+    resultados = evaluar_en_hilos(pacientes)
+    
+    assert all(len(r) == RONDAS * len(pacientes) for r in resultados)
+    discrepancias = [(i, obtenido) for r in resultados for i, obtenido in r if obtenido != esperados[i]]
+    assert discrepancias == []
+
+
+def test_singleton_unico_entre_hilos(sistema_global):
+    reglas_difusas._fuzzy_system = None
+    barrera = threading.Barrier(HILOS)
+    sistemas = []
+    
+    def trabajador():
+        barrera.wait()
+        sistemas.append(reglas_difusas.get_fuzzy_system())
+    
+    hilos = [threading.Thread(target=trabajador) for _ in range(HILOS)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    assert len({id(s) for s in sistemas}) == 1
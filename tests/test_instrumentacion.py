@@ -0,0 +1,130 @@
+"""
+Pruebas de los histogramas de latencia y del perfilado por etapas
+"""
+
+import math
+import random
+from bisect import bisect_left
+
+import pytest
+
+from src.motor_inferencia import MotorDiagnostico
+from src.utilidades.instrumentacion import (
+    DEFAULT_BOUNDS,
+    EXPORT_STEP,
+    STAGES,
+    HistogramaLatencia,
+    PerfiladorEtapas,
+    disable_profiling,
+    enable_profiling,
+    get_profiler
+)
+
+
+FACTS = {'intensidad_dolor': 8, 'caries_visible': 'si', 'sensibilidad_frio': 7}
+
+
+def limites_del_cubo(segundos):
+    """Límites (inferior, superior) del cubo en el que cae segundos"""
+    index = bisect_left(DEFAULT_BOUNDS, segundos)
+    return (DEFAULT_BOUNDS[index - 1] if index else 0.0), DEFAULT_BOUNDS[index]
+
+
+@pytest.mark.parametrize('q', [50, 95, 99])
+def test_percentiles_dentro_de_un_cubo(q):
+    generador = random.Random(7)
+    observaciones = [generador.lognormvariate(math.log(1e-3), 1.0) for _ in range(5000)]
+    histograma = HistogramaLatencia()
+    for segundos in observaciones:
+        histograma.observe(segundos)
+    
+    exacto = sorted(observaciones)[math.ceil(q / 100 * len(observaciones)) - 1]
+    inferior, superior = limites_del_cubo(exacto)
+    assert inferior <= histograma.percentile(q) <= superior
+
+
+def test_percentiles_de_observaciones_conocidas():
+    histograma = HistogramaLatencia()
+    for _ in range(90):
+        histograma.observe(0.001)
+    for _ in range(10):
+        histograma.observe(0.020)
+    snapshot = histograma.snapshot()
+    
+    inferior, superior = limites_del_cubo(0.001)
+    assert inferior <= snapshot['p50'] <= superior
+    inferior, superior = limites_del_cubo(0.020)
+    assert inferior <= snapshot['p95'] <= superior
+    # Ningún percentil supera el máximo observado
+    assert snapshot['p99'] <= snapshot['max'] == 0.020
+    assert snapshot['count'] == 100
+    assert snapshot['sum'] == pytest.approx(0.29)
+
+
+def test_reset():
+    histograma = HistogramaLatencia()
+    histograma.observe(0.5)
+    histograma.reset()
+    snapshot = histograma.snapshot()
+    assert (snapshot['count'], snapshot['sum'], snapshot['max'], snapshot['p50']) == (0, 0.0, 0.0, 0.0)
+    assert not any(snapshot['buckets'])
+    
+    perfilador = PerfiladorEtapas()
+    perfilador.record('crisp', 0.001)
+    perfilador.reset()
+    assert perfilador.stats() == {}
+    assert perfilador.to_prometheus().count('\n') == 2
+
+
+def cubos_prometheus(texto, stage):
+    """[(le, recuento)] de la etapa en el texto de Prometheus"""
+    prefijo = f'odontologia_stage_seconds_bucket{{stage="{stage}",le="'
+    cubos = []
+    for linea in texto.splitlines():
+        if linea.startswith(prefijo):
+            le, _, valor = linea[len(prefijo):].partition('"} ')
+            cubos.append((le, int(valor)))
+    return cubos
+
+
+def test_prometheus_acumulado():
+    perfilador = PerfiladorEtapas()
+    generador = random.Random(3)
+    for _ in range(500):
+        perfilador.record('crisp', generador.uniform(1e-6, 0.05))
+        perfilador.record('total', generador.uniform(1e-4, 0.5))
+    perfilador.record('total', 100.0)  # fuera del último límite: solo en +Inf
+    texto = perfilador.to_prometheus()
+    
+    for stage, count in (('crisp', 500), ('total', 501)):
+        cubos = cubos_prometheus(texto, stage)
+        # Solo se exporta uno de cada EXPORT_STEP límites, siempre los mismos
+        limites = [le for le, _ in cubos[:-1]]
+        assert limites == [f'{bound:.9g}' for bound in DEFAULT_BOUNDS[::EXPORT_STEP]]
+        assert [float(le) for le in limites] == sorted(float(le) for le in limites)
+        recuentos = [n for _, n in cubos]
+        assert recuentos == sorted(recuentos)
+        assert cubos[-1] == ('+Inf', count)
+        assert f'odontologia_stage_seconds_count{{stage="{stage}"}} {count}' in texto
+    assert cubos_prometheus(texto, 'total')[-2][1] == 500
+
+
+def test_perfilado_en_diagnose():
+    motor = MotorDiagnostico()
+    assert get_profiler() is None
+    perfilador = enable_profiling()
+    try:
+        motor.diagnose(FACTS)
+        assert get_profiler() is perfilador
+    finally:
+        assert disable_profiling() is perfilador
+    
+    stats = perfilador.stats()
+    assert {'crisp', 'fuzzy', 'conflictos', 'enriquecimiento', 'total'} <= set(stats)
+    assert set(stats) <= set(STAGES)
+    assert all(etapa['count'] == 1 for etapa in stats.values())
+    
+    # Desactivado, diagnose no registra nada
+    motor.diagnose(FACTS)
+    assert perfilador.stats() == stats
+    assert get_profiler() is None
@@ -0,0 +1,100 @@
+"""
+Pruebas de las funciones de pertenencia de logica_difusa
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from src.motor_inferencia.logica_difusa import (
+    FuzzyVariable,
+    GaussianMF,
+    SigmoidMF,
+    TrapezoidalMF,
+    TriangularMF
+)
+
+
+# Puntos dentro y fuera del universo 0-10, en los vértices y entre ellos
+PUNTOS = [-5.0, -0.5, 0.0, 0.5, 1.0, 2.0, 2.5, 4.0, 5.0, 5.5, 6.0, 7.25, 8.0, 9.9, 10.0, 10.5, 15.0]
+
+FUNCIONES = [
+    TriangularMF(2, 5, 8),
+    TriangularMF(0, 0, 4),       # hombro izquierdo
+    TriangularMF(6, 10, 10),     # hombro derecho
+    TrapezoidalMF(1, 4, 6, 9),
+    TrapezoidalMF(0, 0, 2, 5),   # hombro izquierdo
+    TrapezoidalMF(5, 8, 10, 10), # hombro derecho
+    GaussianMF(5, 1.5),
+    SigmoidMF(6, 2),
+    SigmoidMF(4, -1.5)
+]
+
+
+@pytest.mark.parametrize('funcion', FUNCIONES, ids=lambda f: type(f).__name__)
+def test_array_igual_a_escalar(funcion):
+    esperados = [funcion(x) for x in PUNTOS]
+    assert all(type(valor) is float for valor in esperados)
+    
+    resultado = funcion(np.array(PUNTOS))
+    assert resultado.shape == (len(PUNTOS),)
+    assert resultado.tolist() == esperados
+    # Una lista o una matriz se evalúan igual, con la forma de la entrada
+    assert funcion(PUNTOS).tolist() == esperados
+    matriz = np.array(PUNTOS[:16]).reshape(4, 4)
+    assert funcion(matriz).tolist() == [[funcion(x) for x in fila] for fila in matriz.tolist()]
+
+
+def test_triangular_puntos_conocidos():
+    mf = TriangularMF(2, 5, 8)
+    assert [mf(x) for x in (2, 3.5, 5, 6.5, 8)] == [0.0, 0.5, 1.0, 0.5, 0.0]
+    assert TriangularMF(0, 0, 4)(0) == 1.0
+    assert TriangularMF(6, 10, 10)(10) == 1.0
+    assert TriangularMF(6, 10, 10)(11) == 0.0
+
+
+def test_trapezoidal_puntos_conocidos():
+    mf = TrapezoidalMF(1, 4, 6, 9)
+    assert [mf(x) for x in (1, 2.5, 4, 5, 6, 7.5, 9)] == [0.0, 0.5, 1.0, 1.0, 1.0, 0.5, 0.0]
+    assert TrapezoidalMF(0, 0, 2, 5)(0) == 1.0
+    assert TrapezoidalMF(5, 8, 10, 10)(10) == 1.0
+
+
+def test_gaussiana_puntos_conocidos():
+    mf = GaussianMF(5, 2)
+    assert mf(5) == 1.0
+    assert mf(7) == pytest.approx(math.exp(-0.5))
+    assert mf(3) == pytest.approx(math.exp(-0.5))
+    assert mf(9) == pytest.approx(math.exp(-2))
+    assert mf(100) == 0.0
+    with pytest.raises(ValueError):
+        GaussianMF(5, 0)
+
+
+def test_sigmoide_puntos_conocidos():
+    creciente = SigmoidMF(6, 2)
+    assert creciente(6) == 0.5
+    assert creciente(7) == pytest.approx(1 / (1 + math.exp(-2)))
+    assert creciente(5) == pytest.approx(1 - creciente(7))
+    assert creciente(1e6) == 1.0
+    # Lejos del centro exp desborda y la pertenencia tiende a 0 sin avisos
+    with np.errstate(all='raise'):
+        assert creciente(-1e6) == 0.0
+    decreciente = SigmoidMF(6, -2)
+    assert decreciente(5) == pytest.approx(creciente(7))
+
+
+def test_fuzzify_columna():
+    variable = FuzzyVariable('intensidad_dolor', (0, 10))
+    variable.add_fuzzy_set('bajo', TriangularMF(0, 0, 4))
+    variable.add_fuzzy_set('medio', TriangularMF(2, 5, 8))
+    variable.add_fuzzy_set('alto', SigmoidMF(7, 1.5))
+    
+    columna = [0, 3, 5, 8.5, 10, 12]
+    grados = variable.fuzzify(columna)
+    assert set(grados) == {'bajo', 'medio', 'alto'}
+    for nombre, valores in grados.items():
+        assert isinstance(valores, np.ndarray) and valores.shape == (len(columna),)
+        assert valores.tolist() == [variable.fuzzify(x)[nombre] for x in columna]
+    assert variable.fuzzify(5) == {'bajo': 0.0, 'medio': 1.0, 'alto': SigmoidMF(7, 1.5)(5)}
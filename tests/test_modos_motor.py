@@ -0,0 +1,65 @@
+"""
+Pruebas de MotorDiagnostico(engine_mode=...)
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.motor_inferencia import MotorDiagnostico
+from src.motor_inferencia.corpus_dorado import verify_engine
+from src.motor_inferencia.encadenamiento_adelante import ForwardChainingEngine
+from src.motor_inferencia.rete import ReteEngine
+
+
+@pytest.mark.parametrize('mode', ['lineal', 'rete'])
+def test_modo_igual_al_corpus(corpus, mode):
+    report = verify_engine(mode, corpus)
+    assert report['divergencias'] == 0, report['primeras']
+
+
+@pytest.mark.parametrize('mode, engine_class', [('lineal', ForwardChainingEngine), ('rete', ReteEngine)])
+def test_modo_usa_su_motor(mode, engine_class):
+    motor = MotorDiagnostico(engine_mode=mode)
+    motor.diagnose({'intensidad_dolor': 9, 'hinchazon_cara': 'si', 'fiebre': 'si'})
+    engine = motor.crisp_engine
+    assert type(engine) is engine_class
+    assert engine.fired_rules
+
+
+def test_crisp_engine_atributo():
+    """motor.crisp_engine sigue siendo el motor de encadenamiento, no un método"""
+    motor = MotorDiagnostico()
+    facts = {'intensidad_dolor': 9, 'hinchazon_cara': 'si', 'fiebre': 'si'}
+    assert type(motor.crisp_engine) is ForwardChainingEngine
+    assert motor.crisp_engine is motor.crisp_engine
+    conclusions = motor.crisp_engine.run(facts)
+    assert conclusions
+    assert {c['regla'] for c in conclusions} == {rule.name for rule in motor.crisp_engine.fired_rules}
+    assert motor.crisp_engine.explain_reasoning()
+
+
+def test_modo_desconocido():
+    with pytest.raises(ValueError):
+        MotorDiagnostico(engine_mode='otro')
+
+
+def test_un_motor_por_hilo(corpus):
+    facts_list = [entry['s'] for entry in corpus[:400]]
+    expected = [MotorDiagnostico().diagnose(facts) for facts in facts_list]
+    
+    motor = MotorDiagnostico(engine_mode='rete')
+    engines = {}
+    
+    def diagnose(facts):
+        engines.setdefault(threading.get_ident(), set()).add(id(motor.crisp_engine))
+        return motor.analyze(facts).data
+    
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(diagnose, facts_list))
+    
+    assert results == expected
+    # Cada hilo reutiliza siempre el mismo motor y ningún motor se comparte
+    assert all(len(ids) == 1 for ids in engines.values())
+    assert len(set.union(*engines.values())) == len(engines)
@@ -0,0 +1,69 @@
+"""
+Pruebas del orden de condiciones aprendido (optimizador_reglas)
+"""
+
+import json
+
+import pytest
+
+from src.base_conocimiento import reglas_crisp
+from src.base_conocimiento.optimizador_reglas import learn_condition_order, save_condition_order
+from src.base_conocimiento.reglas_crisp import (
+    compile_rules,
+    configure_crisp_evaluator,
+    evaluate_crisp_rules,
+    get_all_rules,
+    get_compiled_rules
+)
+
+
+@pytest.fixture
+def orden_guardado(tmp_path, corpus, monkeypatch):
+    """Aprende un orden con el corpus y lo guarda; restaura la configuración al terminar"""
+    monkeypatch.setattr(reglas_crisp, '_COMPILED_RULES', None)
+    monkeypatch.setattr(reglas_crisp, '_CONDITION_ORDER_PATH', None)
+    monkeypatch.setattr(reglas_crisp, '_CRISP_EVALUATOR', None)
+    path = str(tmp_path / 'orden.json')
+    order, _ = learn_condition_order([entry['s'] for entry in corpus])
+    save_condition_order(order, path=path)
+    return path
+
+
+def condiciones(rules):
+    return [rule.conditions for rule in rules]
+
+
+def test_orden_escrito_por_defecto(orden_guardado):
+    escritas = compile_rules(get_all_rules())
+    assert condiciones(get_compiled_rules()) == condiciones(escritas)
+
+
+def test_orden_aprendido_opcional(orden_guardado, corpus):
+    escritas = compile_rules(get_all_rules())
+    esperado = [evaluate_crisp_rules(entry['s']) for entry in corpus]
+    
+    configure_crisp_evaluator(condition_order=orden_guardado)
+    assert condiciones(get_compiled_rules()) != condiciones(escritas)
+    assert [evaluate_crisp_rules(entry['s']) for entry in corpus] == esperado
+    
+    configure_crisp_evaluator()
+    assert condiciones(get_compiled_rules()) == condiciones(escritas)
+
+
+def test_orden_obsoleto_avisa(orden_guardado):
+    with open(orden_guardado, encoding='utf-8') as f:
+        data = json.load(f)
+    data['huella'] = 'otra'
+    with open(orden_guardado, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    
+    configure_crisp_evaluator(condition_order=orden_guardado)
+    with pytest.warns(UserWarning, match='obsoleto'):
+        rules = get_compiled_rules()
+    assert condiciones(rules) == condiciones(compile_rules(get_all_rules()))
+
+
+def test_orden_inexistente_avisa(orden_guardado, tmp_path):
+    configure_crisp_evaluator(condition_order=str(tmp_path / 'no_existe.json'))
+    with pytest.warns(UserWarning, match='Error al leer'):
+        get_compiled_rules()
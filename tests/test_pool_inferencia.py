@@ -0,0 +1,41 @@
+"""
+Pruebas de InferencePool
+"""
+
+import pytest
+
+from src.base_conocimiento import reglas_difusas
+from src.motor_inferencia import DiagnosisCache, InferencePool, MotorDiagnostico, canonical_key
+
+
+@pytest.fixture
+def sistema_global(monkeypatch):
+    """Sistema fuzzy global propio de la prueba (sin superficie), restaurado al terminar"""
+    sistema = reglas_difusas.FuzzyDiagnosisSystem()
+    monkeypatch.setattr(reglas_difusas, '_fuzzy_system', sistema)
+    return sistema
+
+
+@pytest.mark.parametrize('start_method', ['fork', 'spawn'])
+def test_pool_no_cambia_el_sistema_global(corpus, sistema_global, start_method):
+    pacientes = [entry['s'] for entry in corpus[:40]]
+    cache = DiagnosisCache()
+    motor = MotorDiagnostico(cache=cache)
+    esperados = [motor.diagnose(facts) for facts in pacientes]
+    
+    with InferencePool(processes=1, chunk_size=16, use_surface=True, start_method=start_method) as pool:
+        assert pool.diagnose_batch(pacientes) == esperados
+    
+    assert reglas_difusas._fuzzy_system is sistema_global
+    assert sistema_global.surface is None
+    # La caché sigue siendo válida: no se reemplazó el sistema fuzzy
+    assert cache.get(canonical_key(pacientes[0])) == esperados[0]
+    assert cache.stats()['invalidaciones'] == 0
+
+
+def test_sin_pool_conserva_la_superficie_activa(monkeypatch):
+    sistema = reglas_difusas.FuzzyDiagnosisSystem(use_surface=True)
+    monkeypatch.setattr(reglas_difusas, '_fuzzy_system', sistema)
+    with InferencePool(processes=0, use_surface=True) as pool:
+        pool.diagnose_batch([{'intensidad_dolor': 8}])
+    assert reglas_difusas._fuzzy_system is sistema
@@ -0,0 +1,81 @@
+"""
+Pruebas del procesamiento por lotes de archivos (src.procesar_lotes)
+"""
+
+import csv
+import io
+import json
+import sys
+
+import pytest
+
+from src.procesar_lotes import main, procesar
+
+
+CSV_ENTRADA = (
+    "id,intensidad_dolor,sensibilidad_calor,caries_visible\n"
+    "p1,8,7,si\n"
+    "p2,alto,7,si\n"
+    ",abc,,no\n"
+)
+
+
+def procesar_texto(texto, formato_entrada, formato_salida):
+    salida = io.StringIO()
+    progreso = procesar(io.StringIO(texto), salida, formato_entrada, formato_salida)
+    return salida.getvalue(), progreso
+
+
+def test_csv_error_conserva_id():
+    texto, progreso = procesar_texto(CSV_ENTRADA, 'csv', 'csv')
+    filas = list(csv.DictReader(io.StringIO(texto)))
+    
+    assert [fila['id'] for fila in filas] == ['p1', 'p2', '']
+    assert filas[0]['diagnostico'] and not filas[0]['error']
+    assert filas[1]['error'].startswith('Valor numérico inválido')
+    assert filas[1]['diagnostico'] == ''
+    assert filas[2]['error']
+    assert progreso.registros == 3
+    assert progreso.errores == 2
+
+
+def test_csv_error_conserva_id_en_jsonl():
+    texto, _ = procesar_texto(CSV_ENTRADA, 'csv', 'jsonl')
+    salidas = [json.loads(linea) for linea in texto.splitlines()]
+    
+    assert salidas[1]['id'] == 'p2'
+    assert 'error' in salidas[1] and 'resultado' not in salidas[1]
+    assert 'id' not in salidas[2]
+
+
+def test_jsonl_invalido():
+    texto, progreso = procesar_texto('{"id": "a", "intensidad_dolor": 5}\n[1]\n{roto\n', 'jsonl', 'jsonl')
+    salidas = [json.loads(linea) for linea in texto.splitlines()]
+    
+    assert salidas[0]['id'] == 'a' and 'resultado' in salidas[0]
+    assert [s['registro'] for s in salidas] == [1, 2, 3]
+    assert all('error' in s for s in salidas[1:])
+    assert progreso.errores == 2
+
+
+@pytest.mark.parametrize('argumentos', [
+    ['--tamano-bloque', '0'],
+    ['--tamano-bloque', '-3'],
+    ['--tamano-bloque', 'x'],
+    ['--procesos', '-1']
+])
+def test_argumentos_invalidos(tmp_path, monkeypatch, capsys, argumentos):
+    entrada = tmp_path / 'entrada.jsonl'
+    entrada.write_text('{"intensidad_dolor": 5}\n{"intensidad_dolor": 8}\n', encoding='utf-8')
+    salida = tmp_path / 'salida.jsonl'
+    monkeypatch.setattr(sys, 'argv', ['procesar_lotes', str(entrada), str(salida)] + argumentos)
+    with pytest.raises(SystemExit) as error:
+        main()
+    assert error.value.code == 2
+    assert argumentos[0] in capsys.readouterr().err
+    assert not salida.exists()
+
+
+def test_tamano_bloque_invalido_en_procesar():
+    with pytest.raises(ValueError):
+        procesar(io.StringIO('{}\n'), io.StringIO(), 'jsonl', 'jsonl', tamano_bloque=0)
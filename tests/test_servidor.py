@@ -0,0 +1,141 @@
+"""
+Pruebas del servicio HTTP de diagnóstico
+"""
+
+import json
+import socket
+import threading
+from concurrent.futures import TimeoutError
+
+import pytest
+
+from src.servicio.trabajadores import EstadoDiagnostico
+from src.servicio.servidor import MAX_CUERPO, ServidorDiagnostico
+
+
+FACTS = {'intensidad_dolor': 8, 'caries_visible': 'si'}
+
+
+@pytest.fixture
+def servidor():
+    servicio = ServidorDiagnostico(port=0, trabajadores=2)
+    servicio.start()
+    yield servicio
+    servicio.shutdown()
+
+
+def peticion(servicio, cabeceras, cuerpo=b''):
+    """Envía una petición POST en crudo y retorna (código, cuerpo JSON)"""
+    host, port = servicio.address[:2]
+    lineas = ['POST /diagnostico HTTP/1.1', f'Host: {host}'] + cabeceras
+    with socket.create_connection((host, port), timeout=5) as conexion:
+        conexion.sendall(('\r\n'.join(lineas) + '\r\n\r\n').encode('latin-1') + cuerpo)
+        archivo = conexion.makefile('rb')
+        codigo = int(archivo.readline().split()[1])
+        longitud = 0
+        while True:
+            linea = archivo.readline().strip()
+            if not linea:
+                break
+            nombre, _, valor = linea.decode('latin-1').partition(':')
+            if nombre.lower() == 'content-length':
+                longitud = int(valor)
+        return codigo, json.loads(archivo.read(longitud))
+
+
+def test_diagnostico(servidor):
+    cuerpo = json.dumps(FACTS).encode()
+    codigo, resultado = peticion(servidor, [f'Content-Length: {len(cuerpo)}'], cuerpo)
+    assert codigo == 200
+    assert resultado['principal'] is not None
+
+
+@pytest.mark.parametrize('cabeceras, esperado', [
+    ([], 411),
+    (['Content-Length: abc'], 400),
+    (['Content-Length: -1'], 400),
+    (['Content-Length: 1_0'], 400),
+    ([f'Content-Length: {MAX_CUERPO + 1}'], 413)
+])
+def test_content_length_invalido(servidor, cabeceras, esperado):
+    codigo, resultado = peticion(servidor, cabeceras)
+    assert codigo == esperado
+    assert 'error' in resultado
+
+
+def enviar_sintomas(servicio, cuerpo):
+    return peticion(servicio, [f'Content-Length: {len(cuerpo)}'], cuerpo)
+
+
+@pytest.mark.parametrize('cuerpo', [
+    b'{"intensidad_dolor": NaN}',
+    b'{"intensidad_dolor": Infinity}',
+    b'{"fiebre": -Infinity}',
+    b'{"intensidad_dolor": 11}',
+    b'{"dolor_presion": -0.5}',
+    b'{"intensidad_dolor": "8"}'
+])
+def test_sintomas_invalidos(servidor, cuerpo):
+    codigo, resultado = enviar_sintomas(servidor, cuerpo)
+    assert codigo == 400
+    assert 'error' in resultado
+
+
+def test_sintomas_en_los_extremos_de_la_escala(servidor):
+    codigo, _ = enviar_sintomas(servidor, b'{"intensidad_dolor": 10, "dolor_presion": 0.0}')
+    assert codigo == 200
+
+
+def test_error_interno_no_se_envia_al_cliente(servidor, monkeypatch, capsys):
+    def fallar(*args):
+        raise RuntimeError('detalle interno')
+    
+    monkeypatch.setattr(servidor, 'diagnose', fallar)
+    codigo, resultado = enviar_sintomas(servidor, json.dumps(FACTS).encode())
+    assert codigo == 500
+    assert 'detalle interno' not in json.dumps(resultado)
+    assert 'RuntimeError: detalle interno' in capsys.readouterr().err
+
+
+def test_tiempo_agotado_cancela_la_tarea(monkeypatch):
+    ejecutadas = []
+    monkeypatch.setattr(EstadoDiagnostico, 'diagnosticar', lambda self, *args: ejecutadas.append(args))
+    servicio = ServidorDiagnostico(port=0, trabajadores=1, timeout=0.05)
+    servicio.start()
+    liberar = threading.Event()
+    try:
+        # El único trabajador está ocupado: el diagnóstico espera en la cola
+        servicio.pool.submit(liberar.wait)
+        with pytest.raises(TimeoutError):
+            servicio.diagnose(FACTS)
+    finally:
+        liberar.set()
+        servicio.shutdown()
+    assert ejecutadas == []
+    assert servicio.metricas.en_curso == 0
+
+
+def test_servicios_independientes(tmp_path):
+    """Un servidor y la fachada asyncio del mismo proceso no comparten motor ni caché"""
+    import asyncio
+    
+    from src.servicio import DiagnosticoAsincrono
+    
+    servicio = ServidorDiagnostico(port=0, trabajadores=1, cache=16)
+    fachada = DiagnosticoAsincrono(trabajadores=1, cache_disco=str(tmp_path / 'cache.db'))
+    otro = ServidorDiagnostico(port=0, trabajadores=1)
+    servicio.start()
+    otro.start()
+    try:
+        assert servicio.metricas.cache is not fachada.cache
+        assert otro.metricas.cache is None
+        
+        esperado = servicio.diagnose(FACTS)
+        assert asyncio.run(fachada.diagnose(FACTS)) == esperado
+        assert servicio.diagnose(FACTS) == esperado
+        assert servicio.metricas.cache.stats()['aciertos'] == 1
+        assert len(fachada.cache) == 1
+    finally:
+        fachada.close()
+        servicio.shutdown()
+        otro.shutdown()
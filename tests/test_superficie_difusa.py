@@ -0,0 +1,43 @@
+"""
+Pruebas de la superficie difusa precalculada (FuzzySurface)
+"""
+
+import math
+
+import pytest
+
+from src.base_conocimiento.reglas_difusas import FuzzyDiagnosisSystem
+
+
+@pytest.fixture(scope='module')
+def sistemas(tmp_path_factory):
+    """Sistema que simula y sistema con superficie (guardada en un directorio temporal)"""
+    ruta = str(tmp_path_factory.mktemp('superficie') / 'superficie.npz')
+    return FuzzyDiagnosisSystem(), FuzzyDiagnosisSystem(use_surface=True, surface_path=ruta)
+
+
+@pytest.mark.parametrize('valor', [math.inf, -math.inf, math.nan, 1e308, 7.5, -1, 11])
+def test_entradas_no_tabuladas_simulan(sistemas, valor):
+    simulado, superficie = sistemas
+    facts = {'intensidad_dolor': valor, 'sensibilidad_frio': 8, 'duracion_dolor': 'mas_semana'}
+    assert superficie.surface.index(valor, 8, 6) is None
+    assert superficie.evaluate(facts) == simulado.evaluate(facts)
+
+
+def test_infinito_conserva_el_diagnostico(sistemas):
+    simulado, superficie = sistemas
+    facts = {'intensidad_dolor': math.inf, 'sensibilidad_frio': 8, 'duracion_dolor': 'mas_semana'}
+    esperado = simulado.evaluate(facts)
+    assert esperado
+    assert superficie.evaluate(facts) == esperado
+
+
+def test_consulta_retorna_float(sistemas):
+    _, superficie = sistemas
+    facts = {'intensidad_dolor': 8, 'sensibilidad_frio': 8, 'duracion_dolor': 'mas_semana'}
+    index = superficie.surface.index(8, 8, 6)
+    assert index is not None
+    for output in superficie.surface.tables:
+        value = superficie.surface.lookup(output, index)
+        assert value is None or type(value) is float
+    assert superficie.evaluate(facts) == FuzzyDiagnosisSystem().evaluate(facts)